@@ -6,7 +6,7 @@ import logging
 from datetime import datetime
 import pytz
 from fastapi import APIRouter, Request, HTTPException, Depends, Query, UploadFile, File, Form
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from utils.timezone_helper import format_for_frontend
 from dependencies.auth import require_admin, require_super_admin_access, require_executive_admin_or_higher, require_admin_with_refresh
 from models.admin_user import AdminUser, AdminRole
@@ -16,6 +16,9 @@ from database.operations import DatabaseOperations
 from config.database import Database
 from utils.event_status_manager import EventStatusManager
 from utils.dynamic_event_scheduler import add_event_to_scheduler, update_event_in_scheduler, remove_event_from_scheduler
+from utils.event_search import event_search_index
+from utils.tagged_cache import admin_events_cache, admin_listing_tag, invalidate_admin_event_listings
+from utils.redis_cache import event_cache
 from services.communication.notification_service import notification_service
 from services.event_organizer_service import event_organizer_service
 from services.event_action_logger import event_action_logger
@@ -26,6 +29,8 @@ import json
 from services.event_registration_service import event_registration_service
 from services.faculty_registration_service import faculty_registration_service
 from services.event_feedback_service import event_feedback_service
+from services.registration_export_service import registration_export_service, STREAMING_FORMATS
+from services.attendance_config_service import attendance_config_service, CONFIG_FIELD
 from .faculty_organizers import router as faculty_organizers_router
 from .approval import router as approval_router
 
@@ -283,6 +288,10 @@ async def create_event(
             event_doc['attendance_sessions'] = []
             event_doc['attendance_auto_generated'] = False
         
+        # Store the attendance config registrations copy their attendance skeleton from; it is
+        # read from the attendance fields set above, so detection does not run a second time
+        event_doc[CONFIG_FIELD] = attendance_config_service.build_config(event_doc)
+        
         # Insert event
         result = await db.events.insert_one(event_doc)
         
@@ -572,16 +581,15 @@ async def create_event(
             # Add booking to venue_bookings collection
             await db.venue_bookings.insert_one(venue_booking)
         
-        # Invalidate admin cache since new event was created
-        from utils.redis_cache import event_cache
+        # Invalidate the admin listings the new event appears in
+        await invalidate_admin_event_listings(event_doc)
+        await event_cache.refresh_event(event_data.event_id)
+        
+        # Make the new event searchable
         try:
-            if event_cache.is_available():
-                keys = event_cache.redis_client.keys("admin_events:*")
-                if keys:
-                    deleted_count = event_cache.redis_client.delete(*keys)
-                    logger.info(f"🗑️ Invalidated {deleted_count} admin cache entries after event creation")
-        except Exception as cache_error:
-            logger.warning(f"Failed to invalidate admin cache after event creation: {cache_error}")
+            await event_search_index.upsert_event(event_doc)
+        except Exception as search_error:
+            logger.warning(f"Failed to index event {event_data.event_id} for search: {search_error}")
         
         # Add event to scheduler only if no approval required
         if not event_data.approval_required:
@@ -840,20 +848,25 @@ async def update_event(
             {"$set": update_doc}
         )
         
-        # Invalidate admin cache since event was updated
-        from utils.redis_cache import event_cache
-        try:
-            if event_cache.is_available():
-                keys = event_cache.redis_client.keys("admin_events:*")
-                if keys:
-                    deleted_count = event_cache.redis_client.delete(*keys)
-                    logger.info(f"🗑️ Invalidated {deleted_count} admin cache entries after event update")
-        except Exception as cache_error:
-            logger.warning(f"Failed to invalidate admin cache after event update: {cache_error}")
+        updated_event = await db.events.find_one({"event_id": event_id})
+        
+        # Rebuild the stored attendance config if a field it depends on changed
+        if updated_event and not attendance_config_service.is_current(updated_event):
+            updated_event[CONFIG_FIELD] = await attendance_config_service.get_config(updated_event)
+        
+        # Invalidate the admin listings the event left or joined
+        await invalidate_admin_event_listings(existing_event, updated_event)
+        await event_cache.refresh_event(event_id)
+        
+        # Re-index the event text for search
+        if updated_event:
+            try:
+                await event_search_index.upsert_event(updated_event)
+            except Exception as search_error:
+                logger.warning(f"Failed to re-index event {event_id} for search: {search_error}")
         
         # Update event in scheduler with new dates/times
         try:
-            updated_event = await db.events.find_one({"event_id": event_id})
             if updated_event:
                 await update_event_in_scheduler(event_id, updated_event)
                 logger.info(f"✅ Updated event {event_id} in scheduler")
@@ -911,132 +924,120 @@ async def get_events_list(
     limit: int = Query(100, ge=1, le=1000, description="Events per page (max 1000)"),
     admin: AdminUser = Depends(require_admin_with_refresh)
 ):
-    """Get paginated list of events for admin management with Redis caching"""
+    """Get paginated list of events for admin management with Redis caching
+    
+    Entries are tagged with their (status, audience) listing and dropped by event
+    mutations through invalidate_admin_event_listings(); after 30s they are served
+    stale while one request refreshes them in the background.
+    """
     try:
-        import json
-        from utils.redis_cache import event_cache
+        # Cache key based on filters and admin role
+        cache_key = f"{admin.role.value}:{admin.username}:{status}:{target_audience}:{page}:{limit}"
         
-        # Create cache key based on filters and admin role
-        cache_key = f"admin_events:{admin.role.value}:{admin.username}:{status}:{target_audience}:{page}:{limit}"
-        
-        # Try to get from Redis cache first
-        if event_cache.is_available():
-            try:
-                # Use custom cache key for admin-specific data
-                cached_data = event_cache.redis_client.get(cache_key)
-                if cached_data:
-                    logger.info(f"🔥 Cache HIT for admin events: {cache_key}")
-                    return json.loads(cached_data)
-            except Exception as cache_error:
-                logger.warning(f"Cache read error: {cache_error}")
-        
-        logger.info(f"🔍 Cache MISS for admin events: {cache_key}")
-        
-        # Determine if we should include pending approval events
-        include_pending_approval = False
-        
-        # FIXED: Allow pending approval events for admin users who should see them:
-        # 1. Super Admins can see all pending approval events
-        # 2. Organizer Admins can see pending approval events (they'll be filtered by assigned events later)
-        if admin.role in [AdminRole.SUPER_ADMIN, AdminRole.ORGANIZER_ADMIN]:
-            include_pending_approval = True
-        
-        # Get events based on status filter
-        if status == "all":
-            events = await EventStatusManager.get_available_events("all", include_pending_approval=include_pending_approval)
-        else:
-            events = await EventStatusManager.get_available_events(status, include_pending_approval=include_pending_approval)
-        
-        # Apply target audience filter if specified
-        if target_audience != "all":
-            events = [
-                event for event in events 
-                if event.get("target_audience") == target_audience
-            ]
-        
-        # Filter events based on admin role
-        if admin.role == AdminRole.ORGANIZER_ADMIN:
-            if status == "pending_approval":
-                # Debug logging for faculty organizer filtering
-                logger.info(f"🔍 Faculty Organizer {admin.username} (employee_id: {admin.employee_id}) checking pending events")
-                logger.info(f"📊 Total pending events before filtering: {len(events)}")
-                
-                # Log faculty organizers for each pending event
-                for i, event in enumerate(events):
-                    faculty_organizers = event.get("faculty_organizers", [])
-                    event_id = event.get("event_id", "unknown")
-                    logger.info(f"📋 Event {i+1} ({event_id}): faculty_organizers = {faculty_organizers}")
-                    if admin.employee_id in faculty_organizers:
-                        logger.info(f"✅ Match found! Faculty {admin.employee_id} can approve event {event_id}")
-                    else:
-                        logger.info(f"❌ No match. Faculty {admin.employee_id} not in {faculty_organizers} for event {event_id}")
-                
-                # For pending approval, filter by faculty_organizers list
-                events = [
-                    event for event in events 
-                    if admin.employee_id and admin.employee_id in event.get("faculty_organizers", [])
-                ]
-                logger.info(f"🔍 Faculty Organizer {admin.username} viewing {len(events)} assigned pending events")
+        async def load_events_page():
+            logger.info(f"🔍 Loading admin events: {cache_key}")
+            
+            # Determine if we should include pending approval events
+            include_pending_approval = False
+            
+            # FIXED: Allow pending approval events for admin users who should see them:
+            # 1. Super Admins can see all pending approval events
+            # 2. Organizer Admins can see pending approval events (they'll be filtered by assigned events later)
+            if admin.role in [AdminRole.SUPER_ADMIN, AdminRole.ORGANIZER_ADMIN]:
+                include_pending_approval = True
+            
+            # Get events based on status filter
+            if status == "all":
+                events = await EventStatusManager.get_available_events("all", include_pending_approval=include_pending_approval)
             else:
-                # For other statuses, filter by assigned_events
+                events = await EventStatusManager.get_available_events(status, include_pending_approval=include_pending_approval)
+            
+            # Apply target audience filter if specified
+            if target_audience != "all":
                 events = [
                     event for event in events 
-                    if event.get("event_id") in (admin.assigned_events or [])
+                    if event.get("target_audience") == target_audience
                 ]
-        
-        # Add statistics for each event and fix status mapping
-        for event in events:
-            event_id = event.get('event_id')
             
-            # Fix status mapping for frontend: map event_approval_status to status for approval workflow
-            if event.get('event_approval_status') == 'pending_approval':
-                event['status'] = 'pending_approval'
-            elif event.get('event_approval_status') == 'declined':
-                event['status'] = 'declined'
-            # For approved events, keep the original lifecycle status (upcoming, ongoing, completed, etc.)
+            # Filter events based on admin role
+            if admin.role == AdminRole.ORGANIZER_ADMIN:
+                if status == "pending_approval":
+                    # Debug logging for faculty organizer filtering
+                    logger.info(f"🔍 Faculty Organizer {admin.username} (employee_id: {admin.employee_id}) checking pending events")
+                    logger.info(f"📊 Total pending events before filtering: {len(events)}")
+            
+                    # Log faculty organizers for each pending event
+                    for i, event in enumerate(events):
+                        faculty_organizers = event.get("faculty_organizers", [])
+                        event_id = event.get("event_id", "unknown")
+                        logger.info(f"📋 Event {i+1} ({event_id}): faculty_organizers = {faculty_organizers}")
+                        if admin.employee_id in faculty_organizers:
+                            logger.info(f"✅ Match found! Faculty {admin.employee_id} can approve event {event_id}")
+                        else:
+                            logger.info(f"❌ No match. Faculty {admin.employee_id} not in {faculty_organizers} for event {event_id}")
             
-            # Count registrations
-            registrations = event.get('registrations', {})
-            team_registrations = event.get('team_registrations', {})
-            attendances = event.get('attendances', {})
+                    # For pending approval, filter by faculty_organizers list
+                    events = [
+                        event for event in events 
+                        if admin.employee_id and admin.employee_id in event.get("faculty_organizers", [])
+                    ]
+                    logger.info(f"🔍 Faculty Organizer {admin.username} viewing {len(events)} assigned pending events")
+                else:
+                    # For other statuses, filter by assigned_events
+                    events = [
+                        event for event in events 
+                        if event.get("event_id") in (admin.assigned_events or [])
+                    ]
             
-            event['admin_stats'] = {
-                "total_individual_registrations": len(registrations),
-                "total_team_registrations": len(team_registrations),
-                "total_attendances": len(attendances),
-                "registration_percentage": 0,  # Calculate if needed
-                "attendance_percentage": 0 if len(registrations) == 0 else round((len(attendances) / len(registrations)) * 100, 1)
-            }
-        
-        # Pagination
-        total_events = len(events)
-        start_idx = (page - 1) * limit
-        end_idx = start_idx + limit
-        paginated_events = events[start_idx:end_idx]
-        # Fix ObjectId in all events before returning
-        paginated_events = fix_objectid(paginated_events)
-        
-        response_data = {
-            "success": True,
-            "message": f"Retrieved {len(paginated_events)} events",
-            "events": paginated_events,
-            "pagination": {
-                "current_page": page,
-                "total_pages": (total_events + limit - 1) // limit,
-                "total_events": total_events,
-                "events_per_page": limit
+            # Add statistics for each event and fix status mapping
+            for event in events:
+                event_id = event.get('event_id')
+            
+                # Fix status mapping for frontend: map event_approval_status to status for approval workflow
+                if event.get('event_approval_status') == 'pending_approval':
+                    event['status'] = 'pending_approval'
+                elif event.get('event_approval_status') == 'declined':
+                    event['status'] = 'declined'
+                # For approved events, keep the original lifecycle status (upcoming, ongoing, completed, etc.)
+            
+                # Count registrations
+                registrations = event.get('registrations', {})
+                team_registrations = event.get('team_registrations', {})
+                attendances = event.get('attendances', {})
+            
+                event['admin_stats'] = {
+                    "total_individual_registrations": len(registrations),
+                    "total_team_registrations": len(team_registrations),
+                    "total_attendances": len(attendances),
+                    "registration_percentage": 0,  # Calculate if needed
+                    "attendance_percentage": 0 if len(registrations) == 0 else round((len(attendances) / len(registrations)) * 100, 1)
+                }
+            
+            # Pagination
+            total_events = len(events)
+            start_idx = (page - 1) * limit
+            end_idx = start_idx + limit
+            paginated_events = events[start_idx:end_idx]
+            # Fix ObjectId in all events before returning
+            paginated_events = fix_objectid(paginated_events)
+            
+            response_data = {
+                "success": True,
+                "message": f"Retrieved {len(paginated_events)} events",
+                "events": paginated_events,
+                "pagination": {
+                    "current_page": page,
+                    "total_pages": (total_events + limit - 1) // limit,
+                    "total_events": total_events,
+                    "events_per_page": limit
+                }
             }
-        }
-        
-        # Cache the response for 30 seconds (events don't change that frequently for admins)
-        if event_cache.is_available():
-            try:
-                event_cache.redis_client.setex(cache_key, 30, json.dumps(response_data, default=str))
-                logger.info(f"💾 Cached admin events for 30s: {cache_key}")
-            except Exception as cache_error:
-                logger.warning(f"Cache write error: {cache_error}")
+            
+            return response_data
         
-        return response_data
+        return await admin_events_cache.get_or_load(
+            cache_key, load_events_page, tags=[admin_listing_tag(status, target_audience)]
+        )
         
     except Exception as e:
         logger.error(f"Error getting events list: {str(e)}")
@@ -1660,22 +1661,23 @@ async def bulk_update_event_status(request: Request, admin: AdminUser = Depends(
         if new_sub_status:
             update_data["sub_status"] = new_sub_status
         
+        previous_events = await DatabaseOperations.find_many(
+            "events",
+            {"event_id": {"$in": event_ids}},
+            {"_id": 0, "event_id": 1, "status": 1, "sub_status": 1, "target_audience": 1, "event_approval_status": 1}
+        )
+        
         result = await DatabaseOperations.update_many(
             "events",
             {"event_id": {"$in": event_ids}},
             {"$set": update_data}
         )
         
-        # Invalidate admin cache since events were bulk updated
-        from utils.redis_cache import event_cache
-        try:
-            if event_cache.is_available():
-                keys = event_cache.redis_client.keys("admin_events:*")
-                if keys:
-                    deleted_count = event_cache.redis_client.delete(*keys)
-                    logger.info(f"🗑️ Invalidated {deleted_count} admin cache entries after bulk event update")
-        except Exception as cache_error:
-            logger.warning(f"Failed to invalidate admin cache after bulk event update: {cache_error}")
+        # Invalidate the admin listings of every affected event, before and after
+        await invalidate_admin_event_listings(
+            *previous_events, *({**event, **update_data} for event in previous_events)
+        )
+        await event_cache.refresh_events(event_ids)
         
         return {
             "success": True,
@@ -1766,6 +1768,43 @@ async def get_event_attendance(
         logger.error(f"Error getting event attendance: {str(e)}")
         return {"success": False, "message": f"Error retrieving attendance: {str(e)}"}
 
+async def _stream_registration_export(event_id: str, file_format: str, export_type: str, fields: List[str]) -> StreamingResponse:
+    """StreamingResponse with an event's registrations as CSV or XLSX"""
+    try:
+        selected_fields = registration_export_service.select_fields(export_type, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    event = await DatabaseOperations.find_one("events", {"event_id": event_id}, {"_id": 0, "event_id": 1, "event_name": 1})
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+
+    filename = registration_export_service.filename(event, export_type, file_format)
+    return StreamingResponse(
+        registration_export_service.stream(event, selected_fields, file_format, signature_column=export_type == 'sign-sheet'),
+        media_type=registration_export_service.media_type(file_format),
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Cache-Control": "no-store"
+        }
+    )
+
+@router.get("/export/{event_id}/registrations")
+async def download_event_registrations(
+    event_id: str,
+    format: str = Query("csv", description="File format: csv or xlsx"),
+    type: str = Query("custom", description="Export type: quick-standard, sign-sheet or custom"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields for custom exports"),
+    admin: AdminUser = Depends(require_admin)
+):
+    """Download event registrations as a streamed CSV/XLSX file"""
+    if admin.role == AdminRole.ORGANIZER_ADMIN and event_id not in (admin.assigned_events or []):
+        raise HTTPException(status_code=403, detail="Access denied to this event")
+    if format not in STREAMING_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+    field_list = [field.strip() for field in fields.split(",") if field.strip()] if fields else []
+    return await _stream_registration_export(event_id, format, type, field_list)
+
 @router.post("/export/{event_id}")
 async def export_event_data(
     event_id: str,
@@ -1794,6 +1833,11 @@ async def export_event_data(
         export_type = export_data.get('type', 'custom')
         fields = export_data.get('fields', [])
         
+        # Spreadsheet formats are streamed straight from the registration collections
+        file_format = export_data.get('format', 'pdf')
+        if file_format in STREAMING_FORMATS:
+            return await _stream_registration_export(event_id, file_format, export_type, fields)
+        
         # Get event details
         db = await Database.get_database()
         if db is None:
@@ -2251,16 +2295,15 @@ async def delete_event(
         except Exception as e:
             logger.warning(f"⚠️ Cleanup Warning: {str(e)}")
         
-        # Invalidate admin cache since event was deleted
-        try:
-            from utils.redis_cache import event_cache
-            if event_cache.is_available():
-                keys = event_cache.redis_client.keys("admin_events:*")
-                if keys:
-                    deleted_count = event_cache.redis_client.delete(*keys)
-                    logger.info(f"🗑️ Invalidated {deleted_count} admin cache entries after event deletion")
-        except Exception as cache_error:
-            logger.warning(f"Cache invalidation warning: {cache_error}")
+        # Invalidate the admin listings the deleted event appeared in
+        await invalidate_admin_event_listings(existing_event)
+        await event_cache.refresh_event(event_id)
+        
+        if deletion_summary["event_deleted"]:
+            try:
+                await event_search_index.remove_event(event_id)
+            except Exception as search_error:
+                logger.warning(f"Failed to drop event {event_id} from search index: {search_error}")
         
         # Determine success status
         success = deletion_summary["event_deleted"]
@@ -10,6 +10,8 @@ from models.admin_user import AdminUser, AdminRole
 from config.database import Database
 from services.event_organizer_service import EventOrganizerService
 from utils.redis_cache import event_cache
+from utils.tagged_cache import invalidate_admin_event_listings
+from utils.event_search import event_search_index
 from bson import ObjectId
 import logging
 import re
@@ -19,20 +21,6 @@ router = APIRouter()
 event_organizer_service = EventOrganizerService()
 logger = logging.getLogger(__name__)
 
-def invalidate_admin_cache():
-    """Invalidate all admin events cache entries"""
-    try:
-        if event_cache.is_available():
-            # Get all keys matching admin_events pattern
-            keys = event_cache.redis_client.keys("admin_events:*")
-            if keys:
-                deleted_count = event_cache.redis_client.delete(*keys)
-                logger.info(f"🗑️ Invalidated {deleted_count} admin cache entries")
-            else:
-                logger.debug("No admin cache entries to invalidate")
-    except Exception as e:
-        logger.warning(f"Failed to invalidate admin cache: {e}")
-
 @router.post("/approve/{event_id}")
 async def approve_event(
     event_id: str,
@@ -92,8 +80,9 @@ async def approve_event(
         if update_result.modified_count == 0:
             raise HTTPException(status_code=500, detail="Failed to update event status")
         
-        # Invalidate admin cache since event status changed
-        invalidate_admin_cache()
+        # Invalidate the admin listings the event moves between
+        await invalidate_admin_event_listings(event, {**event, "event_approval_status": "approved"})
+        await event_cache.refresh_event(event_id)
         # Add approved event to scheduler for real-time status updates
         try:
             # Get the updated event data
@@ -307,8 +296,9 @@ async def decline_event(
         if update_result.modified_count == 0:
             raise HTTPException(status_code=500, detail="Failed to update event status")
         
-        # Invalidate admin cache since event status changed
-        invalidate_admin_cache()
+        # Invalidate the admin listings the event moves between
+        await invalidate_admin_event_listings(event, {**event, "event_approval_status": "declined"})
+        await event_cache.refresh_event(event_id)
         
         # Remove event from faculty assigned_events (since it's declined)
         faculty_organizers = event.get("faculty_organizers", [])
@@ -423,6 +413,7 @@ async def decline_event(
             delete_result = await db.events.delete_one({"event_id": event_id})
             if delete_result.deleted_count == 1:
                 logger.info(f"🗑️ Successfully deleted declined event {event_id} from database")
+                await event_search_index.remove_event(event_id)
             else:
                 logger.warning(f"⚠️ Failed to delete declined event {event_id} - event not found or already deleted")
         except Exception as e:
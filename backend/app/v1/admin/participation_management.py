@@ -315,34 +315,36 @@ async def bulk_mark_attendance(
         event_id = bulk_data.get("event_id")
         attendance_list = bulk_data.get("attendance_data", [])
         
-        results = []
-        for attendance_item in attendance_list:
-            # Simplified bulk attendance - assume single mark strategy
-            enrollment_no = attendance_item.get("enrollment_no")
-            if enrollment_no:
-                result = await event_attendance_service.mark_single_attendance(
-                    enrollment_no=enrollment_no,
-                    event_id=event_id,
-                    marked_by=current_user.username,
-                    marking_method="admin_bulk"
-                )
-                results.append(result)
-            else:
-                results.append({"success": False, "message": "enrollment_no required"})
+        if not event_id:
+            raise HTTPException(status_code=400, detail="event_id required")
         
-        successful_count = sum(1 for r in results if r["success"])
+        # Top-level target fields apply to every row that does not set its own
+        default_target = {
+            key: bulk_data[key]
+            for key in ("day", "day_number", "session_id", "session_name", "milestone_id", "milestone_name")
+            if bulk_data.get(key) is not None
+        }
         
+        result = await event_attendance_service.bulk_mark_attendance(
+            event_id=event_id,
+            attendance_items=attendance_list,
+            marked_by=current_user.username,
+            marking_method="admin_bulk",
+            default_target=default_target
+        )
+        if not result["success"]:
+            raise HTTPException(status_code=500, detail=result["message"])
+        
+        summary = result["summary"]
         return {
             "success": True,
-            "message": f"Bulk attendance marking completed. {successful_count}/{len(attendance_list)} successful.",
-            "results": results,
-            "summary": {
-                "total_processed": len(attendance_list),
-                "successful": successful_count,
-                "failed": len(attendance_list) - successful_count
-            }
+            "message": f"Bulk attendance marking completed. {summary['successful']}/{summary['total_processed']} successful.",
+            "results": result["results"],
+            "summary": summary
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in bulk attendance marking: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
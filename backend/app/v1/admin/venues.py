@@ -6,6 +6,7 @@ from fastapi import APIRouter, HTTPException, Depends, status, Query
 from typing import List, Optional
 from models.venue import Venue, VenueCreate, VenueUpdate, VenueResponse
 from database.operations import DatabaseOperations
+from services.venue_service import VenueService
 from dependencies.auth import get_current_admin
 from models.admin_user import AdminUser
 from datetime import datetime
@@ -29,15 +30,11 @@ async def get_venues(
     - Results are sorted by name for consistency
     """
     try:
-        # Build filter query based on include_inactive parameter
-        filter_query = {} if include_inactive else {"is_active": True}
-        
-        venues = await DatabaseOperations.find_many(
-            "venues", 
-            filter_query,
-            sort_by=[("name", 1)]  # Always sort by name
-        )
-        return venues
+        # Served from the two-tier venue cache; writes below invalidate it
+        result = await VenueService.get_all_venues(include_inactive)
+        if not result.success:
+            raise RuntimeError(result.message)
+        return result.venues or []
     except Exception as e:
         logger.error(f"Error fetching venues: {e}")
         raise HTTPException(
@@ -74,6 +71,7 @@ async def create_venue(
         # Save to database
         await DatabaseOperations.insert_one("venues", venue.model_dump())
         
+        await VenueService.invalidate_venue_cache()
         logger.info(f"Venue created: {venue_id} by {current_admin.username}")
         return {
             "success": True,
@@ -122,6 +120,7 @@ async def update_venue(
                 detail="No changes made to venue"
             )
         
+        await VenueService.invalidate_venue_cache()
         logger.info(f"Venue updated: {venue_id} by {current_admin.username}")
         return {
             "success": True,
@@ -206,6 +205,7 @@ async def manage_venue_status(
                 detail=f"Failed to {action.replace('_', ' ')} venue"
             )
         
+        await VenueService.invalidate_venue_cache()
         logger.info(log_message)
         return {
             "success": True,
@@ -16,6 +16,8 @@ import jwt
 from dependencies.auth import require_admin, get_current_student
 from models.admin_user import AdminUser
 from database.operations import DatabaseOperations
+from utils.statistics import StatisticsManager
+from utils.tagged_cache import invalidate_student_dashboards
 from core.logger import get_logger
 from config.settings import settings
 
@@ -280,6 +282,7 @@ async def mark_attendance(
             
             # Get current attendance data for this team member
             current_attendance = team_member_data.get("attendance", {})
+            present_before = StatisticsManager.present_participants(team_registration)
             
             # Mark attendance for the team member
             updated_attendance = await _mark_attendance_by_strategy(
@@ -316,6 +319,10 @@ async def mark_attendance(
                     }
                 }
             )
+            await StatisticsManager.record_attendance_present(
+                StatisticsManager.present_participants(team_registration) - present_before
+            )
+            await invalidate_student_dashboards(team_member_data.get("student", {}).get("enrollment_no"))
             
             return {
                 "success": True,
@@ -339,6 +346,7 @@ async def mark_attendance(
             
             # Get current attendance data
             current_attendance = participant.get("attendance", {})
+            present_before = StatisticsManager.present_participants(participant)
             
             # Mark attendance based on strategy
             updated_attendance = await _mark_attendance_by_strategy(
@@ -357,6 +365,10 @@ async def mark_attendance(
                 {"registration_id": registration_id},
                 {"$set": {"attendance": updated_attendance}}
             )
+            await StatisticsManager.record_attendance_present(
+                StatisticsManager.present_participants({**participant, "attendance": updated_attendance}) - present_before
+            )
+            await invalidate_student_dashboards(participant.get("student", {}).get("enrollment_no"))
             
             return {
                 "success": True,
@@ -886,6 +898,7 @@ async def scan_and_mark_attendance(
         # If not already marked, mark attendance
         if not already_marked:
             notes = f"Marked via QR scanner by {volunteer_name} ({volunteer_contact}, {volunteer_role})"
+            present_before = StatisticsManager.present_participants(participant)
             
             updated_attendance = await _mark_attendance_by_strategy(
                 current_attendance,
@@ -903,6 +916,10 @@ async def scan_and_mark_attendance(
                 {"registration_id": registration_id},
                 {"$set": {"attendance": updated_attendance}}
             )
+            await StatisticsManager.record_attendance_present(
+                StatisticsManager.present_participants({**participant, "attendance": updated_attendance}) - present_before
+            )
+            await invalidate_student_dashboards(participant.get("student", {}).get("enrollment_no"))
             
             attendance_status = "marked"
             
@@ -96,7 +96,7 @@ async def refresh_token_api(request: Request, refresh_data: RefreshTokenRequest)
             )
         
         # Try to refresh the access token
-        new_token_data = token_manager.refresh_access_token(refresh_token)
+        new_token_data = await token_manager.refresh_access_token(refresh_token)
         if not new_token_data:
             return JSONResponse(
                 status_code=401,
@@ -243,7 +243,7 @@ async def unified_login(request: Request, login_data: UnifiedLoginRequest):
         try:
             if token_manager.is_available():
                 # Use Redis-backed tokens if available
-                tokens = token_manager.generate_tokens(
+                tokens = await token_manager.generate_tokens(
                     user_id=user_id,
                     user_type=user_type,
                     user_data=user_data,
@@ -411,7 +411,7 @@ async def unified_logout(request: Request):
         
         # Revoke tokens if available
         if user_id and token_manager.is_available():
-            token_manager.revoke_user_tokens(user_id, user_type)
+            await token_manager.revoke_user_tokens(user_id, user_type)
         
         # Clear session data based on user type
         if user_type == "admin":
@@ -1,13 +1,15 @@
 """
 Certificate PDF Generation API Endpoints
 """
-import asyncio
-import os
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from fastapi.responses import FileResponse, Response
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
-from services.pdf_generation_service import pdf_service
+from typing import Optional, List, Dict, Any
+from services.pdf_generation_service import pdf_service, safe_pdf_filename
+from services.pdf_job_queue import pdf_job_queue
+from services.certificate_batch_service import certificate_batch_service
+from dependencies.auth import get_optional_admin, require_admin
+from models.admin_user import AdminRole, AdminUser
 from core.logger import get_logger
 
 logger = get_logger(__name__)
@@ -27,11 +29,30 @@ class PDFGenerationResponse(BaseModel):
     message: str
 
 
+class BatchCertificateRequest(BaseModel):
+    event_id: str
+    certificate_type: str
+    format: Optional[str] = "zip"  # zip or pdf (one merged PDF)
+
+
+class BatchCertificateResponse(BaseModel):
+    job_id: str
+    status: str
+    total: int
+    message: str
+
+
 class PDFStatusResponse(BaseModel):
     job_id: str
     status: str  # pending, processing, completed, failed
-    file_path: Optional[str] = None
+    filename: Optional[str] = None
     error: Optional[str] = None
+    # Batch jobs only
+    total: Optional[int] = None
+    completed: Optional[int] = None
+    failed: Optional[int] = None
+    progress: Optional[float] = None
+    errors: Optional[List[Dict[str, Any]]] = None
 
 
 @router.post("/generate", response_model=PDFGenerationResponse)
@@ -50,18 +71,17 @@ async def generate_certificate_pdf(
     4. Download from /download/{job_id}
     """
     try:
-        # Create job
-        job_id = pdf_service.create_job()
+        # Queue the job - any worker process/instance can claim it
+        job_id = await pdf_job_queue.enqueue("single", {
+            "html_content": request.html_content,
+            "filename": request.filename,
+            "width": request.width,
+            "height": request.height
+        })
         
-        # Start PDF generation in background
-        background_tasks.add_task(
-            pdf_service.generate_pdf,
-            job_id=job_id,
-            html_content=request.html_content,
-            filename=request.filename,
-            width=request.width,
-            height=request.height
-        )
+        # No worker loop in this process (e.g. serverless) - run it after the response
+        if not pdf_job_queue.is_running:
+            background_tasks.add_task(pdf_job_queue.process_job, job_id)
         
         logger.info(f"📝 Created PDF generation job: {job_id}")
         
@@ -76,8 +96,18 @@ async def generate_certificate_pdf(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _check_job_access(job: Dict[str, Any], admin: Optional[AdminUser]):
+    """Batch jobs hold every participant's certificate, so only the admin who started one may read it"""
+    if job.get("kind") != "batch":
+        return
+    if admin is None:
+        raise HTTPException(status_code=401, detail="Admin login required")
+    if admin.username != job.get("requested_by"):
+        raise HTTPException(status_code=403, detail="Access denied to this job")
+
+
 @router.get("/status/{job_id}", response_model=PDFStatusResponse)
-async def get_pdf_status(job_id: str):
+async def get_pdf_status(job_id: str, admin: Optional[AdminUser] = Depends(get_optional_admin)):
     """
     Check the status of a PDF generation job
     
@@ -87,29 +117,41 @@ async def get_pdf_status(job_id: str):
     - completed: PDF ready for download
     - failed: Generation failed (check error field)
     """
-    status = pdf_service.get_job_status(job_id)
+    status = await pdf_job_queue.get_job(job_id)
     
     if not status:
         raise HTTPException(status_code=404, detail="Job not found")
+    _check_job_access(status, admin)
+    
+    total = status.get("total")
+    progress = None
+    if total:
+        progress = round((status["completed"] + status["failed"]) * 100 / total, 1)
     
     return PDFStatusResponse(
         job_id=job_id,
         status=status["status"],
-        file_path=status.get("file_path"),
-        error=status.get("error")
+        filename=status.get("filename"),
+        error=status.get("error"),
+        total=total,
+        completed=status.get("completed"),
+        failed=status.get("failed"),
+        progress=progress,
+        errors=status.get("errors")
     )
 
 
 @router.get("/download/{job_id}")
-async def download_certificate_pdf(job_id: str):
+async def download_certificate_pdf(job_id: str, admin: Optional[AdminUser] = Depends(get_optional_admin)):
     """
     Download the generated PDF file
     Only works if status is 'completed'
     """
-    status = pdf_service.get_job_status(job_id)
+    status = await pdf_job_queue.get_job(job_id)
     
     if not status:
         raise HTTPException(status_code=404, detail="Job not found")
+    _check_job_access(status, admin)
     
     if status["status"] != "completed":
         raise HTTPException(
@@ -117,23 +159,75 @@ async def download_certificate_pdf(job_id: str):
             detail=f"PDF not ready. Current status: {status['status']}"
         )
     
-    file_path = status.get("file_path")
-    if not file_path or not os.path.exists(file_path):
+    try:
+        grid_out = await pdf_job_queue.open_download(job_id)
+    except Exception:
+        grid_out = None
+    if grid_out is None:
         raise HTTPException(status_code=404, detail="PDF file not found")
     
-    filename = os.path.basename(file_path)
+    filename = status["filename"]
+    media_type = 'application/zip' if filename.endswith('.zip') else 'application/pdf'
     
-    return FileResponse(
-        path=file_path,
-        media_type='application/pdf',
-        filename=filename,
+    async def stream_file():
+        while True:
+            chunk = await grid_out.readchunk()
+            if not chunk:
+                break
+            yield chunk
+    
+    return StreamingResponse(
+        stream_file(),
+        media_type=media_type,
         headers={
             "Content-Disposition": f'attachment; filename="{filename}"',
+            "Content-Length": str(grid_out.length),
             "Cache-Control": "no-cache"
         }
     )
 
 
+@router.post("/batch", response_model=BatchCertificateResponse)
+async def generate_event_certificates_batch(
+    request: BatchCertificateRequest,
+    background_tasks: BackgroundTasks,
+    admin: AdminUser = Depends(require_admin)
+):
+    """
+    Generate one certificate type for every eligible participant of an event (Admin only)
+    
+    Usage:
+    1. POST to /batch with event_id, certificate_type and format ("zip" or "pdf")
+    2. Poll /status/{job_id} - total/completed/failed/progress show how far it is
+    3. Download the ZIP (or merged PDF) from /download/{job_id}
+    
+    Status and download of a batch job are limited to the admin who started it.
+    """
+    if admin.role == AdminRole.ORGANIZER_ADMIN and request.event_id not in (admin.assigned_events or []):
+        raise HTTPException(status_code=403, detail="Access denied to this event")
+    
+    result = await certificate_batch_service.start_batch(
+        event_id=request.event_id,
+        certificate_type=request.certificate_type,
+        output_format=request.format,
+        requested_by=admin.username
+    )
+    if not result["success"]:
+        status_code = 404 if result["message"] == "Event not found" else 400
+        raise HTTPException(status_code=status_code, detail=result["message"])
+    
+    if not pdf_job_queue.is_running:
+        background_tasks.add_task(pdf_job_queue.process_job, result["job_id"])
+    logger.info(f"📝 Created batch certificate job {result['job_id']} for {request.event_id} ({result['total']} certificates) by {admin.username}")
+    
+    return BatchCertificateResponse(
+        job_id=result["job_id"],
+        status="pending",
+        total=result["total"],
+        message="Batch certificate generation started. Use job_id to check progress."
+    )
+
+
 @router.post("/generate-sync")
 async def generate_certificate_pdf_sync(request: PDFGenerationRequest):
     """
@@ -141,23 +235,18 @@ async def generate_certificate_pdf_sync(request: PDFGenerationRequest):
     Use this only for testing or low-traffic scenarios
     """
     try:
-        job_id = pdf_service.create_job()
-        
         # Generate PDF and wait
-        file_path = await pdf_service.generate_pdf(
-            job_id=job_id,
+        pdf_bytes = await pdf_service.generate_pdf_bytes(
             html_content=request.html_content,
-            filename=request.filename,
             width=request.width,
             height=request.height
         )
         
-        filename = os.path.basename(file_path)
+        filename = safe_pdf_filename(request.filename)
         
-        return FileResponse(
-            path=file_path,
+        return Response(
+            content=pdf_bytes,
             media_type='application/pdf',
-            filename=filename,
             headers={
                 "Content-Disposition": f'attachment; filename="{filename}"'
             }
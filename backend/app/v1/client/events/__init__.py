@@ -2,6 +2,9 @@
 Client Events API with Redis Caching Support
 Handles event-related API endpoints for students and faculty (browsing, details, etc.)
 """
+import asyncio
+import base64
+import json
 import logging
 from fastapi import APIRouter, Request, HTTPException, Depends, Query
 from dependencies.auth import get_current_student_optional, get_current_faculty_optional, get_current_user, require_student_login
@@ -9,17 +12,14 @@ from models.student import Student
 from models.faculty import Faculty
 from database.operations import DatabaseOperations
 from utils.event_status_manager import EventStatusManager
+from utils.statistics import StatisticsManager
+from utils.event_search import event_search_index
 from bson import ObjectId
 from datetime import datetime
 from typing import Union, Optional
 
-# Import Redis cache with fallback
-try:
-    from utils.redis_cache import event_cache
-    REDIS_CACHE_AVAILABLE = True
-except ImportError:
-    REDIS_CACHE_AVAILABLE = False
-    event_cache = None
+from utils.redis_cache import event_cache, AUDIENCE_VIEWS
+from utils.two_tier_cache import two_tier_cached
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -54,148 +54,283 @@ def serialize_event(event):
     
     return serialized
 
+# Fields the event cards and list filters use; full documents come from /details
+EVENT_CARD_PROJECTION = {
+    "_id": 0,
+    "event_id": 1, "event_name": 1, "event_type": 1, "category": 1,
+    "short_description": 1, "description": 1,
+    "status": 1, "sub_status": 1, "target_audience": 1,
+    "start_datetime": 1, "end_datetime": 1,
+    "registration_start_date": 1, "registration_end_date": 1,
+    "certificate_end_date": 1, "feedback_end_date": 1, "feedback_form.end_date": 1,
+    "venue": 1, "mode": 1, "organizing_department": 1,
+    "student_department": 1, "student_semester": 1,
+    "registration_mode": 1, "registration_type": 1, "is_team_based": 1, "registration_fee": 1, "max_participants": 1,
+    "is_certificate_based": 1, "certificate_based": 1, "is_paid": 1,
+}
+
+# Keyset order for every listing; event_id breaks ties between events starting together
+EVENT_LIST_SORT = [("start_datetime", 1), ("event_id", 1)]
+
+MAX_EVENTS_PER_PAGE = 100
+MAX_UPCOMING_EVENTS = 50
+MAX_SEARCH_RESULTS = 1000
+
+
+@two_tier_cached("event_details", key=lambda event_id: event_id, shared=False, local_ttl_seconds=15)
+async def _get_cached_event(event_id: str) -> Optional[dict]:
+    """Event details with an in-process tier in front of the shared per-event cache"""
+    return await event_cache.get_event(event_id)
+
+
+def _card_fields(event: dict) -> dict:
+    """Apply EVENT_CARD_PROJECTION to a cached (full) event document"""
+    card = {key: event[key] for key in EVENT_CARD_PROJECTION if key in event and "." not in key}
+    feedback_end = (event.get("feedback_form") or {}).get("end_date")
+    if feedback_end is not None:
+        card["feedback_form"] = {"end_date": feedback_end}
+    return card
+
+
+def _encode_cursor(event: dict) -> str:
+    """Opaque keyset cursor pointing just past `event`"""
+    start = event.get("start_datetime")
+    if isinstance(start, str):
+        # Cached events carry ISO strings; cursors always hold real datetimes
+        try:
+            start = datetime.fromisoformat(start)
+        except ValueError:
+            pass
+    is_datetime = isinstance(start, datetime)
+    payload = [start.isoformat() if is_datetime else start, is_datetime, event.get("event_id")]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    """(start_datetime, event_id) from a cursor; raises ValueError when it is malformed"""
+    try:
+        start, is_datetime, event_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (datetime.fromisoformat(start) if is_datetime else start), event_id
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def _after_cursor(start, event_id, descending: bool = False) -> dict:
+    """Events sorting after (start, event_id) in EVENT_LIST_SORT order, or in its reverse when `descending`"""
+    if descending:
+        if start is None:
+            # Null sorts last, so only undated events remain
+            return {"start_datetime": None, "event_id": {"$lt": event_id}}
+        return {"$or": [
+            {"start_datetime": {"$lt": start}},
+            {"start_datetime": None},
+            {"start_datetime": start, "event_id": {"$lt": event_id}}
+        ]}
+    if start is None:
+        # Null sorts first, so everything dated comes after it
+        return {"$or": [
+            {"start_datetime": {"$ne": None}},
+            {"start_datetime": None, "event_id": {"$gt": event_id}}
+        ]}
+    return {"$or": [
+        {"start_datetime": {"$gt": start}},
+        {"start_datetime": start, "event_id": {"$gt": event_id}}
+    ]}
+
+
+def _profile_conditions(current_user) -> list:
+    """Department and semester filters for a student whose profile has both"""
+    if not isinstance(current_user, Student) or not current_user.department or not current_user.semester:
+        return []
+    semester = str(current_user.semester)
+    return [
+        {"student_department": current_user.department},
+        {"student_semester": {"$in": [semester, f"SEM{semester}"]}}
+    ]
+
+
+async def _category_values(category: str) -> list:
+    """Stored spellings of a category, matched case-insensitively against the (small) distinct set"""
+    wanted = category.strip().lower()
+    categories = await DatabaseOperations.distinct("events", "category")
+    return [value for value in categories if isinstance(value, str) and value.lower() == wanted]
+
+
 @router.get("/unified")
 async def get_events_unified(
     mode: str = Query("list", description="Mode: list, search, upcoming, categories"),
-    status: str = Query("all", description="Filter by event status: all, upcoming, ongoing, completed"),
+    status: str = Query("all", description="Filter by event status: all, upcoming, ongoing, live, completed"),
     category: str = Query(None, description="Filter by event category"),
     q: str = Query(None, description="Search query (required for search mode)"),
-    page: int = Query(1, description="Page number for pagination"),
+    page: int = Query(1, description="Page number for pagination (ignored when a cursor is given)"),
     limit: int = Query(10, description="Number of events per page"),
-    force_refresh: bool = Query(False, description="Force refresh cache"),
+    cursor: str = Query(None, description="Keyset cursor from the previous page's pagination.next_cursor"),
+    order: str = Query("asc", description="asc: earliest start first, desc: latest start first (send the same order with a cursor)"),
+    match_profile: bool = Query(False, description="Students: only events offered to their department and semester"),
+    force_refresh: bool = Query(False, description="Bypass the listing cache and query MongoDB"),
     current_user: Union[Student, Faculty, None] = Depends(get_current_user)
 ):
-    """UNIFIED endpoint for all event operations: list, search, upcoming, categories"""
+    """UNIFIED endpoint for all event operations: list, search, upcoming, categories
+
+    Filtering, ordering and paging all run in MongoDB on indexed fields. Pages are
+    ordered by (start_datetime, event_id), or its reverse with order=desc; follow
+    `pagination.next_cursor` for constant-cost paging, `page` is kept for existing
+    clients. Search mode ranks hits by relevance through the event search index and
+    pages by `page`. Categories mode also returns per-category event counts for the
+    given status and audience.
+    """
     try:
-        # Handle categories mode specially
-        if mode == "categories":
-            events = await DatabaseOperations.find_many("events", {})
-            categories = set()
-            for event in events:
-                category_val = event.get('category')
-                if category_val:
-                    categories.add(category_val)
-            
-            return {
-                "success": True,
-                "message": f"Found {len(categories)} categories",
-                "categories": sorted(list(categories)),
-                "mode": "categories"
-            }
-        
         # Handle search mode validation
         if mode == "search" and (not q or len(q.strip()) < 2):
             return {"success": False, "message": "Search query must be at least 2 characters long"}
         
-        # Get events data with caching
-        cached_events = None
-        if REDIS_CACHE_AVAILABLE and event_cache and not force_refresh:
-            try:
-                cached_events = event_cache.get_events()
-                if cached_events:
-                    logger.info(f"Using cached events data from Redis")
-            except Exception as e:
-                logger.warning(f"Redis cache retrieval failed: {e}")
-        
-        if not cached_events:
-            logger.info(f"Fetching fresh events data for status: {status}")
-            if status == "all":
-                events = await EventStatusManager.get_available_events("all")
-            else:
-                events = await EventStatusManager.get_available_events(status)
-            
-            if REDIS_CACHE_AVAILABLE and event_cache and status == "all":
-                try:
-                    event_cache.set_events(events)
-                    logger.info(f"Cached {len(events)} events in Redis")
-                except Exception as e:
-                    logger.warning(f"Redis cache storage failed: {e}")
-        else:
-            events = cached_events
+        limit = max(1, min(limit, MAX_UPCOMING_EVENTS if mode == "upcoming" else MAX_EVENTS_PER_PAGE))
+        page = max(page, 1)
+        from_cache = False
         
         # Filter by target audience
         if current_user:
-            user_type = "student" if isinstance(current_user, Student) else "faculty"
-            events = [
-                event for event in events 
-                if event.get('target_audience') in [user_type, 'both']
-            ]
-            logger.info(f"Filtered events for logged-in {user_type}: {len(events)} events")
+            audience_view = "student" if isinstance(current_user, Student) else "faculty"
         else:
-            events = [
-                event for event in events 
-                if event.get('target_audience') == 'student'
-            ]
-            logger.info(f"Filtered events for non-logged users (student events only): {len(events)} events")
+            audience_view = "public"
+        audience = list(AUDIENCE_VIEWS[audience_view])
+        
+        conditions = [
+            {"target_audience": {"$in": audience}},
+            EventStatusManager.status_query("upcoming" if mode == "upcoming" else status)
+        ]
+        profile_conditions = _profile_conditions(current_user) if match_profile else []
+        conditions.extend(profile_conditions)
+        
+        if mode == "categories":
+            categories = await DatabaseOperations.distinct("events", "category")
+            categories = sorted({value for value in categories if value})
+            rows = await DatabaseOperations.aggregate("events", [
+                {"$match": {"$and": [condition for condition in conditions if condition]}},
+                {"$group": {"_id": "$category", "count": {"$sum": 1}}}
+            ])
+            counts = {row["_id"]: row["count"] for row in rows if row["_id"]}
+            
+            return {
+                "success": True,
+                "message": f"Found {len(categories)} categories",
+                "categories": categories,
+                "counts": counts,
+                "total_events": sum(row["count"] for row in rows),
+                "mode": "categories"
+            }
         
         # Apply mode-specific filtering
         if mode == "search":
-            search_query = q.lower().strip()
-            filtered_events = []
-            for event in events:
-                event_name = event.get('event_name', '').lower()
-                event_description = event.get('description', '').lower()
-                event_category = event.get('category', '').lower()
-                
-                if (search_query in event_name or 
-                    search_query in event_description or 
-                    search_query in event_category):
-                    filtered_events.append(event)
-            events = filtered_events
-        
-        elif mode == "upcoming":
-            events = [event for event in events if event.get('status') == 'upcoming']
-            events.sort(key=lambda x: x.get('start_datetime', ''))
-            if mode == "upcoming" and limit > 50:  # Limit upcoming to reasonable amount
-                limit = 50
+            ranked_ids = await event_search_index.search_event_ids(q, limit=MAX_SEARCH_RESULTS)
+            conditions.append({"event_id": {"$in": ranked_ids}})
         
         # Filter by category if specified
         if category:
-            events = [event for event in events if event.get('category', '').lower() == category.lower()]        
+            conditions.append({"category": {"$in": await _category_values(category)}})
+        
+        query = {"$and": [condition for condition in conditions if condition]}
+        
+        if mode == "search":
+            # Relevance order: filter the ranked hits in Mongo, then page through them by rank
+            allowed = {
+                event["event_id"] for event in
+                await DatabaseOperations.find_many("events", query, {"_id": 0, "event_id": 1})
+            }
+            hits = [event_id for event_id in ranked_ids if event_id in allowed]
+            total_events = len(hits)
+            start = (page - 1) * limit
+            page_ids = hits[start:start + limit]
+            has_next = start + limit < total_events
+            rank = {event_id: position for position, event_id in enumerate(page_ids)}
+            events = await DatabaseOperations.find_many(
+                "events", {"event_id": {"$in": page_ids}}, EVENT_CARD_PROJECTION
+            ) if page_ids else []
+            events.sort(key=lambda event: rank[event["event_id"]])
+            cursor = None
+        else:
+            after = None
+            if cursor:
+                try:
+                    after = _decode_cursor(cursor)
+                except ValueError as e:
+                    return {"success": False, "message": str(e)}
+            skip = 0 if cursor else (page - 1) * limit
+            descending = order == "desc"
+            
+            # Plain status listings are served from the per-status cache indexes
+            cached_page = None
+            if not category and not profile_conditions and not force_refresh:
+                cached_page = await event_cache.get_listing_page(
+                    "upcoming" if mode == "upcoming" else status, audience_view,
+                    limit, offset=skip, after=after, descending=descending
+                )
+            
+            if cached_page is not None:
+                events = [_card_fields(event) for event in await event_cache.get_events(cached_page["event_ids"])]
+                has_next = cached_page["has_next"]
+                total_events = cached_page["total"]
+                from_cache = True
+            else:
+                page_query = {"$and": query["$and"] + [_after_cursor(*after, descending)]} if after else query
+                
+                # One extra row tells us whether another page exists; the total is only
+                # counted for page-numbered requests, cursor pages skip it
+                events, total_events = await asyncio.gather(
+                    DatabaseOperations.find_many(
+                        "events", page_query, EVENT_CARD_PROJECTION,
+                        limit=limit + 1, skip=skip,
+                        sort_by=[(field, -direction) for field, direction in EVENT_LIST_SORT] if descending else EVENT_LIST_SORT
+                    ),
+                    DatabaseOperations.count_documents("events", query) if not cursor else asyncio.sleep(0, result=None)
+                )
+                has_next = len(events) > limit
+                events = events[:limit]
         
         # Add registration status for logged-in users
         if current_user:
-            if isinstance(current_user, Student):
-                student_data = await DatabaseOperations.find_one("students", {"enrollment_no": current_user.enrollment_no})
-                if student_data:
-                    event_participations = student_data.get('event_participations', {})
-                    for event in events:
-                        event_id = event.get('event_id')
-                        if event_id in event_participations:
-                            participation = event_participations[event_id]
-                            event['user_registration_status'] = {
-                                "registered": True,
-                                "registration_id": participation.get('registration_id'),
-                                "registration_type": participation.get('registration_type', 'individual'),
-                                "attendance_marked": bool(participation.get('attendance_id')),
-                                "feedback_submitted": bool(participation.get('feedback_id')),
-                                "certificate_available": bool(participation.get('certificate_id'))
-                            }
-                        else:
-                            event['user_registration_status'] = {"registered": False}
-                else:
-                    for event in events:
+            if isinstance(current_user, Student) and events:
+                event_ids = [event.get('event_id') for event in events]
+                student_data = await DatabaseOperations.find_one(
+                    "students",
+                    {"enrollment_no": current_user.enrollment_no},
+                    {f"event_participations.{event_id}": 1 for event_id in event_ids if event_id}
+                )
+                event_participations = (student_data or {}).get('event_participations') or {}
+                for event in events:
+                    participation = event_participations.get(event.get('event_id'))
+                    if participation:
+                        event['user_registration_status'] = {
+                            "registered": True,
+                            "registration_id": participation.get('registration_id'),
+                            "registration_type": participation.get('registration_type', 'individual'),
+                            "attendance_marked": bool(participation.get('attendance_id')),
+                            "feedback_submitted": bool(participation.get('feedback_id')),
+                            "certificate_available": bool(participation.get('certificate_id'))
+                        }
+                    else:
                         event['user_registration_status'] = {"registered": False}
             elif isinstance(current_user, Faculty):
                 for event in events:
                     event['user_registration_status'] = {"registered": False}
         
-        # Pagination
-        total_events = len(events)
-        start_idx = (page - 1) * limit
-        end_idx = start_idx + limit
-        paginated_events = events[start_idx:end_idx]
-        
         # Serialize events
-        serialized_events = [serialize_event(event) for event in paginated_events]
+        serialized_events = [serialize_event(event) for event in events]
         
-        # Cache information
-        cache_info = {}
-        if REDIS_CACHE_AVAILABLE and event_cache:
-            try:
-                cache_info = event_cache.get_cache_info()
-            except Exception as e:
-                cache_info = {"error": str(e)}
+        pagination = {
+            "events_per_page": limit,
+            "has_next": has_next,
+            "next_cursor": _encode_cursor(events[-1]) if has_next and mode != "search" else None
+        }
+        if cursor:
+            pagination["has_previous"] = True
+        else:
+            pagination.update({
+                "current_page": page,
+                "total_pages": (total_events + limit - 1) // limit,
+                "total_events": total_events,
+                "has_previous": page > 1
+            })
         
         return {
             "success": True,
@@ -203,16 +338,8 @@ async def get_events_unified(
             "mode": mode,
             "events": serialized_events,
             "search_query": q if mode == "search" else None,
-            "pagination": {
-                "current_page": page,
-                "total_pages": (total_events + limit - 1) // limit,
-                "total_events": total_events,
-                "events_per_page": limit,
-                "has_next": end_idx < total_events,
-                "has_previous": page > 1
-            },
-            "cache_info": cache_info,
-            "from_cache": bool(cached_events)
+            "pagination": pagination,
+            "from_cache": from_cache
         }
         
     except Exception as e:
@@ -227,6 +354,7 @@ async def get_events_list(
     category: str = Query(None, description="Filter by event category"),
     page: int = Query(1, description="Page number for pagination"),
     limit: int = Query(10, description="Number of events per page"),
+    cursor: str = Query(None, description="Keyset cursor from the previous page's pagination.next_cursor"),
     force_refresh: bool = Query(False, description="Force refresh cache"),
     current_user: Union[Student, Faculty, None] = Depends(get_current_user)
 ):
@@ -238,23 +366,45 @@ async def get_events_list(
         category=category,
         page=page,
         limit=limit,
+        cursor=cursor,
+        order="asc",
+        match_profile=False,
         force_refresh=force_refresh,
         current_user=current_user
     )
 
+@router.get("/platform-stats")
+async def get_platform_stats():
+    """Public platform statistics (events hosted, active students, certificates, rating) for the homepage"""
+    stats = await StatisticsManager.get_platform_statistics()
+    return {
+        "success": True,
+        "stats": stats,
+        "formatted": {
+            "total_events": StatisticsManager.format_stat_number(stats["total_events"]),
+            "active_students": StatisticsManager.format_stat_number(stats["active_students"]),
+            "certificates_issued": StatisticsManager.format_stat_number(stats["certificates_issued"]),
+            "platform_rating": StatisticsManager.format_rating(stats["platform_rating"])
+        }
+    }
+
 @router.get("/details/{event_id}")
 async def get_event_details(event_id: str, student: Student = Depends(get_current_student_optional)):
     """Get detailed information about a specific event"""
     try:
-        # Get event details with updated status (no caching for event details to ensure freshness)
-        event = await EventStatusManager.get_event_by_id(event_id)
+        # Per-event cache entry; admin changes and scheduler status flips refresh it
+        event = await _get_cached_event(event_id)
         if not event:
             return {"success": False, "message": "Event not found"}
         
         # Add registration status for logged-in students
         user_registration_status = {"registered": False}
         if student:
-            student_data = await DatabaseOperations.find_one("students", {"enrollment_no": student.enrollment_no})
+            student_data = await DatabaseOperations.find_one(
+                "students",
+                {"enrollment_no": student.enrollment_no},
+                {f"event_participations.{event_id}": 1}
+            )
             if student_data:
                 event_participations = student_data.get('event_participations', {})
                 if event_id in event_participations:
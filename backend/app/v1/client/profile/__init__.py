@@ -2,16 +2,20 @@
 Client Profile API
 Handles student and faculty profile-related API endpoints
 """
+import asyncio
+import hashlib
+import json
 import logging
 import traceback
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 import pytz
 from fastapi import APIRouter, Request, HTTPException, Depends
 from dependencies.auth import require_student_login, get_current_student, get_current_faculty_optional, get_current_user, require_faculty_login, require_student_login_hybrid, get_current_student_hybrid, require_faculty_login_hybrid
 from models.student import Student, StudentUpdate
 from models.faculty import Faculty, FacultyUpdate
 from database.operations import DatabaseOperations
-from typing import Union
+from utils.tagged_cache import student_dashboard_cache, student_dashboard_tag, student_dashboard_event_tag
+from typing import Any, Dict, List, Union
 
 # Import team tools router (LEGACY - DISABLED IN PHASE 3A)
 # from .team_tools import router as team_tools_router
@@ -19,6 +23,64 @@ from typing import Union
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Only the fields the student dashboard renders
+_DASHBOARD_EVENT_PROJECTION = {
+    "_id": 0, "event_id": 1, "event_name": 1, "start_datetime": 1, "venue": 1, "category": 1,
+    "status": 1, "sub_status": 1, "certificate_end_date": 1, "feedback_end_date": 1, "feedback_form.end_date": 1
+}
+_DASHBOARD_REGISTRATION_PROJECTION = {"_id": 0, "registration_id": 1, "attendance": 1, "feedback": 1, "certificate": 1}
+
+
+def _json_ready(value: Any) -> Any:
+    """Dates as ISO strings (as the API would render them), so cached and fresh records look the same"""
+    if isinstance(value, dict):
+        return {key: _json_ready(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_json_ready(item) for item in value]
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+async def _fetch_dashboard_records(event_ids: List[str], registration_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    events, registrations = await asyncio.gather(
+        DatabaseOperations.find_many("events", {"event_id": {"$in": event_ids}}, _DASHBOARD_EVENT_PROJECTION),
+        DatabaseOperations.find_many(
+            "student_registrations", {"registration_id": {"$in": registration_ids}}, _DASHBOARD_REGISTRATION_PROJECTION
+        )
+    )
+    return _json_ready({
+        "events": {event["event_id"]: event for event in events},
+        "registrations": {registration["registration_id"]: registration for registration in registrations}
+    })
+
+
+async def load_student_dashboard_records(enrollment_no: str, participations: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Events and registrations referenced by a student's participations, keyed by
+    event_id and registration_id.
+
+    The records are cached per student. The key covers the participation list,
+    so a new or cancelled registration is a miss; attendance and feedback
+    writers drop the entry through the student's tag, and event updates through
+    the event's tag. No code path writes a registration's certificate data yet;
+    one that does must call invalidate_student_dashboards as well.
+    """
+    event_ids = sorted({p.get('event_id') for p in participations if p.get('event_id')})
+    registration_ids = sorted({p.get('registration_id') for p in participations if p.get('registration_id')})
+    if not event_ids:
+        return {"events": {}, "registrations": {}}
+
+    digest = hashlib.sha1(json.dumps([event_ids, registration_ids]).encode()).hexdigest()[:16]
+    tags = [student_dashboard_tag(enrollment_no)] + [student_dashboard_event_tag(event_id) for event_id in event_ids]
+    return await student_dashboard_cache.get_or_load(
+        f"{enrollment_no}:{digest}",
+        lambda: _fetch_dashboard_records(event_ids, registration_ids),
+        tags
+    )
+
 @router.get("/complete-profile")
 async def get_complete_profile(student: Student = Depends(require_student_login_hybrid)):
     """Get complete profile information including stats and event history in one call - OPTIMIZED"""
@@ -83,6 +145,9 @@ async def get_complete_profile(student: Student = Depends(require_student_login_
         
         event_history = []
         
+        # Every referenced event and registration in two batched queries (cached per student)
+        dashboard_records = await load_student_dashboard_records(student.enrollment_no, event_participations)
+        
         # Process all participations in one pass for efficiency
         for participation in event_participations:
             event_id = participation.get('event_id')
@@ -130,13 +195,10 @@ async def get_complete_profile(student: Student = Depends(require_student_login_
             
             # Build event history entry (only if we need the event data)
             if event_id:
-                event = await DatabaseOperations.find_one("events", {"event_id": event_id})
+                event = dashboard_records["events"].get(event_id)
                 if event:
-                    # Fetch full registration document for attendance, feedback, certificate data
-                    registration_doc = await DatabaseOperations.find_one(
-                        "student_registrations",
-                        {"registration_id": participation.get('registration_id')}
-                    )
+                    # Registration document for attendance, feedback, certificate data
+                    registration_doc = dashboard_records["registrations"].get(participation.get('registration_id'))
                     
                     history_item = {
                         "event_id": event_id,
@@ -149,12 +149,11 @@ async def access_organizer_portal(request: Request, faculty: Faculty = Depends(r
         request.session["admin"] = admin_session_data
         
         # Generate admin tokens for cross-device compatibility
-        from utils.token_manager import TokenManager
-        token_manager = TokenManager()
+        from utils.token_manager import token_manager
         
         admin_tokens = {}
         if token_manager.is_available():
-            admin_tokens = token_manager.generate_tokens(
+            admin_tokens = await token_manager.generate_tokens(
                 user_id=faculty.employee_id,
                 user_type='admin',
                 user_data=admin_session_data,
@@ -3,7 +3,9 @@ Volunteer Scanner API - Invitation-based attendance marking system
 Replaces JWT token-based scanner with simple invitation codes
 """
 
-from fastapi import APIRouter, HTTPException, Depends
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Depends, Query
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime, timedelta
@@ -11,9 +13,14 @@ import pytz
 import secrets
 import string
 
+from pymongo import UpdateOne
+
 from database.operations import DatabaseOperations
 from models.admin_user import AdminUser
 from utils.datetime_helper import safe_datetime_compare, get_current_ist, make_naive
+from utils.two_tier_cache import LocalLRUCache
+from utils.statistics import StatisticsManager
+from utils.tagged_cache import invalidate_student_dashboards
 from dependencies.auth import require_admin
 import logging
 import os
@@ -103,6 +110,13 @@ class MarkAttendanceRequest(BaseModel):
     timestamp: str = Field(..., description="Timestamp of scan")
     selected_members: Optional[List[str]] = Field(None, description="For team QR: list of enrollment numbers to mark present")
 
+class OfflineScan(MarkAttendanceRequest):
+    scan_id: Optional[str] = Field(None, description="Client-side ID of the queued scan, echoed back in its result")
+    attendance_data: dict = Field(default_factory=dict, description="Attendance details (who is present)")
+
+class SyncScansRequest(BaseModel):
+    scans: List[OfflineScan] = Field(..., min_length=1, max_length=500, description="Scans queued while offline, in any order")
+
 # ==================== HELPER FUNCTIONS ====================
 
 def generate_invitation_code(length: int = 12) -> str:
@@ -116,6 +130,224 @@ def generate_session_id() -> str:
     """Generate a unique session ID"""
     return f"sess_{secrets.token_urlsafe(16)}"
 
+# ----- scanner history aggregation -----
+
+SCAN_HISTORY_MAX_SESSIONS = 100
+IST_TIMEZONE = "Asia/Kolkata"
+_EPOCH = datetime(1970, 1, 1)
+
+def _volunteer_sessions_pipeline(event_id: str, invitation_code: Optional[str] = None) -> List[dict]:
+    """Volunteer sessions of an event's active invitations (at most 10 invitations, 100 sessions)"""
+    invitation_filter = {"event_id": event_id, "is_active": True}
+    if invitation_code:
+        invitation_filter["invitation_code"] = invitation_code
+    return [
+        {"$match": invitation_filter},
+        {"$limit": 10},
+        {"$project": {"_id": 0, "invitation_code": 1}},
+        {"$lookup": {
+            "from": "volunteer_sessions",
+            "localField": "invitation_code",
+            "foreignField": "invitation_code",
+            "as": "sessions"
+        }},
+        {"$unwind": "$sessions"},
+        {"$replaceRoot": {"newRoot": "$sessions"}},
+        {"$project": {
+            "_id": 0, "session_id": 1, "volunteer_name": 1, "volunteer_contact": 1,
+            "created_at": 1, "expires_at": 1, "last_activity": 1, "total_scans": 1,
+            "target_day": 1, "target_session": 1, "target_round": 1
+        }},
+        {"$limit": SCAN_HISTORY_MAX_SESSIONS}
+    ]
+
+def _marks_expr(attendance: str, fields: dict) -> dict:
+    """
+    Scan rows of one attendance sub-document (`attendance` is a field path such
+    as "$attendance"): one per volunteer-marked session, or its single mark when
+    it has no sessions
+    """
+    sessions = {"$ifNull": [f"{attendance}.sessions", []]}
+    common = {
+        **fields,
+        "attendance_status": f"{attendance}.status",
+        "attendance_percentage": f"{attendance}.percentage"
+    }
+    # Strings sort after null/missing, so this keeps non-empty marked_by values only
+    session_rows = {"$map": {
+        "input": {"$filter": {"input": sessions, "as": "session", "cond": {"$gt": ["$$session.marked_by", ""]}}},
+        "as": "session",
+        "in": {
+            **common,
+            "marked_by": "$$session.marked_by",
+            "marked_at": "$$session.marked_at",
+            "session_id": "$$session.session_id",
+            "session_name": "$$session.session_name",
+            "notes": "$$session.notes"
+        }
+    }}
+    single_mark = {"$cond": [
+        {"$and": [{"$gt": [f"{attendance}.marked_by", ""]}, {"$eq": [{"$size": sessions}, 0]}]},
+        [{
+            **common,
+            "marked_by": f"{attendance}.marked_by",
+            "marked_at": f"{attendance}.marked_at",
+            "session_name": "Single Mark",
+            "notes": f"{attendance}.notes"
+        }],
+        []
+    ]}
+    return {"$concatArrays": [session_rows, single_mark]}
+
+def _scan_history_pipeline(event_id: str, limit: int, bucket_minutes: int) -> List[dict]:
+    """
+    Every volunteer mark of an event across student and faculty registrations,
+    most recent first, faceted into the page of scans plus per-volunteer counts,
+    per-day coverage, time buckets and totals
+    """
+    registration_match = {"$match": {
+        "event.event_id": event_id,
+        "$or": [
+            {"attendance.sessions.marked_by": {"$exists": True}},
+            {"attendance.marked_by": {"$exists": True}},  # For single-mark strategy
+            {"team_members.attendance.sessions.marked_by": {"$exists": True}},
+            {"team_members.attendance.marked_by": {"$exists": True}}
+        ]
+    }}
+
+    participant_name = {"$switch": {
+        "branches": [
+            {"case": {"$gt": ["$student", None]}, "then": {"$ifNull": ["$student.name", {"$ifNull": ["$student.full_name", "Unknown"]}]}},
+            {"case": {"$gt": ["$faculty", None]}, "then": {"$ifNull": ["$faculty.name", {"$ifNull": ["$faculty.full_name", "Unknown"]}]}},
+            {"case": {"$gt": ["$team", None]}, "then": {"$ifNull": ["$team.team_name", "Unknown Team"]}}
+        ],
+        "default": "Unknown"
+    }}
+    participant_type = {"$switch": {
+        "branches": [
+            {"case": {"$gt": ["$student", None]}, "then": "student"},
+            {"case": {"$gt": ["$faculty", None]}, "then": "faculty"},
+            {"case": {"$gt": ["$team", None]}, "then": "team"}
+        ],
+        "default": "unknown"
+    }}
+    member_name = {"$ifNull": ["$$member.student.name", {"$ifNull": ["$$member.name", {"$ifNull": ["$$member.full_name", "Unknown Member"]}]}]}
+    # One row array per member; non-team registrations are wrapped to the same shape
+    member_marks = {"$map": {
+        "input": "$team_members",
+        "as": "member",
+        "in": _marks_expr("$$member.attendance", {
+            "registration_id": "$registration_id",
+            "participant_name": {"$concat": [member_name, " (Team: ", "$$participant_name", ")"]},
+            "participant_type": "team_member",
+            "member_enrollment": {"$ifNull": ["$$member.student.enrollment_no", {"$ifNull": ["$$member.enrollment_no", "N/A"]}]}
+        })
+    }}
+    is_team = {"$and": [
+        {"$eq": ["$registration_type", "team"]},
+        {"$gt": [{"$size": {"$ifNull": ["$team_members", []]}}, 0]}
+    ]}
+    expand_marks = {"$project": {"_id": 0, "marks": {"$let": {
+        "vars": {"participant_name": participant_name},
+        "in": {"$cond": [
+            is_team,
+            member_marks,
+            [_marks_expr("$attendance", {
+                "registration_id": "$registration_id",
+                "participant_name": "$$participant_name",
+                "participant_type": participant_type
+            })]
+        ]}
+    }}}}
+
+    # Scan writers store marked_at as the isoformat() string of an IST-aware datetime
+    # ("2025-09-12T10:30:00+05:30"); strings without an offset are read as IST and BSON
+    # dates are taken as they are. Buckets and days are aligned to IST.
+    parse_options = {"dateString": "$marked_at", "onError": None, "onNull": None}
+    marked_on = {"$switch": {
+        "branches": [
+            {"case": {"$eq": [{"$type": "$marked_at"}, "date"]}, "then": "$marked_at"},
+            {"case": {"$eq": [{"$type": "$marked_at"}, "string"]}, "then": {"$cond": [
+                {"$regexMatch": {"input": "$marked_at", "regex": "(Z|[+-][0-9]{2}:?[0-9]{2})$"}},
+                {"$dateFromString": parse_options},
+                {"$dateFromString": {**parse_options, "timezone": IST_TIMEZONE}}
+            ]}}
+        ],
+        "default": None
+    }}
+    bucket_ms = bucket_minutes * 60 * 1000
+    ist_offset_ms = int(pytz.timezone(IST_TIMEZONE).utcoffset(datetime(2000, 1, 1)).total_seconds() * 1000)
+    bucket_start = {"$subtract": ["$marked_on", {"$mod": [
+        {"$add": [{"$subtract": ["$marked_on", _EPOCH]}, ist_offset_ms]}, bucket_ms
+    ]}]}
+    dated = {"$match": {"marked_on": {"$ne": None}}}
+
+    return [
+        registration_match,
+        {"$unionWith": {"coll": "faculty_registrations", "pipeline": [registration_match]}},
+        expand_marks,
+        {"$unwind": "$marks"},
+        {"$unwind": "$marks"},
+        {"$replaceRoot": {"newRoot": "$marks"}},
+        {"$addFields": {"marked_on": marked_on}},
+        {"$sort": {"marked_on": -1, "registration_id": 1}},
+        {"$facet": {
+            "scans": [{"$limit": limit}, {"$project": {"marked_on": 0}}],
+            "volunteers": [
+                {"$group": {
+                    "_id": "$marked_by",
+                    "total_scans": {"$sum": 1},
+                    "attendees": {"$addToSet": "$registration_id"},
+                    "first_scan_at": {"$min": "$marked_on"},
+                    "last_scan_at": {"$max": "$marked_on"}
+                }},
+                {"$project": {
+                    "_id": 0, "marked_by": "$_id", "total_scans": 1,
+                    "unique_attendees": {"$size": "$attendees"},
+                    "first_scan_at": 1, "last_scan_at": 1
+                }},
+                {"$sort": {"total_scans": -1, "marked_by": 1}}
+            ],
+            "daily_coverage": [
+                dated,
+                {"$group": {
+                    "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$marked_on", "timezone": IST_TIMEZONE}},
+                    "total_scans": {"$sum": 1},
+                    "attendees": {"$addToSet": "$registration_id"},
+                    "volunteers": {"$addToSet": "$marked_by"},
+                    "sessions": {"$addToSet": "$session_name"},
+                    "first_scan_at": {"$min": "$marked_on"},
+                    "last_scan_at": {"$max": "$marked_on"}
+                }},
+                {"$project": {
+                    "_id": 0, "date": "$_id", "total_scans": 1,
+                    "unique_attendees": {"$size": "$attendees"},
+                    "volunteers": 1, "sessions": 1,
+                    "first_scan_at": 1, "last_scan_at": 1
+                }},
+                {"$sort": {"date": 1}}
+            ],
+            "time_buckets": [
+                dated,
+                {"$group": {
+                    "_id": bucket_start,
+                    "total_scans": {"$sum": 1},
+                    "volunteers": {"$addToSet": "$marked_by"}
+                }},
+                {"$project": {
+                    "_id": 0, "bucket_start": "$_id", "total_scans": 1,
+                    "active_volunteers": {"$size": "$volunteers"}
+                }},
+                {"$sort": {"bucket_start": 1}}
+            ],
+            "totals": [
+                {"$group": {"_id": "$registration_id", "scans": {"$sum": 1}}},
+                {"$group": {"_id": None, "total_scans": {"$sum": "$scans"}, "unique_attendees": {"$sum": 1}}},
+                {"$project": {"_id": 0}}
+            ]
+        }}
+    ]
+
 # ==================== ADMIN ENDPOINTS ====================
 
 @router.post("/invitation/create")
@@ -380,70 +612,73 @@ async def get_invitation_stats(
     Admin/Faculty only endpoint
     """
     try:
-        # Get most recent active invitation (sort by created_at descending)
-        invitations = await DatabaseOperations.find_many(
-            "volunteer_invitations",
-            {"event_id": event_id, "is_active": True},
-            sort_by=[("created_at", -1)],
-            limit=1
-        )
-        
-        if not invitations:
+        now = datetime.now(pytz.timezone('Asia/Kolkata')).replace(tzinfo=None)
+
+        # Most recent active invitation with its live sessions, scan count and event
+        # session names, joined in one round trip
+        results = await DatabaseOperations.aggregate("volunteer_invitations", [
+            {"$match": {"event_id": event_id, "is_active": True}},
+            {"$sort": {"created_at": -1}},
+            {"$limit": 1},
+            {"$project": {"_id": 0}},
+            {"$lookup": {
+                "from": "volunteer_sessions",
+                "let": {"code": "$invitation_code"},
+                "pipeline": [
+                    {"$match": {"$expr": {"$and": [
+                        {"$eq": ["$invitation_code", "$$code"]},
+                        {"$gt": ["$expires_at", now]}
+                    ]}}},
+                    {"$project": {
+                        "_id": 0, "volunteer_name": 1, "volunteer_contact": 1,
+                        "created_at": 1, "last_activity": 1, "total_scans": 1
+                    }}
+                ],
+                "as": "sessions"
+            }},
+            {"$lookup": {
+                "from": "attendance_records",
+                "let": {"code": "$invitation_code"},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$invitation_code", "$$code"]}}},
+                    {"$count": "total"}
+                ],
+                "as": "scan_count"
+            }},
+            {"$lookup": {
+                "from": "events",
+                "let": {"event_id": "$event_id"},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$event_id", "$$event_id"]}}},
+                    {"$project": {"_id": 0, "sessions": "$attendance_strategy.sessions"}}
+                ],
+                "as": "event"
+            }}
+        ])
+
+        if not results:
             return {
                 "success": True,
                 "data": {
                     "has_active_invitation": False
                 }
             }
-        
-        invitation = invitations[0]
-        
-        # Get active sessions
-        sessions = await DatabaseOperations.find_many(
-            "volunteer_sessions",
-            {
-                "invitation_code": invitation["invitation_code"],
-                "expires_at": {"$gt": datetime.now(pytz.timezone('Asia/Kolkata')).replace(tzinfo=None)}
-            }
-        )
-        
-        # Get scan count
-        scan_count = await DatabaseOperations.count_documents(
-            "attendance_records",
-            {"invitation_code": invitation["invitation_code"]}
-        )
-        
-        # Helper function to serialize datetime
-        def serialize_datetime(dt):
-            if dt is None:
-                return None
-            if isinstance(dt, str):
-                return dt
-            # Ensure datetime is treated as UTC and includes 'Z' suffix
-            if hasattr(dt, 'isoformat'):
-                iso_string = dt.isoformat()
-                # If no timezone info, assume UTC and add 'Z'
-                if '+' not in iso_string and 'Z' not in iso_string:
-                    iso_string += 'Z'
-                return iso_string
-            return str(dt)
-        
+
+        invitation = results[0]
+        sessions = invitation.get("sessions", [])
+        scan_count = invitation["scan_count"][0]["total"] if invitation.get("scan_count") else 0
+
         # Generate invitation URL
         base_url = "https://campusconnectldrp.vercel.app"
         invitation_url = f"{base_url}/scan/{invitation['invitation_code']}"
-        
-        # Debug logging
-        logger.info(f"Stats endpoint - Retrieved expires_at: {invitation.get('expires_at')} (type: {type(invitation.get('expires_at')).__name__})")
-        logger.info(f"Stats endpoint - Serialized expires_at: {serialize_datetime(invitation.get('expires_at'))}")
-        
+
         # Compute human-readable session name from event config
         target_day = invitation.get("target_day")
         target_session = invitation.get("target_session")
         target_round = invitation.get("target_round")
         target_session_name = None
-        event_for_stats = await DatabaseOperations.find_one("events", {"event_id": event_id})
-        if event_for_stats and event_for_stats.get("attendance_strategy", {}).get("sessions"):
-            event_sessions = event_for_stats["attendance_strategy"]["sessions"]
+        event_sessions = invitation["event"][0].get("sessions") if invitation.get("event") else None
+        if event_sessions:
             if target_session:
                 sc = next((s for s in event_sessions if s.get("session_id") == target_session), None)
                 target_session_name = sc.get("session_name") if sc else target_session
@@ -455,8 +690,7 @@ async def get_invitation_stats(
                 target_session_name = rs.get("session_name") if rs else target_round
             else:
                 # No specific target — use first session name
-                first_s = event_sessions[0] if event_sessions else None
-                target_session_name = first_s.get("session_name") if first_s else None
+                target_session_name = event_sessions[0].get("session_name")
         # Final fallback
         if not target_session_name:
             if target_day:
@@ -465,7 +699,7 @@ async def get_invitation_stats(
                 target_session_name = target_session
             elif target_round:
                 target_session_name = target_round
-        
+
         return {
             "success": True,
             "data": {
@@ -487,222 +721,80 @@ async def get_invitation_stats(
                     {
                         "name": s.get("volunteer_name"),
                         "contact": s.get("volunteer_contact"),
-                        "joined_at": serialize_datetime(s.get("created_at"))
+                        "joined_at": serialize_datetime(s.get("created_at")),
+                        "last_activity": serialize_datetime(s.get("last_activity")),
+                        "total_scans": s.get("total_scans", 0)
                     }
                     for s in sessions
                 ]
             }
         }
-        
+
     except Exception as e:
         logger.error(f"Error getting invitation stats for event {event_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to get stats: {str(e)}")
 
 @router.get("/invitation/{event_id}/history")
-async def get_scanner_history(event_id: str, invitation_code: Optional[str] = None):
+async def get_scanner_history(
+    event_id: str,
+    invitation_code: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=5000, description="Maximum number of scans to return (most recent first)"),
+    bucket_minutes: int = Query(60, ge=5, le=1440, description="Width of the scan-rate time buckets")
+):
     """
     Get detailed scan history for an event
-    Shows all scans made via scanner and volunteer sessions
+    Shows all scans made via scanner and volunteer sessions, with per-volunteer
+    scan counts, per-day coverage and scan-rate time buckets
     """
     try:
-        # Find active invitations for the event
-        invitation_filter = {"event_id": event_id, "is_active": True}
-        if invitation_code:
-            invitation_filter["invitation_code"] = invitation_code
-        
-        invitations = await DatabaseOperations.find_many(
+        # Volunteer sessions of the event's active invitations
+        volunteer_sessions = await DatabaseOperations.aggregate(
             "volunteer_invitations",
-            invitation_filter,
-            limit=10
+            _volunteer_sessions_pipeline(event_id, invitation_code)
         )
-        
-        if not invitations:
-            return {
-                "success": True,
-                "data": {
-                    "scans": [],
-                    "volunteer_sessions": [],
-                    "stats": {
-                        "total_scans": 0,
-                        "total_volunteers": 0,
-                        "unique_attendees": 0,
-                        "active_sessions": 0
+
+        if not volunteer_sessions:
+            # Also covers invitations nobody joined yet: there is nothing to report
+            invitations = await DatabaseOperations.count_documents(
+                "volunteer_invitations",
+                {"event_id": event_id, "is_active": True, **({"invitation_code": invitation_code} if invitation_code else {})}
+            )
+            if not invitations:
+                return {
+                    "success": True,
+                    "data": {
+                        "scans": [],
+                        "volunteer_sessions": [],
+                        "volunteers": [],
+                        "daily_coverage": [],
+                        "time_buckets": [],
+                        "stats": {
+                            "total_scans": 0,
+                            "total_volunteers": 0,
+                            "unique_attendees": 0,
+                            "active_sessions": 0
+                        }
                     }
                 }
-            }
-        
-        invitation_codes = [inv["invitation_code"] for inv in invitations]
-        
-        # Get all volunteer sessions for these invitations
-        volunteer_sessions = await DatabaseOperations.find_many(
-            "volunteer_sessions",
-            {"invitation_code": {"$in": invitation_codes}},
-            limit=100
-        )
-        
+
         logger.info(f"Found {len(volunteer_sessions)} volunteer sessions for event {event_id}")
-        
-        # Get all registrations with scans marked via scanner
-        # Look for attendance.sessions where marked_by exists (indicating scanner marking)
-        # For individual registrations
-        registrations_student = await DatabaseOperations.find_many(
-            "student_registrations",
-            {
-                "event.event_id": event_id,
-                "$or": [
-                    {"attendance.sessions.marked_by": {"$exists": True}},
-                    {"attendance.marked_by": {"$exists": True}}  # For single-mark strategy
-                ]
-            },
-            limit=500
-        )
-        
-        registrations_faculty = await DatabaseOperations.find_many(
-            "faculty_registrations",
-            {
-                "event.event_id": event_id,
-                "$or": [
-                    {"attendance.sessions.marked_by": {"$exists": True}},
-                    {"attendance.marked_by": {"$exists": True}}  # For single-mark strategy
-                ]
-            },
-            limit=500
-        )
-        
-        # For team-based registrations, check team_members attendance
-        registrations_student_teams = await DatabaseOperations.find_many(
-            "student_registrations",
-            {
-                "event.event_id": event_id,
-                "registration_type": "team",
-                "$or": [
-                    {"team_members.attendance.sessions.marked_by": {"$exists": True}},
-                    {"team_members.attendance.marked_by": {"$exists": True}}  # For single-mark strategy
-                ]
-            },
-            limit=500
+
+        # Scans are expanded, sorted and counted in MongoDB; only the page and the
+        # aggregates come back
+        history, event = await asyncio.gather(
+            DatabaseOperations.aggregate("student_registrations", _scan_history_pipeline(event_id, limit, bucket_minutes)),
+            DatabaseOperations.find_one("events", {"event_id": event_id}, {"_id": 0, "config.sessions": 1})
         )
-        
-        logger.info(f"Found {len(registrations_student)} student registrations, {len(registrations_faculty)} faculty registrations, and {len(registrations_student_teams)} team registrations with scanner marks")
-        
-        all_registrations = registrations_student + registrations_faculty + registrations_student_teams
-        
-        # Build scan history
-        scans = []
-        unique_attendees = set()
-        
-        for registration in all_registrations:
-            registration_id = registration.get("registration_id")
-            registration_type = registration.get("registration_type", "individual")
-            attendance = registration.get("attendance", {})
-            sessions = attendance.get("sessions", [])
-            
-            # Get participant info
-            participant_name = "Unknown"
-            participant_type = "unknown"
-            
-            if registration.get("student"):
-                participant_name = registration["student"].get("name") or registration["student"].get("full_name", "Unknown")
-                participant_type = "student"
-            elif registration.get("faculty"):
-                participant_name = registration["faculty"].get("name") or registration["faculty"].get("full_name", "Unknown")
-                participant_type = "faculty"
-            elif registration.get("team"):
-                participant_name = registration["team"].get("team_name", "Unknown Team")
-                participant_type = "team"
-            
-            # For team-based registrations, extract scans from team_members
-            if registration_type == "team" and registration.get("team_members"):
-                for member in registration.get("team_members", []):
-                    member_attendance = member.get("attendance", {})
-                    member_sessions = member_attendance.get("sessions", [])
-                    member_name = member.get("student", {}).get("name") or member.get("name") or member.get("full_name", "Unknown Member")
-                    member_enrollment = member.get("student", {}).get("enrollment_no") or member.get("enrollment_no", "N/A")
-                    
-                    # Check for session-based marking
-                    for session in member_sessions:
-                        if session.get("marked_by"):
-                            unique_attendees.add(registration_id)
-                            scans.append({
-                                "registration_id": registration_id,
-                                "participant_name": f"{member_name} (Team: {participant_name})",
-                                "participant_type": "team_member",
-                                "member_enrollment": member_enrollment,
-                                "marked_by": session.get("marked_by"),
-                                "marked_at": serialize_datetime(session.get("marked_at")),
-                                "session_id": session.get("session_id"),
-                                "session_name": session.get("session_name"),
-                                "attendance_status": member_attendance.get("status"),
-                                "attendance_percentage": member_attendance.get("percentage"),
-                                "notes": session.get("notes"),
-                                "already_marked": False
-                            })
-                    
-                    # Check for single-mark strategy
-                    if member_attendance.get("marked_by") and not member_sessions:
-                        unique_attendees.add(registration_id)
-                        scans.append({
-                            "registration_id": registration_id,
-                            "participant_name": f"{member_name} (Team: {participant_name})",
-                            "participant_type": "team_member",
-                            "member_enrollment": member_enrollment,
-                            "marked_by": member_attendance.get("marked_by"),
-                            "marked_at": serialize_datetime(member_attendance.get("marked_at")),
-                            "session_id": None,
-                            "session_name": "Single Mark",
-                            "attendance_status": member_attendance.get("status"),
-                            "attendance_percentage": member_attendance.get("percentage"),
-                            "notes": member_attendance.get("notes"),
-                            "already_marked": False
-                        })
-            else:
-                # Extract scanner-marked sessions for individual registrations
-                for session in sessions:
-                    # Only include sessions that were marked by volunteers (have marked_by field)
-                    if session.get("marked_by"):
-                        unique_attendees.add(registration_id)
-                        scans.append({
-                            "registration_id": registration_id,
-                            "participant_name": participant_name,
-                            "participant_type": participant_type,
-                            "marked_by": session.get("marked_by"),
-                            "marked_at": serialize_datetime(session.get("marked_at")),
-                            "session_id": session.get("session_id"),
-                            "session_name": session.get("session_name"),
-                            "attendance_status": attendance.get("status"),
-                            "attendance_percentage": attendance.get("percentage"),
-                            "notes": session.get("notes"),
-                            "already_marked": False
-                        })
-                
-                # Also check for single-mark strategy (no sessions, just marked_by at attendance level)
-                if attendance.get("marked_by") and not sessions:
-                    unique_attendees.add(registration_id)
-                    scans.append({
-                        "registration_id": registration_id,
-                        "participant_name": participant_name,
-                        "participant_type": participant_type,
-                        "marked_by": attendance.get("marked_by"),
-                        "marked_at": serialize_datetime(attendance.get("marked_at")),
-                        "session_id": None,
-                        "session_name": "Single Mark",
-                        "attendance_status": attendance.get("status"),
-                        "attendance_percentage": attendance.get("percentage"),
-                        "notes": attendance.get("notes"),
-                        "already_marked": False
-                    })
-        
-        # Sort scans by time (most recent first)
-        scans.sort(key=lambda x: x["marked_at"] if x["marked_at"] else "", reverse=True)
-        
+        history = history[0] if history else {}
+        totals = history.get("totals") or [{}]
+
         # Count active sessions
         active_sessions = sum(1 for s in volunteer_sessions if s.get("expires_at") and safe_datetime_compare(s["expires_at"], get_current_ist(), 'gt'))
-        
+
         # Get event config for session name lookup
-        event = await DatabaseOperations.find_one("events", {"event_id": event_id})
         event_config = event.get("config", {}) if event else {}
         sessions_config = event_config.get("sessions", [])
-        
+
         # Helper function to get session name from session id
         def get_session_name(session_id):
             if not session_id or not sessions_config:
@@ -711,12 +803,27 @@ async def get_scanner_history(event_id: str, invitation_code: Optional[str] = No
                 if session.get("id") == session_id:
                     return session.get("name")
             return session_id  # Fallback to ID if name not found
-        
-        # Build response - use total_scans from database (which is incremented on each scan)
+
         return {
             "success": True,
             "data": {
-                "scans": scans,
+                "scans": [
+                    {
+                        "registration_id": scan.get("registration_id"),
+                        "participant_name": scan.get("participant_name"),
+                        "participant_type": scan.get("participant_type"),
+                        **({"member_enrollment": scan.get("member_enrollment", "N/A")} if scan.get("participant_type") == "team_member" else {}),
+                        "marked_by": scan.get("marked_by"),
+                        "marked_at": serialize_datetime(scan.get("marked_at")),
+                        "session_id": scan.get("session_id"),
+                        "session_name": scan.get("session_name"),
+                        "attendance_status": scan.get("attendance_status"),
+                        "attendance_percentage": scan.get("attendance_percentage"),
+                        "notes": scan.get("notes"),
+                        "already_marked": False
+                    }
+                    for scan in history.get("scans", [])
+                ],
                 "volunteer_sessions": [
                     {
                         "session_id": s.get("session_id"),
@@ -733,15 +840,35 @@ async def get_scanner_history(event_id: str, invitation_code: Optional[str] = No
                     }
                     for s in volunteer_sessions
                 ],
+                "volunteers": [
+                    {
+                        **volunteer,
+                        "first_scan_at": serialize_datetime(volunteer.get("first_scan_at")),
+                        "last_scan_at": serialize_datetime(volunteer.get("last_scan_at"))
+                    }
+                    for volunteer in history.get("volunteers", [])
+                ],
+                "daily_coverage": [
+                    {
+                        **day,
+                        "first_scan_at": serialize_datetime(day.get("first_scan_at")),
+                        "last_scan_at": serialize_datetime(day.get("last_scan_at"))
+                    }
+                    for day in history.get("daily_coverage", [])
+                ],
+                "time_buckets": [
+                    {**bucket, "bucket_start": serialize_datetime(bucket.get("bucket_start"))}
+                    for bucket in history.get("time_buckets", [])
+                ],
                 "stats": {
-                    "total_scans": len(scans),
+                    "total_scans": totals[0].get("total_scans", 0),
                     "total_volunteers": len(volunteer_sessions),
-                    "unique_attendees": len(unique_attendees),
+                    "unique_attendees": totals[0].get("unique_attendees", 0),
                     "active_sessions": active_sessions
                 }
             }
         }
-        
+
     except Exception as e:
         logger.error(f"Error getting scanner history for event {event_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to get scanner history: {str(e)}")
@@ -1247,6 +1374,471 @@ async def create_volunteer_session(
         logger.error(f"Error creating session for invitation {invitation_code}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to create session: {str(e)}")
 
+# ==================== SCAN PIPELINE ====================
+
+# Session, invitation and event attendance config are fixed for a session's lifetime;
+# the TTL only bounds how long an edited event attendance config takes to apply
+SCAN_CONTEXT_TTL_SECONDS = int(os.getenv("SCAN_CONTEXT_TTL_SECONDS", "300"))
+_scan_contexts = LocalLRUCache("scan_context", max_entries=2048, ttl_seconds=SCAN_CONTEXT_TTL_SECONDS)
+
+# Re-reads allowed when another volunteer changed the same registration mid-scan
+SCAN_WRITE_ATTEMPTS = 3
+
+SCAN_REGISTRATION_PROJECTION = {
+    "_id": 0,
+    "_collection": 1,
+    "registration_id": 1,
+    "registration_type": 1,
+    "event.event_id": 1,
+    "student.enrollment_no": 1,
+    "attendance": 1,
+    "team_members": 1,
+    "updated_at": 1,
+}
+
+
+async def _get_scan_context(session_id: str) -> dict:
+    """Session, invitation and event attendance config for a scanner session (cached per worker)"""
+    found, context = _scan_contexts.get(session_id)
+    if found:
+        return context
+
+    session = await DatabaseOperations.find_one(
+        "volunteer_sessions",
+        {"session_id": session_id},
+        {"_id": 0, "session_id": 1, "event_id": 1, "invitation_code": 1, "volunteer_name": 1, "expires_at": 1}
+    )
+    if not session:
+        raise HTTPException(status_code=404, detail="Invalid session")
+
+    event, invitation = await asyncio.gather(
+        DatabaseOperations.find_one(
+            "events",
+            {"event_id": session.get("event_id")},
+            {"_id": 0, "event_id": 1, "event_name": 1, "attendance_strategy": 1}
+        ),
+        DatabaseOperations.find_one(
+            "volunteer_invitations",
+            {"invitation_code": session.get("invitation_code")},
+            {"_id": 0, "attendance_strategy": 1, "target_day": 1, "target_session": 1}
+        )
+    )
+    context = {"session": session, "event": event, "invitation": invitation}
+    if event:
+        _scan_contexts.set(session_id, context)
+    return context
+
+
+async def _find_registration(registration_id: str) -> Optional[dict]:
+    """
+    Student or faculty registration by ID in one round trip.
+
+    Both collections issue "REG..." IDs, so the ID alone does not tell them apart;
+    the result carries the collection it came from in `_collection`.
+    """
+    def lookup(collection_name: str) -> list:
+        return [
+            {"$match": {"registration_id": registration_id}},
+            {"$limit": 1},
+            {"$addFields": {"_collection": collection_name}},
+        ]
+
+    results = await DatabaseOperations.aggregate("student_registrations", [
+        *lookup("student_registrations"),
+        {"$unionWith": {"coll": "faculty_registrations", "pipeline": lookup("faculty_registrations")}},
+        {"$limit": 1},
+        {"$project": SCAN_REGISTRATION_PROJECTION},
+    ])
+    return results[0] if results else None
+
+
+def _registration_enrollments(registration: dict) -> List[str]:
+    """Enrollment numbers of the students on a registration (all members for teams)"""
+    enrollments = [(registration.get("student") or {}).get("enrollment_no")]
+    enrollments += [(member.get("student") or {}).get("enrollment_no") for member in registration.get("team_members") or []]
+    return [enrollment_no for enrollment_no in enrollments if enrollment_no]
+
+
+def _newly_present(registration: dict, present_before: int, update: Optional[dict]) -> int:
+    """Change in "present" participants once `update` is written, given the count taken before it was built"""
+    if update is None:
+        return 0
+    written = {**registration, **update["$set"]}
+    return StatisticsManager.present_participants(written) - present_before
+
+
+def _build_scan_update(registration: dict, context: dict, attendance_data: dict, selected_members: Optional[List[str]],
+                       marked_at: Optional[datetime] = None) -> dict:
+    """
+    Attendance changes for one scan, computed from the registration as read.
+    `marked_at` (IST-aware) is when the scan happened; defaults to now.
+
+    Returns the MongoDB `update` to apply (None when nothing changes), the `guard`
+    filter the registration must still match for the update to be safe, and the
+    details reported back to the scanner.
+    """
+    registration_id = registration.get("registration_id")
+    is_team = registration.get("registration_type") == "team"
+    invitation = context["invitation"]
+
+    # Get current attendance object from registration
+    current_attendance = registration.get("attendance", {})
+    # The write only applies if nobody changed the registration since this read
+    guard = {"attendance.last_updated": current_attendance.get("last_updated")}
+    # Shared by every scan of the session: read it, never modify it
+    attendance_strategy_data = context["event"].get("attendance_strategy", {})
+
+    # Get strategy - prioritize invitation's strategy, fallback to event config
+    attendance_strategy = "single_mark"
+    if invitation and invitation.get("attendance_strategy"):
+        attendance_strategy = invitation.get("attendance_strategy")
+    elif attendance_strategy_data.get("strategy"):
+        attendance_strategy = attendance_strategy_data.get("strategy")
+    elif current_attendance.get("strategy"):
+        attendance_strategy = current_attendance.get("strategy")
+
+    # Get volunteer info for marking
+    marked_by = context["session"].get("volunteer_name", "Unknown Volunteer")
+    ist = pytz.timezone('Asia/Kolkata')
+    marked_at_time = marked_at or datetime.now(ist)
+
+    # Update attendance based on strategy
+    # UPDATED to match attendance.py logic exactly - allows re-marking/toggling
+    attendance_updated = False
+    day_marked = None
+    session_marked = None
+    already_marked = False
+    previous_marked_by = None
+    previous_marked_at = None
+
+    if attendance_strategy == "day_based":
+        # Use target_day from invitation, or from request
+        day_to_mark = None
+        if invitation and invitation.get("target_day"):
+            day_to_mark = invitation.get("target_day")
+        elif attendance_data.get("day"):
+            day_to_mark = attendance_data.get("day")
+        else:
+            raise HTTPException(status_code=400, detail="Day number required for day-based attendance")
+
+        # Get ALL configured days/sessions from event config
+        all_sessions = attendance_strategy_data.get("sessions", [])
+        if not all_sessions:
+            raise HTTPException(status_code=400, detail="No days configured in event")
+
+        # Find the target day configuration
+        target_day_config = None
+        for day_config in all_sessions:
+            # Extract day number from session_id (e.g., "day_1" -> 1)
+            if day_config.get("session_id"):
+                day_match = day_config.get("session_id", "").split("_")
+                if len(day_match) >= 2 and day_match[0] == "day":
+                    try:
+                        config_day_num = int(day_match[1])
+                        if config_day_num == day_to_mark:
+                            target_day_config = day_config
+                            break
+                    except ValueError:
+                        continue
+
+        if not target_day_config:
+            raise HTTPException(status_code=400, detail=f"Day {day_to_mark} not found in event configuration")
+
+        # Use SAME structure as attendance.py - sessions array with session_id
+        attended_sessions = current_attendance.get("sessions", [])
+
+        # Check if already marked for this day (for notification only)
+        already_marked = any(s.get("session_id") == target_day_config.get("session_id") for s in attended_sessions)
+        previous_marked_by = None
+        previous_marked_at = None
+        if already_marked:
+            for s in attended_sessions:
+                if s.get("session_id") == target_day_config.get("session_id"):
+                    previous_marked_by = s.get("marked_by")
+                    previous_marked_at = s.get("marked_at")
+                    break
+
+        # Remove existing entry for this day (allows re-marking/toggling)
+        attended_sessions = [s for s in attended_sessions if s.get("session_id") != target_day_config.get("session_id")]
+
+        # Always mark as present when scanning QR (scanner = attendance confirmation)
+        attended_sessions.append({
+            "session_id": target_day_config.get("session_id"),
+            "session_name": target_day_config.get("session_name", f"Day {day_to_mark}"),
+            "marked_at": marked_at_time.isoformat(),
+            "marked_by": marked_by,
+            "weight": target_day_config.get("weight", 1),
+            "notes": f"Marked via QR Scanner"
+        })
+
+        attendance_updated = True
+        day_marked = day_to_mark
+
+        # Calculate percentage based on weights (SAME as attendance.py)
+        total_weight = sum(s.get("weight", 1) for s in all_sessions)
+        attended_weight = sum(s.get("weight", 1) for s in attended_sessions)
+        percentage = (attended_weight / total_weight * 100) if total_weight > 0 else 0
+
+        # Determine status based on percentage
+        minimum_percentage = attendance_strategy_data.get("criteria", {}).get("minimum_percentage", 75)
+        if percentage >= minimum_percentage:
+            status = "present"
+        elif percentage > 0:
+            status = "partial"
+        else:
+            status = "absent"
+
+        current_attendance.update({
+            "strategy": attendance_strategy,
+            "sessions": attended_sessions,
+            "total_sessions": len(all_sessions),
+            "sessions_attended": len(attended_sessions),
+            "percentage": round(percentage, 2),
+            "status": status
+        })
+
+    elif attendance_strategy == "session_based":
+        # Use target_session from invitation or from request
+        session_id_to_mark = None
+        if invitation and invitation.get("target_session"):
+            session_id_to_mark = invitation.get("target_session")
+        elif attendance_data.get("session_id"):
+            session_id_to_mark = attendance_data.get("session_id")
+        else:
+            raise HTTPException(status_code=400, detail="session_id required for session-based attendance")
+
+        # Get ALL configured sessions from event config
+        all_sessions = attendance_strategy_data.get("sessions", [])
+        if not all_sessions:
+            raise HTTPException(status_code=400, detail="No sessions configured in event")
+
+        # Find the target session configuration
+        target_session_config = None
+        for sess_config in all_sessions:
+            if sess_config.get("session_id") == session_id_to_mark:
+                target_session_config = sess_config
+                break
+
+        if not target_session_config:
+            raise HTTPException(status_code=400, detail=f"Session {session_id_to_mark} not found in event configuration")
+
+        # Use SAME structure as attendance.py
+        attended_sessions = current_attendance.get("sessions", [])
+
+        # Check if already marked for this session (for notification only)
+        already_marked = any(s.get("session_id") == session_id_to_mark for s in attended_sessions)
+        previous_marked_by = None
+        previous_marked_at = None
+        if already_marked:
+            for s in attended_sessions:
+                if s.get("session_id") == session_id_to_mark:
+                    previous_marked_by = s.get("marked_by")
+                    previous_marked_at = s.get("marked_at")
+                    break
+
+        # Remove existing entry for this session (allows re-marking/toggling)
+        attended_sessions = [s for s in attended_sessions if s.get("session_id") != session_id_to_mark]
+
+        # Always mark as present when scanning QR
+        attended_sessions.append({
+            "session_id": session_id_to_mark,
+            "session_name": target_session_config.get("session_name", session_id_to_mark),
+            "marked_at": marked_at_time.isoformat(),
+            "marked_by": marked_by,
+            "weight": target_session_config.get("weight", 1),
+            "notes": f"Marked via QR Scanner"
+        })
+
+        attendance_updated = True
+        session_marked = session_id_to_mark
+
+        # Calculate percentage based on weights (SAME as attendance.py)
+        total_weight = sum(s.get("weight", 1) for s in all_sessions)
+        attended_weight = sum(s.get("weight", 1) for s in attended_sessions)
+        percentage = (attended_weight / total_weight * 100) if total_weight > 0 else 0
+
+        # Determine status based on percentage
+        minimum_percentage = attendance_strategy_data.get("criteria", {}).get("minimum_percentage", 75)
+        if percentage >= minimum_percentage:
+            status = "present"
+        elif percentage > 0:
+            status = "partial"
+        else:
+            status = "absent"
+
+        current_attendance.update({
+            "strategy": attendance_strategy,
+            "sessions": attended_sessions,
+            "total_sessions": len(all_sessions),
+            "sessions_attended": len(attended_sessions),
+            "percentage": round(percentage, 2),
+            "status": status
+        })
+
+    elif attendance_strategy == "single_mark":
+        # Simple single mark - QR scan = present
+        current_attendance["strategy"] = attendance_strategy
+        current_attendance["marked"] = True
+        current_attendance["marked_at"] = marked_at_time.isoformat()
+        current_attendance["marked_by"] = marked_by
+        current_attendance["percentage"] = 100
+        current_attendance["status"] = "present"
+        attendance_updated = True
+
+    if not attendance_updated:
+        raise HTTPException(status_code=400, detail=f"Could not mark attendance for strategy: {attendance_strategy}")
+
+    # Update last_updated timestamp
+    current_attendance["last_updated"] = marked_at_time.isoformat()
+
+    # TEAM HANDLING: Update individual team members if this is a team registration
+    update = None
+    members_updated = []
+
+    if is_team and selected_members:
+        # Update specific team members
+        team_members = registration.get("team_members", [])
+
+        for member in team_members:
+            member_enrollment = member.get("student", {}).get("enrollment_no")
+
+            # Only update members that were selected
+            if member_enrollment in selected_members:
+                member_attendance = member.get("attendance", {})
+
+                # Apply same attendance strategy logic to individual member
+                if attendance_strategy == "day_based" and day_marked:
+                    sessions = member_attendance.get("sessions", [])
+                    session_id_to_mark = f"day_{day_marked}"
+
+                    # Find or create session
+                    session_found = False
+                    for s in sessions:
+                        if s.get("session_id") == session_id_to_mark:
+                            s["status"] = "present"
+                            s["marked_at"] = marked_at_time.isoformat()
+                            s["marked_by"] = marked_by
+                            s["notes"] = f"QR Scanner - {marked_by}"
+                            session_found = True
+                            break
+
+                    if not session_found:
+                        # Get the session config to extract the proper session_name
+                        target_day_config = None
+                        for day_config in attendance_strategy_data.get("sessions", []):
+                            if day_config.get("session_id") == session_id_to_mark:
+                                target_day_config = day_config
+                                break
+
+                        sessions.append({
+                            "session_id": session_id_to_mark,
+                            "session_name": target_day_config.get("session_name", f"Day {day_marked}") if target_day_config else f"Day {day_marked}",
+                            "day": day_marked,
+                            "status": "present",
+                            "marked_at": marked_at_time.isoformat(),
+                            "marked_by": marked_by,
+                            "notes": f"QR Scanner - {marked_by}"
+                        })
+
+                    member_attendance["sessions"] = sessions
+
+                    # Recalculate percentage
+                    total_days = len(attendance_strategy_data.get("sessions", []))
+                    attended_days = len([s for s in sessions if s.get("status") == "present"])
+                    member_attendance["percentage"] = min(round((attended_days / total_days) * 100, 2) if total_days > 0 else 0, 100)
+                    member_attendance["status"] = "present" if member_attendance["percentage"] >= 75 else "partial"
+
+                elif attendance_strategy == "session_based" and session_marked:
+                    sessions = member_attendance.get("sessions", [])
+
+                    session_found = False
+                    for s in sessions:
+                        if s.get("session_id") == session_marked:
+                            s["status"] = "present"
+                            s["marked_at"] = marked_at_time.isoformat()
+                            s["marked_by"] = marked_by
+                            s["notes"] = f"QR Scanner - {marked_by}"
+                            session_found = True
+                            break
+
+                    if not session_found:
+                        # Get the session config to extract the proper session_name
+                        target_session_config = None
+                        for sess_config in attendance_strategy_data.get("sessions", []):
+                            if sess_config.get("session_id") == session_marked:
+                                target_session_config = sess_config
+                                break
+
+                        sessions.append({
+                            "session_id": session_marked,
+                            "session_name": target_session_config.get("session_name", session_marked) if target_session_config else session_marked,
+                            "status": "present",
+                            "marked_at": marked_at_time.isoformat(),
+                            "marked_by": marked_by,
+                            "notes": f"QR Scanner - {marked_by}"
+                        })
+
+                    member_attendance["sessions"] = sessions
+
+                    # Recalculate percentage
+                    total_sessions = len(attendance_strategy_data.get("sessions", []))
+                    attended_sessions = len([s for s in sessions if s.get("status") == "present"])
+                    member_attendance["percentage"] = min(round((attended_sessions / total_sessions) * 100, 2) if total_sessions > 0 else 0, 100)
+                    member_attendance["status"] = "present" if member_attendance["percentage"] >= 75 else "partial"
+
+                else:
+                    # Single mark strategy
+                    member_attendance["marked"] = True
+                    member_attendance["marked_at"] = marked_at_time.isoformat()
+                    member_attendance["marked_by"] = marked_by
+                    member_attendance["percentage"] = 100
+                    member_attendance["status"] = "present"
+
+                member_attendance["last_updated"] = marked_at_time.isoformat()
+                member["attendance"] = member_attendance
+                members_updated.append(member_enrollment)
+
+        # Calculate team's overall status based on member attendance
+        team_status = _calculate_team_status(team_members, attendance_strategy, session_marked or f"day_{day_marked}" if day_marked else None)
+
+        logger.info(f"Calculated team status for {registration_id}: {team_status}")
+
+        # Update the team registration with modified team_members and team status
+        update = {
+            "$set": {
+                "team_members": team_members,
+                "team.status": team_status,  # Update team status
+                "updated_at": datetime.now(pytz.timezone('Asia/Kolkata')).replace(tzinfo=None)
+            }
+        }
+        guard = {"updated_at": registration.get("updated_at")}
+
+    elif is_team and selected_members is not None and len(selected_members) == 0:
+        # Team QR scanned but no members selected - this is OK, just skip without error
+        # This allows re-scanning to mark members later
+        logger.info(f"Team QR scanned for {registration_id} but no members selected - no changes made")
+
+    else:
+        # Individual registration - update as before
+        update = {"$set": {"attendance": current_attendance}}
+
+    return {
+        "update": update,
+        "guard": guard,
+        "marked_by": marked_by,
+        "marked_at": marked_at_time.isoformat(),
+        "attendance_strategy": attendance_strategy,
+        "day_marked": day_marked,
+        "session_marked": session_marked,
+        "is_team": is_team,
+        "members_updated": members_updated,
+        "attendance": current_attendance,
+        "already_marked": already_marked,
+        "previous_marked_by": previous_marked_by,
+        "previous_marked_at": previous_marked_at,
+    }
+
+
 @router.post("/session/{session_id}/mark")
 async def mark_attendance(
     session_id: str,
@@ -1258,14 +1850,9 @@ async def mark_attendance(
     Public endpoint - validates session
     """
     try:
-        # Get and validate session
-        session = await DatabaseOperations.find_one(
-            "volunteer_sessions",
-            {"session_id": session_id}
-        )
-        
-        if not session:
-            raise HTTPException(status_code=404, detail="Invalid session")
+        # Session, invitation and event come from the per-session scan context
+        context = await _get_scan_context(session_id)
+        session = context["session"]
         
         # Check if session expired
         if safe_datetime_compare(get_current_ist(), session.get("expires_at"), 'gt'):
@@ -1277,20 +1864,8 @@ async def mark_attendance(
         if not registration_id:
             raise HTTPException(status_code=400, detail="No registration_id found in QR code")
         
-        # Fetch registration - try student_registrations first, then faculty_registrations
-        registration = await DatabaseOperations.find_one(
-            "student_registrations",
-            {"registration_id": registration_id}
-        )
-        
-        collection_name = "student_registrations"
-        
-        if not registration:
-            registration = await DatabaseOperations.find_one(
-                "faculty_registrations",
-                {"registration_id": registration_id}
-            )
-            collection_name = "faculty_registrations"
+        # One lookup across student_registrations and faculty_registrations
+        registration = await _find_registration(registration_id)
         
         if not registration:
             raise HTTPException(status_code=404, detail="Registration not found")
@@ -1301,8 +1876,10 @@ async def mark_attendance(
         
         if registration_event_id != session_event_id:
             # Different event - return professional error
-            session_event = await DatabaseOperations.find_one("events", {"event_id": session_event_id})
-            registration_event = await DatabaseOperations.find_one("events", {"event_id": registration_event_id})
+            session_event = context["event"]
+            registration_event = await DatabaseOperations.find_one(
+                "events", {"event_id": registration_event_id}, {"event_name": 1}
+            )
             
             raise HTTPException(
                 status_code=403, 
@@ -1320,396 +1897,60 @@ async def mark_attendance(
                 }
             )
         
-        # Check if this is a team registration
-        is_team = registration.get("registration_type") == "team"
-        selected_members = request.selected_members  # List of enrollment numbers to mark
-        
-        # Fetch event to get attendance strategy
-        event = await DatabaseOperations.find_one(
-            "events",
-            {"event_id": session.get("event_id")}
-        )
-        
-        if not event:
+        if not context["event"]:
             raise HTTPException(status_code=404, detail="Event not found")
         
-        # Get current attendance object from registration
-        current_attendance = registration.get("attendance", {})
-        attendance_strategy_data = event.get("attendance_strategy", {})
-        
-        # Get invitation to determine target day/session
-        invitation = await DatabaseOperations.find_one(
-            "volunteer_invitations",
-            {"invitation_code": session.get("invitation_code")}
-        )
-        
-        # Get strategy - prioritize invitation's strategy, fallback to event config
-        attendance_strategy = "single_mark"
-        if invitation and invitation.get("attendance_strategy"):
-            attendance_strategy = invitation.get("attendance_strategy")
-        elif attendance_strategy_data.get("strategy"):
-            attendance_strategy = attendance_strategy_data.get("strategy")
-        elif current_attendance.get("strategy"):
-            attendance_strategy = current_attendance.get("strategy")
-        
-        # Get volunteer info for marking
-        marked_by = session.get("volunteer_name", "Unknown Volunteer")
-        ist = pytz.timezone('Asia/Kolkata')
-        marked_at_time = datetime.now(ist)
-        
-        # Update attendance based on strategy
-        # UPDATED to match attendance.py logic exactly - allows re-marking/toggling
-        attendance_updated = False
-        day_marked = None
-        session_marked = None
-        
-        if attendance_strategy == "day_based":
-            # Use target_day from invitation, or from request
-            day_to_mark = None
-            if invitation and invitation.get("target_day"):
-                day_to_mark = invitation.get("target_day")
-            elif request.attendance_data.get("day"):
-                day_to_mark = request.attendance_data.get("day")
-            else:
-                raise HTTPException(status_code=400, detail="Day number required for day-based attendance")
-            
-            # Get ALL configured days/sessions from event config
-            all_sessions = attendance_strategy_data.get("sessions", [])
-            if not all_sessions:
-                raise HTTPException(status_code=400, detail="No days configured in event")
-            
-            # Find the target day configuration
-            target_day_config = None
-            for day_config in all_sessions:
-                # Extract day number from session_id (e.g., "day_1" -> 1)
-                if day_config.get("session_id"):
-                    day_match = day_config.get("session_id", "").split("_")
-                    if len(day_match) >= 2 and day_match[0] == "day":
-                        try:
-                            config_day_num = int(day_match[1])
-                            if config_day_num == day_to_mark:
-                                target_day_config = day_config
-                                break
-                        except ValueError:
-                            continue
-            
-            if not target_day_config:
-                raise HTTPException(status_code=400, detail=f"Day {day_to_mark} not found in event configuration")
-            
-            # Use SAME structure as attendance.py - sessions array with session_id
-            attended_sessions = current_attendance.get("sessions", [])
-            
-            # Check if already marked for this day (for notification only)
-            already_marked = any(s.get("session_id") == target_day_config.get("session_id") for s in attended_sessions)
-            previous_marked_by = None
-            previous_marked_at = None
-            if already_marked:
-                for s in attended_sessions:
-                    if s.get("session_id") == target_day_config.get("session_id"):
-                        previous_marked_by = s.get("marked_by")
-                        previous_marked_at = s.get("marked_at")
-                        break
-            
-            # Remove existing entry for this day (allows re-marking/toggling)
-            attended_sessions = [s for s in attended_sessions if s.get("session_id") != target_day_config.get("session_id")]
-            
-            # Always mark as present when scanning QR (scanner = attendance confirmation)
-            attended_sessions.append({
-                "session_id": target_day_config.get("session_id"),
-                "session_name": target_day_config.get("session_name", f"Day {day_to_mark}"),
-                "marked_at": marked_at_time.isoformat(),
-                "marked_by": marked_by,
-                "weight": target_day_config.get("weight", 1),
-                "notes": f"Marked via QR Scanner"
-            })
-            
-            attendance_updated = True
-            day_marked = day_to_mark
-            
-            # Calculate percentage based on weights (SAME as attendance.py)
-            total_weight = sum(s.get("weight", 1) for s in all_sessions)
-            attended_weight = sum(s.get("weight", 1) for s in attended_sessions)
-            percentage = (attended_weight / total_weight * 100) if total_weight > 0 else 0
-            
-            # Determine status based on percentage
-            minimum_percentage = attendance_strategy_data.get("criteria", {}).get("minimum_percentage", 75)
-            if percentage >= minimum_percentage:
-                status = "present"
-            elif percentage > 0:
-                status = "partial"
-            else:
-                status = "absent"
-            
-            current_attendance.update({
-                "strategy": attendance_strategy,
-                "sessions": attended_sessions,
-                "total_sessions": len(all_sessions),
-                "sessions_attended": len(attended_sessions),
-                "percentage": round(percentage, 2),
-                "status": status
-            })
-        
-        elif attendance_strategy == "session_based":
-            # Use target_session from invitation or from request
-            session_id_to_mark = None
-            if invitation and invitation.get("target_session"):
-                session_id_to_mark = invitation.get("target_session")
-            elif request.attendance_data.get("session_id"):
-                session_id_to_mark = request.attendance_data.get("session_id")
-            else:
-                raise HTTPException(status_code=400, detail="session_id required for session-based attendance")
-            
-            # Get ALL configured sessions from event config
-            all_sessions = attendance_strategy_data.get("sessions", [])
-            if not all_sessions:
-                raise HTTPException(status_code=400, detail="No sessions configured in event")
-            
-            # Find the target session configuration
-            target_session_config = None
-            for sess_config in all_sessions:
-                if sess_config.get("session_id") == session_id_to_mark:
-                    target_session_config = sess_config
-                    break
-            
-            if not target_session_config:
-                raise HTTPException(status_code=400, detail=f"Session {session_id_to_mark} not found in event configuration")
-            
-            # Use SAME structure as attendance.py
-            attended_sessions = current_attendance.get("sessions", [])
-            
-            # Check if already marked for this session (for notification only)
-            already_marked = any(s.get("session_id") == session_id_to_mark for s in attended_sessions)
-            previous_marked_by = None
-            previous_marked_at = None
-            if already_marked:
-                for s in attended_sessions:
-                    if s.get("session_id") == session_id_to_mark:
-                        previous_marked_by = s.get("marked_by")
-                        previous_marked_at = s.get("marked_at")
-                        break
-            
-            # Remove existing entry for this session (allows re-marking/toggling)
-            attended_sessions = [s for s in attended_sessions if s.get("session_id") != session_id_to_mark]
-            
-            # Always mark as present when scanning QR
-            attended_sessions.append({
-                "session_id": session_id_to_mark,
-                "session_name": target_session_config.get("session_name", session_id_to_mark),
-                "marked_at": marked_at_time.isoformat(),
-                "marked_by": marked_by,
-                "weight": target_session_config.get("weight", 1),
-                "notes": f"Marked via QR Scanner"
-            })
-            
-            attendance_updated = True
-            session_marked = session_id_to_mark
-            
-            # Calculate percentage based on weights (SAME as attendance.py)
-            total_weight = sum(s.get("weight", 1) for s in all_sessions)
-            attended_weight = sum(s.get("weight", 1) for s in attended_sessions)
-            percentage = (attended_weight / total_weight * 100) if total_weight > 0 else 0
-            
-            # Determine status based on percentage
-            minimum_percentage = attendance_strategy_data.get("criteria", {}).get("minimum_percentage", 75)
-            if percentage >= minimum_percentage:
-                status = "present"
-            elif percentage > 0:
-                status = "partial"
-            else:
-                status = "absent"
-            
-            current_attendance.update({
-                "strategy": attendance_strategy,
-                "sessions": attended_sessions,
-                "total_sessions": len(all_sessions),
-                "sessions_attended": len(attended_sessions),
-                "percentage": round(percentage, 2),
-                "status": status
-            })
-        
-        elif attendance_strategy == "single_mark":
-            # Simple single mark - QR scan = present
-            current_attendance["strategy"] = attendance_strategy
-            current_attendance["marked"] = True
-            current_attendance["marked_at"] = marked_at_time.isoformat()
-            current_attendance["marked_by"] = marked_by
-            current_attendance["percentage"] = 100
-            current_attendance["status"] = "present"
-            attendance_updated = True
-        
-        if not attendance_updated:
-            raise HTTPException(status_code=400, detail=f"Could not mark attendance for strategy: {attendance_strategy}")
-        
-        # Update last_updated timestamp
-        current_attendance["last_updated"] = marked_at_time.isoformat()
-        
-        # TEAM HANDLING: Update individual team members if this is a team registration
-        update_result = False
-        members_updated = []
-        
-        if is_team and selected_members:
-            # Update specific team members
-            team_members = registration.get("team_members", [])
-            
-            for member in team_members:
-                member_enrollment = member.get("student", {}).get("enrollment_no")
-                
-                # Only update members that were selected
-                if member_enrollment in selected_members:
-                    member_attendance = member.get("attendance", {})
-                    
-                    # Apply same attendance strategy logic to individual member
-                    if attendance_strategy == "day_based" and day_marked:
-                        sessions = member_attendance.get("sessions", [])
-                        session_id_to_mark = f"day_{day_marked}"
-                        
-                        # Find or create session
-                        session_found = False
-                        for s in sessions:
-                            if s.get("session_id") == session_id_to_mark:
-                                s["status"] = "present"
-                                s["marked_at"] = marked_at_time.isoformat()
-                                s["marked_by"] = marked_by
-                                s["notes"] = f"QR Scanner - {marked_by}"
-                                session_found = True
-                                break
-                        
-                        if not session_found:
-                            # Get the session config to extract the proper session_name
-                            target_day_config = None
-                            for day_config in attendance_strategy_data.get("sessions", []):
-                                if day_config.get("session_id") == session_id_to_mark:
-                                    target_day_config = day_config
-                                    break
-                            
-                            sessions.append({
-                                "session_id": session_id_to_mark,
-                                "session_name": target_day_config.get("session_name", f"Day {day_marked}") if target_day_config else f"Day {day_marked}",
-                                "day": day_marked,
-                                "status": "present",
-                                "marked_at": marked_at_time.isoformat(),
-                                "marked_by": marked_by,
-                                "notes": f"QR Scanner - {marked_by}"
-                            })
-                        
-                        member_attendance["sessions"] = sessions
-                        
-                        # Recalculate percentage
-                        total_days = len(attendance_strategy_data.get("sessions", []))
-                        attended_days = len([s for s in sessions if s.get("status") == "present"])
-                        member_attendance["percentage"] = min(round((attended_days / total_days) * 100, 2) if total_days > 0 else 0, 100)
-                        member_attendance["status"] = "present" if member_attendance["percentage"] >= 75 else "partial"
-                        
-                    elif attendance_strategy == "session_based" and session_marked:
-                        sessions = member_attendance.get("sessions", [])
-                        
-                        session_found = False
-                        for s in sessions:
-                            if s.get("session_id") == session_marked:
-                                s["status"] = "present"
-                                s["marked_at"] = marked_at_time.isoformat()
-                                s["marked_by"] = marked_by
-                                s["notes"] = f"QR Scanner - {marked_by}"
-                                session_found = True
-                                break
-                        
-                        if not session_found:
-                            # Get the session config to extract the proper session_name
-                            target_session_config = None
-                            for sess_config in attendance_strategy_data.get("sessions", []):
-                                if sess_config.get("session_id") == session_marked:
-                                    target_session_config = sess_config
-                                    break
-                            
-                            sessions.append({
-                                "session_id": session_marked,
-                                "session_name": target_session_config.get("session_name", session_marked) if target_session_config else session_marked,
-                                "status": "present",
-                                "marked_at": marked_at_time.isoformat(),
-                                "marked_by": marked_by,
-                                "notes": f"QR Scanner - {marked_by}"
-                            })
-                        
-                        member_attendance["sessions"] = sessions
-                        
-                        # Recalculate percentage
-                        total_sessions = len(attendance_strategy_data.get("sessions", []))
-                        attended_sessions = len([s for s in sessions if s.get("status") == "present"])
-                        member_attendance["percentage"] = min(round((attended_sessions / total_sessions) * 100, 2) if total_sessions > 0 else 0, 100)
-                        member_attendance["status"] = "present" if member_attendance["percentage"] >= 75 else "partial"
-                        
-                    else:
-                        # Single mark strategy
-                        member_attendance["marked"] = True
-                        member_attendance["marked_at"] = marked_at_time.isoformat()
-                        member_attendance["marked_by"] = marked_by
-                        member_attendance["percentage"] = 100
-                        member_attendance["status"] = "present"
-                    
-                    member_attendance["last_updated"] = marked_at_time.isoformat()
-                    member["attendance"] = member_attendance
-                    members_updated.append(member_enrollment)
-            
-            # Calculate team's overall status based on member attendance
-            team_status = _calculate_team_status(team_members, attendance_strategy, session_marked or f"day_{day_marked}" if day_marked else None)
-            
-            logger.info(f"Calculated team status for {registration_id}: {team_status}")
-            
-            # Update the team registration with modified team_members and team status
-            update_result = await DatabaseOperations.update_one(
-                collection_name,
-                {"registration_id": registration_id},
-                {
-                    "$set": {
-                        "team_members": team_members,
-                        "team.status": team_status,  # Update team status
-                        "updated_at": datetime.now(pytz.timezone('Asia/Kolkata')).replace(tzinfo=None)
-                    }
-                }
-            )
-            
-        elif is_team and selected_members is not None and len(selected_members) == 0:
-            # Team QR scanned but no members selected - this is OK, just skip without error
-            # This allows re-scanning to mark members later
-            update_result = True  # No update needed, but mark as successful
-            logger.info(f"Team QR scanned for {registration_id} but no members selected - no changes made")
-            
+        # Read-modify-write guarded on the value we read: if another volunteer marked
+        # the same registration in between, re-read it and apply this scan on top
+        for attempt in range(SCAN_WRITE_ATTEMPTS):
+            present_before = StatisticsManager.present_participants(registration)
+            scan = _build_scan_update(registration, context, request.attendance_data, request.selected_members)
+            if scan["update"] is None:
+                break
+            if await DatabaseOperations.update_one(
+                registration["_collection"],
+                {"registration_id": registration_id, **scan["guard"]},
+                scan["update"]
+            ):
+                break
+            registration = await _find_registration(registration_id)
+            if not registration:
+                raise HTTPException(status_code=404, detail="Registration not found")
         else:
-            # Individual registration - update as before
-            update_result = await DatabaseOperations.update_one(
-                collection_name,
-                {"registration_id": registration_id},
-                {"$set": {"attendance": current_attendance}}
-            )
-        
-        if not update_result:
             raise HTTPException(status_code=500, detail="Failed to update registration attendance")
+        if scan["update"] is not None:
+            await StatisticsManager.record_attendance_present(_newly_present(registration, present_before, scan["update"]))
+            await invalidate_student_dashboards(*_registration_enrollments(registration))
         
-        # Update session activity
-        await DatabaseOperations.update_one(
-            "volunteer_sessions",
-            {"session_id": session_id},
-            {
-                "$set": {"last_activity": datetime.now(pytz.timezone('Asia/Kolkata')).replace(tzinfo=None)},
-                "$inc": {"total_scans": 1}
-            }
+        # Session activity and invitation scan count, issued together
+        now = datetime.now(pytz.timezone('Asia/Kolkata')).replace(tzinfo=None)
+        await asyncio.gather(
+            DatabaseOperations.update_one(
+                "volunteer_sessions",
+                {"session_id": session_id},
+                {"$set": {"last_activity": now}, "$inc": {"total_scans": 1}}
+            ),
+            DatabaseOperations.update_one(
+                "volunteer_invitations",
+                {"invitation_code": session.get("invitation_code")},
+                {"$inc": {"total_scans": 1}}
+            )
         )
         
-        # Update invitation scan count
-        await DatabaseOperations.update_one(
-            "volunteer_invitations",
-            {"invitation_code": session.get("invitation_code")},
-            {"$inc": {"total_scans": 1}}
-        )
+        is_team = scan["is_team"]
+        members_updated = scan["members_updated"]
+        marked_by = scan["marked_by"]
+        day_marked = scan["day_marked"]
+        session_marked = scan["session_marked"]
         
-        logger.info(f"✅ ATTENDANCE UPDATED: Registration {registration_id} marked by {marked_by} via session {session_id} - Strategy: {attendance_strategy}, Day: {day_marked}, Session: {session_marked}, Team: {is_team}, Members: {len(members_updated) if is_team else 'N/A'}")
+        logger.info(f"✅ ATTENDANCE UPDATED: Registration {registration_id} marked by {marked_by} via session {session_id} - Strategy: {scan['attendance_strategy']}, Day: {day_marked}, Session: {session_marked}, Team: {is_team}, Members: {len(members_updated) if is_team else 'N/A'}")
         
         # Prepare response with already_marked flag if applicable
         response_data = {
             "registration_id": registration_id,
             "marked_by": marked_by,
-            "marked_at": marked_at_time.isoformat(),
-            "attendance_strategy": attendance_strategy,
+            "marked_at": scan["marked_at"],
+            "attendance_strategy": scan["attendance_strategy"],
             "day_marked": day_marked,
             "session_marked": session_marked,
             "is_team": is_team
@@ -1721,18 +1962,18 @@ async def mark_attendance(
             response_data["members_count"] = len(members_updated)
             response_data["message"] = f"✓ Marked {len(members_updated)} team member(s) present"
         else:
-            response_data["attendance_percentage"] = current_attendance.get("percentage", 0)
-            response_data["attendance_status"] = current_attendance.get("status", "unknown")
+            response_data["attendance_percentage"] = scan["attendance"].get("percentage", 0)
+            response_data["attendance_status"] = scan["attendance"].get("status", "unknown")
         
         # Add already_marked flag and message if this was a re-mark (individual only)
-        if not is_team and 'already_marked' in locals() and already_marked:
+        if not is_team and scan["already_marked"]:
             response_data["already_marked"] = True
-            response_data["previous_marked_by"] = previous_marked_by
-            response_data["previous_marked_at"] = previous_marked_at
+            response_data["previous_marked_by"] = scan["previous_marked_by"]
+            response_data["previous_marked_at"] = scan["previous_marked_at"]
             if day_marked:
-                response_data["message"] = f"✓ Attendance re-confirmed for Day {day_marked} (previously marked by {previous_marked_by})"
+                response_data["message"] = f"✓ Attendance re-confirmed for Day {day_marked} (previously marked by {scan['previous_marked_by']})"
             elif session_marked:
-                response_data["message"] = f"✓ Attendance re-confirmed for session (previously marked by {previous_marked_by})"
+                response_data["message"] = f"✓ Attendance re-confirmed for session (previously marked by {scan['previous_marked_by']})"
         
         return {
             "success": True,
@@ -1745,6 +1986,287 @@ async def mark_attendance(
         logger.error(f"❌ Error marking attendance for session {session_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to mark attendance: {str(e)}")
 
+# Queued scans are accepted this long after the session expired, so a scanner that
+# was offline at the end of its shift can still upload what it collected
+OFFLINE_SYNC_GRACE_HOURS = int(os.getenv("OFFLINE_SYNC_GRACE_HOURS", "24"))
+
+
+def _parse_scan_time(timestamp: str) -> Optional[datetime]:
+    """Scan timestamp as an IST-aware datetime (naive timestamps are taken as IST)"""
+    ist = pytz.timezone('Asia/Kolkata')
+    try:
+        parsed = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    except (AttributeError, TypeError, ValueError):
+        return None
+    return ist.localize(parsed) if parsed.tzinfo is None else parsed.astimezone(ist)
+
+
+def _scan_target(context: dict, attendance_data: dict):
+    """Day or session a scan counts towards, used to spot repeated scans"""
+    invitation = context["invitation"] or {}
+    return (
+        invitation.get("target_day") or invitation.get("target_session")
+        or attendance_data.get("day") or attendance_data.get("session_id")
+    )
+
+
+async def _find_registrations(registration_ids: List[str]) -> dict:
+    """Registrations by ID across both collections, in one concurrent pass"""
+    projection = {key: value for key, value in SCAN_REGISTRATION_PROJECTION.items() if key != "_collection"}
+    query = {"registration_id": {"$in": registration_ids}}
+    students, faculty = await asyncio.gather(
+        DatabaseOperations.find_many("student_registrations", query, projection),
+        DatabaseOperations.find_many("faculty_registrations", query, projection)
+    )
+    found = {}
+    # Student registrations win on an ID clash, as in _find_registration
+    for collection_name, registrations in (("faculty_registrations", faculty), ("student_registrations", students)):
+        for registration in registrations:
+            found[registration["registration_id"]] = {**registration, "_collection": collection_name}
+    return found
+
+
+def _apply_scans(registration: dict, context: dict, scans: list):
+    """
+    Apply scans (oldest first) to an in-memory registration.
+
+    Returns the combined update (None when nothing changes), the guard filter that
+    pins the registration to the state it was read in, and per-scan outcomes:
+    {index: _build_scan_update result, or an error message}.
+    """
+    guard = {
+        "attendance.last_updated": (registration.get("attendance") or {}).get("last_updated"),
+        "updated_at": registration.get("updated_at"),
+    }
+    changes = {}
+    outcomes = {}
+    for index, scan, marked_at in scans:
+        try:
+            result = _build_scan_update(registration, context, scan.attendance_data, scan.selected_members, marked_at)
+        except HTTPException as e:
+            outcomes[index] = str(e.detail)
+            continue
+        if result["update"] is not None:
+            changes.update(result["update"]["$set"])
+            if "attendance" in result["update"]["$set"]:
+                # Later scans of the same registration build on this one
+                registration["attendance"] = result["attendance"]
+        outcomes[index] = result
+    return ({"$set": changes} if changes else None), guard, outcomes
+
+
+def _scan_update_landed(registration: dict, update: dict) -> bool:
+    """Whether a re-read `registration` already holds what `update` (from _apply_scans) wrote"""
+    changes = update["$set"]
+    if "attendance" in changes:
+        # Every scan stamps its own time into attendance.last_updated
+        return (registration.get("attendance") or {}).get("last_updated") == changes["attendance"].get("last_updated")
+    updated_at, stored = changes.get("updated_at"), registration.get("updated_at")
+    if not isinstance(updated_at, datetime) or not isinstance(stored, datetime):
+        return False
+    # MongoDB keeps milliseconds only
+    return stored == updated_at.replace(microsecond=updated_at.microsecond // 1000 * 1000)
+
+
+async def _write_scans_individually(registration_id: str, context: dict, scans: list) -> Optional[dict]:
+    """Guarded re-read/apply/write loop for one registration; None if it kept conflicting"""
+    for attempt in range(SCAN_WRITE_ATTEMPTS):
+        registration = await _find_registration(registration_id)
+        if not registration:
+            return None
+        present_before = StatisticsManager.present_participants(registration)
+        update, guard, outcomes = _apply_scans(registration, context, scans)
+        # A matched update counts even when it changes nothing (the scans were already stored)
+        if update is None or await DatabaseOperations.find_one_and_update(
+            registration["_collection"], {"registration_id": registration_id, **guard}, update, projection={"_id": 1}
+        ) is not None:
+            await StatisticsManager.record_attendance_present(_newly_present(registration, present_before, update))
+            return outcomes
+    return None
+
+
+@router.post("/session/{session_id}/sync")
+async def sync_offline_scans(
+    session_id: str,
+    request: SyncScansRequest
+):
+    """
+    Apply scans a volunteer collected while offline, in one request.
+
+    Scans are validated against the session in one pass, repeated scans of the same
+    registration and day/session are dropped (the earliest one counts), and every
+    registration is written once with an unordered bulk_write.
+    Public endpoint - validates session
+
+    Returns:
+        Per-scan results in request order plus a summary
+    """
+    try:
+        context = await _get_scan_context(session_id)
+        session = context["session"]
+        event = context["event"]
+        if not event:
+            raise HTTPException(status_code=404, detail="Event not found")
+        
+        expires_at = session.get("expires_at")
+        if isinstance(expires_at, datetime) and safe_datetime_compare(get_current_ist(), expires_at + timedelta(hours=OFFLINE_SYNC_GRACE_HOURS), 'gt'):
+            raise HTTPException(status_code=403, detail="Session has expired")
+        
+        results: List[Optional[dict]] = [None] * len(request.scans)
+        
+        def reject(index: int, scan: OfflineScan, outcome: str, message: str, registration_id: Optional[str] = None):
+            results[index] = {
+                "success": False,
+                "scan_id": scan.scan_id,
+                "registration_id": registration_id,
+                "outcome": outcome,
+                "message": message
+            }
+        
+        # Validate every scan against the session before touching the database
+        queued = []
+        for index, scan in enumerate(request.scans):
+            registration_id = scan.qr_data.get("registration_id") or scan.qr_data.get("reg_id")
+            marked_at = _parse_scan_time(scan.timestamp)
+            if not registration_id:
+                reject(index, scan, "invalid", "No registration_id found in QR code")
+            elif marked_at is None:
+                reject(index, scan, "invalid", f"Invalid scan timestamp: {scan.timestamp}", registration_id)
+            elif expires_at and safe_datetime_compare(marked_at.replace(tzinfo=None), expires_at, 'gt'):
+                reject(index, scan, "session_expired", "Scanned after the session expired", registration_id)
+            else:
+                queued.append((index, scan, marked_at, registration_id))
+        
+        registrations = await _find_registrations(list({item[3] for item in queued})) if queued else {}
+        
+        # Earliest scan first; a repeat of the same registration and target is a duplicate
+        queued.sort(key=lambda item: (item[2], item[0]))
+        seen = set()
+        scans_by_registration = {}
+        for index, scan, marked_at, registration_id in queued:
+            registration = registrations.get(registration_id)
+            if not registration:
+                reject(index, scan, "not_found", "Registration not found", registration_id)
+                continue
+            if registration.get("event", {}).get("event_id") != session.get("event_id"):
+                reject(index, scan, "event_mismatch", "This QR code belongs to a different event", registration_id)
+                continue
+            dedupe_key = (
+                registration_id,
+                _scan_target(context, scan.attendance_data),
+                tuple(sorted(scan.selected_members)) if scan.selected_members is not None else None
+            )
+            if dedupe_key in seen:
+                reject(index, scan, "duplicate", "Already scanned earlier in this batch", registration_id)
+                continue
+            seen.add(dedupe_key)
+            scans_by_registration.setdefault(registration_id, []).append((index, scan, marked_at))
+        
+        # One combined, guarded update per registration, one bulk_write per collection
+        outcomes = {}
+        operations = {}
+        updates = {}
+        newly_present = {}
+        for registration_id, scans in scans_by_registration.items():
+            registration = registrations[registration_id]
+            present_before = StatisticsManager.present_participants(registration)
+            update, guard, registration_outcomes = _apply_scans(registration, context, scans)
+            outcomes[registration_id] = registration_outcomes
+            if update is not None:
+                updates[registration_id] = update
+                newly_present[registration_id] = _newly_present(registration, present_before, update)
+                operations.setdefault(registration["_collection"], []).append(
+                    (registration_id, UpdateOne({"registration_id": registration_id, **guard}, update))
+                )
+        
+        collections = list(operations)
+        write_results = await asyncio.gather(*(
+            DatabaseOperations.bulk_write(collection_name, [operation for _, operation in operations[collection_name]], ordered=False)
+            for collection_name in collections
+        ))
+        for collection_name, write_result in zip(collections, write_results):
+            if write_result is not None and write_result.matched_count == len(operations[collection_name]):
+                continue
+            # A live scan changed some of these registrations meanwhile: re-apply only the
+            # ones whose guarded update did not land
+            current = await _find_registrations([registration_id for registration_id, _ in operations[collection_name]])
+            for registration_id, _ in operations[collection_name]:
+                registration = current.get(registration_id)
+                if registration and _scan_update_landed(registration, updates[registration_id]):
+                    continue
+                # Re-applied from a fresh read, which records its own change
+                newly_present.pop(registration_id, None)
+                outcomes[registration_id] = await _write_scans_individually(
+                    registration_id, context, scans_by_registration[registration_id]
+                )
+        
+        for registration_id, scans in scans_by_registration.items():
+            registration_outcomes = outcomes.get(registration_id)
+            for index, scan, marked_at in scans:
+                outcome = registration_outcomes.get(index) if registration_outcomes is not None else None
+                if registration_outcomes is None:
+                    reject(index, scan, "failed", "Attendance could not be saved, please retry", registration_id)
+                elif isinstance(outcome, str):
+                    reject(index, scan, "invalid", outcome, registration_id)
+                else:
+                    results[index] = {
+                        "success": True,
+                        "scan_id": scan.scan_id,
+                        "registration_id": registration_id,
+                        "outcome": "marked",
+                        "marked_at": outcome["marked_at"],
+                        "attendance_strategy": outcome["attendance_strategy"],
+                        "day_marked": outcome["day_marked"],
+                        "session_marked": outcome["session_marked"],
+                        "already_marked": outcome["already_marked"],
+                        "is_team": outcome["is_team"],
+                        "members_updated": outcome["members_updated"]
+                    }
+        
+        await StatisticsManager.record_attendance_present(sum(newly_present.values()))
+        await invalidate_student_dashboards(*(
+            enrollment_no
+            for registration_id, registration_outcomes in outcomes.items() if registration_outcomes is not None
+            for enrollment_no in _registration_enrollments(registrations[registration_id])
+        ))
+        
+        applied = sum(1 for result in results if result["success"])
+        if applied:
+            now = datetime.now(pytz.timezone('Asia/Kolkata')).replace(tzinfo=None)
+            await asyncio.gather(
+                DatabaseOperations.update_one(
+                    "volunteer_sessions",
+                    {"session_id": session_id},
+                    {"$set": {"last_activity": now}, "$inc": {"total_scans": applied}}
+                ),
+                DatabaseOperations.update_one(
+                    "volunteer_invitations",
+                    {"invitation_code": session.get("invitation_code")},
+                    {"$inc": {"total_scans": applied}}
+                )
+            )
+        
+        duplicates = sum(1 for result in results if result["outcome"] == "duplicate")
+        logger.info(f"✅ OFFLINE SYNC: session {session_id} ({session.get('volunteer_name')}) - {applied}/{len(results)} scans applied, {duplicates} duplicates")
+        
+        return {
+            "success": True,
+            "data": {
+                "session_id": session_id,
+                "received": len(results),
+                "applied": applied,
+                "duplicates": duplicates,
+                "rejected": len(results) - applied - duplicates,
+                "results": results
+            }
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Error syncing offline scans for session {session_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to sync scans: {str(e)}")
+
 @router.get("/session/{session_id}/status")
 async def get_session_status(session_id: str):
     """
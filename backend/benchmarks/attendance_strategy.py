@@ -0,0 +1,199 @@
+"""
+Microbenchmark: attendance strategy detection over a corpus of event write-ups.
+
+Checks that the compiled pattern tables give the same counts as running
+`re.findall` over every pattern, then times both on each event's name, type
+and description, and times a full detection with and without the memo that
+repeated registrations for one event hit. Runs fully in-process, no MongoDB
+or Redis needed.
+
+Usage (from backend/):
+    python -m benchmarks.attendance_strategy [iterations]
+"""
+
+import re
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from models.dynamic_attendance import AttendanceIntelligenceService
+from services.venue_intelligence_service import VenueIntelligenceService
+
+
+def event(name, event_type, description, hours, venue, registration_mode="individual", max_team_size=1):
+    start = datetime(2025, 9, 12, 9, 0)
+    return {
+        "event_name": name,
+        "event_type": event_type,
+        "detailed_description": description,
+        "start_datetime": start,
+        "end_datetime": start + timedelta(hours=hours),
+        "venue": venue,
+        "registration_mode": registration_mode,
+        "max_team_size": max_team_size,
+    }
+
+
+CORPUS = [
+    event(
+        "HackNova 2025 - 24 Hour National Hackathon", "Hackathon",
+        "HackNova is a 24-hour coding marathon where teams of up to four build working prototypes "
+        "for problem statements released at the opening ceremony. Mentors from partner companies "
+        "review progress at the midnight checkpoint and again before final judging. Round one is an "
+        "online screening of idea submissions; shortlisted teams are invited on campus for the final "
+        "round. Participants must bring their own laptops; food and accommodation are provided.",
+        24, {"venue_name": "Innovation Lab, Block C", "venue_type": "lab"}, "team", 4,
+    ),
+    event(
+        "Industrial Visit to Tata Motors Assembly Plant", "Industrial Visit",
+        "A one-day industrial visit for third-year mechanical and production engineering students. "
+        "Students will tour the body shop, paint shop and final assembly line, followed by an "
+        "interaction with plant engineers on lean manufacturing and quality control. Buses leave "
+        "the main gate at 7:30 AM sharp; formal attire and college ID cards are mandatory.",
+        9, {"venue_name": "Tata Motors Plant, Sanand", "venue_type": "industrial site"},
+    ),
+    event(
+        "Hands-on Workshop on Machine Learning with Python", "Workshop",
+        "This three-day hands-on workshop introduces supervised and unsupervised learning with "
+        "scikit-learn. Day one covers data cleaning and feature engineering, day two regression and "
+        "classification models, and day three clustering and model deployment with Flask. Each "
+        "session ends with a lab assignment; certificates require attendance on all three days.",
+        56, {"venue_name": "Computer Lab 3", "venue_type": "laboratory", "capacity": 60},
+    ),
+    event(
+        "Rhythm 2025 - Annual Cultural Fest", "Cultural Fest",
+        "Rhythm is our annual cultural festival celebrating music, dance and drama across three "
+        "days. Events include solo and group dance competitions, battle of bands, street play, "
+        "fashion show and a stand-up comedy night. Preliminary rounds are held on day one and "
+        "finals on the last evening, followed by the prize distribution ceremony and DJ night.",
+        60, {"venue_name": "Open Air Theatre and Central Lawn", "venue_type": "outdoor"},
+    ),
+    event(
+        "Campus Placement Drive - Infosys", "Placement Drive",
+        "Infosys is conducting a campus placement drive for final-year B.E. and MCA students with no "
+        "active backlogs. The selection process has an online aptitude test, a technical interview "
+        "and an HR interview, all on the same day. Carry three copies of your resume, passport size "
+        "photographs and original mark sheets. Results are announced in the evening.",
+        10, {"venue_name": "Placement Cell Seminar Hall", "venue_type": "seminar hall"},
+    ),
+    event(
+        "International Conference on Sustainable Energy Systems", "Conference",
+        "A two-day hybrid tech conference with keynote talks, paper presentations and panel "
+        "discussions on renewable integration, battery storage and smart grids. Accepted papers "
+        "will be published in the conference proceedings. Delegates attending in person get access "
+        "to the exhibition area; remote participants can join the live stream on Zoom.",
+        32, {"venue_name": "Main Auditorium", "venue_type": "auditorium", "capacity": 800},
+    ),
+    event(
+        "Free Health Checkup and Blood Donation Camp", "Medical Camp",
+        "The NSS unit, together with the civil hospital, is organising a free health checkup and "
+        "blood donation camp for students, staff and residents of nearby villages. Services include "
+        "blood pressure, sugar and eye checkups. Donors receive refreshments and a certificate of "
+        "appreciation. Volunteers are needed for registration and crowd management.",
+        6, {"venue_name": "College Gymkhana", "venue_type": "multi purpose hall"},
+    ),
+    event(
+        "Webinar: Careers in Cloud Computing", "Webinar",
+        "An online webinar with a solutions architect from AWS on career paths in cloud computing, "
+        "the certifications that matter and how to build a portfolio of projects. The talk is "
+        "followed by a thirty-minute Q&A. The meeting link will be emailed to registered students.",
+        1.5, {"venue_name": "Online (Zoom)", "venue_type": "virtual"},
+    ),
+    event(
+        "Inter-College Football Tournament", "Sports",
+        "Sixteen colleges compete in a knockout football tournament over four days. League matches "
+        "are played in the mornings and knockout rounds in the evenings under floodlights. Teams "
+        "must report thirty minutes before kick-off with their registered squad list.",
+        80, {"venue_name": "University Sports Ground", "venue_type": "stadium"}, "team", 16,
+    ),
+    event(
+        "Summer Research Internship Programme", "Internship",
+        "An eight-week research internship in which students work with faculty mentors on funded "
+        "research projects in robotics, materials science and data analytics. Interns submit weekly "
+        "progress reports, present a mid-term review and a final thesis-style report. A stipend is "
+        "paid on completion of the internship with at least 90 percent attendance.",
+        24 * 56, {"venue_name": "Central Research Facility", "venue_type": "research lab"},
+    ),
+    event(
+        "Quiz Mania - General Knowledge Quiz", "Quiz",
+        "A general knowledge quiz in three rounds: a written preliminary, a visual round and a rapid "
+        "fire buzzer final. Teams of two; the top six teams from the preliminary qualify for the "
+        "stage rounds. Topics span science, sports, current affairs, business and pop culture.",
+        3, {"venue_name": "Seminar Room 204", "venue_type": "classroom"}, "team", 2,
+    ),
+    event(
+        "Guest Lecture on Constitutional Law", "Guest Lecture",
+        "A guest lecture by a senior advocate of the High Court on landmark constitutional law "
+        "judgements and their impact on fundamental rights, followed by an interactive session.",
+        2, {"venue_name": "Moot Court Hall", "venue_type": "lecture hall"},
+    ),
+]
+
+
+def legacy_counts(patterns, text):
+    """The previous scoring: re.findall over every pattern of every key"""
+    return {key: sum(len(re.findall(pattern, text)) for pattern in key_patterns) for key, key_patterns in patterns.items()}
+
+
+def legacy_pattern_scores(event_data):
+    """Weighted event pattern scores as detect_attendance_strategy used to compute them"""
+    patterns = AttendanceIntelligenceService.EVENT_TYPE_PATTERNS
+    fields = [(event_data["event_name"].lower(), 6), (event_data["event_type"].lower(), 4),
+              (event_data["detailed_description"].lower(), 2)]
+    return {
+        strategy: sum(legacy_counts(patterns, text)[strategy] * weight for text, weight in fields)
+        for strategy in patterns
+    }
+
+
+def table_pattern_scores(event_data):
+    table = AttendanceIntelligenceService.EVENT_TYPE_TABLE
+    fields = [(event_data["event_name"].lower(), 6), (event_data["event_type"].lower(), 4),
+              (event_data["detailed_description"].lower(), 2)]
+    counts = [(table.counts(text), weight) for text, weight in fields]
+    return {strategy: sum(count[strategy] * weight for count, weight in counts) for strategy in table.keys}
+
+
+def venue_text(event_data):
+    venue = event_data["venue"]
+    return f"{venue.get('venue_name', '')} {venue.get('venue_type', '')} {venue.get('description', '')}".lower()
+
+
+def time_us(function, iterations):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - started) * 1_000_000)
+    return statistics.mean(samples)
+
+
+def run(iterations: int = 200):
+    venue_patterns = VenueIntelligenceService.VENUE_CLASSIFICATION_PATTERNS
+    for event_data in CORPUS:
+        assert table_pattern_scores(event_data) == legacy_pattern_scores(event_data), event_data["event_name"]
+        assert (VenueIntelligenceService.VENUE_CLASSIFICATION_TABLE.counts(venue_text(event_data))
+                == legacy_counts(venue_patterns, venue_text(event_data))), event_data["event_name"]
+    print(f"{len(CORPUS)} events, compiled tables match re.findall counts")
+
+    print(f"{'event':<46}{'findall':>10}{'table':>10}{'detect':>10}{'memo':>8}  strategy")
+    totals = [0.0, 0.0, 0.0, 0.0]
+    for event_data in CORPUS:
+        timings = [
+            time_us(lambda: legacy_pattern_scores(event_data), iterations),
+            time_us(lambda: table_pattern_scores(event_data), iterations),
+            time_us(lambda: AttendanceIntelligenceService._detect_attendance_strategy(event_data), iterations),
+            time_us(lambda: AttendanceIntelligenceService.detect_attendance_strategy(event_data), iterations),
+        ]
+        totals = [total + timing for total, timing in zip(totals, timings)]
+        strategy = AttendanceIntelligenceService.detect_attendance_strategy(event_data).value
+        print(f"{event_data['event_name'][:45]:<46}" + "".join(f"{timing:>8.0f}us" for timing in timings[:3])
+              + f"{timings[3]:>6.0f}us  {strategy}")
+    print(f"{'mean':<46}" + "".join(f"{total / len(CORPUS):>8.0f}us" for total in totals[:3])
+          + f"{totals[3] / len(CORPUS):>6.0f}us")
+
+
+if __name__ == "__main__":
+    iterations_arg = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    run(iterations_arg)
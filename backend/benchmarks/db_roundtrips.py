@@ -0,0 +1,45 @@
+"""
+Microbenchmark: network round trips per DatabaseOperations.find_one.
+
+Counts the commands the driver sends while running a batch of find_one calls
+against the configured MONGODB_URL. With the connection manager in
+config/database.py every find_one should cost exactly one round trip.
+
+Usage (from backend/):
+    python -m benchmarks.db_roundtrips [collection] [iterations]
+"""
+
+import asyncio
+import sys
+import time
+
+from config.database import Database
+from database.operations import DatabaseOperations
+
+
+async def run(collection: str = "events", iterations: int = 200):
+    if not await Database.connect_db():
+        print("Could not connect to MongoDB - check MONGODB_URL")
+        return
+
+    # Warm up the pool so connection handshakes are not counted
+    await DatabaseOperations.find_one(collection, {})
+
+    commands_before = Database.command_counter.count
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await DatabaseOperations.find_one(collection, {})
+    elapsed = time.perf_counter() - started
+    commands = Database.command_counter.count - commands_before
+
+    print(f"find_one x{iterations} on '{collection}'")
+    print(f"  round trips per find_one: {commands / iterations:.2f}")
+    print(f"  mean latency:             {elapsed / iterations * 1000:.2f} ms")
+
+    await Database.close_db()
+
+
+if __name__ == "__main__":
+    collection_arg = sys.argv[1] if len(sys.argv) > 1 else "events"
+    iterations_arg = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    asyncio.run(run(collection_arg, iterations_arg))
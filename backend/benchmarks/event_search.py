@@ -0,0 +1,96 @@
+"""
+Microbenchmark: event search latency on a synthetic catalog.
+
+Builds a catalog of generated events (10k by default), then times the old
+lowercase substring scan over event_name/description/category against
+EventSearchIndex for a set of typed-as-you-go queries. Runs fully in-process,
+no MongoDB or Redis needed.
+
+Usage (from backend/):
+    python -m benchmarks.event_search [events] [iterations]
+"""
+
+import random
+import statistics
+import sys
+import time
+
+from utils.event_search import EventSearchIndex
+
+CATEGORIES = ["Technical", "Cultural", "Sports", "Workshop", "Seminar", "Hackathon", "Webinar"]
+TOPICS = [
+    "machine learning", "web development", "robotics", "photography", "public speaking",
+    "cyber security", "cloud computing", "data science", "music", "drama", "entrepreneurship",
+    "blockchain", "mobile apps", "circuit design", "quiz", "debate", "football", "chess",
+]
+ADJECTIVES = ["annual", "national", "intro", "advanced", "hands-on", "inter-college", "beginner", "open"]
+FILLER = (
+    "participants will learn practical skills from industry mentors and work in teams "
+    "certificates are awarded to everyone who attends the full session lunch provided"
+).split()
+
+QUERIES = ["ma", "mach", "machine learn", "hack", "robotics workshop", "cyber", "nat deb", "photo", "quiz", "cloud comp"]
+
+
+def make_catalog(size: int, seed: int = 7):
+    rng = random.Random(seed)
+    events = []
+    for number in range(size):
+        topic = rng.choice(TOPICS)
+        category = rng.choice(CATEGORIES)
+        events.append({
+            "event_id": f"EVT{number:06d}",
+            "event_name": f"{rng.choice(ADJECTIVES).title()} {topic.title()} {category} {2020 + number % 7}",
+            "category": category,
+            "event_type": rng.choice(["individual", "team"]),
+            "short_description": f"A {category.lower()} on {topic}",
+            "description": " ".join(rng.choices(FILLER, k=40)) + f" {topic}",
+        })
+    return events
+
+
+def substring_scan(events, query):
+    """The previous search: lowercase substring match over three fields"""
+    needle = query.lower().strip()
+    return [
+        event for event in events
+        if needle in event.get("event_name", "").lower()
+        or needle in event.get("description", "").lower()
+        or needle in event.get("category", "").lower()
+    ]
+
+
+def time_ms(function, iterations):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return statistics.mean(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def run(size: int = 10_000, iterations: int = 50):
+    events = make_catalog(size)
+
+    index = EventSearchIndex()
+    started = time.perf_counter()
+    index.load(events)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    print(f"{size} events, index built in {build_ms:.0f} ms")
+    print(f"{'query':<18}{'hits':>7}{'scan mean':>12}{'index mean':>12}{'index p95':>11}")
+    for query in QUERIES:
+        hits = len(index.search(query))
+        scan_mean, _ = time_ms(lambda: substring_scan(events, query), iterations)
+        index_mean, index_p95 = time_ms(lambda: index.search(query), iterations)
+        print(f"{query:<18}{hits:>7}{scan_mean:>10.2f}ms{index_mean:>10.2f}ms{index_p95:>9.2f}ms")
+
+    update_mean, _ = time_ms(lambda: index.add(dict(events[0], event_name="Renamed Hackathon")), iterations)
+    print(f"incremental re-index of one event: {update_mean:.3f} ms")
+
+
+if __name__ == "__main__":
+    size_arg = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    iterations_arg = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    run(size_arg, iterations_arg)
@@ -1,22 +1,142 @@
-from motor.motor_asyncio import AsyncIOMotorClient
-from typing import Optional
+"""
+MongoDB connection manager.
+
+The Motor client is opened once per process with explicit pool settings and
+database handles are cached, so a query costs exactly one round trip. Lost
+connections are detected from driver events (background heartbeats and pool
+clears after network errors) instead of probing the server before every call;
+the driver itself reconnects and retries reads/writes once the server is back.
+"""
+
+import logging
+import os
+import threading
+from typing import Dict, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import monitoring
+
 from config.settings import MONGODB_URL
 
+logger = logging.getLogger(__name__)
+
+# Pool settings - overridable through the environment for different deployments
+MONGO_CLIENT_OPTIONS = {
+    "maxPoolSize": int(os.getenv("MONGODB_MAX_POOL_SIZE", "50")),
+    "minPoolSize": int(os.getenv("MONGODB_MIN_POOL_SIZE", "5")),
+    "maxIdleTimeMS": int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", "300000")),
+    "waitQueueTimeoutMS": int(os.getenv("MONGODB_WAIT_QUEUE_TIMEOUT_MS", "10000")),
+    "serverSelectionTimeoutMS": int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+    "connectTimeoutMS": int(os.getenv("MONGODB_CONNECT_TIMEOUT_MS", "10000")),
+    "heartbeatFrequencyMS": int(os.getenv("MONGODB_HEARTBEAT_FREQUENCY_MS", "10000")),
+    "retryWrites": True,
+    "retryReads": True,
+}
+
+
+class _ConnectionHealthListener(monitoring.ServerHeartbeatListener, monitoring.ConnectionPoolListener):
+    """Tracks connection health from driver heartbeats and pool events.
+
+    Callbacks run on the driver's monitor threads, so they only flip flags.
+    """
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        Database._mark_healthy()
+
+    def failed(self, event):
+        Database._mark_unhealthy(f"heartbeat to {event.connection_id} failed: {event.reply}")
+
+    # Connection pool events - a pool clear means the driver saw a network error
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        Database._mark_healthy()
+
+    def pool_cleared(self, event):
+        Database._mark_unhealthy(f"connection pool for {event.address} cleared")
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        pass
+
+    def connection_checked_out(self, event):
+        pass
+
+    def connection_checked_in(self, event):
+        pass
+
+
+class _CommandCounter(monitoring.CommandListener):
+    """Counts commands sent to the server (one per network round trip)."""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        with self._lock:
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
 class Database:
     client: Optional[AsyncIOMotorClient] = None
-    
+    _databases: Dict[str, AsyncIOMotorDatabase] = {}
+    _healthy: bool = False
+    _last_error: Optional[str] = None
+    _health_listener = _ConnectionHealthListener()
+    command_counter = _CommandCounter()
+
     @classmethod
     async def connect_db(cls):
         """Connect to MongoDB database"""
+        client = None
         try:
             if cls.client is None:
-                cls.client = AsyncIOMotorClient(MONGODB_URL)
-                await cls.client.server_info()  # Test the connection
-                print("Connected to MongoDB")
+                client = AsyncIOMotorClient(
+                    MONGODB_URL,
+                    event_listeners=[cls._health_listener, cls.command_counter],
+                    **MONGO_CLIENT_OPTIONS,
+                )
+                await client.admin.command("ping")  # Verify once at startup
+                cls.client = client
+                cls._databases = {}
+                cls._mark_healthy()
+                logger.info(
+                    f"Connected to MongoDB (pool {MONGO_CLIENT_OPTIONS['minPoolSize']}-"
+                    f"{MONGO_CLIENT_OPTIONS['maxPoolSize']})"
+                )
             return cls.client
         except Exception as e:
-            print(f"Error connecting to MongoDB: {e}")
+            logger.error(f"Error connecting to MongoDB: {e}")
+            if client is not None:
+                client.close()
+            cls._mark_unhealthy(str(e))
             cls.client = None
+            cls._databases = {}
             return None
 
     @classmethod
@@ -25,33 +145,72 @@ class Database:
         if cls.client:
             try:
                 cls.client.close()
-                cls.client = None
-                print("Closed MongoDB connection")
+                logger.info("Closed MongoDB connection")
             except Exception as e:
-                print(f"Error closing MongoDB connection: {e}")
+                logger.error(f"Error closing MongoDB connection: {e}")
+            finally:
+                cls.client = None
+                cls._databases = {}
+                cls._healthy = False
 
     @classmethod
     async def ensure_connected(cls):
-        """Ensure database connection is established"""
+        """Ensure a client exists.
+
+        No round trip is made here: once the client is open the driver
+        reconnects on its own and connection loss is tracked via listeners.
+        """
         if cls.client is None:
             return await cls.connect_db()
-        try:
-            await cls.client.server_info()  # Test if connection is still alive
-            return cls.client
-        except Exception:
-            return await cls.connect_db()  # Reconnect if connection is lost
+        return cls.client
 
     @classmethod
     async def get_database(cls, db_name: str = "CampusConnect"):
-        """Get a database instance by name with connection check"""
+        """Get a cached database handle by name"""
+        db = cls._databases.get(db_name)
+        if db is not None and cls.client is not None:
+            return db
+
         try:
             if not await cls.ensure_connected():
                 raise Exception("Could not establish database connection")
-            
+
             db = cls.client[db_name]
-            # Test database access
-            await db.command('ping')
+            cls._databases[db_name] = db
             return db
         except Exception as e:
-            print(f"Error accessing database {db_name}: {e}")
+            logger.error(f"Error accessing database {db_name}: {e}")
             return None
+
+    @classmethod
+    def is_healthy(cls) -> bool:
+        """Whether the driver currently reports a working connection"""
+        return cls.client is not None and cls._healthy
+
+    @classmethod
+    def get_status(cls) -> Dict:
+        """Connection status for health endpoints"""
+        return {
+            "connected": cls.client is not None,
+            "healthy": cls.is_healthy(),
+            "last_error": cls._last_error,
+            "commands_sent": cls.command_counter.count,
+            "pool": {
+                "min": MONGO_CLIENT_OPTIONS["minPoolSize"],
+                "max": MONGO_CLIENT_OPTIONS["maxPoolSize"],
+            },
+        }
+
+    @classmethod
+    def _mark_healthy(cls):
+        if not cls._healthy:
+            if cls._last_error:
+                logger.info("MongoDB connection restored")
+            cls._healthy = True
+
+    @classmethod
+    def _mark_unhealthy(cls, reason: str):
+        if cls._healthy:
+            logger.warning(f"MongoDB connection lost: {reason}")
+        cls._healthy = False
+        cls._last_error = reason
@@ -0,0 +1,298 @@
+"""
+Declarative MongoDB index registry.
+
+Every index the hot query paths depend on is declared once in INDEX_REGISTRY
+together with a sample of the query shape it serves. ensure_indexes() applies
+the registry idempotently at startup (createIndexes is a no-op for indexes that
+already exist), and the report command runs explain() on each query shape so
+collection scans show up before event day does.
+
+Usage (from backend/):
+    python -m database.indexes apply     # create missing indexes
+    python -m database.indexes report    # explain() every registered query shape
+"""
+
+import asyncio
+import logging
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from config.database import Database
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IndexSpec:
+    """An index plus the query shape that should use it"""
+    collection: str
+    keys: List[Tuple[str, int]]
+    name: str
+    sample_query: Dict[str, Any]
+    unique: bool = False
+    sample_sort: Optional[List[Tuple[str, int]]] = None
+    options: Dict[str, Any] = field(default_factory=dict)
+
+    def to_model(self) -> IndexModel:
+        return IndexModel(self.keys, name=self.name, unique=self.unique, **self.options)
+
+
+# Only enforce uniqueness on documents that actually carry the field
+_HAS_STRING = {"$type": "string"}
+
+INDEX_REGISTRY: List[IndexSpec] = [
+    # Events
+    IndexSpec(
+        "events", [("event_id", ASCENDING)], "event_id_unique",
+        {"event_id": "__sample__"}, unique=True,
+    ),
+    # Client event listing: audience/status/category filters, keyset on (start_datetime, event_id)
+    IndexSpec(
+        "events", [("status", ASCENDING), ("target_audience", ASCENDING), ("start_datetime", ASCENDING), ("event_id", ASCENDING)],
+        "status_audience_start_event",
+        {"status": "upcoming", "target_audience": {"$in": ["student", "both"]}},
+        sample_sort=[("start_datetime", ASCENDING), ("event_id", ASCENDING)],
+    ),
+    IndexSpec(
+        "events", [("target_audience", ASCENDING), ("start_datetime", ASCENDING), ("event_id", ASCENDING)],
+        "audience_start_event",
+        {"target_audience": {"$in": ["student", "both"]}},
+        sample_sort=[("start_datetime", ASCENDING), ("event_id", ASCENDING)],
+    ),
+    IndexSpec(
+        "events", [("category", ASCENDING), ("start_datetime", ASCENDING), ("event_id", ASCENDING)],
+        "category_start_event",
+        {"category": "__sample__"},
+        sample_sort=[("start_datetime", ASCENDING), ("event_id", ASCENDING)],
+    ),
+    # Scheduler bootstrap: one $or branch per trigger date, each served by its own index
+    *[
+        IndexSpec("events", [(date_field, ASCENDING)], date_field, {date_field: {"$gte": "__sample__"}})
+        for date_field in (
+            "registration_start_date", "registration_end_date", "start_datetime", "end_datetime",
+            "certificate_start_date", "certificate_end_date",
+        )
+    ],
+
+    # Student registrations
+    IndexSpec(
+        "student_registrations", [("registration_id", ASCENDING)], "registration_id_unique",
+        {"registration_id": "__sample__"}, unique=True,
+        options={"partialFilterExpression": {"registration_id": _HAS_STRING}},
+    ),
+    IndexSpec(
+        "student_registrations", [("student.enrollment_no", ASCENDING), ("event.event_id", ASCENDING)],
+        "student_enrollment_event",
+        {"student.enrollment_no": "__sample__", "event.event_id": "__sample__"},
+    ),
+    IndexSpec(
+        "student_registrations", [("event.event_id", ASCENDING), ("registration_type", ASCENDING)],
+        "event_registration_type",
+        {"event.event_id": "__sample__"},
+    ),
+    IndexSpec(
+        "student_registrations", [("team_members.student.enrollment_no", ASCENDING), ("event.event_id", ASCENDING)],
+        "team_member_enrollment_event",
+        {"event.event_id": "__sample__", "registration_type": "team", "team_members.student.enrollment_no": "__sample__"},
+    ),
+    IndexSpec(
+        "student_registrations", [("team_members.registration_id", ASCENDING)],
+        "team_member_registration_id",
+        {"registration_type": "team", "team_members.registration_id": "__sample__"},
+    ),
+
+    # Faculty registrations (mirror student_registrations)
+    IndexSpec(
+        "faculty_registrations", [("registration_id", ASCENDING)], "registration_id_unique",
+        {"registration_id": "__sample__"}, unique=True,
+        options={"partialFilterExpression": {"registration_id": _HAS_STRING}},
+    ),
+    IndexSpec(
+        "faculty_registrations", [("faculty.employee_id", ASCENDING), ("event.event_id", ASCENDING)],
+        "faculty_employee_event",
+        {"faculty.employee_id": "__sample__", "event.event_id": "__sample__"},
+    ),
+    IndexSpec(
+        "faculty_registrations", [("event.event_id", ASCENDING)], "event_id",
+        {"event.event_id": "__sample__"},
+    ),
+
+    # Users
+    IndexSpec(
+        "students", [("enrollment_no", ASCENDING)], "enrollment_no_unique",
+        {"enrollment_no": "__sample__"}, unique=True,
+        options={"partialFilterExpression": {"enrollment_no": _HAS_STRING}},
+    ),
+    IndexSpec(
+        "faculties", [("employee_id", ASCENDING)], "employee_id_unique",
+        {"employee_id": "__sample__"}, unique=True,
+        options={"partialFilterExpression": {"employee_id": _HAS_STRING}},
+    ),
+
+    # Volunteer scanner
+    IndexSpec(
+        "volunteer_sessions", [("session_id", ASCENDING)], "session_id_unique",
+        {"session_id": "__sample__"}, unique=True,
+    ),
+    IndexSpec(
+        "volunteer_sessions", [("invitation_code", ASCENDING), ("expires_at", ASCENDING)],
+        "invitation_code_expires_at",
+        {"invitation_code": "__sample__"},
+    ),
+    IndexSpec(
+        "volunteer_invitations", [("invitation_code", ASCENDING)], "invitation_code_unique",
+        {"invitation_code": "__sample__"}, unique=True,
+    ),
+    IndexSpec(
+        "volunteer_invitations", [("event_id", ASCENDING), ("is_active", ASCENDING)],
+        "event_id_is_active",
+        {"event_id": "__sample__", "is_active": True},
+    ),
+    # Scan count joined into the invitation stats
+    IndexSpec(
+        "attendance_records", [("invitation_code", ASCENDING)], "invitation_code",
+        {"invitation_code": "__sample__"},
+    ),
+
+    # URL shortener
+    IndexSpec(
+        "url_shortcuts", [("short_code", ASCENDING)], "short_code_unique",
+        {"short_code": "__sample__"}, unique=True,
+    ),
+
+    # PDF job queue (workers claim the oldest runnable job; finished jobs expire)
+    IndexSpec(
+        "pdf_jobs", [("status", ASCENDING), ("created_at", ASCENDING)], "status_created_at",
+        {"status": "pending"}, sample_sort=[("created_at", ASCENDING)],
+    ),
+    IndexSpec(
+        "pdf_jobs", [("expires_at", ASCENDING)], "expires_at_ttl",
+        {"expires_at": {"$lt": "__sample__"}},
+        options={"expireAfterSeconds": 0},
+    ),
+    IndexSpec(
+        "pdf_files.files", [("metadata.expires_at", ASCENDING)], "metadata_expires_at",
+        {"metadata.expires_at": {"$lt": "__sample__"}},
+    ),
+
+    # Status logs (recent activity feed sorts by timestamp)
+    IndexSpec(
+        "event_status_logs", [("timestamp", DESCENDING)], "timestamp_desc",
+        {}, sample_sort=[("timestamp", DESCENDING)],
+    ),
+]
+
+
+async def ensure_indexes(db_name: str = "CampusConnect") -> Dict[str, int]:
+    """
+    Apply INDEX_REGISTRY idempotently.
+
+    Failures (e.g. duplicate data blocking a unique index, or an existing index
+    with the same keys under another name) are logged and skipped so they never
+    block startup.
+
+    Returns:
+        Counts of indexes ensured and failed
+    """
+    db = await Database.get_database(db_name)
+    if db is None:
+        logger.warning("Skipping index bootstrap - database unavailable")
+        return {"ensured": 0, "failed": 0}
+
+    ensured = failed = 0
+    for spec in INDEX_REGISTRY:
+        try:
+            await db[spec.collection].create_indexes([spec.to_model()])
+            ensured += 1
+        except OperationFailure as e:
+            failed += 1
+            logger.warning(f"Could not create index {spec.collection}.{spec.name}: {e}")
+
+    logger.info(f"Index bootstrap complete: {ensured} ensured, {failed} failed")
+    return {"ensured": ensured, "failed": failed}
+
+
+def _plan_stages(plan: Dict[str, Any]) -> List[str]:
+    """Flatten the stage names of a winning plan tree"""
+    stages = [plan.get("stage", "?")]
+    if "inputStage" in plan:
+        stages.extend(_plan_stages(plan["inputStage"]))
+    for child in plan.get("inputStages", []):
+        stages.extend(_plan_stages(child))
+    if "queryPlan" in plan:  # slot-based execution engine wraps the classic plan
+        stages.extend(_plan_stages(plan["queryPlan"]))
+    return stages
+
+
+async def explain_registry(db_name: str = "CampusConnect") -> List[Dict[str, Any]]:
+    """
+    Run explain() on the query shape of every registered index.
+
+    Returns:
+        One row per IndexSpec with the winning plan's stages and whether it scans the collection
+    """
+    db = await Database.get_database(db_name)
+    if db is None:
+        return []
+
+    report = []
+    for spec in INDEX_REGISTRY:
+        cursor = db[spec.collection].find(spec.sample_query)
+        if spec.sample_sort:
+            cursor = cursor.sort(spec.sample_sort)
+        try:
+            explanation = await cursor.explain()
+            winning_plan = explanation.get("queryPlanner", {}).get("winningPlan", {})
+            stages = _plan_stages(winning_plan)
+            report.append({
+                "collection": spec.collection,
+                "index": spec.name,
+                "stages": stages,
+                "collection_scan": "COLLSCAN" in stages,
+            })
+        except OperationFailure as e:
+            report.append({
+                "collection": spec.collection,
+                "index": spec.name,
+                "stages": [],
+                "collection_scan": None,
+                "error": str(e),
+            })
+    return report
+
+
+async def _main(command: str):
+    if not await Database.connect_db():
+        print("Could not connect to MongoDB - check MONGODB_URL")
+        return 1
+
+    try:
+        if command == "apply":
+            result = await ensure_indexes()
+            print(f"Indexes ensured: {result['ensured']}, failed: {result['failed']}")
+        elif command == "report":
+            scans = 0
+            for row in await explain_registry():
+                if row.get("error"):
+                    status = f"ERROR {row['error']}"
+                elif row["collection_scan"]:
+                    status = "COLLSCAN"
+                    scans += 1
+                else:
+                    status = "ok"
+                print(f"{row['collection']:<24} {row['index']:<32} {status:<10} {' > '.join(row['stages'])}")
+            print(f"\n{scans} query shape(s) fall back to a collection scan")
+        else:
+            print(__doc__)
+            return 1
+    finally:
+        await Database.close_db()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(_main(sys.argv[1] if len(sys.argv) > 1 else "report")))
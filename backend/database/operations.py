@@ -1,6 +1,7 @@
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Union
 from config.database import Database
 from bson import ObjectId
+from pymongo import ReturnDocument
 import json
 
 class DatabaseOperations:
@@ -29,6 +30,24 @@ class DatabaseOperations:
             
         return await cursor.to_list(length=None)
 
+    @classmethod
+    async def find_batches(cls, collection_name: str, query: Dict = {}, projection: Optional[Dict] = None, batch_size: int = 500, sort_by: Optional[List] = None, db_name: str = "CampusConnect") -> AsyncIterator[List[Dict]]:
+        """Iterate over matching documents in lists of up to `batch_size`, one cursor batch at a time"""
+        db = await Database.get_database(db_name)
+        if db is None:
+            return
+        cursor = db[collection_name].find(query, projection, batch_size=batch_size)
+        if sort_by:
+            cursor = cursor.sort(sort_by)
+        try:
+            while True:
+                batch = await cursor.to_list(length=batch_size)
+                if not batch:
+                    break
+                yield batch
+        finally:
+            await cursor.close()
+
     @classmethod
     async def insert_one(cls, collection_name: str, document: Dict, db_name: str = "CampusConnect") -> Optional[str]:
         """Insert a single document into the specified collection"""
@@ -38,6 +57,15 @@ class DatabaseOperations:
         result = await db[collection_name].insert_one(document)
         return str(result.inserted_id) if result.inserted_id else None
 
+    @classmethod
+    async def insert_many(cls, collection_name: str, documents: List[Dict], ordered: bool = False, db_name: str = "CampusConnect") -> List[str]:
+        """Insert several documents into the specified collection in one round trip"""
+        db = await Database.get_database(db_name)
+        if db is None or not documents:
+            return []
+        result = await db[collection_name].insert_many(documents, ordered=ordered)
+        return [str(inserted_id) for inserted_id in result.inserted_ids]
+
     @classmethod
     async def update_one(cls, collection_name: str, query: Dict, update: Dict, db_name: str = "CampusConnect") -> bool:
         """Update a single document in the specified collection"""
@@ -47,6 +75,35 @@ class DatabaseOperations:
         result = await db[collection_name].update_one(query, update)
         return result.modified_count > 0
 
+    @classmethod
+    async def find_one_and_update(cls, collection_name: str, query: Dict, update: Union[Dict, List[Dict]], projection: Optional[Dict] = None, return_updated: bool = True, upsert: bool = False, array_filters: Optional[List[Dict]] = None, sort: Optional[List] = None, db_name: str = "CampusConnect") -> Optional[Dict]:
+        """Atomically update a single document and return it (after the update by default).
+        
+        The update may be a regular update document or an aggregation pipeline.
+        When several documents match, `sort` picks which one is updated.
+        Returns None when no document matched the query.
+        """
+        db = await Database.get_database(db_name)
+        if db is None:
+            return None
+        return await db[collection_name].find_one_and_update(
+            query,
+            update,
+            projection=projection,
+            upsert=upsert,
+            array_filters=array_filters,
+            sort=sort,
+            return_document=ReturnDocument.AFTER if return_updated else ReturnDocument.BEFORE
+        )
+
+    @classmethod
+    async def bulk_write(cls, collection_name: str, operations: List, ordered: bool = False, db_name: str = "CampusConnect") -> object:
+        """Apply a batch of write operations (UpdateOne, InsertOne, ...) in one round trip"""
+        db = await Database.get_database(db_name)
+        if db is None:
+            return None
+        return await db[collection_name].bulk_write(operations, ordered=ordered)
+
     @classmethod
     async def update_many(cls, collection_name: str, query: Dict, update: Dict, db_name: str = "CampusConnect") -> object:
         """Update multiple documents in the specified collection"""
@@ -77,12 +134,12 @@ class DatabaseOperations:
     @classmethod
     async def find_by_id(cls, collection_name: str, document_id: ObjectId, db_name: str = "CampusConnect") -> Optional[Dict]:
         """Find a document by its ObjectId"""
-        return await cls.find_one(collection_name, {"_id": document_id}, db_name)
+        return await cls.find_one(collection_name, {"_id": document_id}, db_name=db_name)
     
     @classmethod
     async def update_by_id(cls, collection_name: str, document_id: ObjectId, update: Dict, db_name: str = "CampusConnect") -> bool:
         """Update a document by its ObjectId"""
-        return await cls.update_one(collection_name, {"_id": document_id}, update, db_name)
+        return await cls.update_one(collection_name, {"_id": document_id}, update, db_name=db_name)
     
     @classmethod
     async def aggregate(cls, collection_name: str, pipeline: List[Dict], db_name: str = "CampusConnect") -> List[Dict]:
@@ -93,6 +150,14 @@ class DatabaseOperations:
         cursor = db[collection_name].aggregate(pipeline)
         return await cursor.to_list(length=None)
 
+    @classmethod
+    async def distinct(cls, collection_name: str, key: str, query: Optional[Dict] = None, db_name: str = "CampusConnect") -> List:
+        """Distinct values of a field in the specified collection"""
+        db = await Database.get_database(db_name)
+        if db is None:
+            return []
+        return await db[collection_name].distinct(key, query or {})
+
     @classmethod
     async def count_documents(cls, collection_name: str, query: Dict = {}, db_name: str = "CampusConnect") -> int:
         """Count documents in the specified collection"""
@@ -13,6 +13,9 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from config.database import Database
+from utils.redis_pool import RedisPool
+from utils.two_tier_cache import start_invalidation_listener, stop_invalidation_listener
+from database.indexes import ensure_indexes
 from utils.dynamic_event_scheduler import start_dynamic_scheduler, stop_dynamic_scheduler
 from core.json_encoder import CustomJSONEncoder
 from core.logger import setup_logger
@@ -231,9 +234,16 @@ async def startup_db_client():
     
     global scheduler_task
     await Database.connect_db()
+    await RedisPool.connect()
+    
+    # Create any missing indexes for hot query paths (idempotent)
+    await ensure_indexes()
     
     # Skip background tasks in serverless environment
     if not is_serverless:
+        # Drop in-process cache entries when another worker invalidates them
+        await start_invalidation_listener()
+        
         # Initialize dynamic event scheduler with background task
         await start_dynamic_scheduler()
         logger.info("Started Dynamic Event Scheduler - updates triggered by event timing")
@@ -246,6 +256,16 @@ async def startup_db_client():
         from utils.dynamic_event_scheduler import get_scheduler_status
         status = await get_scheduler_status()
         logger.info(f"Scheduler status: {status['running']}, Queue size: {status['triggers_queued']}")
+        
+        # Claim queued PDF jobs in this process (disable on instances that should only serve API traffic)
+        if os.getenv("PDF_JOB_WORKERS_ENABLED", "true").lower() == "true":
+            from services.pdf_job_queue import pdf_job_queue
+            await pdf_job_queue.start()
+        
+        # Optionally launch certificate PDF workers now instead of on the first request
+        if os.getenv("PDF_PREWARM", "false").lower() == "true":
+            from services.pdf_generation_service import pdf_service
+            asyncio.create_task(pdf_service.start())
     else:
         logger.info("Running in serverless mode - background tasks disabled")
 
@@ -279,11 +299,19 @@ async def shutdown_db_client():
         if scheduler_task:
             scheduler_task.cancel()
         await stop_dynamic_scheduler()
+        await stop_invalidation_listener()
+        
+        # Stop claiming PDF jobs, then close warm PDF worker processes and their browsers
+        from services.pdf_job_queue import pdf_job_queue
+        from services.pdf_generation_service import pdf_service
+        await pdf_job_queue.stop()
+        await pdf_service.shutdown()
         
         # Communication service cleanup happens automatically
         logger.info("Communication service cleanup completed")
     
     await Database.close_db()
+    await RedisPool.close()
     logger.info("Database connections closed")
 
 # Health check endpoint for debugging API connectivity
@@ -298,7 +326,8 @@ async def health_check(request: Request):
         "host": request.headers.get("host"),
         "origin": request.headers.get("origin"),
         "user_agent": request.headers.get("user-agent"),
-        "cors_configured": True
+        "cors_configured": True,
+        "database": Database.get_status()
     }
 
 
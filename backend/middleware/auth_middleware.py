@@ -64,7 +64,7 @@ class AuthMiddleware:
         
         # First try Redis-backed token validation
         if token_manager.is_available():
-            token_data = token_manager.validate_access_token(access_token)
+            token_data = await token_manager.validate_access_token(access_token)
         
         # Fallback: Validate as stateless JWT (for iOS users when Redis unavailable)
         if not token_data:
@@ -104,11 +104,11 @@ class AuthMiddleware:
             
             if refresh_token:
                 # Try to refresh the access token
-                new_token_data = token_manager.refresh_access_token(refresh_token)
+                new_token_data = await token_manager.refresh_access_token(refresh_token)
                 if new_token_data:
                     # Get updated user data
                     new_access_token = new_token_data['access_token']
-                    token_data = token_manager.validate_access_token(new_access_token)
+                    token_data = await token_manager.validate_access_token(new_access_token)
                     
                     if token_data:
                         # Set new access token in response (will be handled by route)
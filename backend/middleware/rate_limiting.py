@@ -7,9 +7,6 @@ from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from fastapi import Request, HTTPException
-import redis
-from datetime import datetime, timedelta
-import pytz
 import logging
 import os
 
@@ -17,29 +14,11 @@ import os
 from dotenv import load_dotenv
 load_dotenv()
 
-# Initialize Redis for rate limiting storage
-# pip install redis
-try:
-    redis_url = os.getenv("UPSTASH_REDIS_URL") or os.getenv("REDIS_URL")
-    if redis_url:
-        # Redis-py 5.x automatically handles SSL from rediss:// URL
-        redis_client = redis.from_url(
-            redis_url, 
-            decode_responses=True,
-            socket_connect_timeout=10,
-            socket_timeout=10,
-            retry_on_timeout=True
-        )
-        redis_client.ping()  # Test connection
-        storage_uri = redis_url
-    else:
-        # Fallback to local Redis
-        redis_client = redis.Redis(host='localhost', port=6379, db=0, decode_responses=True)
-        redis_client.ping()  # Test connection
-        storage_uri = "redis://localhost:6379"
-except:
-    redis_client = None
-    storage_uri = "memory://"
+from utils.redis_pool import RedisPool
+
+# slowapi keeps its own storage; point it at Redis when one is configured
+redis_url = os.getenv("UPSTASH_REDIS_URL") or os.getenv("REDIS_URL")
+storage_uri = redis_url if redis_url else "memory://"
 
 # Initialize rate limiter
 limiter = Limiter(
@@ -50,27 +29,29 @@ limiter = Limiter(
 class AdvancedRateLimiter:
     """
     Advanced rate limiting with different strategies
+    
+    Counters live in the shared async Redis pool, or in the pool's in-process
+    fallback store when Redis is unavailable.
     """
     
     def __init__(self):
-        self.failed_attempts = {}
-        self.blocked_ips = {}
         self.logger = logging.getLogger(__name__)
     
-    def check_failed_login_attempts(self, ip: str, user_identifier: str) -> bool:
+    @property
+    def redis_client(self):
+        """Shared async Redis client (or in-process fallback)"""
+        return RedisPool.get_client()
+    
+    async def check_failed_login_attempts(self, ip: str, user_identifier: str) -> bool:
         """
         Check if IP or user has exceeded failed login attempts
         Returns True if should be blocked
         """
         key = f"failed_login:{ip}:{user_identifier}"
-        current_time = datetime.now(pytz.timezone('Asia/Kolkata')).replace(tzinfo=None)
         
         # Get current attempts
-        if redis_client:
-            attempts = redis_client.get(key)
-            attempts = int(attempts) if attempts else 0
-        else:
-            attempts = self.failed_attempts.get(key, 0)
+        attempts = await self.redis_client.get(key)
+        attempts = int(attempts) if attempts else 0
         
         # Check if blocked
         if attempts >= 5:  # Max 5 failed attempts
@@ -79,48 +60,30 @@ class AdvancedRateLimiter:
         
         return False
     
-    def record_failed_login(self, ip: str, user_identifier: str):
+    async def record_failed_login(self, ip: str, user_identifier: str):
         """Record a failed login attempt"""
         key = f"failed_login:{ip}:{user_identifier}"
         
-        if redis_client:
-            # Increment counter with 15-minute expiry
-            redis_client.incr(key)
-            redis_client.expire(key, 900)  # 15 minutes
-        else:
-            self.failed_attempts[key] = self.failed_attempts.get(key, 0) + 1
+        # Increment counter with 15-minute expiry in one round trip
+        pipe = self.redis_client.pipeline()
+        pipe.incr(key)
+        pipe.expire(key, 900)  # 15 minutes
+        await pipe.execute()
         
         self.logger.info(f"Failed login recorded for IP {ip}")
     
-    def clear_failed_attempts(self, ip: str, user_identifier: str):
+    async def clear_failed_attempts(self, ip: str, user_identifier: str):
         """Clear failed attempts after successful login"""
         key = f"failed_login:{ip}:{user_identifier}"
-        
-        if redis_client:
-            redis_client.delete(key)
-        else:
-            self.failed_attempts.pop(key, None)
+        await self.redis_client.delete(key)
     
-    def is_ip_blocked(self, ip: str) -> bool:
+    async def is_ip_blocked(self, ip: str) -> bool:
         """Check if IP is in temporary block list"""
-        if redis_client:
-            return redis_client.exists(f"blocked_ip:{ip}")
-        else:
-            blocked_until = self.blocked_ips.get(ip)
-            if blocked_until and datetime.now(pytz.timezone('Asia/Kolkata')).replace(tzinfo=None) < blocked_until:
-                return True
-            elif blocked_until:
-                # Remove expired block
-                del self.blocked_ips[ip]
-        
-        return False
+        return bool(await self.redis_client.exists(f"blocked_ip:{ip}"))
     
-    def block_ip_temporarily(self, ip: str, duration_minutes: int = 15):
+    async def block_ip_temporarily(self, ip: str, duration_minutes: int = 15):
         """Block IP for specified duration"""
-        if redis_client:
-            redis_client.setex(f"blocked_ip:{ip}", duration_minutes * 60, "blocked")
-        else:
-            self.blocked_ips[ip] = datetime.now(pytz.timezone('Asia/Kolkata')).replace(tzinfo=None) + timedelta(minutes=duration_minutes)
+        await self.redis_client.setex(f"blocked_ip:{ip}", duration_minutes * 60, "blocked")
         
         self.logger.warning(f"IP {ip} temporarily blocked for {duration_minutes} minutes")
 
@@ -151,7 +114,7 @@ async def check_ip_block_middleware(request: Request, call_next):
     """
     client_ip = get_remote_address(request)
     
-    if rate_limiter.is_ip_blocked(client_ip):
+    if await rate_limiter.is_ip_blocked(client_ip):
         raise HTTPException(
             status_code=429,
             detail="IP temporarily blocked due to suspicious activity"
@@ -170,16 +133,16 @@ async def login(request: Request, credentials: LoginCredentials):
     client_ip = get_remote_address(request)
     
     # Check if IP should be blocked
-    if rate_limiter.check_failed_login_attempts(client_ip, credentials.email):
+    if await rate_limiter.check_failed_login_attempts(client_ip, credentials.email):
         raise HTTPException(429, "Too many failed attempts. Try again later.")
     
     # Verify credentials...
     if not valid_credentials:
-        rate_limiter.record_failed_login(client_ip, credentials.email)
+        await rate_limiter.record_failed_login(client_ip, credentials.email)
         raise HTTPException(401, "Invalid credentials")
     
     # Clear failed attempts on successful login
-    rate_limiter.clear_failed_attempts(client_ip, credentials.email)
+    await rate_limiter.clear_failed_attempts(client_ip, credentials.email)
     
     return {"token": "success"}
 """
@@ -17,10 +17,15 @@ Key Features:
 
 from typing import Dict, List, Optional, Any, Union
 from datetime import datetime, timedelta
+from collections import OrderedDict
+import hashlib
+import json
+import os
 import pytz
 from enum import Enum
 from pydantic import BaseModel, Field, field_validator
-import re
+
+from utils.pattern_table import PatternTable
 
 # Import venue intelligence service and missing patterns service
 try:
@@ -37,6 +42,21 @@ except ImportError:
     MISSING_PATTERNS_AVAILABLE = False
     MissingEventTypePatternsService = None
 
+# Number of detected strategies kept in memory, keyed by the event fields detection reads
+ATTENDANCE_STRATEGY_CACHE_SIZE = int(os.getenv("ATTENDANCE_STRATEGY_CACHE_SIZE", "1024"))
+
+# Event fields that detect_attendance_strategy, generate_attendance_sessions and the services they consult read
+STRATEGY_INPUT_FIELDS = (
+    "event_name", "event_type", "detailed_description", "start_datetime", "end_datetime",
+    "venue", "registration_mode", "max_team_size",
+)
+
+
+def strategy_input_hash(event_data: Dict[str, Any]) -> str:
+    """sha1 of the STRATEGY_INPUT_FIELDS present in `event_data`; changes whenever detection could"""
+    fields = {field: event_data[field] for field in STRATEGY_INPUT_FIELDS if field in event_data}
+    return hashlib.sha1(json.dumps(fields, sort_keys=True, default=str).encode()).hexdigest()
+
 class AttendanceStrategy(Enum):
     """Attendance strategy types based on event nature"""
     SINGLE_MARK = "single_mark"           # Conference, webinar, seminar - one-time attendance
@@ -223,6 +243,12 @@ class AttendanceIntelligenceService:
             r"online.*course|distance.*education|e.*learning.*program"
         ]
     }
+
+    # EVENT_TYPE_PATTERNS compiled once, with a literal prefilter (see utils.pattern_table)
+    EVENT_TYPE_TABLE = PatternTable(EVENT_TYPE_PATTERNS)
+
+    # content hash of STRATEGY_INPUT_FIELDS -> detected strategy, least recently used first
+    _strategy_cache: "OrderedDict[str, AttendanceStrategy]" = OrderedDict()
     
     # Default criteria based on strategy
     DEFAULT_CRITERIA = {
@@ -255,6 +281,26 @@ class AttendanceIntelligenceService:
     
     @classmethod
     def detect_attendance_strategy(cls, event_data: Dict[str, Any]) -> AttendanceStrategy:
+        """
+        Attendance strategy for an event, memoized by a hash of the fields detection reads.
+        
+        Registrations call this for every participant of the same event, so repeated
+        calls for an unchanged event are answered from memory.
+        """
+        cache_key = strategy_input_hash(event_data)
+        strategy = cls._strategy_cache.get(cache_key)
+        if strategy is not None:
+            cls._strategy_cache.move_to_end(cache_key)
+            return strategy
+        
+        strategy = cls._detect_attendance_strategy(event_data)
+        cls._strategy_cache[cache_key] = strategy
+        while len(cls._strategy_cache) > ATTENDANCE_STRATEGY_CACHE_SIZE:
+            cls._strategy_cache.popitem(last=False)
+        return strategy
+    
+    @classmethod
+    def _detect_attendance_strategy(cls, event_data: Dict[str, Any]) -> AttendanceStrategy:
         """
         ENHANCED Attendance Strategy Detection (Phase 1)
         ===============================================
@@ -362,17 +408,14 @@ class AttendanceIntelligenceService:
             strategy_scores[strategy] = 0
         
         # Pattern matching with weighted scoring (ENHANCED: Higher weights for pattern matching)
-        for strategy, patterns in cls.EVENT_TYPE_PATTERNS.items():
-            score = 0
-            for pattern in patterns:
-                # Count pattern matches with position weighting (INCREASED WEIGHTS)
-                matches_in_name = len(re.findall(pattern, event_name)) * 6  # Name matches are most important
-                matches_in_type = len(re.findall(pattern, event_type)) * 4  # Type matches are important  
-                matches_in_desc = len(re.findall(pattern, description)) * 2  # Description matches are helpful
-                
-                score += matches_in_name + matches_in_type + matches_in_desc
-            
-            strategy_scores[strategy] = score
+        # Count pattern matches with position weighting (INCREASED WEIGHTS)
+        matches_in_name = cls.EVENT_TYPE_TABLE.counts(event_name)  # Name matches are most important
+        matches_in_type = cls.EVENT_TYPE_TABLE.counts(event_type)  # Type matches are important
+        matches_in_desc = cls.EVENT_TYPE_TABLE.counts(description)  # Description matches are helpful
+        for strategy in cls.EVENT_TYPE_PATTERNS:
+            strategy_scores[strategy] = (
+                matches_in_name[strategy] * 6 + matches_in_type[strategy] * 4 + matches_in_desc[strategy] * 2
+            )
         
         # ========================================
         # DURATION-BASED ENHANCED HEURISTICS
@@ -1561,8 +1604,7 @@ class AttendanceIntelligenceService:
         combined_text = f"{event_name} {event_type} {description}"
         
         # Count pattern matches for the selected strategy
-        patterns = self.EVENT_TYPE_PATTERNS.get(strategy, [])
-        match_count = sum(len(re.findall(pattern, combined_text)) for pattern in patterns)
+        match_count = self.EVENT_TYPE_TABLE.counts(combined_text).get(strategy, 0)
         
         # Base confidence + bonus for matches
         base_confidence = 0.6
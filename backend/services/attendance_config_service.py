@@ -0,0 +1,284 @@
+"""
+Attendance Config Service
+=========================
+Keeps an event's attendance configuration, and the attendance skeleton every
+new registration starts from, in one place on the event.
+
+The strategy, criteria and sessions come from the event's own attendance
+fields: the admin's override (`attendance_strategy` as a dict) or the
+auto-detected `attendance_strategy`/`attendance_criteria`/`attendance_sessions`
+create_event stores. Detection only runs for events that carry none of them.
+The result is stored in the event document's `dynamic_attendance_config`
+field, stamped with ATTENDANCE_CONFIG_VERSION and a hash of the event fields it
+was derived from. Registrations read it from the event they already loaded and
+copy the skeleton. A stored config whose stamp does not match the event
+(written by an older version, or the event was edited outside the admin
+routes) is rebuilt on first use and written back.
+"""
+
+import copy
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from database.operations import DatabaseOperations
+from models.dynamic_attendance import (
+    AttendanceCriteria,
+    AttendanceIntelligenceService,
+    AttendanceStrategy,
+    DynamicAttendanceConfig,
+    strategy_input_hash,
+)
+from utils.two_tier_cache import LocalLRUCache
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Bump whenever strategy detection, session generation or the skeleton format changes,
+# so configs stored by earlier code are rebuilt
+ATTENDANCE_CONFIG_VERSION = 2
+
+CONFIG_FIELD = "dynamic_attendance_config"
+
+# Event fields the config is read from, besides the inputs of strategy detection
+CONFIG_INPUT_FIELDS = ("attendance_mandatory", "attendance_strategy", "attendance_criteria", "attendance_sessions")
+
+# Configs built for events whose stored copy was missing or stale, per worker
+ATTENDANCE_CONFIG_CACHE_SIZE = int(os.getenv("ATTENDANCE_CONFIG_CACHE_SIZE", "512"))
+
+
+def _event_days(event_data: Dict[str, Any]) -> int:
+    """Number of calendar days an event spans (1 when unknown)"""
+    try:
+        start = event_data.get("start_datetime")
+        end = event_data.get("end_datetime")
+
+        if start and end:
+            if isinstance(start, str):
+                start = datetime.fromisoformat(start.replace("Z", "+00:00"))
+            if isinstance(end, str):
+                end = datetime.fromisoformat(end.replace("Z", "+00:00"))
+
+            return max(1, (end - start).days + 1)
+
+        return 1  # Default to single day
+
+    except Exception:
+        return 1  # Fallback to single day
+
+
+def config_input_hash(event_data: Dict[str, Any]) -> str:
+    """sha1 of every event field the stored config depends on"""
+    fields = {field: event_data.get(field) for field in CONFIG_INPUT_FIELDS}
+    fields["detection"] = strategy_input_hash(event_data)
+    return hashlib.sha1(json.dumps(fields, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _strategy_value(value: Any) -> Optional[AttendanceStrategy]:
+    try:
+        return AttendanceStrategy(value)
+    except ValueError:
+        return None
+
+
+def build_attendance_skeleton(strategy: str, event_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Attendance structure of a new registration for `strategy`.
+    Pre-creates all required fields that attendance service will update.
+    """
+    skeleton = {
+        "strategy": strategy,
+        "status": "pending",  # pending, present, partial, absent
+        "percentage": 0.0,
+        "last_updated": None,
+        "marked_by": None,
+        "marking_method": None
+    }
+
+    if strategy == "single_mark":
+        skeleton.update({"marked": False, "marked_at": None})
+
+    elif strategy == "day_based":
+        # Pre-create day slots based on event duration
+        event_days = _event_days(event_data)
+        skeleton.update({
+            "days": [
+                {
+                    "day": i + 1,
+                    "date": None,  # Will be calculated
+                    "marked": False,
+                    "marked_at": None
+                }
+                for i in range(event_days)
+            ],
+            "total_days": event_days,
+            "days_attended": 0
+        })
+
+    elif strategy == "session_based":
+        # Pre-create session slots (will be populated by attendance service)
+        skeleton.update({
+            "sessions": [],  # Will be populated when attendance is initialized
+            "total_sessions": 0,
+            "sessions_attended": 0
+        })
+
+    elif strategy == "milestone_based":
+        skeleton.update({
+            "milestones": [],  # Will be populated based on event milestones
+            "total_milestones": 0,
+            "milestones_completed": 0
+        })
+
+    elif strategy == "continuous":
+        skeleton.update({"engagement_periods": [], "total_engagement_time": 0, "active_time": 0})
+
+    return skeleton
+
+
+class AttendanceConfigService:
+    """Builds, stores and serves the per-event attendance configuration"""
+
+    def __init__(self):
+        self.events_collection = "events"
+        self._built = LocalLRUCache("attendance_config", ATTENDANCE_CONFIG_CACHE_SIZE, ttl_seconds=3600)
+
+    def _detect(self, event_data: Dict[str, Any]) -> DynamicAttendanceConfig:
+        try:
+            return AttendanceIntelligenceService.create_dynamic_config(event_data)
+        except Exception as e:
+            logger.warning(f"Attendance config generation failed for {event_data.get('event_id')}: {e}")
+
+        # Keep the detected strategy when only session generation failed
+        try:
+            strategy = AttendanceIntelligenceService.detect_attendance_strategy(event_data)
+        except Exception as e:
+            logger.warning(f"Strategy detection failed, using default: {e}")
+            strategy = AttendanceStrategy.SINGLE_MARK  # Fallback to simple strategy
+        defaults = AttendanceIntelligenceService.DEFAULT_CRITERIA[strategy]
+        return DynamicAttendanceConfig(
+            event_id=event_data.get("event_id", ""),
+            event_type=str(event_data.get("event_type") or ""),
+            event_name=str(event_data.get("event_name") or ""),
+            strategy=strategy,
+            criteria=AttendanceCriteria(
+                strategy=strategy,
+                minimum_percentage=defaults.get("minimum_percentage"),
+                required_sessions=defaults.get("required_sessions"),
+                required_milestones=defaults.get("required_milestones"),
+            ),
+        )
+
+    def _configured(
+        self, event_data: Dict[str, Any]
+    ) -> Optional[Tuple[AttendanceStrategy, Dict[str, Any], List[Dict[str, Any]], bool]]:
+        """(strategy, criteria, sessions, auto_generated) recorded on the event, or None to detect them"""
+        if event_data.get("attendance_mandatory") is False:
+            # Attendance is not tracked; registrations still get the plain single-mark record
+            return AttendanceStrategy.SINGLE_MARK, {}, [], False
+
+        chosen = event_data.get("attendance_strategy")
+        if isinstance(chosen, dict):
+            # Admin override from the event form: {"strategy", "criteria", "sessions", "minimum_percentage", ...}
+            strategy = _strategy_value(chosen.get("strategy") or chosen.get("strategy_type"))
+            if strategy is None:
+                return None
+            criteria = dict(chosen.get("criteria") or {})
+            if chosen.get("minimum_percentage") is not None:
+                criteria.setdefault("minimum_percentage", chosen["minimum_percentage"])
+            return strategy, criteria, chosen.get("sessions") or [], False
+
+        strategy = _strategy_value(chosen) if isinstance(chosen, str) else None
+        if strategy is None:
+            return None
+        return (
+            strategy,
+            event_data.get("attendance_criteria") or {},
+            event_data.get("attendance_sessions") or [],
+            event_data.get("attendance_auto_generated", True),
+        )
+
+    def build_config(self, event_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Config document for `event_data`, ready to be stored on the event"""
+        configured = self._configured(event_data)
+        if configured is None:
+            config = self._detect(event_data)
+            strategy = config.strategy
+            document = config.model_dump()
+        else:
+            strategy, criteria, sessions, auto_generated = configured
+            defaults = AttendanceIntelligenceService.DEFAULT_CRITERIA[strategy]
+            now = datetime.utcnow()
+            document = {
+                "event_id": event_data.get("event_id", ""),
+                "event_type": str(event_data.get("event_type") or ""),
+                "event_name": str(event_data.get("event_name") or ""),
+                "criteria": {
+                    field: criteria[field] if field in criteria else defaults.get(field)
+                    for field in ("minimum_percentage", "required_sessions", "required_milestones")
+                },
+                "sessions": [dict(session) for session in sessions if isinstance(session, dict)],
+                "auto_generated": bool(auto_generated),
+                "created_at": now,
+                "updated_at": now,
+            }
+            document["criteria"]["auto_calculate"] = criteria.get("auto_calculate", True)
+
+        document["strategy"] = strategy.value
+        document["criteria"]["strategy"] = strategy.value
+        document.update({
+            "attendance_skeleton": build_attendance_skeleton(strategy.value, event_data),
+            "version": ATTENDANCE_CONFIG_VERSION,
+            "source_hash": config_input_hash(event_data),
+        })
+        return document
+
+    def is_current(self, event_data: Dict[str, Any]) -> bool:
+        """Whether the config stored on `event_data` still matches the event"""
+        stored = event_data.get(CONFIG_FIELD)
+        return (
+            isinstance(stored, dict)
+            and stored.get("version") == ATTENDANCE_CONFIG_VERSION
+            and stored.get("source_hash") == config_input_hash(event_data)
+        )
+
+    async def get_config(self, event_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Attendance config of an event document: the stored copy when it is
+        current, otherwise a rebuilt one that is also written back to the event.
+        """
+        if self.is_current(event_data):
+            return event_data[CONFIG_FIELD]
+
+        event_id = event_data.get("event_id")
+        cache_key = (event_id, config_input_hash(event_data))
+        found, config = self._built.get(cache_key)
+        if found:
+            return config
+
+        config = self.build_config(event_data)
+        self._built.set(cache_key, config)
+        if event_id:
+            try:
+                await DatabaseOperations.update_one(
+                    self.events_collection,
+                    {"event_id": event_id},
+                    {"$set": {CONFIG_FIELD: config}}
+                )
+            except Exception as e:
+                logger.warning(f"Could not store attendance config for event {event_id}: {e}")
+        return config
+
+    async def get_strategy(self, event_data: Dict[str, Any]) -> str:
+        """Attendance strategy value of an event, e.g. "single_mark" """
+        return (await self.get_config(event_data))["strategy"]
+
+    async def new_attendance_record(self, event_data: Dict[str, Any]) -> Dict[str, Any]:
+        """A fresh copy of the attendance skeleton for one new registration"""
+        return copy.deepcopy((await self.get_config(event_data))["attendance_skeleton"])
+
+
+# Create singleton instance
+attendance_config_service = AttendanceConfigService()
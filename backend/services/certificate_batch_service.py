@@ -0,0 +1,399 @@
+"""
+Certificate Batch Service
+Renders one certificate type for every eligible participant of an event into a
+single ZIP (or one merged PDF) as a "batch" job on the durable PDF job queue,
+reporting progress through the job status.
+
+Placeholder filling and eligibility mirror the frontend certificateService so
+batch output matches what participants download themselves.
+"""
+import asyncio
+import re
+import shutil
+import time
+import zipfile
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import pytz
+
+from database.operations import DatabaseOperations
+from services.pdf_generation_service import pdf_service, PDF_TEMP_DIR, PDF_WORKER_CONCURRENCY
+from services.pdf_job_queue import pdf_job_queue, PDFJobQueue
+from core.logger import get_logger
+
+try:
+    from pypdf import PdfWriter
+    PYPDF_AVAILABLE = True
+except ImportError:
+    PYPDF_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+BATCH_FORMATS = ("zip", "pdf")
+
+# Placeholder syntaxes, most specific first (same order as the frontend)
+PLACEHOLDER_PATTERNS = [
+    re.compile(r"\{\{([^}]+)\}\}"),  # {{PLACEHOLDER}}
+    re.compile(r"\{([^}]+)\}"),      # {PLACEHOLDER}
+    re.compile(r"\[([^\]]+)\]"),     # [PLACEHOLDER]
+    re.compile(r"\(([^)]+)\)"),      # (PLACEHOLDER)
+]
+PARTICIPATION_KEYWORDS = ("participation", "attendee", "attended", "participant")
+
+# Job errors kept per batch (the rest are only counted)
+MAX_REPORTED_ERRORS = 50
+
+# How often a running batch writes its progress (and renews its lease)
+PROGRESS_REPORT_SECONDS = 2
+
+
+def _format_date(value: Any) -> str:
+    """Format like the frontend's toLocaleDateString('en-IN', {day, month: 'long', year})"""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return ""
+    if not isinstance(value, datetime):
+        return ""
+    return f"{value.day} {value.strftime('%B %Y')}"
+
+
+def _safe_name(value: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9]", "_", value or "")
+
+
+def fill_template(html_content: str, user_data: Dict[str, str]) -> str:
+    """Replace every supported placeholder syntax, leaving unknown placeholders untouched"""
+    def replace(match: re.Match) -> str:
+        key = re.sub(r"[_\s-]+", "_", match.group(1).strip().lower())
+        clean_key = re.sub(r"[^a-z0-9_]", "", key)
+        for candidate in (key, clean_key):
+            value = user_data.get(candidate)
+            if value not in (None, ""):
+                return str(value).strip()
+        return match.group(0)
+
+    for pattern in PLACEHOLDER_PATTERNS:
+        html_content = pattern.sub(replace, html_content)
+    return html_content
+
+
+def clean_html_for_render(html_content: str) -> str:
+    """Same clean-up the frontend applies before server-side rendering"""
+    html_content = re.sub(r"<br\s*/?>", " ", html_content, flags=re.IGNORECASE)
+    return re.sub(r"oklch\([^)]+\)", "rgb(0, 0, 0)", html_content, flags=re.IGNORECASE)
+
+
+def prepare_user_data(participant_entry: Dict[str, Any], event: Dict[str, Any], issue_date: datetime) -> Dict[str, str]:
+    """Build every placeholder key variation for one participant"""
+    participant = participant_entry.get("student") or participant_entry.get("faculty") or {}
+    full_name = participant.get("name") or "Participant"
+    phone = participant.get("phone") or participant.get("contact_no") or ""
+
+    user_data = {key: full_name for key in (
+        "name", "full_name", "fullname", "participant_name", "participantname", "participant",
+        "student_name", "studentname", "faculty_name", "facultyname"
+    )}
+
+    team_name = participant_entry.get("team_name")
+    if team_name:
+        user_data.update({"team_name": team_name, "teamname": team_name, "team": team_name})
+
+    user_data.update({
+        "email": participant.get("email") or "",
+        "phone": phone, "contact": phone, "mobile": phone,
+        "department": participant.get("department") or "",
+        "dept": participant.get("department") or "",
+    })
+
+    if participant_entry.get("student"):
+        enrollment_no = participant.get("enrollment_no") or ""
+        for key in ("enrollment", "enrollment_no", "enrollmentno", "enrollment_number", "roll_no", "rollno"):
+            user_data[key] = enrollment_no
+        user_data.update({
+            "year": participant.get("year") or "",
+            "semester": participant.get("semester") or "",
+            "sem": participant.get("semester") or "",
+        })
+
+    if participant_entry.get("faculty"):
+        user_data.update({
+            "employee_id": participant.get("employee_id") or "",
+            "employeeid": participant.get("employee_id") or "",
+            "designation": participant.get("designation") or "",
+        })
+
+    event_name = event.get("event_name") or ""
+    event_type = event.get("event_type") or ""
+    event_date = _format_date(event.get("start_datetime") or event.get("start_date"))
+    issue = _format_date(issue_date)
+    user_data.update({
+        "event_name": event_name, "eventname": event_name, "event": event_name,
+        "event_type": event_type, "eventtype": event_type,
+        "date": event_date, "event_date": event_date, "eventdate": event_date,
+        "issue_date": issue, "issuedate": issue, "certificate_date": issue, "certificatedate": issue,
+    })
+
+    registration_id = participant_entry.get("registration_id") or ""
+    user_data.update({"registration_id": registration_id, "registrationid": registration_id, "reg_id": registration_id})
+    return user_data
+
+
+class CertificateBatchService:
+    """Batch certificate rendering for a whole event"""
+
+    def __init__(self, concurrency: int = PDF_WORKER_CONCURRENCY):
+        self.concurrency = max(concurrency, 1)
+
+    async def get_recipients(self, event: Dict[str, Any], certificate_type: str) -> List[Dict[str, Any]]:
+        """
+        Participants that should receive `certificate_type`.
+
+        Special types go to the registrations assigned to them; participation-style
+        types go to everyone without another special assignment. Attendance must meet the
+        event's minimum percentage either way.
+        """
+        event_id = event["event_id"]
+        assignments = event.get("special_certificate_assignments") or {}
+        assigned_ids = set(assignments.get(certificate_type) or [])
+        specially_assigned = {rid for ids in assignments.values() for rid in (ids or [])}
+        # Participants without a special assignment get the participation template,
+        # or the first template when none is named like one (as on the frontend)
+        template_types = list((event.get("certificate_templates") or {}).keys())
+        default_type = next(
+            (t for t in template_types if any(keyword in t.lower() for keyword in PARTICIPATION_KEYWORDS)),
+            template_types[0] if template_types else None
+        )
+        is_special = certificate_type != default_type
+        minimum_percentage = self._minimum_percentage(event)
+
+        projection = {
+            "registration_id": 1, "registration_type": 1, "team.team_name": 1,
+            "student": 1, "faculty": 1, "attendance": 1, "team_members": 1,
+        }
+        student_regs, faculty_regs = await asyncio.gather(
+            DatabaseOperations.find_many("student_registrations", {"event.event_id": event_id}, projection),
+            DatabaseOperations.find_many("faculty_registrations", {"event.event_id": event_id}, projection),
+        )
+
+        recipients = []
+        for entry in self._participant_entries(student_regs + faculty_regs):
+            identifiers = {entry.get("registration_id"), entry.get("enrollment_no")} - {None, ""}
+            if is_special:
+                if not identifiers & assigned_ids:
+                    continue
+            elif identifiers & specially_assigned and not identifiers & assigned_ids:
+                continue
+
+            percentage = (entry.get("attendance") or {}).get("percentage") or 0
+            if percentage >= minimum_percentage:
+                recipients.append(entry)
+        return recipients
+
+    def _participant_entries(self, registrations: List[Dict[str, Any]]):
+        """Flatten individual and team registrations into one entry per participant"""
+        for registration in registrations:
+            if registration.get("registration_type") == "team" and registration.get("team_members"):
+                team_name = (registration.get("team") or {}).get("team_name") or "Team"
+                for member in registration["team_members"]:
+                    yield {
+                        "registration_id": member.get("registration_id"),
+                        "enrollment_no": (member.get("student") or {}).get("enrollment_no"),
+                        "student": member.get("student"),
+                        "attendance": member.get("attendance"),
+                        "team_name": team_name,
+                    }
+            else:
+                yield {
+                    "registration_id": registration.get("registration_id"),
+                    "enrollment_no": (registration.get("student") or {}).get("enrollment_no"),
+                    "student": registration.get("student"),
+                    "faculty": registration.get("faculty"),
+                    "attendance": registration.get("attendance"),
+                }
+
+    def _minimum_percentage(self, event: Dict[str, Any]) -> float:
+        strategy = event.get("attendance_strategy") or {}
+        return (
+            (strategy.get("criteria") or {}).get("minimum_percentage")
+            or strategy.get("minimum_percentage")
+            or event.get("minimum_percentage")
+            or 75
+        )
+
+    async def _fetch_template(self, template_url: str) -> str:
+        import aiohttp
+        async with aiohttp.ClientSession() as session:
+            async with session.get(template_url) as response:
+                if response.status != 200:
+                    raise Exception(f"Failed to fetch template: {response.status}")
+                content = (await response.read()).decode("utf-8")
+        if not content.strip():
+            raise Exception("Empty template received")
+        return content
+
+    async def _load_batch(self, event_id: str, certificate_type: str) -> Tuple[Dict[str, Any], str, List[Dict[str, Any]]]:
+        """Event, template URL and recipients for a batch; raises LookupError/ValueError when it cannot run"""
+        event = await DatabaseOperations.find_one("events", {"event_id": event_id})
+        if not event:
+            raise LookupError("Event not found")
+
+        template_url = (event.get("certificate_templates") or {}).get(certificate_type)
+        if not template_url:
+            raise ValueError(f"Certificate type '{certificate_type}' not found in event templates")
+
+        recipients = await self.get_recipients(event, certificate_type)
+        if not recipients:
+            raise ValueError("No eligible participants for this certificate")
+        return event, template_url, recipients
+
+    async def start_batch(self, event_id: str, certificate_type: str, output_format: str = "zip", requested_by: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Validate the request and queue a batch job for any PDF worker to pick up.
+
+        Returns:
+            {"success": bool, "message": str, "job_id": str, "total": int}
+        """
+        if output_format not in BATCH_FORMATS:
+            return {"success": False, "message": f"Unsupported format '{output_format}', use one of {BATCH_FORMATS}"}
+        if output_format == "pdf" and not PYPDF_AVAILABLE:
+            return {"success": False, "message": "Merged PDF output requires pypdf, run 'pip install pypdf'"}
+
+        try:
+            _, _, recipients = await self._load_batch(event_id, certificate_type)
+        except (LookupError, ValueError) as e:
+            return {"success": False, "message": str(e)}
+
+        job_id = await pdf_job_queue.enqueue(
+            "batch",
+            {"event_id": event_id, "certificate_type": certificate_type, "format": output_format},
+            event_id=event_id,
+            certificate_type=certificate_type,
+            format=output_format,
+            requested_by=requested_by,
+            total=len(recipients),
+            completed=0,
+            failed=0,
+            errors=[]
+        )
+        return {"success": True, "message": "Batch certificate generation started", "job_id": job_id, "total": len(recipients)}
+
+    async def run_batch(self, job: Dict[str, Any], queue: PDFJobQueue) -> Tuple[str, str]:
+        """
+        Queue handler: render every recipient with bounded parallelism into one archive.
+
+        Returns:
+            (download filename, local path of the ZIP/merged PDF)
+        """
+        job_id = job["_id"]
+        payload = job["payload"]
+        output_format = payload["format"]
+        certificate_type = payload["certificate_type"]
+        work_dir = PDF_TEMP_DIR / f"{job_id}_batch"
+
+        # Recipients are resolved again here - the job may run on another instance, later
+        event, template_url, recipients = await self._load_batch(payload["event_id"], certificate_type)
+        template = await self._fetch_template(template_url)
+        issue_date = datetime.now(pytz.timezone('Asia/Kolkata')).replace(tzinfo=None)
+        base_name = f"{_safe_name(certificate_type)}_{_safe_name(event.get('event_name', ''))}"
+
+        progress = {"total": len(recipients), "completed": 0, "failed": 0, "errors": []}
+        await queue.report_progress(job_id, **progress)
+        last_report = time.monotonic()
+
+        async def report(force: bool = False):
+            nonlocal last_report
+            if force or time.monotonic() - last_report >= PROGRESS_REPORT_SECONDS:
+                last_report = time.monotonic()
+                await queue.report_progress(job_id, **progress)
+
+        work_queue: asyncio.Queue = asyncio.Queue()
+        for index, recipient in enumerate(recipients):
+            work_queue.put_nowait((index, recipient))
+
+        rendered: List[Tuple[int, str]] = []
+        used_names = set()
+        archive = None
+        if output_format == "zip":
+            filename = f"{base_name}.zip"
+            file_path = PDF_TEMP_DIR / f"{job_id}_{filename}"
+            # PDFs are already compressed - store them as-is
+            archive = zipfile.ZipFile(file_path, "w", compression=zipfile.ZIP_STORED)
+        else:
+            filename = f"{base_name}.pdf"
+            file_path = PDF_TEMP_DIR / f"{job_id}_{filename}"
+            work_dir.mkdir(exist_ok=True)
+
+        async def worker():
+            while True:
+                try:
+                    index, recipient = work_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                participant = recipient.get("student") or recipient.get("faculty") or {}
+                try:
+                    html = clean_html_for_render(
+                        fill_template(template, prepare_user_data(recipient, event, issue_date))
+                    )
+                    pdf_bytes = await pdf_service.generate_pdf_bytes(html)
+
+                    name = f"{base_name}_{_safe_name(participant.get('name') or 'Participant')}"
+                    if name in used_names:
+                        name = f"{name}_{_safe_name(recipient.get('registration_id') or str(index))}"
+                    used_names.add(name)
+
+                    if archive is not None:
+                        archive.writestr(f"{name}.pdf", pdf_bytes)
+                    else:
+                        part_path = work_dir / f"{index:06d}.pdf"
+                        part_path.write_bytes(pdf_bytes)
+                        rendered.append((index, str(part_path)))
+                    progress["completed"] += 1
+                except Exception as e:
+                    progress["failed"] += 1
+                    if len(progress["errors"]) < MAX_REPORTED_ERRORS:
+                        progress["errors"].append({"registration_id": recipient.get("registration_id"), "error": str(e)})
+                    logger.warning(f"Batch {job_id}: certificate for {recipient.get('registration_id')} failed: {e}")
+                await report()
+
+        try:
+            try:
+                await asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(recipients)))))
+            finally:
+                if archive is not None:
+                    archive.close()
+            await report(force=True)
+
+            if progress["completed"] == 0:
+                raise Exception("No certificates could be rendered")
+
+            if output_format == "pdf":
+                # Merge in recipient order, off the event loop
+                rendered.sort()
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self._merge_pdfs, [path for _, path in rendered], str(file_path)
+                )
+        except Exception:
+            file_path.unlink(missing_ok=True)
+            raise
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        logger.info(f"✅ Batch {job_id}: {progress['completed']}/{progress['total']} certificates -> {filename}")
+        return filename, str(file_path)
+
+    @staticmethod
+    def _merge_pdfs(paths: List[str], output_path: str):
+        writer = PdfWriter()
+        for path in paths:
+            writer.append(path)
+        with open(output_path, "wb") as f:
+            writer.write(f)
+        writer.close()
+
+
+# Singleton instance
+certificate_batch_service = CertificateBatchService()
+pdf_job_queue.register_handler("batch", certificate_batch_service.run_batch)
@@ -13,6 +13,7 @@ from pathlib import Path
 from database.operations import DatabaseOperations
 from services.supabase_storage_service import SupabaseStorageService
 from models.certificate_template import CertificateTemplate
+from utils.two_tier_cache import two_tier_cached
 
 logger = logging.getLogger(__name__)
 
@@ -24,8 +25,16 @@ class CertificateTemplateService:
         self.storage_service = SupabaseStorageService()
         self.collection_name = "certificate_templates"
     
+    @two_tier_cached(
+        "certificate_templates",
+        key=lambda self: "all",
+        encode=lambda templates: [template.model_dump(mode="json") for template in templates],
+        decode=lambda templates: [CertificateTemplate.model_validate(template) for template in templates],
+        # An empty list is also what a failed read returns, so it is never cached
+        cache_if=bool,
+    )
     async def get_all_templates(self) -> List[CertificateTemplate]:
-        """Get all certificate templates from database"""
+        """Get all certificate templates from database (cached until a template is created or deleted)"""
         try:
             templates_data = await self.db_ops.find_many(
                 self.collection_name, 
@@ -152,6 +161,7 @@ class CertificateTemplateService:
                 template.dict()
             )
             
+            await self.get_all_templates.invalidate()
             logger.info(f"Created certificate template: {template_id}")
             return template
             
@@ -193,6 +203,7 @@ class CertificateTemplateService:
                 )
             
             if result:
+                await self.get_all_templates.invalidate()
                 logger.info(f"Deleted certificate template: {template_id}")
                 return True
             
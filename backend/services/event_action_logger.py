@@ -4,7 +4,7 @@ Unified logging service for all event-related actions including both audit logs
 Handles manual actions (created_by, updated_by, cancelled_by) and automatic scheduler changes.
 """
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 import pytz
 
@@ -492,24 +492,10 @@ class EventActionLogger:
     ):
         """Log automatic status changes (from scheduler) with enhanced tracking"""
         try:
-            # Enhanced status log entry
-            status_log_entry = {
-                "event_id": event_id,
-                "action_type": "status_changed",
-                "old_status": old_status,
-                "new_status": new_status,
-                "trigger_type": trigger_type or "automatic_scheduler",
-                "performed_by": performed_by or "system_scheduler",
-                "performed_by_role": performed_by_role or "system",
-                "timestamp": datetime.now(pytz.timezone('Asia/Kolkata')).replace(tzinfo=None),
-                "scheduler_version": "dynamic_v1" if trigger_source == "scheduler" else "manual_v1",
-                "metadata": {
-                    "event_name": event_name,
-                    "trigger_source": trigger_source,
-                    "action_source": "automatic_scheduler" if trigger_source == "scheduler" else "manual_action",
-                    **(metadata or {})
-                }
-            }
+            status_log_entry = self._status_change_entry(
+                event_id, event_name, old_status, new_status, trigger_source,
+                performed_by, performed_by_role, trigger_type, metadata
+            )
             
             await DatabaseOperations.insert_one(self.status_logs_collection, status_log_entry)
             
@@ -518,6 +504,47 @@ class EventActionLogger:
         except Exception as e:
             logger.error(f"❌ Failed to log status change for {event_id}: {str(e)}")
     
+    async def log_status_changes(self, changes: List[Dict[str, Any]]):
+        """Log several status changes in one insert; each change takes the arguments of log_status_change"""
+        try:
+            entries = [self._status_change_entry(**change) for change in changes]
+            if entries:
+                await DatabaseOperations.insert_many(self.status_logs_collection, entries)
+                logger.info(f"✅ {len(entries)} status changes logged")
+        except Exception as e:
+            logger.error(f"❌ Failed to log {len(changes)} status changes: {str(e)}")
+    
+    def _status_change_entry(
+        self,
+        event_id: str,
+        event_name: str,
+        old_status: str,
+        new_status: str,
+        trigger_source: str = "scheduler",
+        performed_by: Optional[str] = None,
+        performed_by_role: Optional[str] = None,
+        trigger_type: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Enhanced status log entry"""
+        return {
+            "event_id": event_id,
+            "action_type": "status_changed",
+            "old_status": old_status,
+            "new_status": new_status,
+            "trigger_type": trigger_type or "automatic_scheduler",
+            "performed_by": performed_by or "system_scheduler",
+            "performed_by_role": performed_by_role or "system",
+            "timestamp": datetime.now(pytz.timezone('Asia/Kolkata')).replace(tzinfo=None),
+            "scheduler_version": "dynamic_v1" if trigger_source == "scheduler" else "manual_v1",
+            "metadata": {
+                "event_name": event_name,
+                "trigger_source": trigger_source,
+                "action_source": "automatic_scheduler" if trigger_source == "scheduler" else "manual_action",
+                **(metadata or {})
+            }
+        }
+    
     def _identify_significant_changes(self, updated_fields: list) -> list:
         """Identify which updated fields are considered significant"""
         significant_fields = [
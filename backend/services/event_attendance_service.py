@@ -9,14 +9,26 @@ COLLECTION: student_registrations (updates existing documents only)
 REQUIREMENT: Student must be registered first (registration document must exist)
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 import pytz
+from pymongo import UpdateOne
 from database.operations import DatabaseOperations
+from utils.statistics import StatisticsManager
+from utils.tagged_cache import invalidate_student_dashboards, invalidate_student_dashboards_for_events
+from services.attendance_config_service import attendance_config_service
 from core.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Human-readable strategy names used in rejection messages
+ATTENDANCE_STRATEGY_LABELS = {
+    "single_mark": "single mark",
+    "day_based": "day-based",
+    "session_based": "session-based",
+    "milestone_based": "milestone-based"
+}
+
 class EventAttendanceService:
     """
     Professional service for event attendance operations.
@@ -41,42 +53,21 @@ class EventAttendanceService:
         try:
             logger.info(f"Single attendance marking: {enrollment_no} -> {event_id}")
             
-            # Find existing registration
-            registration = await self._get_registration(enrollment_no, event_id)
+            registration = await self._apply_mark(enrollment_no, event_id, "single_mark", {}, marked_by, marking_method)
             if not registration:
-                return {"success": False, "message": "Student not registered for this event"}
-            
-            # Verify attendance strategy
-            if registration["attendance"]["strategy"] != "single_mark":
-                return {"success": False, "message": "Event does not use single mark attendance"}
-            
-            # Check if already marked
-            if registration["attendance"]["marked"]:
-                return {"success": False, "message": "Attendance already marked"}
-            
-            # Update attendance
-            attendance_update = {
-                "attendance.marked": True,
-                "attendance.marked_at": datetime.now(pytz.timezone('Asia/Kolkata')).replace(tzinfo=None),
-                "attendance.status": "present",
-                "attendance.percentage": 100.0,
-                "attendance.last_updated": datetime.now(pytz.timezone('Asia/Kolkata')).replace(tzinfo=None),
-                "attendance.marked_by": marked_by,
-                "attendance.marking_method": marking_method
-            }
-            
-            await self._update_registration_attendance(enrollment_no, event_id, attendance_update)
+                return await self._explain_rejected_mark(enrollment_no, event_id, "single_mark", {})
             
             logger.info(f"Single attendance marked: {enrollment_no} -> {event_id}")
             
+            attendance = registration["attendance"]
             return {
                 "success": True,
                 "message": "Single attendance marked successfully",
                 "attendance_data": {
                     "strategy": "single_mark",
-                    "status": "present",
-                    "percentage": 100.0,
-                    "marked_at": datetime.now(pytz.timezone('Asia/Kolkata')).replace(tzinfo=None).isoformat()
+                    "status": attendance.get("status"),
+                    "percentage": attendance.get("percentage"),
+                    "marked_at": attendance["marked_at"].isoformat()
                 }
             }
             
@@ -99,54 +90,17 @@ class EventAttendanceService:
         try:
             logger.info(f"Day attendance marking: {enrollment_no} -> {event_id} -> Day {day_number}")
             
-            # Find existing registration
-            registration = await self._get_registration(enrollment_no, event_id)
+            target = {"day": day_number}
+            registration = await self._apply_mark(enrollment_no, event_id, "day_based", target, marked_by, marking_method)
             if not registration:
-                return {"success": False, "message": "Student not registered for this event"}
-            
-            # Verify attendance strategy
-            if registration["attendance"]["strategy"] != "day_based":
-                return {"success": False, "message": "Event does not use day-based attendance"}
-            
-            # Check if day exists in structure
-            days = registration["attendance"].get("days", [])
-            target_day = next((d for d in days if d["day"] == day_number), None)
-            
-            if not target_day:
-                return {"success": False, "message": f"Day {day_number} not found in event structure"}
-            
-            # Check if day already marked
-            if target_day["marked"]:
-                return {"success": False, "message": f"Day {day_number} attendance already marked"}
-            
-            # Update the specific day
-            await DatabaseOperations.update_one(
-                self.collection,
-                {
-                    "student.enrollment_no": enrollment_no,
-                    "event.event_id": event_id,
-                    "attendance.days.day": day_number
-                },
-                {
-                    "$set": {
-                        "attendance.days.$.marked": True,
-                        "attendance.days.$.marked_at": datetime.now(pytz.timezone('Asia/Kolkata')).replace(tzinfo=None),
-                        "attendance.last_updated": datetime.now(pytz.timezone('Asia/Kolkata')).replace(tzinfo=None),
-                        "attendance.marked_by": marked_by,
-                        "attendance.marking_method": marking_method
-                    }
-                }
-            )
-            
-            # Recalculate overall attendance percentage
-            await self._recalculate_day_based_attendance(enrollment_no, event_id)
+                return await self._explain_rejected_mark(enrollment_no, event_id, "day_based", target)
             
             logger.info(f"Day attendance marked: {enrollment_no} -> {event_id} -> Day {day_number}")
             
             return {
                 "success": True,
                 "message": f"Day {day_number} attendance marked successfully",
-                "attendance_data": await self._get_attendance_summary(enrollment_no, event_id)
+                "attendance_data": self._summarize_attendance(registration)
             }
             
         except Exception as e:
@@ -169,57 +123,17 @@ class EventAttendanceService:
         try:
             logger.info(f"Session attendance marking: {enrollment_no} -> {event_id} -> {session_id}")
             
-            # Find existing registration
-            registration = await self._get_registration(enrollment_no, event_id)
+            target = {"session_id": session_id, "session_name": session_name}
+            registration = await self._apply_mark(enrollment_no, event_id, "session_based", target, marked_by, marking_method)
             if not registration:
-                return {"success": False, "message": "Student not registered for this event"}
-            
-            # Verify attendance strategy
-            if registration["attendance"]["strategy"] != "session_based":
-                return {"success": False, "message": "Event does not use session-based attendance"}
-            
-            # Check if session already marked
-            sessions = registration["attendance"].get("sessions", [])
-            existing_session = next((s for s in sessions if s.get("session_id") == session_id), None)
-            
-            if existing_session:
-                return {"success": False, "message": f"Session {session_name} attendance already marked"}
-            
-            # Add new session attendance
-            session_data = {
-                "session_id": session_id,
-                "session_name": session_name,
-                "marked": True,
-                "marked_at": datetime.now(pytz.timezone('Asia/Kolkata')).replace(tzinfo=None),
-                "marked_by": marked_by,
-                "marking_method": marking_method
-            }
-            
-            await DatabaseOperations.update_one(
-                self.collection,
-                {
-                    "student.enrollment_no": enrollment_no,
-                    "event.event_id": event_id
-                },
-                {
-                    "$push": {"attendance.sessions": session_data},
-                    "$set": {
-                        "attendance.last_updated": datetime.now(pytz.timezone('Asia/Kolkata')).replace(tzinfo=None),
-                        "attendance.marked_by": marked_by,
-                        "attendance.marking_method": marking_method
-                    }
-                }
-            )
-            
-            # Recalculate overall attendance
-            await self._recalculate_session_based_attendance(enrollment_no, event_id)
+                return await self._explain_rejected_mark(enrollment_no, event_id, "session_based", target)
             
             logger.info(f"Session attendance marked: {enrollment_no} -> {event_id} -> {session_id}")
             
             return {
                 "success": True,
                 "message": f"Session {session_name} attendance marked successfully",
-                "attendance_data": await self._get_attendance_summary(enrollment_no, event_id)
+                "attendance_data": self._summarize_attendance(registration)
             }
             
         except Exception as e:
@@ -242,62 +156,168 @@ class EventAttendanceService:
         try:
             logger.info(f"Milestone attendance marking: {enrollment_no} -> {event_id} -> {milestone_id}")
             
-            # Find existing registration
-            registration = await self._get_registration(enrollment_no, event_id)
+            target = {"milestone_id": milestone_id, "milestone_name": milestone_name}
+            registration = await self._apply_mark(enrollment_no, event_id, "milestone_based", target, marked_by, marking_method)
             if not registration:
-                return {"success": False, "message": "Student not registered for this event"}
-            
-            # Verify attendance strategy
-            if registration["attendance"]["strategy"] != "milestone_based":
-                return {"success": False, "message": "Event does not use milestone-based attendance"}
+                return await self._explain_rejected_mark(enrollment_no, event_id, "milestone_based", target)
             
-            # Check if milestone already marked
-            milestones = registration["attendance"].get("milestones", [])
-            existing_milestone = next((m for m in milestones if m.get("milestone_id") == milestone_id), None)
-            
-            if existing_milestone:
-                return {"success": False, "message": f"Milestone {milestone_name} already completed"}
+            logger.info(f"Milestone attendance marked: {enrollment_no} -> {event_id} -> {milestone_id}")
             
-            # Add new milestone completion
-            milestone_data = {
-                "milestone_id": milestone_id,
-                "milestone_name": milestone_name,
-                "completed": True,
-                "completed_at": datetime.now(pytz.timezone('Asia/Kolkata')).replace(tzinfo=None),
-                "marked_by": marked_by,
-                "marking_method": marking_method
+            return {
+                "success": True,
+                "message": f"Milestone {milestone_name} completed successfully",
+                "attendance_data": self._summarize_attendance(registration)
             }
             
-            await DatabaseOperations.update_one(
+        except Exception as e:
+            logger.error(f"Milestone attendance marking error: {e}")
+            return {"success": False, "message": f"Milestone marking failed: {str(e)}"}
+    
+    async def bulk_mark_attendance(
+        self,
+        event_id: str,
+        attendance_items: List[Dict[str, Any]],
+        marked_by: str,
+        marking_method: str = "bulk",
+        default_target: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Mark attendance for many students in one pass, for any strategy.
+        
+        Registrations are resolved with a single $in query, every valid row becomes a
+        conditional UpdateOne (same filter/pipeline as the single-mark paths) and all of
+        them are applied with one unordered bulk_write.
+        
+        Args:
+            event_id: Event being marked
+            attendance_items: Rows with enrollment_no plus the target for the event's strategy
+                (day/day_number, session_id/session_name or milestone_id/milestone_name)
+            marked_by: Who is marking
+            marking_method: Marking method recorded on each registration
+            default_target: Target fields applied to rows that do not carry their own
+            
+        Returns:
+            Per-row results in request order plus a summary
+        """
+        try:
+            default_target = default_target or {}
+            results: List[Dict[str, Any]] = [None] * len(attendance_items)
+            rows = []
+            for index, item in enumerate(attendance_items):
+                enrollment_no = (item or {}).get("enrollment_no")
+                if not enrollment_no:
+                    results[index] = {"success": False, "enrollment_no": None, "message": "enrollment_no required"}
+                else:
+                    rows.append((index, enrollment_no, {**default_target, **item}))
+            
+            logger.info(f"Bulk attendance marking: {len(rows)} rows -> {event_id}")
+            
+            # One round trip to resolve every registration
+            registrations = await DatabaseOperations.find_many(
                 self.collection,
                 {
-                    "student.enrollment_no": enrollment_no,
-                    "event.event_id": event_id
+                    "event.event_id": event_id,
+                    "student.enrollment_no": {"$in": list({enrollment_no for _, enrollment_no, _ in rows})}
                 },
-                {
-                    "$push": {"attendance.milestones": milestone_data},
-                    "$set": {
-                        "attendance.last_updated": datetime.now(pytz.timezone('Asia/Kolkata')).replace(tzinfo=None),
-                        "attendance.marked_by": marked_by,
-                        "attendance.marking_method": marking_method
-                    }
-                }
+                {"student.enrollment_no": 1, "attendance": 1}
             )
+            by_enrollment = {reg["student"]["enrollment_no"]: reg for reg in registrations}
+            
+            now = datetime.now(pytz.timezone('Asia/Kolkata')).replace(tzinfo=None)
+            operations = []
+            pending = []
+            seen = set()
+            for index, enrollment_no, item in rows:
+                registration = by_enrollment.get(enrollment_no)
+                strategy = (registration or {}).get("attendance", {}).get("strategy")
+                try:
+                    target = self._extract_mark_target(strategy, item)
+                except ValueError as e:
+                    results[index] = {"success": False, "enrollment_no": enrollment_no, "message": str(e)}
+                    continue
+                
+                if registration and target is None:
+                    message = f"Target required for {strategy} attendance"
+                else:
+                    message = self._mark_rejection_reason(registration, strategy, target or {})
+                
+                dedupe_key = (enrollment_no, tuple(sorted((target or {}).items())))
+                if not message and dedupe_key in seen:
+                    message = "Duplicate entry in request"
+                
+                if message:
+                    results[index] = {"success": False, "enrollment_no": enrollment_no, "message": message}
+                    continue
+                
+                seen.add(dedupe_key)
+                query, update = self._build_mark_operation(enrollment_no, event_id, strategy, target, now, marked_by, marking_method)
+                operations.append(UpdateOne(query, update))
+                pending.append((index, enrollment_no, strategy, target))
+            
+            # One round trip to apply every mark
+            if operations:
+                result = await DatabaseOperations.bulk_write(self.collection, operations, ordered=False)
+                if result is None:
+                    raise Exception("Database unavailable")
+                
+                if result.matched_count < len(operations):
+                    # Some rows lost a race with a concurrent mark - re-check just those registrations
+                    current = await DatabaseOperations.find_many(
+                        self.collection,
+                        {
+                            "event.event_id": event_id,
+                            "student.enrollment_no": {"$in": list({enrollment_no for _, enrollment_no, _, _ in pending})}
+                        },
+                        {"student.enrollment_no": 1, "attendance": 1}
+                    )
+                    current_by_enrollment = {reg["student"]["enrollment_no"]: reg for reg in current}
+                    for index, enrollment_no, strategy, target in pending:
+                        attendance = current_by_enrollment.get(enrollment_no, {}).get("attendance", {})
+                        if not self._is_target_marked_by(attendance, strategy, target, now, marked_by):
+                            results[index] = {
+                                "success": False,
+                                "enrollment_no": enrollment_no,
+                                "message": self._mark_rejection_reason(current_by_enrollment.get(enrollment_no), strategy, target)
+                                or "Attendance could not be marked, please retry"
+                            }
             
-            # Recalculate overall attendance
-            await self._recalculate_milestone_based_attendance(enrollment_no, event_id)
+            successful_marks = [p for p in pending if results[p[0]] is None]
+            if successful_marks:
+                # Registrations stamped with this batch's present_at just reached "present"
+                newly_present = await DatabaseOperations.count_documents(self.collection, {
+                    "event.event_id": event_id,
+                    "student.enrollment_no": {"$in": list({enrollment_no for _, enrollment_no, _, _ in successful_marks})},
+                    "attendance.present_at": now
+                })
+                await StatisticsManager.record_attendance_present(newly_present)
+                await invalidate_student_dashboards(*{enrollment_no for _, enrollment_no, _, _ in successful_marks})
+            
+            for index, enrollment_no, strategy, target in pending:
+                if results[index] is None:
+                    results[index] = {
+                        "success": True,
+                        "enrollment_no": enrollment_no,
+                        "message": "Attendance marked successfully",
+                        "strategy": strategy,
+                        "target": target
+                    }
             
-            logger.info(f"Milestone attendance marked: {enrollment_no} -> {event_id} -> {milestone_id}")
+            successful_count = sum(1 for r in results if r["success"])
+            logger.info(f"Bulk attendance marked: {successful_count}/{len(attendance_items)} -> {event_id}")
             
             return {
                 "success": True,
-                "message": f"Milestone {milestone_name} completed successfully",
-                "attendance_data": await self._get_attendance_summary(enrollment_no, event_id)
+                "results": results,
+                "summary": {
+                    "total_processed": len(attendance_items),
+                    "successful": successful_count,
+                    "failed": len(attendance_items) - successful_count
+                }
             }
             
         except Exception as e:
-            logger.error(f"Milestone attendance marking error: {e}")
-            return {"success": False, "message": f"Milestone marking failed: {str(e)}"}
+            logger.error(f"Bulk attendance marking error: {e}")
+            return {"success": False, "message": f"Bulk attendance marking failed: {str(e)}"}
     
     async def initialize_event_attendance_structure(
         self,
@@ -386,6 +406,7 @@ class EventAttendanceService:
                 updated_count += 1
             
             logger.info(f"Attendance structure initialized for {updated_count} registrations in event {event_id}")
+            await invalidate_student_dashboards_for_events(event_id)
             
             return {
                 "success": True,
@@ -438,105 +459,350 @@ class EventAttendanceService:
         """Get registration document for student and event."""
         return await DatabaseOperations.find_one(
             self.collection,
-            {
-                "student.enrollment_no": enrollment_no,
-                "event.event_id": event_id
-            }
+            self._registration_query(enrollment_no, event_id)
         )
     
-    async def _update_registration_attendance(
-        self,
-        enrollment_no: str,
-        event_id: str,
-        update_data: Dict[str, Any]
-    ) -> None:
-        """Update attendance data in registration document."""
-        await DatabaseOperations.update_one(
-            self.collection,
-            {
-                "student.enrollment_no": enrollment_no,
-                "event.event_id": event_id
-            },
-            {"$set": update_data}
-        )
+    def _registration_query(self, enrollment_no: str, event_id: str) -> Dict[str, Any]:
+        """Filter selecting a student's registration for an event."""
+        return {
+            "student.enrollment_no": enrollment_no,
+            "event.event_id": event_id
+        }
     
-    async def _recalculate_day_based_attendance(
+    def _marking_audit_fields(self, now: datetime, marked_by: str, marking_method: str) -> Dict[str, Any]:
+        """Pipeline $set fields recording who marked attendance and when."""
+        return {
+            "attendance.last_updated": now,
+            "attendance.marked_by": {"$literal": marked_by},
+            "attendance.marking_method": {"$literal": marking_method}
+        }
+    
+    def _mark_entry_expression(
         self,
-        enrollment_no: str,
-        event_id: str
-    ) -> None:
-        """Recalculate overall attendance percentage for day-based strategy."""
-        registration = await self._get_registration(enrollment_no, event_id)
-        if not registration:
-            return
+        array_path: str,
+        key_field: str,
+        key_value: Any,
+        updates: Dict[str, Any],
+        new_entry: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Aggregation expression that merges `updates` into the array entry whose
+        `key_field` equals `key_value`. If `new_entry` is given and no entry
+        matches, it is appended instead.
+        """
+        current = {"$ifNull": [array_path, []]}
+        literal_updates = {field: {"$literal": value} for field, value in updates.items()}
+        marked = {
+            "$map": {
+                "input": current,
+                "as": "entry",
+                "in": {
+                    "$cond": [
+                        {"$eq": [f"$$entry.{key_field}", {"$literal": key_value}]},
+                        {"$mergeObjects": ["$$entry", literal_updates]},
+                        "$$entry"
+                    ]
+                }
+            }
+        }
+        if new_entry is None:
+            return marked
         
-        days = registration["attendance"].get("days", [])
-        total_days = len(days)
-        attended_days = len([d for d in days if d["marked"]])
+        return {
+            "$cond": [
+                {"$in": [{"$literal": key_value}, {"$ifNull": [f"{array_path}.{key_field}", []]}]},
+                marked,
+                {"$concatArrays": [current, [{"$literal": new_entry}]]}
+            ]
+        }
+    
+    def _attendance_rollup_stages(
+        self,
+        array_field: str,
+        flag_field: str,
+        count_field: str,
+        total_field: str
+    ) -> List[Dict[str, Any]]:
+        """
+        Pipeline stages recomputing the attended count, percentage and status
+        server-side (mirrors _calculate_attendance_status).
         
-        percentage = min((attended_days / total_days * 100) if total_days > 0 else 0, 100)
-        status = self._calculate_attendance_status(percentage)
+        Args:
+            array_field: attendance array (days/sessions/milestones)
+            flag_field: entry flag counted as attended (marked/completed)
+            count_field: attendance field receiving the attended count
+            total_field: attendance field holding the planned total, or "$size" to use the array length
+        """
+        entries = f"$attendance.{array_field}"
+        if total_field == "$size":
+            total = {"$size": entries}
+        else:
+            total = {"$ifNull": [f"$attendance.{total_field}", {"$size": entries}]}
+        percentage = "$attendance.percentage"
         
-        await self._update_registration_attendance(
-            enrollment_no, event_id,
-            {
-                "attendance.days_attended": attended_days,
-                "attendance.percentage": percentage,
-                "attendance.status": status
-            }
-        )
+        return [
+            {"$set": {
+                f"attendance.{count_field}": {
+                    "$size": {"$filter": {"input": entries, "as": "entry", "cond": {"$eq": [f"$$entry.{flag_field}", True]}}}
+                }
+            }},
+            {"$set": {
+                "attendance.percentage": {
+                    "$min": [
+                        {"$cond": [
+                            {"$gt": [total, 0]},
+                            {"$multiply": [{"$divide": [f"$attendance.{count_field}", total]}, 100]},
+                            0.0
+                        ]},
+                        100
+                    ]
+                }
+            }},
+            {"$set": {
+                "attendance.status": {
+                    "$switch": {
+                        "branches": [
+                            {"case": {"$gte": [percentage, 75]}, "then": "present"},
+                            {"case": {"$gt": [percentage, 0]}, "then": "partial"}
+                        ],
+                        "default": "absent"
+                    }
+                }
+            }}
+        ]
+    
+    def _present_at_stage(self, now: datetime) -> Dict[str, Any]:
+        """
+        Pipeline stage stamping when attendance first reached "present".
+        A registration whose present_at equals this mark's timestamp just crossed the threshold.
+        """
+        return {"$set": {
+            "attendance.present_at": {"$ifNull": [
+                "$attendance.present_at",
+                {"$cond": [{"$eq": ["$attendance.status", "present"]}, now, None]}
+            ]}
+        }}
     
-    async def _recalculate_session_based_attendance(
+    def _build_mark_operation(
         self,
         enrollment_no: str,
-        event_id: str
-    ) -> None:
-        """Recalculate overall attendance percentage for session-based strategy."""
-        registration = await self._get_registration(enrollment_no, event_id)
-        if not registration:
-            return
+        event_id: str,
+        strategy: str,
+        target: Dict[str, Any],
+        now: datetime,
+        marked_by: str,
+        marking_method: str
+    ) -> Tuple[Dict[str, Any], Any]:
+        """
+        Build the conditional (filter, update) pair that marks one target.
+        
+        The filter encodes the preconditions (right strategy, target not yet marked), so
+        applying it is atomic and idempotent. Day/session/milestone updates are pipelines
+        that also recompute the attended count, percentage and status server-side.
+        """
+        query = {**self._registration_query(enrollment_no, event_id), "attendance.strategy": strategy}
         
-        sessions = registration["attendance"].get("sessions", [])
-        total_sessions = registration["attendance"].get("total_sessions", len(sessions))
-        attended_sessions = len([s for s in sessions if s.get("marked")])
+        if strategy == "single_mark":
+            query["attendance.marked"] = {"$ne": True}
+            return query, {
+                "$set": {
+                    "attendance.marked": True,
+                    "attendance.marked_at": now,
+                    "attendance.status": "present",
+                    "attendance.percentage": 100.0,
+                    "attendance.present_at": now,
+                    "attendance.last_updated": now,
+                    "attendance.marked_by": marked_by,
+                    "attendance.marking_method": marking_method
+                }
+            }
         
-        percentage = min((attended_sessions / total_sessions * 100) if total_sessions > 0 else 0, 100)
-        status = self._calculate_attendance_status(percentage)
+        if strategy == "day_based":
+            day_number = target["day"]
+            query["attendance.days"] = {"$elemMatch": {"day": day_number, "marked": {"$ne": True}}}
+            return query, [
+                {"$set": {
+                    "attendance.days": self._mark_entry_expression(
+                        "$attendance.days", "day", day_number,
+                        {"marked": True, "marked_at": now}
+                    ),
+                    **self._marking_audit_fields(now, marked_by, marking_method)
+                }},
+                *self._attendance_rollup_stages("days", "marked", "days_attended", "$size"),
+                self._present_at_stage(now)
+            ]
         
-        await self._update_registration_attendance(
-            enrollment_no, event_id,
-            {
-                "attendance.sessions_attended": attended_sessions,
-                "attendance.percentage": percentage,
-                "attendance.status": status
+        if strategy == "session_based":
+            session_id = target["session_id"]
+            query["attendance.sessions"] = {"$not": {"$elemMatch": {"session_id": session_id, "marked": True}}}
+            # Session data for sessions not pre-created in the registration's structure
+            session_data = {
+                "session_id": session_id,
+                "session_name": target.get("session_name"),
+                "marked": True,
+                "marked_at": now,
+                "marked_by": marked_by,
+                "marking_method": marking_method
             }
-        )
+            return query, [
+                {"$set": {
+                    "attendance.sessions": self._mark_entry_expression(
+                        "$attendance.sessions", "session_id", session_id,
+                        {"marked": True, "marked_at": now, "marked_by": marked_by, "marking_method": marking_method},
+                        new_entry=session_data
+                    ),
+                    **self._marking_audit_fields(now, marked_by, marking_method)
+                }},
+                *self._attendance_rollup_stages("sessions", "marked", "sessions_attended", "total_sessions"),
+                self._present_at_stage(now)
+            ]
+        
+        if strategy == "milestone_based":
+            milestone_id = target["milestone_id"]
+            query["attendance.milestones"] = {"$not": {"$elemMatch": {"milestone_id": milestone_id, "completed": True}}}
+            # Milestone data for milestones not pre-created in the registration's structure
+            milestone_data = {
+                "milestone_id": milestone_id,
+                "milestone_name": target.get("milestone_name"),
+                "completed": True,
+                "completed_at": now,
+                "marked_by": marked_by,
+                "marking_method": marking_method
+            }
+            return query, [
+                {"$set": {
+                    "attendance.milestones": self._mark_entry_expression(
+                        "$attendance.milestones", "milestone_id", milestone_id,
+                        {"completed": True, "completed_at": now, "marked_by": marked_by, "marking_method": marking_method},
+                        new_entry=milestone_data
+                    ),
+                    **self._marking_audit_fields(now, marked_by, marking_method)
+                }},
+                *self._attendance_rollup_stages("milestones", "completed", "milestones_completed", "total_milestones"),
+                self._present_at_stage(now)
+            ]
+        
+        raise ValueError(f"Unsupported attendance strategy: {strategy}")
     
-    async def _recalculate_milestone_based_attendance(
+    async def _apply_mark(
         self,
         enrollment_no: str,
-        event_id: str
-    ) -> None:
-        """Recalculate overall attendance percentage for milestone-based strategy."""
-        registration = await self._get_registration(enrollment_no, event_id)
+        event_id: str,
+        strategy: str,
+        target: Dict[str, Any],
+        marked_by: str,
+        marking_method: str
+    ) -> Optional[Dict[str, Any]]:
+        """Apply one conditional mark; returns the updated registration or None if rejected."""
+        now = datetime.now(pytz.timezone('Asia/Kolkata')).replace(tzinfo=None)
+        query, update = self._build_mark_operation(enrollment_no, event_id, strategy, target, now, marked_by, marking_method)
+        registration = await DatabaseOperations.find_one_and_update(
+            self.collection, query, update, projection={"attendance": 1}
+        )
+        if registration:
+            await invalidate_student_dashboards(enrollment_no)
+            if registration["attendance"].get("present_at") == self._stored_datetime(now):
+                await StatisticsManager.record_attendance_present()
+        return registration
+    
+    def _extract_mark_target(self, strategy: Optional[str], item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Pull the strategy's target fields out of a bulk row; None if they are missing, ValueError if malformed."""
+        if strategy == "single_mark":
+            return {}
+        if strategy == "day_based":
+            day = item.get("day", item.get("day_number"))
+            if day is None:
+                return None
+            try:
+                return {"day": int(day)}
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid day: {day}")
+        if strategy == "session_based":
+            if not item.get("session_id"):
+                return None
+            return {"session_id": item["session_id"], "session_name": item.get("session_name") or item["session_id"]}
+        if strategy == "milestone_based":
+            if not item.get("milestone_id"):
+                return None
+            return {"milestone_id": item["milestone_id"], "milestone_name": item.get("milestone_name") or item["milestone_id"]}
+        return None
+    
+    def _mark_rejection_reason(
+        self,
+        registration: Optional[Dict[str, Any]],
+        strategy: Optional[str],
+        target: Dict[str, Any]
+    ) -> Optional[str]:
+        """Why a mark of `target` would be rejected for this registration, or None if it is allowed."""
         if not registration:
-            return
+            return "Student not registered for this event"
         
-        milestones = registration["attendance"].get("milestones", [])
-        total_milestones = registration["attendance"].get("total_milestones", len(milestones))
-        completed_milestones = len([m for m in milestones if m.get("completed")])
+        attendance = registration.get("attendance", {})
+        if attendance.get("strategy") != strategy or strategy not in ATTENDANCE_STRATEGY_LABELS:
+            return f"Event does not use {ATTENDANCE_STRATEGY_LABELS.get(strategy, strategy)} attendance"
         
-        percentage = min((completed_milestones / total_milestones * 100) if total_milestones > 0 else 0, 100)
-        status = self._calculate_attendance_status(percentage)
+        if strategy == "single_mark":
+            if attendance.get("marked"):
+                return "Attendance already marked"
+        elif strategy == "day_based":
+            day_number = target["day"]
+            target_day = next((d for d in attendance.get("days", []) if d.get("day") == day_number), None)
+            if not target_day:
+                return f"Day {day_number} not found in event structure"
+            if target_day.get("marked"):
+                return f"Day {day_number} attendance already marked"
+        elif strategy == "session_based":
+            if any(s.get("session_id") == target["session_id"] and s.get("marked") for s in attendance.get("sessions", [])):
+                return f"Session {target.get('session_name')} attendance already marked"
+        elif strategy == "milestone_based":
+            if any(m.get("milestone_id") == target["milestone_id"] and m.get("completed") for m in attendance.get("milestones", [])):
+                return f"Milestone {target.get('milestone_name')} already completed"
         
-        await self._update_registration_attendance(
-            enrollment_no, event_id,
-            {
-                "attendance.milestones_completed": completed_milestones,
-                "attendance.percentage": percentage,
-                "attendance.status": status
-            }
+        return None
+    
+    def _stored_datetime(self, value: datetime) -> datetime:
+        """The datetime as it reads back from Mongo (millisecond precision)"""
+        return value.replace(microsecond=value.microsecond // 1000 * 1000)
+    
+    def _is_target_marked_by(
+        self,
+        attendance: Dict[str, Any],
+        strategy: str,
+        target: Dict[str, Any],
+        marked_at: datetime,
+        marked_by: str
+    ) -> bool:
+        """Whether the target carries this request's mark (used to resolve bulk_write races)."""
+        marked_at = self._stored_datetime(marked_at)
+        if strategy == "single_mark":
+            return attendance.get("marked_at") == marked_at and attendance.get("marked_by") == marked_by
+        if strategy == "day_based":
+            entries, key, value, time_field = attendance.get("days", []), "day", target["day"], "marked_at"
+        elif strategy == "session_based":
+            entries, key, value, time_field = attendance.get("sessions", []), "session_id", target["session_id"], "marked_at"
+        else:
+            entries, key, value, time_field = attendance.get("milestones", []), "milestone_id", target["milestone_id"], "completed_at"
+        
+        return any(e.get(key) == value and e.get(time_field) == marked_at for e in entries)
+    
+    async def _explain_rejected_mark(
+        self,
+        enrollment_no: str,
+        event_id: str,
+        strategy: str,
+        target: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Build the failure response after a conditional mark matched no document.
+        Only runs on the rejection path, so successful marks stay a single round trip.
+        """
+        registration = await DatabaseOperations.find_one(
+            self.collection,
+            self._registration_query(enrollment_no, event_id),
+            {"attendance": 1}
         )
+        message = self._mark_rejection_reason(registration, strategy, target)
+        return {"success": False, "message": message or "Attendance could not be marked, please retry"}
     
     def _calculate_attendance_status(self, percentage: float) -> str:
         """Calculate attendance status based on percentage."""
@@ -552,38 +818,39 @@ class EventAttendanceService:
         event_id: str,
         event_data: Dict[str, Any]
     ) -> Optional[Dict[str, Any]]:
-        """Get attendance configuration using the working dynamic attendance system."""
+        """Get the event's attendance configuration: the admin's chosen strategy or the one detected at creation (see AttendanceConfigService)."""
         try:
-            from services.dynamic_attendance_service import IntegratedDynamicAttendanceService
-            
-            dynamic_service = IntegratedDynamicAttendanceService()
-            result = await dynamic_service.initialize_event_attendance(event_id)
+            config = await attendance_config_service.get_config(event_data)
             
-            if result["success"]:
-                return result.get("config")
+            if config["strategy"] == "milestone_based":
+                # Milestone events track their generated sessions as milestones
+                config = {
+                    **config,
+                    "milestones": [
+                        {
+                            "milestone_id": session["session_id"],
+                            "milestone_name": session["session_name"],
+                            "milestone_type": session.get("session_type", "regular"),
+                            "is_mandatory": session.get("is_mandatory", True)
+                        }
+                        for session in config.get("sessions", [])
+                    ]
+                }
             
-            return None
+            return config
             
         except Exception as e:
             logger.warning(f"Dynamic attendance config failed: {e}")
             return None
     
-    async def _get_attendance_summary(
-        self,
-        enrollment_no: str,
-        event_id: str
-    ) -> Dict[str, Any]:
-        """Get attendance summary for response."""
-        registration = await self._get_registration(enrollment_no, event_id)
-        if not registration:
-            return {}
-        
-        attendance = registration["attendance"]
+    def _summarize_attendance(self, registration: Dict[str, Any]) -> Dict[str, Any]:
+        """Get attendance summary for response from an (updated) registration document."""
+        attendance = registration.get("attendance", {})
         return {
-            "strategy": attendance["strategy"],
-            "status": attendance["status"],
-            "percentage": attendance["percentage"],
-            "last_updated": attendance["last_updated"]
+            "strategy": attendance.get("strategy"),
+            "status": attendance.get("status"),
+            "percentage": attendance.get("percentage"),
+            "last_updated": attendance.get("last_updated")
         }
     
     def _get_strategy_specific_details(self, attendance_data: Dict[str, Any]) -> Dict[str, Any]:
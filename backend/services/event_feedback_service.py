@@ -12,7 +12,11 @@ from typing import Dict, List, Optional, Any
 from datetime import datetime
 import pytz
 from database.operations import DatabaseOperations
+from utils.statistics import StatisticsManager
 from core.logger import get_logger
+from utils.redis_cache import event_cache
+from utils.two_tier_cache import two_tier_cached
+from utils.tagged_cache import invalidate_student_dashboards
 from bson import ObjectId
 
 logger = get_logger(__name__)
@@ -92,6 +96,7 @@ class EventFeedbackService:
             
             if update_result:
                 logger.info(f"Feedback form created/updated for event {event_id}")
+                await event_cache.refresh_event(event_id)
                 
                 # Serialize datetime objects in feedback_form for JSON response
                 serialized_feedback_form = {}
@@ -119,8 +124,13 @@ class EventFeedbackService:
                 "message": f"Error creating feedback form: {str(e)}"
             }
     
+    @two_tier_cached(
+        "feedback_forms",
+        key=lambda self, event_id: event_id,
+        cache_if=lambda result: result["success"],
+    )
     async def get_feedback_form(self, event_id: str) -> Dict[str, Any]:
-        """Get feedback form for an event"""
+        """Get feedback form for an event (cached per event; event changes invalidate it)"""
         try:
             event = await DatabaseOperations.find_one(
                 self.events_collection,
@@ -282,6 +292,7 @@ class EventFeedbackService:
                     "department": student_data.get("department", "")
                 },
                 "responses": feedback_responses,
+                "overall_rating": self._overall_rating(feedback_form, feedback_responses),
                 "submitted_at": datetime.now(pytz.timezone('Asia/Kolkata')).replace(tzinfo=None),
                 "ip_address": None,  # Can be added from request context
                 "user_agent": None   # Can be added from request context
@@ -294,6 +305,8 @@ class EventFeedbackService:
             )
             
             if feedback_id:
+                await StatisticsManager.record_feedback_rating(feedback_document["overall_rating"])
+                
                 # Update registration to mark feedback as submitted
                 # For team-based registrations, update the specific team member's feedback status
                 if registration.get("registration_type") == "team":
@@ -326,6 +339,7 @@ class EventFeedbackService:
                             }
                         }
                     )
+                await invalidate_student_dashboards(student_enrollment)
                 
                 logger.info(f"Feedback submitted by {student_enrollment} for event {event_id}")
                 return {
@@ -346,6 +360,24 @@ class EventFeedbackService:
                 "message": f"Error submitting feedback: {str(e)}"
             }
     
+    def _overall_rating(self, feedback_form: Optional[Dict[str, Any]], responses: Dict[str, Any]) -> Optional[float]:
+        """Average of the answered rating elements, scaled to 1-5 (None if the form has no rated answers)"""
+        ratings = []
+        for element in (feedback_form or {}).get("elements", []):
+            if element.get("type") not in ("rating", "star_rating") or element.get("id") not in responses:
+                continue
+            try:
+                value = float(responses[element["id"]])
+                max_rating = float((element.get("props") or {}).get("max") or 5)
+            except (TypeError, ValueError):
+                continue
+            if 0 < value <= max_rating:
+                ratings.append(value * 5 / max_rating)
+        
+        if not ratings:
+            return None
+        return round(max(sum(ratings) / len(ratings), 1.0), 2)
+    
     async def submit_test_feedback(
         self,
         event_id: str,
@@ -669,6 +701,7 @@ class EventFeedbackService:
             
             if update_result:
                 logger.info(f"Feedback form deleted for event {event_id}")
+                await event_cache.refresh_event(event_id)
                 return {
                     "success": True,
                     "message": "Feedback form deleted successfully"
@@ -790,7 +823,7 @@ class EventFeedbackService:
             event = await DatabaseOperations.find_one(
                 self.events_collection,
                 {"event_id": event_id},
-                {"target_audience": 1}
+                {"target_audience": 1, "feedback_form": 1}
             )
             
             if not event:
@@ -921,7 +954,7 @@ class EventFeedbackService:
             event = await DatabaseOperations.find_one(
                 self.events_collection,
                 {"event_id": event_id},
-                {"target_audience": 1}
+                {"target_audience": 1, "feedback_form": 1}
             )
             
             target_audience = event.get("target_audience", "students") if event else "students"
@@ -996,6 +1029,7 @@ class EventFeedbackService:
                 "registration_id": registration_id,
                 "student_info": student_info,
                 "responses": feedback_responses,
+                "overall_rating": self._overall_rating((event or {}).get("feedback_form"), feedback_responses),
                 "submitted_at": datetime.now(pytz.timezone('Asia/Kolkata')).replace(tzinfo=None),
                 "submission_method": "anonymous_qr"
             }
@@ -1009,6 +1043,7 @@ class EventFeedbackService:
             )
             
             if result:
+                await StatisticsManager.record_feedback_rating(feedback_doc["overall_rating"])
                 logger.info(f"Anonymous feedback submitted successfully for registration {registration_id}")
                 return {
                     "success": True,
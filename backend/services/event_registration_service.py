@@ -17,6 +17,8 @@ from datetime import datetime, timedelta
 import pytz
 from zoneinfo import ZoneInfo
 from database.operations import DatabaseOperations
+from utils.statistics import StatisticsManager
+from services.attendance_config_service import attendance_config_service
 from models.registration import CreateRegistrationRequest, RegistrationResponse
 # REMOVED: core.id_generator import - now using frontend-generated IDs
 from core.logger import get_logger
@@ -86,6 +88,7 @@ class EventRegistrationService:
             
             # Insert registration
             await DatabaseOperations.insert_one(self.collection, registration_doc)
+            await StatisticsManager.record_registrations()
             
             # Update student document - add event to event_participations
             try:
@@ -277,10 +280,7 @@ class EventRegistrationService:
                         "semester": student_data.get("semester")
                     },
                     "is_team_leader": enrollment_no == team_leader_enrollment,
-                    "attendance": self._create_attendance_structure(
-                        await self._get_event_attendance_strategy(event_data), 
-                        event_data
-                    ),
+                    "attendance": await attendance_config_service.new_attendance_record(event_data),
                     "feedback": {
                         "submitted": False,
                         "rating": None,
@@ -322,6 +322,7 @@ class EventRegistrationService:
             
             # Insert single team registration document
             await DatabaseOperations.insert_one(self.collection, team_registration_doc)
+            await StatisticsManager.record_registrations(len(team_registration_details))
             
             logger.info(f"Team registration successful: {team_name} ({len(team_registration_details)} members)")
             
@@ -521,7 +522,7 @@ class EventRegistrationService:
             if not event_data:
                 return {"success": False, "message": "Event not found"}
             
-            attendance_strategy = await self._get_event_attendance_strategy(event_data)
+            attendance = await attendance_config_service.new_attendance_record(event_data)
             
             # Generate registration ID for new member
             import random
@@ -540,7 +541,7 @@ class EventRegistrationService:
                     "semester": student_data.get("semester", "")
                 },
                 "is_team_leader": False,
-                "attendance": self._create_attendance_structure(attendance_strategy, event_data),
+                "attendance": attendance,
                 "feedback": {
                     "submitted": False,
                     "rating": None,
@@ -565,6 +566,7 @@ class EventRegistrationService:
                     "$set": {"updated_at": datetime.now(pytz.timezone('Asia/Kolkata')).replace(tzinfo=None)}
                 }
             )
+            await StatisticsManager.record_registrations()
             
             # Update student's event_participations
             await DatabaseOperations.update_one(
@@ -666,7 +668,7 @@ class EventRegistrationService:
             if not event_data:
                 return {"success": False, "message": "Event not found"}
             
-            attendance_strategy = await self._get_event_attendance_strategy(event_data)
+            attendance = await attendance_config_service.new_attendance_record(event_data)
             
             # Generate registration ID for new member
             import random
@@ -685,7 +687,7 @@ class EventRegistrationService:
                     "semester": student_data.get("semester", "")
                 },
                 "is_team_leader": False,
-                "attendance": self._create_attendance_structure(attendance_strategy, event_data),
+                "attendance": attendance,
                 "feedback": {
                     "submitted": False,
                     "rating": None,
@@ -710,6 +712,7 @@ class EventRegistrationService:
                     "$set": {"updated_at": datetime.now(pytz.timezone('Asia/Kolkata')).replace(tzinfo=None)}
                 }
             )
+            await StatisticsManager.record_registrations()
             
             # Update student's event_participations
             await DatabaseOperations.update_one(
@@ -807,7 +810,7 @@ class EventRegistrationService:
                 }
             
             # Remove member from team registration document
-            await DatabaseOperations.update_one(
+            member_removed = await DatabaseOperations.update_one(
                 self.collection,
                 {"registration_id": team_registration_id},
                 {
@@ -845,6 +848,8 @@ class EventRegistrationService:
                     "$inc": {"registration_stats.total_participants": -1}
                 }
             )
+            if member_removed:
+                await StatisticsManager.record_registrations(-1)
             
             logger.info(f"✅ Team member removed successfully: {remove_member_enrollment}")
             return {
@@ -1227,6 +1232,7 @@ class EventRegistrationService:
                     "success": False,
                     "message": "Failed to delete registration document"
                 }
+            await StatisticsManager.record_registrations(-1)
             
             # 2. Remove from student's event_participations
             await DatabaseOperations.update_one(
@@ -1301,6 +1307,8 @@ class EventRegistrationService:
                     "success": False,
                     "message": "Failed to delete team registration document"
                 }
+            # The platform total counts one participant per team member entry
+            await StatisticsManager.record_registrations(-len(team_members))
             
             # 2. Remove from ALL team members' event_participations and collect registration IDs
             member_enrollments = []
@@ -1646,8 +1654,8 @@ class EventRegistrationService:
         The attendance structure is created based on the event's attendance strategy.
         """
         
-        # Get attendance strategy from event (this uses the 4-day intelligence system)
-        attendance_strategy = await self._get_event_attendance_strategy(event_data)
+        # Attendance skeleton precomputed from the event's attendance strategy
+        attendance = await attendance_config_service.new_attendance_record(event_data)
         print("Student Data:", student_data)
         # Create base registration document
         registration_doc = {
@@ -1674,7 +1682,7 @@ class EventRegistrationService:
                 "additional_data": additional_data or {}
             },
             "team": team_info,
-            "attendance": self._create_attendance_structure(attendance_strategy, event_data),
+            "attendance": attendance,
             "feedback": {
                 "submitted": False,
                 "rating": None,
@@ -1690,108 +1698,6 @@ class EventRegistrationService:
         }
         
         return registration_doc
-    
-    async def _get_event_attendance_strategy(self, event_data: Dict[str, Any]) -> str:
-        """
-        Get attendance strategy for event using the existing 4-day intelligence system.
-        This preserves all the working strategy detection logic.
-        """
-        try:
-            # Import the working strategy detection system
-            from models.dynamic_attendance import AttendanceIntelligenceService
-            
-            # Use the proven 4-day strategy detection system
-            strategy = AttendanceIntelligenceService.detect_attendance_strategy(event_data)
-            return strategy.value
-            
-        except Exception as e:
-            logger.warning(f"Strategy detection failed, using default: {e}")
-            return "single_mark"  # Fallback to simple strategy
-    
-    def _create_attendance_structure(
-        self,
-        strategy: str,
-        event_data: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """
-        Create attendance structure based on strategy.
-        Pre-creates all required fields that attendance service will update.
-        """
-        
-        base_structure = {
-            "strategy": strategy,
-            "status": "pending",  # pending, present, partial, absent
-            "percentage": 0.0,
-            "last_updated": None,
-            "marked_by": None,
-            "marking_method": None
-        }
-        
-        if strategy == "single_mark":
-            base_structure.update({
-                "marked": False,
-                "marked_at": None
-            })
-            
-        elif strategy == "day_based":
-            # Pre-create day slots based on event duration
-            event_days = self._calculate_event_days(event_data)
-            base_structure.update({
-                "days": [
-                    {
-                        "day": i + 1,
-                        "date": None,  # Will be calculated
-                        "marked": False,
-                        "marked_at": None
-                    }
-                    for i in range(event_days)
-                ],
-                "total_days": event_days,
-                "days_attended": 0
-            })
-            
-        elif strategy == "session_based":
-            # Pre-create session slots (will be populated by attendance service)
-            base_structure.update({
-                "sessions": [],  # Will be populated when attendance is initialized
-                "total_sessions": 0,
-                "sessions_attended": 0
-            })
-            
-        elif strategy == "milestone_based":
-            base_structure.update({
-                "milestones": [],  # Will be populated based on event milestones
-                "total_milestones": 0,
-                "milestones_completed": 0
-            })
-            
-        elif strategy == "continuous":
-            base_structure.update({
-                "engagement_periods": [],
-                "total_engagement_time": 0,
-                "active_time": 0
-            })
-        
-        return base_structure
-    
-    def _calculate_event_days(self, event_data: Dict[str, Any]) -> int:
-        """Calculate number of days for an event."""
-        try:
-            start = event_data.get("start_datetime")
-            end = event_data.get("end_datetime")
-            
-            if start and end:
-                if isinstance(start, str):
-                    start = datetime.fromisoformat(start.replace('Z', '+00:00'))
-                if isinstance(end, str):
-                    end = datetime.fromisoformat(end.replace('Z', '+00:00'))
-                
-                return max(1, (end - start).days + 1)
-            
-            return 1  # Default to single day
-            
-        except Exception:
-            return 1  # Fallback to single day
 
 
 # Service instance
@@ -12,6 +12,8 @@ from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 import pytz
 from database.operations import DatabaseOperations
+from utils.statistics import StatisticsManager
+from services.attendance_config_service import attendance_config_service
 from models.registration import RegistrationResponse
 from core.logger import get_logger
 
@@ -89,6 +91,7 @@ class FacultyRegistrationService:
 
             # Insert registration
             await DatabaseOperations.insert_one(self.collection, registration_doc)
+            await StatisticsManager.record_registrations()
 
             # Update faculty document - add event to event_participations (plural)
             try:
@@ -248,6 +251,7 @@ class FacultyRegistrationService:
                 await DatabaseOperations.insert_one(self.collection, registration_doc)
                 team_registration_ids.append(registration_id)
 
+            await StatisticsManager.record_registrations(len(team_registration_ids))
             logger.info(
                 f"Faculty team registration successful: {team_name} ({len(team_registration_ids)} members)"
             )
@@ -350,6 +354,7 @@ class FacultyRegistrationService:
                     "success": False,
                     "message": "Failed to delete registration document - not found",
                 }
+            await StatisticsManager.record_registrations(-1)
 
             # 2. Remove from faculty's event_participations array (plural)
             try:
@@ -524,8 +529,8 @@ class FacultyRegistrationService:
         The attendance structure is created based on the event's attendance strategy.
         """
 
-        # Get attendance strategy from event
-        attendance_strategy = await self._get_event_attendance_strategy(event_data)
+        # Attendance skeleton precomputed from the event's attendance strategy
+        attendance = await attendance_config_service.new_attendance_record(event_data)
 
         # Create base registration document for faculty
         registration_doc = {
@@ -552,9 +557,7 @@ class FacultyRegistrationService:
                 "additional_data": additional_data or {},
             },
             "team": team_info,
-            "attendance": self._create_attendance_structure(
-                attendance_strategy, event_data
-            ),
+            "attendance": attendance,
             "feedback": {
                 "submitted": False,
                 "rating": None,
@@ -571,109 +574,6 @@ class FacultyRegistrationService:
 
         return registration_doc
 
-    async def _get_event_attendance_strategy(self, event_data: Dict[str, Any]) -> str:
-        """
-        Get attendance strategy for event using the existing 4-day intelligence system.
-        This preserves all the working strategy detection logic.
-        """
-        try:
-            # Import the working strategy detection system
-            from models.dynamic_attendance import AttendanceIntelligenceService
-
-            # Use the proven 4-day strategy detection system
-            strategy = AttendanceIntelligenceService.detect_attendance_strategy(
-                event_data
-            )
-            return strategy.value
-
-        except Exception as e:
-            logger.warning(f"Strategy detection failed, using default: {e}")
-            return "single_mark"  # Fallback to simple strategy
-
-    def _create_attendance_structure(
-        self, strategy: str, event_data: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """
-        Create attendance structure based on strategy.
-        Pre-creates all required fields that attendance service will update.
-        """
-
-        base_structure = {
-            "strategy": strategy,
-            "status": "pending",  # pending, present, partial, absent
-            "percentage": 0.0,
-            "last_updated": None,
-            "marked_by": None,
-            "marking_method": None,
-        }
-
-        if strategy == "single_mark":
-            base_structure.update({"marked": False, "marked_at": None})
-
-        elif strategy == "day_based":
-            # Pre-create day slots based on event duration
-            event_days = self._calculate_event_days(event_data)
-            base_structure.update(
-                {
-                    "days": [
-                        {
-                            "day": i + 1,
-                            "date": None,  # Will be calculated
-                            "marked": False,
-                            "marked_at": None,
-                        }
-                        for i in range(event_days)
-                    ],
-                    "total_days": event_days,
-                    "days_attended": 0,
-                }
-            )
-
-        elif strategy == "session_based":
-            # Pre-create session slots (will be populated by attendance service)
-            base_structure.update(
-                {
-                    "sessions": [],  # Will be populated when attendance is initialized
-                    "total_sessions": 0,
-                    "sessions_attended": 0,
-                }
-            )
-
-        elif strategy == "milestone_based":
-            base_structure.update(
-                {
-                    "milestones": [],  # Will be populated based on event milestones
-                    "total_milestones": 0,
-                    "milestones_completed": 0,
-                }
-            )
-
-        elif strategy == "continuous":
-            base_structure.update(
-                {"engagement_periods": [], "total_engagement_time": 0, "active_time": 0}
-            )
-
-        return base_structure
-
-    def _calculate_event_days(self, event_data: Dict[str, Any]) -> int:
-        """Calculate number of days for an event."""
-        try:
-            start = event_data.get("start_datetime")
-            end = event_data.get("end_datetime")
-
-            if start and end:
-                if isinstance(start, str):
-                    start = datetime.fromisoformat(start.replace("Z", "+00:00"))
-                if isinstance(end, str):
-                    end = datetime.fromisoformat(end.replace("Z", "+00:00"))
-
-                return max(1, (end - start).days + 1)
-
-            return 1  # Default to single day
-
-        except Exception:
-            return 1  # Fallback to single day
-
     def _generate_random_string(self, length: int = 8) -> str:
         """
         Generate random string matching frontend format.
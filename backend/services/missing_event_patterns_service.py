@@ -17,6 +17,7 @@ Key Additions:
 
 from typing import Dict, List, Any
 from models.dynamic_attendance import AttendanceStrategy
+from utils.pattern_table import PatternTable
 
 class MissingEventTypePatternsService:
     """Service to handle additional event types not covered in base patterns"""
@@ -175,6 +176,9 @@ class MissingEventTypePatternsService:
         ]
     }
     
+    # ADDITIONAL_EVENT_PATTERNS compiled once, with a literal prefilter (see utils.pattern_table)
+    ADDITIONAL_EVENT_TABLE = PatternTable(ADDITIONAL_EVENT_PATTERNS)
+    
     # Event type priority modifiers for better strategy selection
     EVENT_TYPE_PRIORITIES = {
         # High priority events that need specific strategies
@@ -216,15 +220,14 @@ class MissingEventTypePatternsService:
         strategy_scores = {strategy: 0 for strategy in AttendanceStrategy}
         
         # Score additional patterns
-        for strategy, patterns in cls.ADDITIONAL_EVENT_PATTERNS.items():
+        pattern_matches = cls.ADDITIONAL_EVENT_TABLE.pattern_counts(combined_text)
+        for strategy in cls.ADDITIONAL_EVENT_PATTERNS:
             score = 0
             matched_patterns = []
             
-            for pattern in patterns:
-                import re
-                matches = re.findall(pattern, combined_text)
-                if matches:
-                    score += len(matches)
+            for matched_strategy, pattern, count in pattern_matches:
+                if matched_strategy == strategy:
+                    score += count
                     matched_patterns.append(pattern)
             
             if score > 0:
@@ -1,7 +1,12 @@
 """
 PDF Generation Service using Playwright
 Handles certificate PDF generation with PERFECT rendering (Google Fonts, CSS, backgrounds)
-Uses subprocess to isolate from FastAPI's event loop (Windows compatibility)
+Uses worker subprocesses to isolate from FastAPI's event loop (Windows compatibility)
+
+Each worker process keeps one Chromium browser and context warm and renders jobs
+sent over stdin, so a certificate costs one page render instead of a Python +
+browser cold start. Workers are recycled after PDF_WORKER_MAX_RENDERS renders
+and killed/replaced when a job exceeds PDF_JOB_TIMEOUT_SECONDS.
 
 For cloud deployment: Most providers (Railway, Render, Fly.io) support Playwright.
 """
@@ -11,11 +16,15 @@ import os
 import sys
 import json
 import base64
+import queue
 import subprocess
+import threading
+import time
 from datetime import datetime
 from typing import Optional, Dict
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor
+from prometheus_client import Histogram
 from core.logger import get_logger
 
 logger = get_logger(__name__)
@@ -24,19 +33,61 @@ logger = get_logger(__name__)
 PDF_TEMP_DIR = Path("./temp_pdfs")
 PDF_TEMP_DIR.mkdir(exist_ok=True)
 
-# Thread pool for running PDF generation
-_executor = ThreadPoolExecutor(max_workers=4)
+# Worker pool settings
+PDF_WORKER_CONCURRENCY = int(os.getenv("PDF_WORKER_CONCURRENCY", "2"))
+PDF_WORKER_MAX_RENDERS = int(os.getenv("PDF_WORKER_MAX_RENDERS", "200"))
+PDF_JOB_TIMEOUT_SECONDS = float(os.getenv("PDF_JOB_TIMEOUT_SECONDS", "30"))
+PDF_WORKER_START_TIMEOUT_SECONDS = float(os.getenv("PDF_WORKER_START_TIMEOUT_SECONDS", "60"))
+
+PDF_RENDER_SECONDS = Histogram(
+    "pdf_render_seconds", "Time to render one PDF on a warm worker",
+    buckets=(0.1, 0.25, 0.5, 0.75, 1, 2, 5, 10, 30)
+)
 
-# Standalone script for PDF generation (runs in separate process)
-PDF_GENERATOR_SCRIPT = '''
+# One thread per worker process - renders beyond the concurrency limit wait in the executor queue
+_executor = ThreadPoolExecutor(max_workers=PDF_WORKER_CONCURRENCY, thread_name_prefix="pdf-worker")
+
+# Standalone worker script (runs in a separate, long-lived process).
+# Protocol: one JSON job per stdin line, one JSON result per stdout line.
+PDF_WORKER_SCRIPT = '''
 import sys
 import json
 import base64
-import time
 
-def generate_pdf(html_content, width, height):
+# Keep the real stdout for results so nothing else can corrupt the protocol
+results = sys.stdout
+sys.stdout = sys.stderr
+
+def send(message):
+    results.write(json.dumps(message) + "\\n")
+    results.flush()
+
+def render(context, job):
+    width = job.get('width', 1052)
+    height = job.get('height', 744)
+    timeout_ms = job.get('timeout_ms', 30000)
+
+    page = context.new_page()
+    try:
+        page.set_default_timeout(timeout_ms)
+        page.set_viewport_size({'width': width, 'height': height})
+        page.set_content(job['html'], wait_until='load', timeout=timeout_ms)
+        # Wait for web fonts instead of sleeping
+        page.evaluate("() => document.fonts.ready.then(() => true)")
+
+        return page.pdf(
+            width=f'{width}px',
+            height=f'{height}px',
+            print_background=True,
+            prefer_css_page_size=True,
+            margin={'top': '0', 'right': '0', 'bottom': '0', 'left': '0'}
+        )
+    finally:
+        page.close()
+
+def main():
     from playwright.sync_api import sync_playwright
-    
+
     with sync_playwright() as p:
         browser = p.chromium.launch(
             headless=True,
@@ -49,123 +100,242 @@ def generate_pdf(html_content, width, height):
                 '--disable-gpu'
             ]
         )
-        
+        # One context per worker so fonts/stylesheets stay in its HTTP cache between jobs
+        context = browser.new_context()
+        send({'ready': True})
+
         try:
-            page = browser.new_page(viewport={'width': width, 'height': height})
-            page.set_content(html_content, wait_until='networkidle')
-            time.sleep(1)  # Wait for fonts to load
-            
-            pdf_bytes = page.pdf(
-                width=f'{width}px',
-                height=f'{height}px',
-                print_background=True,
-                prefer_css_page_size=True,
-                margin={'top': '0', 'right': '0', 'bottom': '0', 'left': '0'}
-            )
-            return pdf_bytes
+            for line in sys.stdin:
+                if not line.strip():
+                    continue
+                job = json.loads(line)
+                if job.get('cmd') == 'shutdown':
+                    break
+                try:
+                    pdf_bytes = render(context, job)
+                    send({
+                        'id': job['id'],
+                        'success': True,
+                        'pdf_base64': base64.b64encode(pdf_bytes).decode('utf-8'),
+                        'size': len(pdf_bytes)
+                    })
+                except Exception as e:
+                    send({'id': job['id'], 'success': False, 'error': str(e)})
         finally:
+            context.close()
             browser.close()
 
 if __name__ == '__main__':
-    try:
-        input_data = json.loads(sys.stdin.read())
-        html_content = input_data['html']
-        width = input_data.get('width', 1052)
-        height = input_data.get('height', 744)
+    main()
+'''
+
+
+class PDFRenderError(Exception):
+    """The worker is healthy but the document could not be rendered"""
+
+
+def _worker_env() -> Dict[str, str]:
+    """Environment for worker processes - inherit parent env + ensure Playwright can find browsers"""
+    env = os.environ.copy()
+    # On Render, browsers are installed to /opt/render/.cache/ms-playwright
+    # This env var tells Playwright where to find them
+    if 'PLAYWRIGHT_BROWSERS_PATH' not in env:
+        # Check common cloud provider paths
+        render_path = '/opt/render/.cache/ms-playwright'
+        if os.path.exists(render_path):
+            env['PLAYWRIGHT_BROWSERS_PATH'] = render_path
+    return env
+
+
+class _PDFWorker:
+    """A long-lived Playwright process with a warm browser"""
+    
+    def __init__(self):
+        self.renders = 0
+        self._responses: "queue.Queue[Optional[dict]]" = queue.Queue()
+        self.process = subprocess.Popen(
+            [sys.executable, '-c', PDF_WORKER_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+            env=_worker_env()
+        )
+        threading.Thread(target=self._read_stdout, daemon=True).start()
+        threading.Thread(target=self._drain_stderr, daemon=True).start()
         
-        pdf_bytes = generate_pdf(html_content, width, height)
+        try:
+            ready = self._responses.get(timeout=PDF_WORKER_START_TIMEOUT_SECONDS)
+        except queue.Empty:
+            ready = None
+        if not ready or not ready.get('ready'):
+            self.kill()
+            raise Exception("PDF worker failed to start (is Chromium installed? run 'playwright install chromium')")
+        logger.info(f"🚀 PDF worker started (pid {self.process.pid})")
+    
+    def _read_stdout(self):
+        for line in self.process.stdout:
+            try:
+                self._responses.put(json.loads(line))
+            except ValueError:
+                continue
+        self._responses.put(None)  # Process exited
+    
+    def _drain_stderr(self):
+        for line in self.process.stderr:
+            if line.strip():
+                logger.debug(f"PDF worker {self.process.pid}: {line.rstrip()}")
+    
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+    
+    def render(self, html_content: str, width: int, height: int, timeout: float) -> bytes:
+        """Render one document; raises TimeoutError if the worker does not answer in time"""
+        job_id = uuid.uuid4().hex
+        self.process.stdin.write(json.dumps({
+            'id': job_id,
+            'html': html_content,
+            'width': width,
+            'height': height,
+            'timeout_ms': int(timeout * 1000)
+        }) + "\n")
+        self.process.stdin.flush()
         
-        result = {
-            'success': True,
-            'pdf_base64': base64.b64encode(pdf_bytes).decode('utf-8'),
-            'size': len(pdf_bytes)
-        }
-        print(json.dumps(result))
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                result = self._responses.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                raise TimeoutError(f"PDF generation timed out after {timeout:.0f}s")
+            if result is None:
+                raise Exception("PDF worker exited unexpectedly")
+            if result.get('id') == job_id:
+                break
         
-    except Exception as e:
-        import traceback
-        result = {
-            'success': False,
-            'error': str(e),
-            'traceback': traceback.format_exc()
-        }
-        print(json.dumps(result))
-        sys.exit(1)
-'''
+        self.renders += 1
+        if not result.get('success'):
+            raise PDFRenderError(result.get('error', 'Unknown'))
+        return base64.b64decode(result['pdf_base64'])
+    
+    def close(self):
+        """Ask the worker to shut its browser down, killing it if it does not"""
+        try:
+            if self.is_alive():
+                self.process.stdin.write(json.dumps({'cmd': 'shutdown'}) + "\n")
+                self.process.stdin.flush()
+                self.process.wait(timeout=10)
+        except Exception:
+            self.kill()
+    
+    def kill(self):
+        try:
+            self.process.kill()
+            self.process.wait(timeout=5)
+        except Exception:
+            pass
 
 
-class PDFGenerationService:
-    """
-    PDF Generation Service
-    Supports both sync and async (job-based) generation
+class _PDFWorkerPool:
     """
+    Pool of warm PDF workers.
     
-    def __init__(self):
-        self.jobs: Dict[str, dict] = {}
-        self._browser = None
-        self._playwright = None
+    Callers run on the service executor, whose size equals the pool size, so a
+    worker is never shared by two renders at once.
+    """
     
-    def create_job(self) -> str:
-        """Create a new PDF generation job"""
-        job_id = str(uuid.uuid4())
-        self.jobs[job_id] = {
-            "status": "pending",
-            "created_at": datetime.utcnow().isoformat(),
-            "file_path": None,
-            "error": None
-        }
-        return job_id
+    def __init__(self, max_renders: int, job_timeout: float):
+        self.max_renders = max_renders
+        self.job_timeout = job_timeout
+        self._idle: "queue.LifoQueue[_PDFWorker]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._workers = set()
+        self._closed = False
+        self.stats = {"renders": 0, "failures": 0, "timeouts": 0, "started": 0, "recycled": 0}
     
-    def get_job_status(self, job_id: str) -> Optional[dict]:
-        """Get the status of a PDF generation job"""
-        return self.jobs.get(job_id)
+    def warm(self, count: int):
+        """Start workers ahead of the first request"""
+        for _ in range(count - len(self._workers)):
+            self._idle.put(self._start_worker())
     
-    async def generate_pdf(
-        self,
-        job_id: str,
-        html_content: str,
-        filename: str,
-        width: int = 1052,
-        height: int = 744
-    ) -> str:
-        """
-        Generate PDF from HTML content
-        Updates job status throughout the process
-        """
+    def render(self, html_content: str, width: int, height: int) -> bytes:
+        worker = self._checkout()
         try:
-            # Update status
-            if job_id in self.jobs:
-                self.jobs[job_id]["status"] = "processing"
-            
-            logger.info(f"📝 Starting PDF generation for job {job_id}")
-            
-            # Generate PDF
-            pdf_bytes = await self.generate_pdf_bytes(html_content, width, height)
-            
-            # Save to file
-            safe_filename = "".join(c for c in filename if c.isalnum() or c in ('_', '-', '.'))
-            if not safe_filename.endswith('.pdf'):
-                safe_filename += '.pdf'
-            
-            file_path = PDF_TEMP_DIR / f"{job_id}_{safe_filename}"
-            
-            with open(file_path, 'wb') as f:
-                f.write(pdf_bytes)
-            
-            # Update job status
-            if job_id in self.jobs:
-                self.jobs[job_id]["status"] = "completed"
-                self.jobs[job_id]["file_path"] = str(file_path)
-            
-            logger.info(f"✅ PDF generated successfully: {file_path} ({len(pdf_bytes)} bytes)")
-            return str(file_path)
-            
+            pdf_bytes = worker.render(html_content, width, height, self.job_timeout)
+        except PDFRenderError:
+            self.stats["failures"] += 1
+            self._checkin(worker)
+            raise
         except Exception as e:
-            logger.error(f"❌ PDF generation failed for job {job_id}: {str(e)}")
-            if job_id in self.jobs:
-                self.jobs[job_id]["status"] = "failed"
-                self.jobs[job_id]["error"] = str(e)
+            # Timed out or crashed - the browser state is unknown, replace the process
+            self.stats["timeouts" if isinstance(e, TimeoutError) else "failures"] += 1
+            self._discard(worker)
+            worker.kill()
             raise
+        
+        self.stats["renders"] += 1
+        self._checkin(worker)
+        return pdf_bytes
+    
+    def _start_worker(self) -> _PDFWorker:
+        worker = _PDFWorker()
+        with self._lock:
+            self._workers.add(worker)
+        self.stats["started"] += 1
+        return worker
+    
+    def _checkout(self) -> _PDFWorker:
+        if self._closed:
+            raise Exception("PDF worker pool is shut down")
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return self._start_worker()
+            if worker.is_alive():
+                return worker
+            self._discard(worker)
+    
+    def _checkin(self, worker: _PDFWorker):
+        if self._closed or worker.renders >= self.max_renders:
+            # Recycle long-lived browsers so leaked memory is returned; close off the request path
+            self._discard(worker)
+            self.stats["recycled"] += 1
+            threading.Thread(target=worker.close, daemon=True).start()
+            return
+        self._idle.put(worker)
+    
+    def _discard(self, worker: _PDFWorker):
+        with self._lock:
+            self._workers.discard(worker)
+    
+    def shutdown(self):
+        self._closed = True
+        with self._lock:
+            workers, self._workers = list(self._workers), set()
+        for worker in workers:
+            worker.close()
+    
+    def get_stats(self) -> dict:
+        return {**self.stats, "workers": len(self._workers), "idle": self._idle.qsize()}
+
+
+def safe_pdf_filename(filename: str) -> str:
+    """Strip a requested filename down to safe characters and ensure a .pdf suffix"""
+    safe_filename = "".join(c for c in filename if c.isalnum() or c in ('_', '-', '.'))
+    if not safe_filename.endswith('.pdf'):
+        safe_filename += '.pdf'
+    return safe_filename
+
+
+class PDFGenerationService:
+    """
+    PDF Generation Service
+    Renders HTML to PDF bytes; queued (job-based) generation lives in services.pdf_job_queue
+    """
+    
+    def __init__(self):
+        self._pool = _PDFWorkerPool(PDF_WORKER_MAX_RENDERS, PDF_JOB_TIMEOUT_SECONDS)
     
     async def generate_pdf_bytes(
         self,
@@ -175,10 +345,10 @@ class PDFGenerationService:
     ) -> bytes:
         """
         Generate PDF and return bytes directly
-        Uses Playwright in subprocess for PERFECT rendering
-        ~3-4 seconds but produces professional quality PDFs
+        Uses a warm Playwright worker for PERFECT rendering
+        ~0.2-0.5 seconds per certificate once the pool is warm
         """
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         return await loop.run_in_executor(
             _executor,
             self._render_pdf_playwright,
@@ -194,74 +364,49 @@ class PDFGenerationService:
         height: int
     ) -> bytes:
         """
-        Run Playwright in a separate subprocess
+        Render on a pooled Playwright worker process
         This isolates it from FastAPI's event loop (Windows fix)
         Produces PERFECT PDFs with Google Fonts, CSS, backgrounds
         """
-        import time
         start_time = time.time()
         
         try:
-            logger.info("🚀 Starting Playwright PDF generation...")
-            
-            # Prepare input data
-            input_data = json.dumps({
-                'html': html_content,
-                'width': width,
-                'height': height
-            })
-            
-            # Set up environment for subprocess - inherit parent env + ensure Playwright can find browsers
-            env = os.environ.copy()
-            # On Render, browsers are installed to /opt/render/.cache/ms-playwright
-            # This env var tells Playwright where to find them
-            if 'PLAYWRIGHT_BROWSERS_PATH' not in env:
-                # Check common cloud provider paths
-                render_path = '/opt/render/.cache/ms-playwright'
-                if os.path.exists(render_path):
-                    env['PLAYWRIGHT_BROWSERS_PATH'] = render_path
-            
-            # Run the generator script in a separate process
-            result = subprocess.run(
-                [sys.executable, '-c', PDF_GENERATOR_SCRIPT],
-                input=input_data,
-                capture_output=True,
-                text=True,
-                timeout=60,
-                env=env
-            )
-            
-            if result.returncode != 0:
-                error_output = result.stderr or result.stdout or "Unknown error"
-                logger.error(f"❌ Subprocess failed: {error_output}")
-                raise Exception(f"PDF subprocess failed: {error_output}")
-            
-            # Parse output
-            output = json.loads(result.stdout)
-            
-            if not output.get('success'):
-                raise Exception(f"PDF generation failed: {output.get('error', 'Unknown')}")
-            
-            # Decode PDF bytes
-            pdf_bytes = base64.b64decode(output['pdf_base64'])
+            pdf_bytes = self._pool.render(html_content, width, height)
             
             elapsed = time.time() - start_time
+            PDF_RENDER_SECONDS.observe(elapsed)
             logger.info(f"✅ PDF generated in {elapsed:.2f}s: {len(pdf_bytes)} bytes")
             return pdf_bytes
             
-        except subprocess.TimeoutExpired:
-            logger.error("❌ PDF generation timed out")
-            raise Exception("PDF generation timed out")
+        except TimeoutError as e:
+            logger.error(f"❌ {e}")
+            raise Exception(str(e))
         except Exception as e:
             logger.error(f"❌ PDF error: {str(e)}")
             raise Exception(f"PDF generation failed: {str(e)}")
     
+    async def start(self, workers: int = PDF_WORKER_CONCURRENCY):
+        """Launch workers ahead of the first request so it does not pay the browser start-up"""
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._pool.warm, workers)
+            logger.info(f"🖨️ PDF worker pool warmed ({workers} workers)")
+        except Exception as e:
+            logger.warning(f"PDF worker pool warm-up failed, workers will start on demand: {e}")
+    
+    async def shutdown(self):
+        """Close all worker processes and their browsers"""
+        await asyncio.get_running_loop().run_in_executor(None, self._pool.shutdown)
+    
+    def get_pool_stats(self) -> dict:
+        """Worker pool counters (renders, failures, timeouts, recycled workers)"""
+        return self._pool.get_stats()
+    
     def cleanup_old_files(self, max_age_hours: int = 1):
         """Clean up old PDF files"""
         try:
             cutoff = datetime.utcnow().timestamp() - (max_age_hours * 3600)
             
-            for file_path in PDF_TEMP_DIR.glob("*.pdf"):
+            for file_path in [*PDF_TEMP_DIR.glob("*.pdf"), *PDF_TEMP_DIR.glob("*.zip")]:
                 if file_path.stat().st_mtime < cutoff:
                     file_path.unlink()
                     logger.info(f"🗑️ Cleaned up old PDF: {file_path}")
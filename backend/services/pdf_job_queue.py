@@ -0,0 +1,332 @@
+"""
+Durable PDF Job Queue
+MongoDB-backed job store shared by every uvicorn worker / instance.
+
+- Jobs live in the `pdf_jobs` collection; any process can report status
+- Worker loops claim jobs atomically (find_one_and_update) under a lease, so a
+  crashed worker's job is picked up again once the lease expires
+- Output goes to GridFS (`pdf_files` bucket) so any process can serve downloads
+- Job documents expire through a TTL index; a GC sweep removes expired files
+- Queue depth, render latency and job outcomes are exported to /metrics
+
+Usage:
+    job_id = await pdf_job_queue.enqueue("single", {...})
+    await pdf_job_queue.start()       # at startup, runs the worker loops
+    job = await pdf_job_queue.get_job(job_id)
+"""
+import asyncio
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Union
+
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+from prometheus_client import Counter, Gauge, Histogram
+
+from config.database import Database
+from database.operations import DatabaseOperations
+from services.pdf_generation_service import pdf_service, safe_pdf_filename, PDF_WORKER_CONCURRENCY
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+PDF_JOBS_COLLECTION = "pdf_jobs"
+PDF_FILES_BUCKET = "pdf_files"
+
+# Queue settings
+PDF_JOB_TTL_HOURS = float(os.getenv("PDF_JOB_TTL_HOURS", "6"))
+PDF_JOB_LEASE_SECONDS = int(os.getenv("PDF_JOB_LEASE_SECONDS", "120"))
+PDF_JOB_MAX_ATTEMPTS = int(os.getenv("PDF_JOB_MAX_ATTEMPTS", "3"))
+PDF_JOB_POLL_SECONDS = float(os.getenv("PDF_JOB_POLL_SECONDS", "2"))
+PDF_JOB_GC_INTERVAL_SECONDS = int(os.getenv("PDF_JOB_GC_INTERVAL_SECONDS", "300"))
+
+# Metrics (exposed on /metrics with the rest of the app metrics)
+PDF_QUEUE_DEPTH = Gauge("pdf_job_queue_depth", "PDF jobs waiting to be claimed")
+PDF_JOB_DURATION = Histogram(
+    "pdf_job_duration_seconds", "Time from claim to stored result", ["kind"],
+    buckets=(0.25, 0.5, 1, 2, 5, 10, 30, 60, 120, 300, 600, 1800)
+)
+PDF_JOB_WAIT = Histogram(
+    "pdf_job_wait_seconds", "Time jobs spend queued before being claimed",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60)
+)
+PDF_JOBS_TOTAL = Counter("pdf_jobs_total", "PDF jobs finished", ["kind", "status"])
+
+# Job fields returned to status callers (payload/HTML stays in the database)
+JOB_STATUS_PROJECTION = {"payload": 0}
+
+JobResult = Tuple[str, Union[bytes, str]]  # (download filename, PDF/ZIP bytes or a local file path)
+JobHandler = Callable[[Dict[str, Any], "PDFJobQueue"], Awaitable[JobResult]]
+
+
+class PDFJobQueue:
+    """Durable job queue for PDF generation"""
+
+    def __init__(self):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._handlers: Dict[str, JobHandler] = {"single": self._render_single}
+        self._tasks = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def register_handler(self, kind: str, handler: JobHandler):
+        """Register the coroutine that produces the output for jobs of `kind`"""
+        self._handlers[kind] = handler
+
+    @property
+    def is_running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    async def _bucket(self) -> AsyncIOMotorGridFSBucket:
+        db = await Database.get_database()
+        if db is None:
+            raise Exception("Database unavailable")
+        return AsyncIOMotorGridFSBucket(db, bucket_name=PDF_FILES_BUCKET)
+
+    # ------------------------------------------------------------------
+    # Producer / status API
+    # ------------------------------------------------------------------
+
+    async def enqueue(self, kind: str, payload: Dict[str, Any], **fields) -> str:
+        """Store a pending job and wake local workers. Extra fields are stored on the job."""
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for PDF job kind '{kind}'")
+
+        now = datetime.utcnow()
+        job_id = str(uuid.uuid4())
+        await DatabaseOperations.insert_one(PDF_JOBS_COLLECTION, {
+            "_id": job_id,
+            "kind": kind,
+            "status": "pending",
+            "payload": payload,
+            "attempts": 0,
+            "file_id": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+            "expires_at": now + timedelta(hours=PDF_JOB_TTL_HOURS),
+            **fields
+        })
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job_id
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job status document (any process can answer this)"""
+        return await DatabaseOperations.find_one(PDF_JOBS_COLLECTION, {"_id": job_id}, JOB_STATUS_PROJECTION)
+
+    async def open_download(self, job_id: str):
+        """GridFS stream for a completed job's output, or None"""
+        job = await self.get_job(job_id)
+        if not job or job.get("status") != "completed" or not job.get("file_id"):
+            return None
+        bucket = await self._bucket()
+        return await bucket.open_download_stream(job["file_id"])
+
+    async def report_progress(self, job_id: str, **fields):
+        """Update progress fields on a running job and extend this worker's lease"""
+        now = datetime.utcnow()
+        await DatabaseOperations.update_one(
+            PDF_JOBS_COLLECTION,
+            {"_id": job_id, "claimed_by": self.worker_id},
+            {"$set": {**fields, "updated_at": now, "lease_expires_at": now + timedelta(seconds=PDF_JOB_LEASE_SECONDS)}}
+        )
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+
+    async def claim(self, job_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Atomically claim the oldest runnable job (or a specific one).
+        Jobs whose lease expired are runnable again until they run out of attempts.
+        """
+        now = datetime.utcnow()
+        query: Dict[str, Any] = {
+            "$or": [
+                {"status": "pending"},
+                {"status": "processing", "lease_expires_at": {"$lt": now}}
+            ],
+            "attempts": {"$lt": PDF_JOB_MAX_ATTEMPTS}
+        }
+        if job_id:
+            query["_id"] = job_id
+
+        return await DatabaseOperations.find_one_and_update(
+            PDF_JOBS_COLLECTION,
+            query,
+            {
+                "$set": {
+                    "status": "processing",
+                    "claimed_by": self.worker_id,
+                    "claimed_at": now,
+                    "lease_expires_at": now + timedelta(seconds=PDF_JOB_LEASE_SECONDS),
+                    "updated_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("created_at", 1)]
+        )
+
+    async def process_job(self, job_id: str) -> bool:
+        """Claim and run one specific job in this process (used when no worker loop runs here)"""
+        job = await self.claim(job_id)
+        if not job:
+            return False
+        await self._run_job(job)
+        return True
+
+    async def _run_job(self, job: Dict[str, Any]):
+        job_id, kind = job["_id"], job["kind"]
+        started = time.monotonic()
+        PDF_JOB_WAIT.observe(max((job["claimed_at"] - job["created_at"]).total_seconds(), 0))
+
+        try:
+            handler = self._handlers.get(kind)
+            if handler is None:
+                raise Exception(f"No handler registered for PDF job kind '{kind}'")
+
+            filename, output = await handler(job, self)
+            file_id = await self._store_output(job_id, filename, output)
+
+            now = datetime.utcnow()
+            result = await DatabaseOperations.update_one(
+                PDF_JOBS_COLLECTION,
+                {"_id": job_id, "claimed_by": self.worker_id},
+                {"$set": {
+                    "status": "completed",
+                    "file_id": file_id,
+                    "filename": filename,
+                    "completed_at": now,
+                    "updated_at": now
+                }}
+            )
+            if not result:
+                # Lease was lost and another worker owns the job now - drop our copy
+                await (await self._bucket()).delete(file_id)
+                logger.warning(f"PDF job {job_id} was reclaimed by another worker, discarded duplicate output")
+                return
+
+            PDF_JOBS_TOTAL.labels(kind=kind, status="completed").inc()
+            logger.info(f"✅ PDF job {job_id} ({kind}) completed in {time.monotonic() - started:.2f}s")
+
+        except Exception as e:
+            logger.error(f"❌ PDF job {job_id} ({kind}) failed: {e}")
+            PDF_JOBS_TOTAL.labels(kind=kind, status="failed").inc()
+            await DatabaseOperations.update_one(
+                PDF_JOBS_COLLECTION,
+                {"_id": job_id, "claimed_by": self.worker_id},
+                {"$set": {"status": "failed", "error": str(e), "updated_at": datetime.utcnow()}}
+            )
+        finally:
+            PDF_JOB_DURATION.labels(kind=kind).observe(time.monotonic() - started)
+
+    async def _store_output(self, job_id: str, filename: str, output: Union[bytes, str]):
+        """Upload output to GridFS; local files are removed once uploaded"""
+        bucket = await self._bucket()
+        metadata = {
+            "job_id": job_id,
+            "expires_at": datetime.utcnow() + timedelta(hours=PDF_JOB_TTL_HOURS)
+        }
+        if isinstance(output, bytes):
+            return await bucket.upload_from_stream(filename, output, metadata=metadata)
+
+        try:
+            with open(output, "rb") as source:
+                return await bucket.upload_from_stream(filename, source, metadata=metadata)
+        finally:
+            os.remove(output)
+
+    async def _render_single(self, job: Dict[str, Any], queue: "PDFJobQueue") -> JobResult:
+        payload = job["payload"]
+        pdf_bytes = await pdf_service.generate_pdf_bytes(
+            payload["html_content"], payload.get("width", 1052), payload.get("height", 744)
+        )
+        return safe_pdf_filename(payload.get("filename") or "certificate"), pdf_bytes
+
+    async def _worker_loop(self, index: int):
+        """Claim and run jobs until cancelled"""
+        while True:
+            try:
+                job = await self.claim()
+                if job:
+                    await self._run_job(job)
+                    continue
+
+                # Idle: wait for a local enqueue or poll for jobs from other processes
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=PDF_JOB_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"PDF worker loop {index} error: {e}")
+                await asyncio.sleep(PDF_JOB_POLL_SECONDS)
+
+    async def _maintenance_loop(self):
+        """Refresh the queue depth gauge and garbage-collect expired output"""
+        last_gc = 0.0
+        while True:
+            try:
+                PDF_QUEUE_DEPTH.set(await DatabaseOperations.count_documents(
+                    PDF_JOBS_COLLECTION, {"status": "pending"}
+                ))
+                if time.monotonic() - last_gc >= PDF_JOB_GC_INTERVAL_SECONDS:
+                    last_gc = time.monotonic()
+                    await self.collect_garbage()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"PDF queue maintenance error: {e}")
+            await asyncio.sleep(15)
+
+    async def collect_garbage(self) -> Dict[str, int]:
+        """
+        Remove expired GridFS output and fail jobs that exhausted their attempts.
+        Expired job documents themselves are removed by the TTL index.
+        """
+        now = datetime.utcnow()
+        bucket = await self._bucket()
+        db = await Database.get_database()
+
+        removed = 0
+        async for grid_file in db[f"{PDF_FILES_BUCKET}.files"].find({"metadata.expires_at": {"$lt": now}}, {"_id": 1}):
+            await bucket.delete(grid_file["_id"])
+            removed += 1
+
+        abandoned = await DatabaseOperations.update_many(
+            PDF_JOBS_COLLECTION,
+            {"status": "processing", "lease_expires_at": {"$lt": now}, "attempts": {"$gte": PDF_JOB_MAX_ATTEMPTS}},
+            {"$set": {"status": "failed", "error": "Job abandoned after repeated worker failures", "updated_at": now}}
+        )
+
+        # Scratch files left behind by interrupted batch jobs
+        pdf_service.cleanup_old_files(max_age_hours=max(int(PDF_JOB_TTL_HOURS), 1))
+
+        abandoned_count = abandoned.modified_count if abandoned else 0
+        if removed or abandoned_count:
+            logger.info(f"🗑️ PDF queue GC: {removed} expired files removed, {abandoned_count} abandoned jobs failed")
+        return {"files_removed": removed, "jobs_failed": abandoned_count}
+
+    async def start(self, concurrency: int = PDF_WORKER_CONCURRENCY):
+        """Start the worker loops (one per PDF worker process) and the maintenance loop"""
+        if self.is_running:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker_loop(i)) for i in range(max(concurrency, 1))]
+        self._tasks.append(asyncio.create_task(self._maintenance_loop()))
+        logger.info(f"🖨️ PDF job workers started ({concurrency} loops, worker {self.worker_id})")
+
+    async def stop(self):
+        """Stop the loops; jobs in flight are re-claimed by another worker after their lease expires"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+# Singleton instance
+pdf_job_queue = PDFJobQueue()
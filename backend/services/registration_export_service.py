@@ -0,0 +1,191 @@
+"""
+Registration Export Service
+===========================
+Streams an event's registrations as CSV or XLSX.
+
+Registrations are read from student_registrations and faculty_registrations
+in cursor batches, with only the selected fields projected at the database,
+and every batch is written out before the next one is fetched. Memory use
+therefore stays flat however many participants an event has. Team
+registrations produce one row per member.
+"""
+
+import os
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+from database.operations import DatabaseOperations
+from utils.stream_writers import STREAM_WRITERS, get_stream_writer
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "500"))
+
+STREAMING_FORMATS = tuple(STREAM_WRITERS)
+
+
+class _Literal(str):
+    """A fixed cell value used in place of a document path"""
+
+
+@dataclass(frozen=True)
+class ExportField:
+    """One export column and where its value lives in each kind of registration"""
+    header: str
+    student: Optional[str] = None  # path in an individual student registration
+    faculty: Optional[str] = None  # path in a faculty registration
+    member: Optional[str] = None   # path in a team_members entry
+    team: Optional[str] = None     # path in the team registration, for values shared by all members
+
+
+EXPORT_FIELDS: Dict[str, ExportField] = {
+    "registration_id": ExportField("Registration ID", "registration_id", "registration_id", team="registration_id"),
+    "participant_type": ExportField("Participant Type", _Literal("Student"), _Literal("Faculty"), _Literal("Student")),
+    "enrollment_no": ExportField("Enrollment No.", "student.enrollment_no", "faculty.employee_id", "student.enrollment_no"),
+    "full_name": ExportField("Full Name", "student.name", "faculty.name", "student.name"),
+    "department": ExportField("Department", "student.department", "faculty.department", "student.department"),
+    "semester": ExportField("Semester", "student.semester", None, "student.semester"),
+    "designation": ExportField("Designation", None, "faculty.designation"),
+    "email": ExportField("Email", "student.email", "faculty.email", "student.email"),
+    "mobile_no": ExportField("Mobile No.", "student.phone", "faculty.contact_no", "student.phone"),
+    "gender": ExportField("Gender", "student.gender", "faculty.gender", "student.gender"),
+    "registration_datetime": ExportField("Registration Date", "registration.registered_at", "registration.registered_at", team="team.registered_at"),
+    "status": ExportField("Status", "registration.status", "registration.status", team="team.status"),
+    "team_name": ExportField("Team Name", None, None, team="team.team_name"),
+    "team_leader": ExportField("Team Leader", _Literal("Individual"), _Literal("Individual"), "is_team_leader"),
+}
+
+# Field selections of the export types offered in the admin panel
+EXPORT_TYPE_FIELDS = {
+    "quick-standard": ["enrollment_no", "full_name", "department", "semester", "email", "mobile_no", "registration_datetime"],
+    "sign-sheet": ["enrollment_no", "full_name", "department", "semester"],
+    "custom": ["enrollment_no", "full_name", "department", "registration_datetime"],
+}
+
+
+def _get_path(document: Dict[str, Any], path: Optional[str]) -> Any:
+    if path is None:
+        return None
+    if isinstance(path, _Literal):
+        return str(path)
+    value: Any = document
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _format_value(value: Any) -> Any:
+    """Cell value: dates as 'YYYY-MM-DD HH:MM', flags as Yes/No, numbers kept numeric"""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "Yes" if value else "No"
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M")
+    if isinstance(value, (int, float, str)):
+        return value
+    return str(value)
+
+
+class RegistrationExportService:
+    """Streams registration exports for an event"""
+
+    def select_fields(self, export_type: str = "custom", fields: Optional[Sequence[str]] = None) -> List[str]:
+        """
+        Columns for an export: the explicit `fields` of a custom export, or the
+        preset of `export_type`.
+
+        Raises:
+            ValueError: For unknown export types or field names
+        """
+        if export_type not in EXPORT_TYPE_FIELDS:
+            raise ValueError(f"Unknown export type: {export_type}")
+        selected = list(fields) if export_type == "custom" and fields else EXPORT_TYPE_FIELDS[export_type]
+        unknown = [field for field in selected if field not in EXPORT_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown export fields: {', '.join(unknown)}")
+        return list(dict.fromkeys(selected))
+
+    def _projection(self, fields: List[str], kind: str) -> Dict[str, int]:
+        """Only the paths the selected columns read from `kind` ("student" or "faculty") documents"""
+        projection = {"_id": 0}
+        for field in fields:
+            spec = EXPORT_FIELDS[field]
+            paths = [spec.faculty] if kind == "faculty" else [
+                spec.student,
+                spec.team,
+                f"team_members.{spec.member}" if spec.member and not isinstance(spec.member, _Literal) else None,
+            ]
+            for path in paths:
+                if path and not isinstance(path, _Literal):
+                    projection[path] = 1
+        if kind == "student":
+            projection["registration_type"] = 1
+            # Keeps one (empty) entry per member even when no member field is selected
+            projection.setdefault("team_members.registration_id", 1)
+        return projection
+
+    def _rows(self, registration: Dict[str, Any], fields: List[str], kind: str) -> List[List[Any]]:
+        if kind == "faculty":
+            return [[_format_value(_get_path(registration, EXPORT_FIELDS[field].faculty)) for field in fields]]
+        if registration.get("registration_type") == "team":
+            return [
+                [
+                    _format_value(
+                        _get_path(member, EXPORT_FIELDS[field].member)
+                        if EXPORT_FIELDS[field].member else
+                        _get_path(registration, EXPORT_FIELDS[field].team)
+                    )
+                    for field in fields
+                ]
+                for member in registration.get("team_members") or []
+            ]
+        return [[_format_value(_get_path(registration, EXPORT_FIELDS[field].student)) for field in fields]]
+
+    async def stream(self, event: Dict[str, Any], fields: List[str], file_format: str,
+                     signature_column: bool = False, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[bytes]:
+        """
+        Yield the export file for `event` chunk by chunk.
+
+        Args:
+            event: The event document (event_id and event_name are used)
+            fields: Columns, as returned by select_fields
+            file_format: One of STREAMING_FORMATS
+            signature_column: Append an empty "Signature" column (sign sheets)
+            batch_size: Registrations fetched and written per step
+        """
+        event_id = event["event_id"]
+        writer = get_stream_writer(file_format, sheet_name=event.get("event_name") or "Registrations")
+        headers = [EXPORT_FIELDS[field].header for field in fields] + (["Signature"] if signature_column else [])
+        padding = [""] if signature_column else []
+        exported = 0
+
+        yield writer.start(headers)
+        for collection, kind in (("student_registrations", "student"), ("faculty_registrations", "faculty")):
+            async for batch in DatabaseOperations.find_batches(
+                collection, {"event.event_id": event_id}, self._projection(fields, kind), batch_size=batch_size
+            ):
+                rows = [row + padding for registration in batch for row in self._rows(registration, fields, kind)]
+                exported += len(rows)
+                yield writer.write_rows(rows)
+        yield writer.finish()
+
+        logger.info(f"Exported {exported} registration rows for event {event_id} as {file_format}")
+
+    def filename(self, event: Dict[str, Any], export_type: str, file_format: str) -> str:
+        """Download name such as tech_fest_2025_registrations.xlsx"""
+        event_name = re.sub(r"[^a-z0-9]+", "_", (event.get("event_name") or "event").lower()).strip("_") or "event"
+        suffix = "sign_sheet" if export_type == "sign-sheet" else "registrations"
+        return f"{event_name}_{suffix}.{STREAM_WRITERS[file_format].extension}"
+
+    def media_type(self, file_format: str) -> str:
+        return STREAM_WRITERS[file_format].media_type
+
+
+# Create singleton instance
+registration_export_service = RegistrationExportService()
@@ -15,9 +15,9 @@ Key Features:
 
 from typing import Dict, List, Optional, Any
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 
-import re
+from utils.pattern_table import PatternTable
 
 class VenueType(Enum):
     """Venue type classifications for attendance strategy hints"""
@@ -89,6 +89,9 @@ class VenueIntelligenceService:
         ]
     }
     
+    # VENUE_CLASSIFICATION_PATTERNS compiled once, with a literal prefilter (see utils.pattern_table)
+    VENUE_CLASSIFICATION_TABLE = PatternTable(VENUE_CLASSIFICATION_PATTERNS)
+    
     # Venue characteristics database
     VENUE_CHARACTERISTICS = {
         VenueType.AUDITORIUM: VenueCharacteristics(
@@ -180,6 +183,7 @@ class VenueIntelligenceService:
         "large": [r"auditorium|theater|complex", r"capacity.*[1-9]\d{2}|[1-9]\d{2}.*seater"],
         "very_large": [r"stadium|ground|field|arena", r"capacity.*\d{4,}|\d{4,}.*seater"]
     }
+    CAPACITY_TABLE = PatternTable(CAPACITY_PATTERNS)
     
     @classmethod
     def analyze_venue(cls, venue_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -214,8 +218,9 @@ class VenueIntelligenceService:
         )
         
         # Override capacity range if detected from text/numbers
+        # (on a copy: the characteristics database is shared by every analysis)
         if capacity_range != "medium":  # Don't override if we couldn't detect
-            characteristics.capacity_range = capacity_range
+            characteristics = replace(characteristics, capacity_range=capacity_range)
         
         # Generate strategy recommendations based on venue
         strategy_recommendations = cls._generate_venue_strategy_recommendations(
@@ -245,15 +250,8 @@ class VenueIntelligenceService:
     @classmethod
     def _classify_venue_type(cls, venue_text: str) -> VenueType:
         """Classify venue type based on text patterns"""
-        type_scores = {}
-        
         # Score each venue type based on pattern matches
-        for venue_type, patterns in cls.VENUE_CLASSIFICATION_PATTERNS.items():
-            score = 0
-            for pattern in patterns:
-                matches = len(re.findall(pattern, venue_text))
-                score += matches
-            type_scores[venue_type] = score
+        type_scores = cls.VENUE_CLASSIFICATION_TABLE.counts(venue_text)
         
         # Find the highest scoring venue type
         max_score = max(type_scores.values()) if type_scores else 0
@@ -284,12 +282,7 @@ class VenueIntelligenceService:
                 return "very_large"
         
         # Otherwise, analyze text patterns
-        for capacity_range, patterns in cls.CAPACITY_PATTERNS.items():
-            for pattern in patterns:
-                if re.search(pattern, venue_text):
-                    return capacity_range
-        
-        return "medium"  # Default fallback
+        return cls.CAPACITY_TABLE.first_match(venue_text) or "medium"  # Default fallback
     
     @classmethod
     def _generate_venue_strategy_recommendations(cls, characteristics: VenueCharacteristics, 
@@ -371,8 +364,7 @@ class VenueIntelligenceService:
     @classmethod
     def _calculate_venue_confidence(cls, venue_type: VenueType, venue_text: str) -> float:
         """Calculate confidence score for venue classification"""
-        patterns = cls.VENUE_CLASSIFICATION_PATTERNS.get(venue_type, [])
-        match_count = sum(len(re.findall(pattern, venue_text)) for pattern in patterns)
+        match_count = cls.VENUE_CLASSIFICATION_TABLE.counts(venue_text).get(venue_type, 0)
         
         base_confidence = 0.5
         match_bonus = min(0.4, match_count * 0.1)
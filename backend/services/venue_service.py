@@ -9,6 +9,7 @@ from datetime import datetime
 import pytz
 from database.operations import DatabaseOperations
 from models.venue import Venue, VenueCreate, VenueUpdate, VenueResponse
+from utils.two_tier_cache import two_tier_cached
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +17,11 @@ logger = logging.getLogger(__name__)
 class VenueService:
     """Service class for managing university venues"""
 
+    @staticmethod
+    async def invalidate_venue_cache():
+        """Drop cached venue lists in every worker; call after any venue write"""
+        await VenueService.get_all_venues.invalidate()
+
     @staticmethod
     async def create_venue(venue_data: VenueCreate, created_by: str, venue_id: str = None) -> VenueResponse:
         """Create a new venue"""
@@ -46,6 +52,7 @@ class VenueService:
             if result:
                 venue = Venue(**venue_doc)
                 logger.info(f"Venue created successfully: {venue_id}")
+                await VenueService.invalidate_venue_cache()
                 return VenueResponse(
                     success=True,
                     message="Venue created successfully",
@@ -66,8 +73,15 @@ class VenueService:
             )
 
     @staticmethod
+    @two_tier_cached(
+        "venues",
+        key=lambda include_inactive=False: "all" if include_inactive else "active",
+        encode=lambda response: response.model_dump(mode="json"),
+        decode=VenueResponse.model_validate,
+        cache_if=lambda response: response["success"],
+    )
     async def get_all_venues(include_inactive: bool = False) -> VenueResponse:
-        """Get all venues"""
+        """Get all venues sorted by name (cached; venue writes call invalidate_venue_cache)"""
         try:
             # Build query filter
             query = {}
@@ -75,7 +89,7 @@ class VenueService:
                 query["is_active"] = True
 
             # Get venues from database
-            venues_data = await DatabaseOperations.find_many("venues", query)
+            venues_data = await DatabaseOperations.find_many("venues", query, sort_by=[("name", 1)])
             
             venues = [Venue(**venue_data) for venue_data in venues_data]
             
@@ -154,6 +168,7 @@ class VenueService:
                 venue = Venue(**updated_venue_data)
                 
                 logger.info(f"Venue updated successfully: {venue_id}")
+                await VenueService.invalidate_venue_cache()
                 return VenueResponse(
                     success=True,
                     message="Venue updated successfully",
@@ -184,6 +199,7 @@ class VenueService:
 
             if result.modified_count > 0:
                 logger.info(f"Venue deleted successfully: {venue_id}")
+                await VenueService.invalidate_venue_cache()
                 return VenueResponse(
                     success=True,
                     message="Venue deleted successfully"
@@ -0,0 +1,14 @@
+"""
+Shared pytest setup: run from backend/ with `python -m pytest tests`.
+
+The settings below only need to exist for the application modules to import;
+the tests never reach MongoDB or Redis.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ.setdefault("MONGODB_URL", "mongodb://localhost:1")
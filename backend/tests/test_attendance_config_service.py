@@ -0,0 +1,137 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from database.operations import DatabaseOperations
+from models.dynamic_attendance import AttendanceIntelligenceService
+from services.attendance_config_service import (
+    ATTENDANCE_CONFIG_VERSION,
+    CONFIG_FIELD,
+    AttendanceConfigService,
+)
+
+
+def make_event(**fields):
+    event = {
+        "event_id": "EVT1",
+        "event_name": "Hands-on Workshop on Machine Learning",
+        "event_type": "Workshop",
+        "detailed_description": "Three days of supervised and unsupervised learning labs.",
+        "start_datetime": datetime(2025, 9, 12, 9, 0),
+        "end_datetime": datetime(2025, 9, 14, 17, 0),
+        "registration_mode": "individual",
+    }
+    event.update(fields)
+    return event
+
+
+@pytest.fixture
+def no_detection(monkeypatch):
+    def detect(*args, **kwargs):
+        raise AssertionError("strategy detection should not run")
+
+    monkeypatch.setattr(AttendanceIntelligenceService, "create_dynamic_config", detect)
+    monkeypatch.setattr(AttendanceIntelligenceService, "detect_attendance_strategy", detect)
+
+
+def test_admin_override_is_used(no_detection):
+    event = make_event(attendance_strategy={
+        "strategy": "session_based",
+        "criteria": {"minimum_percentage": 50},
+        "sessions": [{"session_id": "s1", "session_name": "Round 1"}],
+    })
+
+    config = AttendanceConfigService().build_config(event)
+
+    assert config["strategy"] == "session_based"
+    assert config["criteria"]["minimum_percentage"] == 50
+    assert config["sessions"] == [{"session_id": "s1", "session_name": "Round 1"}]
+    assert config["auto_generated"] is False
+    assert config["attendance_skeleton"]["strategy"] == "session_based"
+
+
+def test_stored_auto_detected_fields_are_used(no_detection):
+    event = make_event(
+        attendance_strategy="day_based",
+        attendance_criteria={"minimum_percentage": 80.0, "required_sessions": None},
+        attendance_sessions=[],
+        attendance_auto_generated=True,
+    )
+
+    config = AttendanceConfigService().build_config(event)
+
+    assert config["strategy"] == "day_based"
+    assert config["criteria"]["minimum_percentage"] == 80.0
+    assert [day["day"] for day in config["attendance_skeleton"]["days"]] == [1, 2, 3]
+
+
+def test_attendance_not_mandatory_skips_detection(no_detection):
+    event = make_event(attendance_mandatory=False, attendance_strategy=None)
+
+    config = AttendanceConfigService().build_config(event)
+
+    assert config["strategy"] == "single_mark"
+    assert config["attendance_skeleton"]["marked"] is False
+
+
+def test_events_without_attendance_fields_are_detected():
+    config = AttendanceConfigService().build_config(make_event())
+
+    assert config["strategy"] == AttendanceIntelligenceService.detect_attendance_strategy(make_event()).value
+    assert config["version"] == ATTENDANCE_CONFIG_VERSION
+
+
+def test_is_current_follows_the_inputs():
+    service = AttendanceConfigService()
+    event = make_event(attendance_strategy="day_based")
+    event[CONFIG_FIELD] = service.build_config(event)
+
+    assert service.is_current(event)
+    assert not service.is_current({**event, "attendance_strategy": "single_mark"})
+    assert not service.is_current({**event, "end_datetime": datetime(2025, 9, 15, 17, 0)})
+    assert not service.is_current({**event, CONFIG_FIELD: {**event[CONFIG_FIELD], "version": ATTENDANCE_CONFIG_VERSION - 1}})
+    assert not service.is_current(make_event())
+
+
+def test_get_config_serves_the_stored_copy(monkeypatch):
+    service = AttendanceConfigService()
+    event = make_event(attendance_strategy="single_mark")
+    event[CONFIG_FIELD] = service.build_config(event)
+
+    async def update_one(*args, **kwargs):
+        raise AssertionError("a current config is not written back")
+
+    monkeypatch.setattr(DatabaseOperations, "update_one", update_one)
+
+    assert asyncio.run(service.get_config(event)) is event[CONFIG_FIELD]
+
+
+def test_get_config_rebuilds_once_and_writes_back(monkeypatch):
+    service = AttendanceConfigService()
+    writes = []
+
+    async def update_one(collection, query, update, *args, **kwargs):
+        writes.append((collection, query, update))
+        return True
+
+    monkeypatch.setattr(DatabaseOperations, "update_one", update_one)
+    event = make_event(attendance_strategy="session_based")
+
+    first = asyncio.run(service.get_config(event))
+    second = asyncio.run(service.get_config(event))
+
+    assert first["strategy"] == "session_based"
+    assert second is first
+    assert writes == [("events", {"event_id": "EVT1"}, {"$set": {CONFIG_FIELD: first}})]
+
+
+def test_new_attendance_record_is_a_copy():
+    service = AttendanceConfigService()
+    event = make_event(attendance_strategy="day_based")
+    event[CONFIG_FIELD] = service.build_config(event)
+
+    record = asyncio.run(service.new_attendance_record(event))
+    record["days"][0]["marked"] = True
+
+    assert event[CONFIG_FIELD]["attendance_skeleton"]["days"][0]["marked"] is False
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from fastapi import BackgroundTasks, HTTPException
+
+from app.v1.certificates import pdf_generation
+from app.v1.certificates.pdf_generation import BatchCertificateRequest
+from models.admin_user import AdminRole, AdminUser
+from services.certificate_batch_service import certificate_batch_service
+from services.pdf_job_queue import pdf_job_queue
+
+BATCH_JOB = {"_id": "JOB1", "kind": "batch", "status": "pending", "requested_by": "organizer", "total": 2,
+             "completed": 0, "failed": 0, "errors": []}
+
+
+def make_admin(username="organizer", role=AdminRole.ORGANIZER_ADMIN, assigned_events=None):
+    return AdminUser(fullname="Event Admin", username=username, email=f"{username}@example.com",
+                     password="password123", role=role, assigned_events=assigned_events or [])
+
+
+@pytest.fixture
+def start_batch(monkeypatch):
+    calls = []
+
+    async def fake_start_batch(**kwargs):
+        calls.append(kwargs)
+        return {"success": True, "message": "", "job_id": "JOB1", "total": 2}
+
+    monkeypatch.setattr(certificate_batch_service, "start_batch", fake_start_batch)
+    monkeypatch.setattr(type(pdf_job_queue), "is_running", property(lambda self: True))
+    return calls
+
+
+def run_batch(admin):
+    request = BatchCertificateRequest(event_id="EVT1", certificate_type="participation")
+    return asyncio.run(pdf_generation.generate_event_certificates_batch(request, BackgroundTasks(), admin))
+
+
+def test_organizer_cannot_batch_unassigned_event(start_batch):
+    with pytest.raises(HTTPException) as error:
+        run_batch(make_admin(assigned_events=["EVT2"]))
+
+    assert error.value.status_code == 403
+    assert start_batch == []
+
+
+def test_batch_records_the_requesting_admin(start_batch):
+    assert run_batch(make_admin(assigned_events=["EVT1"])).job_id == "JOB1"
+    assert run_batch(make_admin("chief", AdminRole.SUPER_ADMIN)).job_id == "JOB1"
+    assert [call["requested_by"] for call in start_batch] == ["organizer", "chief"]
+
+
+@pytest.mark.parametrize("admin, status_code", [
+    (None, 401),
+    (make_admin("other", AdminRole.SUPER_ADMIN), 403),
+])
+def test_batch_job_is_limited_to_its_requester(monkeypatch, admin, status_code):
+    async def get_job(job_id):
+        return dict(BATCH_JOB)
+
+    monkeypatch.setattr(pdf_job_queue, "get_job", get_job)
+
+    for endpoint in (pdf_generation.get_pdf_status, pdf_generation.download_certificate_pdf):
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(endpoint("JOB1", admin))
+        assert error.value.status_code == status_code
+
+    assert asyncio.run(pdf_generation.get_pdf_status("JOB1", make_admin())).status == "pending"
+
+
+def test_single_certificate_jobs_stay_open(monkeypatch):
+    async def get_job(job_id):
+        return {"_id": job_id, "kind": "certificate", "status": "pending"}
+
+    monkeypatch.setattr(pdf_job_queue, "get_job", get_job)
+
+    assert asyncio.run(pdf_generation.get_pdf_status("JOB2", None)).status == "pending"
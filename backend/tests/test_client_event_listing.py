@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+from app.v1.client.events import _after_cursor, _profile_conditions, get_events_list, get_events_unified
+from database.operations import DatabaseOperations
+from models.student import Student
+from utils.event_status_manager import EventStatusManager
+from utils.redis_cache import event_cache
+
+
+def make_student(department="CSE", semester=5):
+    return Student(enrollment_no="22CE001", email="asha@example.com", mobile_no="9876543210",
+                   password_hash="hash", department=department, semester=semester)
+
+
+@pytest.fixture
+def database(monkeypatch):
+    calls = {"find_many": [], "listing_page": [], "aggregate": []}
+
+    async def find_many(collection, query, projection=None, limit=0, skip=0, sort_by=None):
+        calls["find_many"].append({"query": query, "sort_by": sort_by})
+        return []
+
+    async def count_documents(collection, query):
+        return 0
+
+    async def distinct(collection, field):
+        return ["technical", "cultural", None]
+
+    async def aggregate(collection, pipeline):
+        calls["aggregate"].append(pipeline)
+        return [{"_id": "technical", "count": 3}, {"_id": None, "count": 1}]
+
+    async def get_listing_page(*args, **kwargs):
+        calls["listing_page"].append(kwargs)
+        return None
+
+    monkeypatch.setattr(DatabaseOperations, "find_many", find_many)
+    monkeypatch.setattr(DatabaseOperations, "count_documents", count_documents)
+    monkeypatch.setattr(DatabaseOperations, "distinct", distinct)
+    monkeypatch.setattr(DatabaseOperations, "aggregate", aggregate)
+    monkeypatch.setattr(event_cache, "get_listing_page", get_listing_page)
+    return calls
+
+
+def list_events(current_user=None, **params):
+    params = {"mode": "list", "status": "all", "category": None, "q": None, "page": 1, "limit": 10,
+              "cursor": None, "order": "asc", "match_profile": False, "force_refresh": False, **params}
+    return asyncio.run(get_events_unified(current_user=current_user, **params))
+
+
+def test_descending_cursor_continues_below_the_last_event():
+    assert _after_cursor("2025-03-01", "EVT5", descending=True) == {"$or": [
+        {"start_datetime": {"$lt": "2025-03-01"}},
+        {"start_datetime": None},
+        {"start_datetime": "2025-03-01", "event_id": {"$lt": "EVT5"}},
+    ]}
+    # Undated events sort last when descending, so only they remain after one
+    assert _after_cursor(None, "EVT5", descending=True) == {"start_datetime": None, "event_id": {"$lt": "EVT5"}}
+
+
+def test_profile_conditions_need_department_and_semester():
+    assert _profile_conditions(make_student()) == [
+        {"student_department": "CSE"},
+        {"student_semester": {"$in": ["5", "SEM5"]}},
+    ]
+    assert _profile_conditions(make_student(semester=None)) == []
+    assert _profile_conditions(None) == []
+
+
+def test_live_status_selects_ongoing_events():
+    assert EventStatusManager.status_query("live")["status"] == "ongoing"
+    assert EventStatusManager.matches_status({"status": "ongoing", "sub_status": "event_ended"}, "live")
+    assert not EventStatusManager.matches_status({"status": "upcoming", "sub_status": "registration_open"}, "live")
+
+
+def test_descending_listing_reverses_the_sort(database):
+    assert list_events(order="desc")["success"]
+
+    assert database["listing_page"][0]["descending"] is True
+    assert database["find_many"][0]["sort_by"] == [("start_datetime", -1), ("event_id", -1)]
+
+
+def test_profile_listing_is_filtered_in_mongo(database, monkeypatch):
+    async def find_one(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(DatabaseOperations, "find_one", find_one)
+
+    assert list_events(make_student(), status="live", match_profile=True)["success"]
+
+    # The cached listing indexes hold every student event, so profile filtering skips them
+    assert database["listing_page"] == []
+    conditions = database["find_many"][0]["query"]["$and"]
+    assert {"student_department": "CSE"} in conditions
+    assert {"status": "ongoing", "event_approval_status": {"$ne": "pending_approval"}} in conditions
+
+
+def test_legacy_list_keeps_ascending_unfiltered_pages(database):
+    params = {"status": "all", "category": None, "page": 1, "limit": 10, "cursor": None, "force_refresh": False}
+    assert asyncio.run(get_events_list(current_user=make_student(), **params))["success"]
+
+    assert database["listing_page"][0]["descending"] is False
+
+
+def test_categories_mode_counts_matching_events(database):
+    result = list_events(mode="categories", status="upcoming")
+
+    assert result["categories"] == ["cultural", "technical"]
+    assert result["counts"] == {"technical": 3}
+    assert result["total_events"] == 4
+    assert {"status": "upcoming", "event_approval_status": {"$ne": "pending_approval"}} in \
+        database["aggregate"][0][0]["$match"]["$and"]
@@ -0,0 +1,81 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from database.operations import DatabaseOperations
+from services.event_attendance_service import EventAttendanceService
+
+# Microseconds are dropped to milliseconds when Mongo stores the mark
+MARKED_AT = datetime(2025, 9, 12, 10, 30, 0, 123456)
+STORED_AT = datetime(2025, 9, 12, 10, 30, 0, 123000)
+
+
+@pytest.fixture
+def service():
+    return EventAttendanceService()
+
+
+def test_single_mark_matches_stored_precision(service):
+    attendance = {"strategy": "single_mark", "marked": True, "marked_at": STORED_AT, "marked_by": "Asha"}
+
+    assert service._is_target_marked_by(attendance, "single_mark", {}, MARKED_AT, "Asha")
+    assert not service._is_target_marked_by(attendance, "single_mark", {}, MARKED_AT, "Ravi")
+    assert not service._is_target_marked_by({**attendance, "marked_at": datetime(2025, 9, 12, 10, 29)},
+                                            "single_mark", {}, MARKED_AT, "Asha")
+
+
+def test_day_based_checks_the_target_day(service):
+    attendance = {"days": [
+        {"day": 1, "marked": True, "marked_at": datetime(2025, 9, 11, 9, 0)},
+        {"day": 2, "marked": True, "marked_at": STORED_AT},
+    ]}
+
+    assert service._is_target_marked_by(attendance, "day_based", {"day": 2}, MARKED_AT, "Asha")
+    assert not service._is_target_marked_by(attendance, "day_based", {"day": 1}, MARKED_AT, "Asha")
+    assert not service._is_target_marked_by(attendance, "day_based", {"day": 3}, MARKED_AT, "Asha")
+
+
+def test_session_based_checks_the_target_session(service):
+    attendance = {"sessions": [{"session_id": "s2", "marked": True, "marked_at": STORED_AT}]}
+
+    assert service._is_target_marked_by(attendance, "session_based", {"session_id": "s2"}, MARKED_AT, "Asha")
+    assert not service._is_target_marked_by(attendance, "session_based", {"session_id": "s1"}, MARKED_AT, "Asha")
+
+
+def test_milestone_based_uses_completed_at(service):
+    attendance = {"milestones": [{"milestone_id": "m1", "completed": True, "completed_at": STORED_AT}]}
+
+    assert service._is_target_marked_by(attendance, "milestone_based", {"milestone_id": "m1"}, MARKED_AT, "Asha")
+    assert not service._is_target_marked_by(
+        {"milestones": [{"milestone_id": "m1", "completed": True, "marked_at": STORED_AT}]},
+        "milestone_based", {"milestone_id": "m1"}, MARKED_AT, "Asha"
+    )
+
+
+def test_extract_mark_target(service):
+    assert service._extract_mark_target("single_mark", {}) == {}
+    assert service._extract_mark_target("day_based", {"day_number": "2"}) == {"day": 2}
+    assert service._extract_mark_target("day_based", {}) is None
+    assert service._extract_mark_target("session_based", {"session_id": "s1"}) == {"session_id": "s1", "session_name": "s1"}
+    with pytest.raises(ValueError):
+        service._extract_mark_target("day_based", {"day": "two"})
+
+
+def test_bulk_mark_reports_invalid_day_per_row(service, monkeypatch):
+    registrations = [{"student": {"enrollment_no": "E1"}, "attendance": {"strategy": "day_based", "days": [{"day": 1}]}}]
+
+    async def find_many(*args, **kwargs):
+        return registrations
+
+    async def bulk_write(*args, **kwargs):
+        raise AssertionError("no valid rows to write")
+
+    monkeypatch.setattr(DatabaseOperations, "find_many", find_many)
+    monkeypatch.setattr(DatabaseOperations, "bulk_write", bulk_write)
+
+    result = asyncio.run(service.bulk_mark_attendance("EVT1", [{"enrollment_no": "E1", "day": "first"}], "Asha"))
+
+    assert result["success"] is True
+    assert result["results"] == [{"success": False, "enrollment_no": "E1", "message": "Invalid day: first"}]
+    assert result["summary"]["failed"] == 1
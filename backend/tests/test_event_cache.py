@@ -0,0 +1,46 @@
+from utils.event_status_manager import EventStatusManager
+from utils.redis_cache import EventCache
+
+
+def make_event(status, sub_status, audience="both", approval="approved"):
+    return {
+        "event_id": "EVT1",
+        "status": status,
+        "sub_status": sub_status,
+        "target_audience": audience,
+        "event_approval_status": approval,
+    }
+
+
+def statuses_of(event):
+    cache = EventCache()
+    keys = cache._index_keys_for(event)
+    return {key[len(cache.index_prefix):].split(":")[0] for key in keys}
+
+
+def test_ongoing_index_matches_status_query():
+    assert statuses_of(make_event("upcoming", "registration_open")) == {"all", "upcoming", "ongoing"}
+    assert statuses_of(make_event("ongoing", "event_started")) == {"all", "ongoing"}
+    # Ended events and events not yet open for registration are not in the ongoing listing
+    assert statuses_of(make_event("ongoing", "event_ended")) == {"all"}
+    assert statuses_of(make_event("upcoming", "registration_not_started")) == {"all", "upcoming"}
+    assert statuses_of(make_event("completed", "certificate_available")) == {"all", "completed"}
+
+
+def test_matches_status_agrees_with_status_query():
+    query = EventStatusManager.status_query("ongoing")
+    event = make_event("upcoming", "registration_open")
+    assert event["status"] in query["status"]["$in"] and event["sub_status"] in query["sub_status"]["$in"]
+    assert EventStatusManager.matches_status(event, "ongoing")
+    assert EventStatusManager.matches_status(event, "active")
+    assert not EventStatusManager.matches_status(event, "completed")
+
+
+def test_pending_approval_events_are_not_indexed():
+    assert EventCache()._index_keys_for(make_event("upcoming", "registration_open", approval="pending_approval")) == []
+
+
+def test_index_views_follow_target_audience():
+    cache = EventCache()
+    keys = cache._index_keys_for(make_event("completed", "certificate_available", audience="faculty"))
+    assert {key.rsplit(":", 1)[1] for key in keys} == {"faculty"}
@@ -0,0 +1,71 @@
+from utils.event_search import EventSearchIndex, tokenize
+
+EVENTS = [
+    {"event_id": "E1", "event_name": "HackNova 24 Hour Hackathon", "category": "technical",
+     "detailed_description": "Build prototypes overnight with mentors."},
+    {"event_id": "E2", "event_name": "Guest Lecture on Constitutional Law", "category": "academic",
+     "detailed_description": "A talk followed by an interactive hackathon-style case study."},
+    {"event_id": "E3", "event_name": "Rhythm Cultural Fest", "category": "cultural",
+     "detailed_description": "Dance, music and drama."},
+]
+
+
+def make_index():
+    index = EventSearchIndex()
+    index.load(EVENTS)
+    return index
+
+
+def ids(results):
+    return [event_id for event_id, _ in results]
+
+
+def test_tokenize_drops_stop_words_and_punctuation():
+    assert tokenize("The Art of War-Games, 2025!") == ["art", "war", "games", "2025"]
+    assert tokenize(None) == []
+
+
+def test_prefix_matches_while_typing():
+    assert set(ids(make_index().search("hack"))) == {"E1", "E2"}
+
+
+def test_name_hits_rank_above_description_hits():
+    assert ids(make_index().search("hackathon")) == ["E1", "E2"]
+
+
+def test_exact_tokens_score_above_prefix_matches():
+    index = EventSearchIndex()
+    index.load([
+        {"event_id": "A", "event_name": "Music Night"},
+        {"event_id": "B", "event_name": "Musical Theatre"},
+    ])
+
+    assert ids(index.search("music")) == ["A", "B"]
+
+
+def test_every_query_token_must_match():
+    index = make_index()
+
+    assert ids(index.search("cultural dance")) == ["E3"]
+    assert index.search("cultural hackathon") == []
+    assert index.search("the of") == []
+
+
+def test_limit():
+    assert len(make_index().search("hack", limit=1)) == 1
+
+
+def test_incremental_add_and_discard():
+    index = make_index()
+
+    index.add({"event_id": "E4", "event_name": "Robotics Workshop", "category": "technical"})
+    assert ids(index.search("robot")) == ["E4"]
+
+    index.add({"event_id": "E4", "event_name": "Drone Workshop", "category": "technical"})
+    assert index.search("robot") == []
+    assert ids(index.search("drone")) == ["E4"]
+
+    index.discard("E4")
+    assert index.search("drone") == []
+    assert index.size == 3
+    index.discard("missing")
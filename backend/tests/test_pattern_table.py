@@ -0,0 +1,83 @@
+import re
+
+import pytest
+
+from models.dynamic_attendance import AttendanceIntelligenceService
+from services.missing_event_patterns_service import MissingEventTypePatternsService
+from services.venue_intelligence_service import VenueIntelligenceService
+from utils.pattern_table import PatternTable, required_literals
+
+TABLES = {
+    "event_type": AttendanceIntelligenceService.EVENT_TYPE_PATTERNS,
+    "additional_event": MissingEventTypePatternsService.ADDITIONAL_EVENT_PATTERNS,
+    "venue": VenueIntelligenceService.VENUE_CLASSIFICATION_PATTERNS,
+    "capacity": VenueIntelligenceService.CAPACITY_PATTERNS,
+}
+
+TEXTS = [
+    "",
+    "hacknova 2025 - 24 hour national hackathon with a coding marathon",
+    "three day hands-on workshop on machine learning in lab 3, capacity 40",
+    "guest lecture followed by a panel discussion in the main auditorium, 350 seater",
+    "inter-college cricket tournament on the sports ground, capacity 2500 spectators",
+    "cultural fest: dance, music and drama competitions across the campus",
+]
+
+
+def alternative_texts(patterns):
+    """Each alternative of each pattern written out as plain text, so every pattern gets hit"""
+    texts = []
+    for key_patterns in patterns.values():
+        for pattern in key_patterns:
+            for alternative in pattern.split("|"):
+                texts.append(re.sub(r"\\d[*+?]?|\.[*+?]?|\\|\?", " 42 ", alternative))
+    return texts + [" ".join(texts)]
+
+
+def findall_counts(patterns, text):
+    return {key: sum(len(re.findall(pattern, text)) for pattern in key_patterns) for key, key_patterns in patterns.items()}
+
+
+def search_first(patterns, text):
+    for key, key_patterns in patterns.items():
+        if any(re.search(pattern, text) for pattern in key_patterns):
+            return key
+    return None
+
+
+def test_required_literals():
+    assert required_literals(r"hackathon|coding.*marathon") == (frozenset({"hackathon"}), frozenset({"coding", "marathon"}))
+    assert required_literals(r"capacity.*\d{4,}") is None
+    assert required_literals(r"day\s*\d") is None
+    assert required_literals(r"team\d+|work-?shops?") == (frozenset({"team"}), frozenset({"work", "shop"}))
+    assert required_literals(r"q&a|c\+\+") == (frozenset({"q&a"}), frozenset({"c++"}))
+    assert required_literals(r"(pre|post)-event") is None
+    assert required_literals(r"^intro") is None
+
+
+@pytest.mark.parametrize("name", TABLES)
+def test_counts_match_findall(name):
+    patterns = TABLES[name]
+    table = PatternTable(patterns)
+
+    for text in TEXTS + alternative_texts(patterns):
+        assert table.counts(text) == findall_counts(patterns, text), text
+
+
+@pytest.mark.parametrize("name", TABLES)
+def test_first_match_matches_search(name):
+    patterns = TABLES[name]
+    table = PatternTable(patterns)
+
+    for text in TEXTS + alternative_texts(patterns):
+        assert table.first_match(text) == search_first(patterns, text), text
+
+
+def test_pattern_counts_lists_matching_patterns_in_table_order():
+    table = PatternTable({"a": [r"talk|lecture", r"panel"], "b": [r"lecture.*series"]})
+
+    assert table.pattern_counts("lecture series talk, no panel") == [
+        ("a", r"talk|lecture", 2), ("a", r"panel", 1), ("b", r"lecture.*series", 1),
+    ]
+    assert table.counts("nothing here") == {"a": 0, "b": 0}
+    assert table.first_match("nothing here") is None
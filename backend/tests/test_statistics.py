@@ -0,0 +1,86 @@
+import asyncio
+from datetime import datetime
+
+from pymongo.errors import DuplicateKeyError
+
+from database.operations import DatabaseOperations
+from utils.statistics import PLATFORM_STATS_ID, StatisticsManager
+
+COUNTS = {"registrations": 10, "certificates": 4}
+
+
+def install(monkeypatch, stored, during_recount=None):
+    """Fake the summary document, the counts and the aggregations; `during_recount` runs mid-rebuild"""
+    async def find_one(collection, query, *args, **kwargs):
+        return dict(stored) if stored else None
+
+    async def count_documents(collection, query, *args, **kwargs):
+        return 3 if collection == "events" else 7
+
+    async def registration_totals():
+        if during_recount:
+            during_recount()
+        return dict(COUNTS)
+
+    async def rating_totals():
+        return {"sum": 9.0, "count": 2}
+
+    async def find_one_and_update(collection, query, update, upsert=False, **kwargs):
+        if stored and stored.get("rebuilt_at") != query["rebuilt_at"]:
+            raise DuplicateKeyError("E11000 duplicate key")
+        stored.setdefault("_id", PLATFORM_STATS_ID)
+        stored.update(update["$set"])
+        return dict(stored)
+
+    monkeypatch.setattr(DatabaseOperations, "find_one", find_one)
+    monkeypatch.setattr(DatabaseOperations, "count_documents", count_documents)
+    monkeypatch.setattr(DatabaseOperations, "find_one_and_update", find_one_and_update)
+    monkeypatch.setattr(StatisticsManager, "_aggregate_registration_totals", staticmethod(registration_totals))
+    monkeypatch.setattr(StatisticsManager, "_aggregate_rating_totals", staticmethod(rating_totals))
+
+
+def test_first_rebuild_stores_the_counts(monkeypatch):
+    stored = {}
+    install(monkeypatch, stored)
+
+    summary = asyncio.run(StatisticsManager.rebuild_platform_stats())
+
+    assert summary["total_registrations"] == 10
+    assert summary["certificates_issued"] == 4
+    assert summary["total_events"] == 3
+    assert stored["rating_count"] == 2
+
+
+def test_rebuild_replaces_drifted_counters(monkeypatch):
+    stored = {"_id": PLATFORM_STATS_ID, "total_registrations": 13, "certificates_issued": 1, "rebuilt_at": datetime(2025, 1, 1)}
+    install(monkeypatch, stored)
+
+    summary = asyncio.run(StatisticsManager.rebuild_platform_stats())
+
+    assert summary["total_registrations"] == 10
+    assert summary["certificates_issued"] == 4
+    assert stored["rebuilt_at"] > datetime(2025, 1, 1)
+
+
+def test_concurrent_rebuild_is_not_applied_twice(monkeypatch):
+    stored = {"_id": PLATFORM_STATS_ID, "total_registrations": 6, "rebuilt_at": datetime(2025, 1, 1)}
+
+    def other_worker_rebuilt():
+        stored.update({"total_registrations": 10, "rebuilt_at": datetime(2025, 1, 2)})
+
+    install(monkeypatch, stored, other_worker_rebuilt)
+
+    summary = asyncio.run(StatisticsManager.rebuild_platform_stats())
+
+    assert summary["total_registrations"] == 10
+    assert stored["rebuilt_at"] == datetime(2025, 1, 2)
+
+
+def test_present_participants_counts_like_the_recount():
+    assert StatisticsManager.present_participants({"attendance": {"status": "present"}}) == 1
+    assert StatisticsManager.present_participants({"attendance": {"status": "partial"}}) == 0
+    assert StatisticsManager.present_participants({"attendance": None}) == 0
+    assert StatisticsManager.present_participants({
+        "attendance": {"status": "present"},
+        "team_members": [{"attendance": {"status": "present"}}, {"attendance": {}}, {}],
+    }) == 1
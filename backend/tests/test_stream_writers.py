@@ -0,0 +1,89 @@
+import csv
+import io
+import zipfile
+import xml.etree.ElementTree as ElementTree
+
+import pytest
+
+from utils.stream_writers import CsvStreamWriter, XlsxStreamWriter, get_stream_writer
+
+SHEET_NS = {"s": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+
+
+def export(writer, headers, batches):
+    chunks = [writer.start(headers)]
+    chunks.extend(writer.write_rows(batch) for batch in batches)
+    chunks.append(writer.finish())
+    return b"".join(chunks)
+
+
+def sheet_rows(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert archive.testzip() is None
+        root = ElementTree.fromstring(archive.read("xl/worksheets/sheet1.xml"))
+    rows = []
+    for row in root.iterfind("s:sheetData/s:row", SHEET_NS):
+        cells = []
+        for cell in row.iterfind("s:c", SHEET_NS):
+            value = cell.find("s:v", SHEET_NS)
+            text = cell.find("s:is/s:t", SHEET_NS)
+            cells.append(value.text if value is not None else text.text if text is not None else None)
+        rows.append(cells)
+    return rows
+
+
+def test_csv_writes_bom_header_and_batches():
+    data = export(CsvStreamWriter(), ["Name", "Enrollment"], [[["Asha", "22CE001"]], [["Ravi, K", "22CE002"]]])
+
+    assert data.startswith(b"\xef\xbb\xbf")
+    rows = list(csv.reader(io.StringIO(data[3:].decode("utf-8"))))
+    assert rows == [["Name", "Enrollment"], ["Asha", "22CE001"], ["Ravi, K", "22CE002"]]
+
+
+def test_csv_neutralises_formulas():
+    data = export(CsvStreamWriter(), ["Note"], [[["=HYPERLINK(\"x\")"], ["-5"], [5]]])
+
+    rows = list(csv.reader(io.StringIO(data[3:].decode("utf-8"))))
+    assert rows[1:] == [["'=HYPERLINK(\"x\")"], ["'-5"], ["5"]]
+
+
+def test_xlsx_round_trips_cells():
+    writer = XlsxStreamWriter(sheet_name="Registrations")
+    data = export(writer, ["Name", "Score", "Note"], [
+        [["Asha", 91, "<b>&"]],
+        [["Ravi", 72.5, None], ["Bad\x01char", True, ""]],
+    ])
+
+    assert sheet_rows(data) == [
+        ["Name", "Score", "Note"],
+        ["Asha", "91", "<b>&"],
+        ["Ravi", "72.5", None],
+        ["Badchar", "True", None],
+    ]
+
+
+def test_xlsx_chunks_stream_before_finish():
+    writer = XlsxStreamWriter()
+    first = writer.start(["Name"])
+    # Zip local headers for the fixed parts are emitted before any row is written
+    assert first.startswith(b"PK")
+    rest = writer.write_rows([["Asha"]] * 1000) + writer.finish()
+    assert len(sheet_rows(first + rest)) == 1001
+
+
+def test_xlsx_sheet_name_is_sanitised():
+    writer = XlsxStreamWriter(sheet_name="Reg/Export: [Sept] " + "x" * 40)
+    data = export(writer, ["Name"], [])
+
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+    name = workbook.find("s:sheets/s:sheet", SHEET_NS).get("name")
+    assert name == writer.sheet_name
+    assert len(name) == 31 and not set("[]:*?/\\") & set(name)
+
+
+def test_get_stream_writer():
+    assert isinstance(get_stream_writer("csv"), CsvStreamWriter)
+    assert isinstance(get_stream_writer("xlsx", sheet_name="S"), XlsxStreamWriter)
+    with pytest.raises(ValueError):
+        get_stream_writer("pdf")
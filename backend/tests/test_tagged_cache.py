@@ -0,0 +1,169 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from utils import tagged_cache
+from utils.redis_pool import RedisPool
+from utils.tagged_cache import TaggedCache, admin_listing_tags_for
+
+
+class FakeRedis:
+    """The handful of async Redis calls TaggedCache makes, backed by a dict"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def incr(self, key):
+        self.data[key] = str(int(self.data.get(key) or 0) + 1)
+        return int(self.data[key])
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append(getattr(self.redis, name)(*args, **kwargs))
+
+    async def execute(self):
+        return [await call for call in self.calls]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = FakeRedis()
+    monkeypatch.setattr(RedisPool, "get_client", classmethod(lambda cls: client))
+    return client
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(tagged_cache, "time", SimpleNamespace(time=clock.time))
+    return clock
+
+
+def counting_loader(values):
+    calls = []
+
+    async def loader():
+        calls.append(len(calls))
+        return values[min(len(calls), len(values)) - 1]
+
+    return loader, calls
+
+
+def test_hit_until_a_tag_is_invalidated(redis, clock):
+    cache = TaggedCache("test")
+    loader, calls = counting_loader(["v1", "v2"])
+
+    async def run():
+        first = await cache.get_or_load("k", loader, tags=["a", "b"])
+        cached = await cache.get_or_load("k", loader, tags=["a", "b"])
+        assert await cache.invalidate_tags(["b", "b"]) == 1
+        reloaded = await cache.get_or_load("k", loader, tags=["a", "b"])
+        return first, cached, reloaded
+
+    assert asyncio.run(run()) == ("v1", "v1", "v2")
+    assert len(calls) == 2
+
+
+def test_invalidation_only_drops_entries_with_that_tag(redis, clock):
+    cache = TaggedCache("test")
+    loader_a, calls_a = counting_loader(["a"])
+    loader_b, calls_b = counting_loader(["b"])
+
+    async def run():
+        await cache.get_or_load("ka", loader_a, tags=["a"])
+        await cache.get_or_load("kb", loader_b, tags=["b"])
+        await cache.invalidate_tags(["a"])
+        await cache.get_or_load("ka", loader_a, tags=["a"])
+        await cache.get_or_load("kb", loader_b, tags=["b"])
+
+    asyncio.run(run())
+    assert (len(calls_a), len(calls_b)) == (2, 1)
+
+
+def test_invalidation_during_load_is_not_served(redis, clock):
+    cache = TaggedCache("test")
+    values = iter(["old", "new"])
+
+    async def loader():
+        value = next(values)
+        if value == "old":
+            # A mutation lands while the first load is still running
+            await cache.invalidate_tags(["a"])
+        return value
+
+    async def run():
+        return await cache.get_or_load("k", loader, tags=["a"]), await cache.get_or_load("k", loader, tags=["a"])
+
+    assert asyncio.run(run()) == ("old", "new")
+
+
+def test_stale_entry_is_served_while_refreshing(redis, clock):
+    cache = TaggedCache("test", fresh_seconds=30, stale_seconds=300)
+    loader, calls = counting_loader(["v1", "v2"])
+
+    async def run():
+        await cache.get_or_load("k", loader)
+        clock.now += 31
+        stale = await cache.get_or_load("k", loader)
+        again = await cache.get_or_load("k", loader)
+        await asyncio.gather(*cache._refreshing.values())
+        refreshed = await cache.get_or_load("k", loader)
+        return stale, again, refreshed
+
+    assert asyncio.run(run()) == ("v1", "v1", "v2")
+    # The two stale reads share one background refresh
+    assert len(calls) == 2
+
+
+def test_read_failure_falls_back_to_loader(monkeypatch):
+    def unavailable(cls):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(RedisPool, "get_client", classmethod(unavailable))
+    loader, calls = counting_loader(["v1"])
+
+    assert asyncio.run(TaggedCache("test").get_or_load("k", loader, tags=["a"])) == "v1"
+    assert asyncio.run(TaggedCache("test").invalidate_tags(["a"])) == 0
+
+
+def test_admin_listing_tags_cover_before_and_after_states():
+    before = {"status": "upcoming", "sub_status": "registration_open", "target_audience": "student"}
+    after = {"status": "completed", "target_audience": "student"}
+
+    assert admin_listing_tags_for(before, None, after) == [
+        "active|all", "active|student", "all|all", "all|student",
+        "completed|all", "completed|student", "ongoing|all", "ongoing|student",
+        "upcoming|all", "upcoming|student",
+    ]
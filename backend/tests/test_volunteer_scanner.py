@@ -0,0 +1,219 @@
+import asyncio
+import copy
+import re
+from datetime import datetime, timedelta
+
+import pytz
+
+from app.v1 import volunteer_scanner
+from app.v1.volunteer_scanner import (
+    OfflineScan,
+    _apply_scans,
+    _build_scan_update,
+    _newly_present,
+    _scan_history_pipeline,
+    _scan_update_landed,
+)
+from database.operations import DatabaseOperations
+from utils.statistics import StatisticsManager
+
+IST = pytz.timezone("Asia/Kolkata")
+SCANNED_AT = IST.localize(datetime(2025, 9, 12, 10, 30))
+
+
+def make_context(strategy="single_mark", sessions=None):
+    return {
+        "session": {"volunteer_name": "Asha", "event_id": "EVT1"},
+        "event": {"event_id": "EVT1", "attendance_strategy": {"strategy": strategy, "sessions": sessions or []}},
+        "invitation": None,
+    }
+
+
+def make_registration():
+    return {
+        "registration_id": "REG1",
+        "_collection": "student_registrations",
+        "event": {"event_id": "EVT1"},
+        "attendance": {"strategy": "single_mark", "marked": False, "last_updated": None},
+    }
+
+
+def scan(attendance_data=None, at=SCANNED_AT):
+    return OfflineScan(qr_data={"registration_id": "REG1"}, attendance_data=attendance_data or {}, timestamp=at.isoformat()), at
+
+
+def test_build_scan_update_single_mark():
+    result = _build_scan_update(make_registration(), make_context(), {}, None, SCANNED_AT)
+
+    attendance = result["update"]["$set"]["attendance"]
+    assert attendance["marked"] is True
+    assert attendance["marked_at"] == SCANNED_AT.isoformat()
+    assert attendance["last_updated"] == SCANNED_AT.isoformat()
+    assert result["guard"] == {"attendance.last_updated": None}
+    assert result["already_marked"] is False
+
+
+def test_build_scan_update_day_based_marks_configured_day():
+    context = make_context("day_based", [{"session_id": "day_1", "session_name": "Day 1"},
+                                         {"session_id": "day_2", "session_name": "Day 2"}])
+    result = _build_scan_update(make_registration(), context, {"day": 2}, None, SCANNED_AT)
+
+    attendance = result["update"]["$set"]["attendance"]
+    assert [s["session_id"] for s in attendance["sessions"]] == ["day_2"]
+    assert attendance["percentage"] == 50
+    assert result["day_marked"] == 2
+
+
+def test_apply_scans_combines_scans_oldest_first():
+    context = make_context("day_based", [{"session_id": "day_1"}, {"session_id": "day_2"}])
+    first, first_at = scan({"day": 1})
+    second, second_at = scan({"day": 2}, SCANNED_AT + timedelta(days=1))
+
+    update, guard, outcomes = _apply_scans(make_registration(), context, [(0, first, first_at), (1, second, second_at)])
+
+    assert {s["session_id"] for s in update["$set"]["attendance"]["sessions"]} == {"day_1", "day_2"}
+    assert update["$set"]["attendance"]["last_updated"] == second_at.isoformat()
+    assert guard["attendance.last_updated"] is None
+    assert set(outcomes) == {0, 1}
+
+
+def test_apply_scans_reports_invalid_scans_per_index():
+    context = make_context("day_based", [{"session_id": "day_1"}])
+    bad, bad_at = scan({"day": 5})
+
+    update, _, outcomes = _apply_scans(make_registration(), context, [(0, bad, bad_at)])
+
+    assert update is None
+    assert "Day 5 not found" in outcomes[0]
+
+
+def test_replayed_scans_produce_the_same_update():
+    """Re-applying stored scans is a no-op write, which MongoDB reports as nModified=0"""
+    queued = [(0, *scan())]
+    update, _, _ = _apply_scans(make_registration(), make_context(), queued)
+
+    stored = make_registration()
+    stored["attendance"] = copy.deepcopy(update["$set"]["attendance"])
+    replay, _, _ = _apply_scans(copy.deepcopy(stored), make_context(), queued)
+
+    assert replay == update
+    assert _scan_update_landed(stored, update)
+    assert not _scan_update_landed(make_registration(), update)
+
+
+def test_scan_update_landed_for_team_updates_at_millisecond_precision():
+    written = datetime(2025, 9, 12, 10, 30, 0, 123456)
+    update = {"$set": {"team_members": [], "updated_at": written}}
+
+    assert _scan_update_landed({"updated_at": written.replace(microsecond=123000)}, update)
+    assert not _scan_update_landed({"updated_at": written - timedelta(seconds=1)}, update)
+
+
+def test_write_scans_individually_counts_matched_noop_as_saved(monkeypatch):
+    queued = [(0, *scan())]
+    update, _, _ = _apply_scans(make_registration(), make_context(), queued)
+    stored = make_registration()
+    stored["attendance"] = copy.deepcopy(update["$set"]["attendance"])
+    calls = []
+
+    async def find_registration(registration_id):
+        return copy.deepcopy(stored)
+
+    async def find_one_and_update(collection_name, query, update, **kwargs):
+        calls.append(query)
+        return {"_id": 1}  # matched, nothing modified
+
+    monkeypatch.setattr(volunteer_scanner, "_find_registration", find_registration)
+    monkeypatch.setattr(DatabaseOperations, "find_one_and_update", find_one_and_update)
+    recorded = record_present(monkeypatch)
+
+    outcomes = asyncio.run(volunteer_scanner._write_scans_individually("REG1", make_context(), queued))
+
+    assert outcomes is not None and outcomes[0]["attendance_strategy"] == "single_mark"
+    assert len(calls) == 1
+    # Already present in the re-read registration: nothing new to count
+    assert recorded == [0]
+
+
+def record_present(monkeypatch):
+    recorded = []
+
+    async def record_attendance_present(count=1):
+        recorded.append(count)
+
+    monkeypatch.setattr(StatisticsManager, "record_attendance_present", staticmethod(record_attendance_present))
+    return recorded
+
+
+def test_write_scans_individually_records_newly_present(monkeypatch):
+    async def find_registration(registration_id):
+        return make_registration()
+
+    async def find_one_and_update(*args, **kwargs):
+        return {"_id": 1}
+
+    monkeypatch.setattr(volunteer_scanner, "_find_registration", find_registration)
+    monkeypatch.setattr(DatabaseOperations, "find_one_and_update", find_one_and_update)
+    recorded = record_present(monkeypatch)
+
+    asyncio.run(volunteer_scanner._write_scans_individually("REG1", make_context(), [(0, *scan())]))
+
+    assert recorded == [1]
+
+
+def test_newly_present_counts_team_members():
+    registration = {"team_members": [{"attendance": {"status": "present"}}, {"attendance": {"status": "pending"}}]}
+    update = {"$set": {"team_members": [{"attendance": {"status": "present"}}, {"attendance": {"status": "present"}}]}}
+
+    assert _newly_present(registration, 1, update) == 1
+    assert _newly_present(registration, 1, None) == 0
+
+
+def evaluate(expression, doc):
+    """The aggregation operators the scan history `marked_on` field is built from"""
+    if isinstance(expression, str) and expression.startswith("$"):
+        return doc.get(expression[1:])
+    if not isinstance(expression, dict):
+        return expression
+    (operator, args), = expression.items()
+    if operator == "$switch":
+        for branch in args["branches"]:
+            if evaluate(branch["case"], doc):
+                return evaluate(branch["then"], doc)
+        return evaluate(args["default"], doc)
+    if operator == "$cond":
+        return evaluate(args[1] if evaluate(args[0], doc) else args[2], doc)
+    if operator == "$eq":
+        return evaluate(args[0], doc) == evaluate(args[1], doc)
+    if operator == "$type":
+        return {datetime: "date", str: "string"}.get(type(evaluate(args, doc)), "other")
+    if operator == "$regexMatch":
+        return re.search(args["regex"], evaluate(args["input"], doc)) is not None
+    if operator == "$dateFromString":
+        parsed = datetime.fromisoformat(evaluate(args["dateString"], doc))
+        if parsed.tzinfo is None:
+            parsed = pytz.timezone(args["timezone"]).localize(parsed)
+        return parsed.astimezone(pytz.utc).replace(tzinfo=None)
+    raise NotImplementedError(operator)
+
+
+def test_scan_history_sorts_mixed_date_and_string_marks_by_time():
+    pipeline = _scan_history_pipeline("EVT1", 10, 30)
+    marked_on = next(stage["$addFields"]["marked_on"] for stage in pipeline if "$addFields" in stage)
+    sort = next(stage["$sort"] for stage in pipeline if "$sort" in stage)
+    marks = [
+        # BSON date (UTC) from event_attendance_service: 10:00 IST
+        {"registration_id": "R1", "marked_at": datetime(2025, 9, 12, 4, 30)},
+        # Scanner isoformat strings: 11:00 IST, and 06:00 UTC = 11:30 IST
+        {"registration_id": "R2", "marked_at": "2025-09-12T11:00:00+05:30"},
+        {"registration_id": "R3", "marked_at": "2025-09-12T06:00:00+00:00"},
+        # No offset, read as IST: 10:15 IST
+        {"registration_id": "R4", "marked_at": "2025-09-12T10:15:00"},
+    ]
+    for mark in marks:
+        mark["marked_on"] = evaluate(marked_on, mark)
+
+    assert list(sort) == ["marked_on", "registration_id"] and sort["marked_on"] == -1
+    ordered = sorted(marks, key=lambda mark: mark["registration_id"])
+    ordered.sort(key=lambda mark: mark["marked_on"], reverse=True)
+    assert [mark["registration_id"] for mark in ordered] == ["R3", "R2", "R4", "R1"]
@@ -3,17 +3,33 @@ Dynamic Event-Driven Scheduler for Real-time Event Status Updates
 
 This scheduler maintains a queue of datetime events and triggers updates exactly when 
 event status changes should occur, eliminating delays and unnecessary runs.
+
+Every worker process runs a scheduler, but only the holder of the
+"event_scheduler" lease (see utils.leader_lease) executes triggers and
+reconciles statuses. The other workers keep their trigger queue current from
+the updates published on SCHEDULER_UPDATES_CHANNEL, so status and queue views
+are the same on every worker and any of them can take over when the leader's
+lease expires.
 """
 
 import asyncio
 import heapq
+import json
+import os
+import time
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 import logging
+from prometheus_client import Counter, Gauge
+from pymongo import UpdateOne
 from config.database import Database
 from database.operations import DatabaseOperations
+from utils.leader_lease import LeaderLease
+from utils.redis_cache import event_cache
+from utils.redis_pool import RedisPool
+from utils.tagged_cache import invalidate_admin_event_listings
 
 # Configure logging
 logging.basicConfig(
@@ -22,6 +38,40 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Reconciliation sweep: re-derive status for events that can still change and fix
+# any drift (dropped trigger, event edited outside the admin API) within one interval
+STATUS_RECONCILE_INTERVAL_SECONDS = int(os.getenv("EVENT_STATUS_RECONCILE_SECONDS", "300"))
+STATUS_RECONCILE_BATCH_SIZE = int(os.getenv("EVENT_STATUS_RECONCILE_BATCH_SIZE", "500"))
+
+# Leader election: the lease expires this long after the leader's last heartbeat
+SCHEDULER_LEASE_SECONDS = int(os.getenv("EVENT_SCHEDULER_LEASE_SECONDS", "30"))
+SCHEDULER_HEARTBEAT_SECONDS = float(os.getenv("EVENT_SCHEDULER_HEARTBEAT_SECONDS", "10"))
+
+# Trigger queue changes, applied by every worker
+SCHEDULER_UPDATES_CHANNEL = "campus_connect:scheduler:updates"
+
+# Event fields that produce triggers (the only ones published with queue updates)
+SCHEDULE_FIELDS = (
+    "registration_start_date", "registration_end_date", "start_datetime", "end_datetime",
+    "certificate_start_date", "certificate_end_date"
+)
+
+# Fields needed to recompute an event's status and refresh the listings it appears in
+STATUS_PROJECTION = {
+    "_id": 0, "event_id": 1, "event_name": 1, "status": 1, "sub_status": 1, "target_audience": 1, "event_approval_status": 1,
+    "start_datetime": 1, "end_datetime": 1,
+    "registration_start_date": 1, "registration_end_date": 1, "certificate_end_date": 1
+}
+
+EVENT_STATUS_RECONCILED = Counter(
+    "event_status_reconciled_total",
+    "Event statuses corrected by the scheduler's reconciliation sweep"
+)
+EVENT_SCHEDULER_LEADER = Gauge(
+    "event_scheduler_leader",
+    "1 while this worker holds the event scheduler lease"
+)
+
 class EventTriggerType(Enum):
     """Types of event triggers"""
     REGISTRATION_OPEN = "registration_open"
@@ -31,6 +81,26 @@ class EventTriggerType(Enum):
     CERTIFICATE_START = "certificate_start"
     CERTIFICATE_END = "certificate_end"
 
+# The event date each trigger type fires at
+TRIGGER_DATE_FIELDS = {
+    EventTriggerType.REGISTRATION_OPEN: "registration_start_date",
+    EventTriggerType.REGISTRATION_CLOSE: "registration_end_date",
+    EventTriggerType.EVENT_START: "start_datetime",
+    EventTriggerType.EVENT_END: "end_datetime",
+    EventTriggerType.CERTIFICATE_START: "certificate_start_date",
+    EventTriggerType.CERTIFICATE_END: "certificate_end_date",
+}
+
+
+def _as_datetime(value: Any) -> Optional[datetime]:
+    """Event date as a datetime (older events store ISO strings); None if unusable"""
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    return value if isinstance(value, datetime) else None
+
 @dataclass
 class ScheduledTrigger:
     """Represents a scheduled trigger for event status update"""
@@ -62,9 +132,15 @@ class DynamicEventScheduler:
         self._stop_event = asyncio.Event()
         self.max_downtime_hours = 168  # Maximum hours to check for missed triggers (1 week = 7 * 24 = 168 hours)
         self.executed_triggers = set()  # Track executed trigger IDs to prevent duplicates
+        self._last_reconcile = 0.0  # time.monotonic() of the last reconciliation sweep
+        self.statuses_reconciled = 0  # Statuses corrected by reconciliation since startup
+        self.lease = LeaderLease("event_scheduler", lease_seconds=SCHEDULER_LEASE_SECONDS)
+        self.is_leader = False
+        self._leadership_task: Optional[asyncio.Task] = None
+        self._updates_task: Optional[asyncio.Task] = None
         
     async def initialize(self):
-        """Initialize the scheduler with all events from database"""
+        """Initialize the scheduler with the events that still have actionable triggers"""
         try:
             logger.info("Initializing Dynamic Event Scheduler...")
             
@@ -74,13 +150,13 @@ class DynamicEventScheduler:
             # Load previously executed triggers to prevent duplicates
             await self._load_executed_triggers()
             
-            # Load all events from database
-            events = await DatabaseOperations.find_many("events", {})
+            current_time = datetime.now()
+            
+            # Only events with a trigger inside the missed-trigger window or still ahead
+            events = await self._load_schedulable_events(current_time - timedelta(hours=self.max_downtime_hours))
             if not events:
-                logger.info("No events found in database")
+                logger.info("No events with actionable triggers found in database")
                 return
-                
-            current_time = datetime.now()
             
             # Step 1: Check for missed triggers during downtime
             missed_triggers = await self._check_missed_triggers(events, current_time)
@@ -103,6 +179,17 @@ class DynamicEventScheduler:
             
         except Exception as e:
             logger.error(f"Error initializing scheduler: {str(e)}")
+    
+    async def _load_schedulable_events(self, since: datetime) -> List[Dict[str, Any]]:
+        """Event dates of every event with a trigger at or after `since` (each date field is indexed)"""
+        query = {"$or": [
+            condition
+            for date_field in SCHEDULE_FIELDS
+            # Older events store ISO strings, which order correctly as strings
+            for condition in ({date_field: {"$gte": since}}, {date_field: {"$gte": since.isoformat()}})
+        ]}
+        projection = {"_id": 0, "event_id": 1, **{date_field: 1 for date_field in SCHEDULE_FIELDS}}
+        return await DatabaseOperations.find_many("events", query, projection)
             
     async def _add_event_triggers(self, event: Dict[str, Any], current_time: datetime) -> int:
         """Add all relevant triggers for an event"""
@@ -157,107 +244,36 @@ class DynamicEventScheduler:
             # Load executed triggers from the last 7 days
             since_time = datetime.now() - timedelta(days=7)
             
-            # Check event_status_logs for scheduler triggers (CORRECTED COLLECTION NAME)
-            executed_logs = await DatabaseOperations.find_many(
-                "event_status_logs",
-                {
-                    "timestamp": {"$gte": since_time},
-                    "trigger_source": {"$in": ["scheduler", "scheduler_missed_recovery"]},
-                    "event_id": {"$exists": True},
-                    "trigger_type": {"$exists": True}
-                },
-                projection={"event_id": 1, "trigger_type": 1, "timestamp": 1, "trigger_source": 1}
-            )
-            
-            # Also check logs without trigger_source but with scheduler patterns
-            legacy_logs = await DatabaseOperations.find_many(
+            # Scheduler entries, plus legacy entries without a trigger source
+            logs = await DatabaseOperations.find_many(
                 "event_status_logs",
                 {
                     "timestamp": {"$gte": since_time},
-                    "trigger_type": {"$exists": True},
                     "event_id": {"$exists": True},
-                    "$or": [
-                        {"trigger_source": {"$exists": False}},
-                        {"trigger_source": None},
-                        {"trigger_source": "N/A"}
-                    ]
+                    "trigger_type": {"$in": [trigger_type.value for trigger_type in EventTriggerType]},
+                    "trigger_source": {"$in": ["scheduler", "scheduler_missed_recovery", None, "N/A"]}
                 },
-                projection={"event_id": 1, "trigger_type": 1, "timestamp": 1}
+                projection={"_id": 0, "event_id": 1, "trigger_type": 1}
             )
             
-            all_logs = executed_logs + legacy_logs
+            # A trigger ID carries the trigger's scheduled time, i.e. the event's date
+            # field for that trigger type: resolve all of them with one lookup
+            event_ids = list({log["event_id"] for log in logs if log.get("event_id")})
+            events = await DatabaseOperations.find_many(
+                "events",
+                {"event_id": {"$in": event_ids}},
+                {"_id": 0, "event_id": 1, **{date_field: 1 for date_field in SCHEDULE_FIELDS}}
+            ) if event_ids else []
+            events_by_id = {event["event_id"]: event for event in events}
             
-            # Generate trigger IDs from the logs
-            for log in all_logs:
-                event_id = log.get('event_id')
-                trigger_type = log.get('trigger_type') 
-                timestamp = log.get('timestamp')
-                trigger_source = log.get('trigger_source')
-                
-                if not all([event_id, trigger_type, timestamp]):
+            for log in logs:
+                event = events_by_id.get(log.get("event_id"))
+                if not event:
                     continue
-                
-                # Convert timestamp to datetime if needed
-                if isinstance(timestamp, str):
-                    try:
-                        timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                    except:
-                        continue
-                
-                # For missed triggers, we need to find the original trigger time from the event
-                if trigger_source == "scheduler_missed_recovery":
-                    # Get the event to find the actual trigger time
-                    event = await DatabaseOperations.find_one("events", {"event_id": event_id})
-                    if event:
-                        # Map trigger type to event field
-                        field_mapping = {
-                            "registration_open": "registration_start_date",
-                            "registration_close": "registration_end_date", 
-                            "event_start": "start_datetime",
-                            "event_end": "end_datetime",
-                            "certificate_start": "certificate_start_date",
-                            "certificate_end": "certificate_end_date"
-                        }
-                        
-                        date_field = field_mapping.get(trigger_type)
-                        if date_field and event.get(date_field):
-                            trigger_time = event[date_field]
-                            if isinstance(trigger_time, str):
-                                try:
-                                    trigger_time = datetime.fromisoformat(trigger_time.replace('Z', '+00:00'))
-                                except:
-                                    continue
-                            
-                            # Generate the trigger ID using the original trigger time
-                            time_str = trigger_time.strftime("%Y%m%d_%H%M%S")
-                            trigger_id = f"{event_id}_{trigger_type}_{time_str}"
-                            self.executed_triggers.add(trigger_id)
-                else:
-                    # For legacy logs or regular scheduler triggers, try to map back to original time
-                    event = await DatabaseOperations.find_one("events", {"event_id": event_id})
-                    if event:
-                        field_mapping = {
-                            "registration_open": "registration_start_date",
-                            "registration_close": "registration_end_date", 
-                            "event_start": "start_datetime",
-                            "event_end": "end_datetime",
-                            "certificate_start": "certificate_start_date",
-                            "certificate_end": "certificate_end_date"
-                        }
-                        
-                        date_field = field_mapping.get(trigger_type)
-                        if date_field and event.get(date_field):
-                            trigger_time = event[date_field]
-                            if isinstance(trigger_time, str):
-                                try:
-                                    trigger_time = datetime.fromisoformat(trigger_time.replace('Z', '+00:00'))
-                                except:
-                                    continue
-                            
-                            # Generate the trigger ID using the original trigger time
-                            time_str = trigger_time.strftime("%Y%m%d_%H%M%S")
-                            trigger_id = f"{event_id}_{trigger_type}_{time_str}"
-                            self.executed_triggers.add(trigger_id)
+                trigger_type = EventTriggerType(log["trigger_type"])
+                trigger_time = _as_datetime(event.get(TRIGGER_DATE_FIELDS[trigger_type]))
+                if trigger_time:
+                    self.executed_triggers.add(ScheduledTrigger(trigger_time, event["event_id"], trigger_type).trigger_id)
             
             logger.info(f"📚 Loaded {len(self.executed_triggers)} recently executed triggers to prevent duplicates")
             if self.executed_triggers:
@@ -330,41 +346,84 @@ class DynamicEventScheduler:
         return missed_triggers
     
     async def _execute_missed_triggers(self, missed_triggers: List[ScheduledTrigger]):
-        """Execute missed triggers in chronological order"""
+        """
+        Apply missed triggers in bulk: each affected event is read once and its
+        status recomputed for now, changed events are written with one
+        bulk_write, and every trigger's audit entry goes into one insert.
+        """
         logger.info(f"⚡ Executing {len(missed_triggers)} missed triggers...")
         
         # Sort missed triggers by their original scheduled time
         missed_triggers.sort(key=lambda t: t.trigger_time)
         
-        successful_executions = 0
-        failed_executions = 0
-        
-        for trigger in missed_triggers:
-            try:
-                logger.info(f"🔄 Executing missed trigger: {trigger.trigger_type.value} for {trigger.event_id}")
-                
-                # Execute the trigger (same as regular execution)
-                await self._execute_trigger(trigger, is_missed=True)
-                
-                # **CRITICAL FIX**: Mark trigger as executed by adding to executed_triggers set
+        try:
+            from services.event_action_logger import event_action_logger
+            
+            current_time = datetime.now()
+            event_ids = list(dict.fromkeys(trigger.event_id for trigger in missed_triggers))
+            events = {
+                event["event_id"]: event
+                for event in await DatabaseOperations.find_many("events", {"event_id": {"$in": event_ids}}, STATUS_PROJECTION)
+            }
+            
+            operations = []
+            changed = []
+            statuses = {}
+            for event_id, event in events.items():
+                old_status = (event.get('status', 'unknown'), event.get('sub_status', 'unknown'))
+                new_status = await self._calculate_event_status(dict(event), current_time)
+                statuses[event_id] = (old_status, new_status)
+                if old_status != new_status:
+                    changed.extend([event, {**event, "status": new_status[0], "sub_status": new_status[1]}])
+                    operations.append(UpdateOne(
+                        {"event_id": event_id, "status": event.get('status'), "sub_status": event.get('sub_status')},
+                        {"$set": {
+                            "status": new_status[0],
+                            "sub_status": new_status[1],
+                            "last_status_update": current_time,
+                            "updated_by_scheduler": True
+                        }}
+                    ))
+                    logger.info(f"Updated event {event_id} status: {'/'.join(old_status)} -> {'/'.join(new_status)} (missed trigger)")
+            
+            if operations:
+                await DatabaseOperations.bulk_write("events", operations)
+                await invalidate_admin_event_listings(*changed)
+                await event_cache.refresh_events(event["event_id"] for event in changed)
+            
+            # One audit entry per trigger, as for scheduled triggers: the first trigger
+            # of an event records the change, later ones the unchanged status
+            log_entries = []
+            status_logged = set()
+            for trigger in missed_triggers:
+                if trigger.event_id not in statuses:
+                    logger.warning(f"Event {trigger.event_id} not found for status update")
+                    continue
+                old_status, new_status = statuses[trigger.event_id]
+                if trigger.event_id in status_logged:
+                    old_status = new_status
+                status_logged.add(trigger.event_id)
+                log_entries.append({
+                    "event_id": trigger.event_id,
+                    "event_name": events[trigger.event_id].get("event_name", "Unknown Event"),
+                    "old_status": "/".join(old_status),
+                    "new_status": "/".join(new_status),
+                    "trigger_source": "scheduler_missed_recovery",
+                    "trigger_type": trigger.trigger_type.value,
+                    "metadata": self._status_log_metadata(is_missed=True)
+                })
                 self.executed_triggers.add(trigger.trigger_id)
-                logger.info(f"🗂️  Marked trigger as executed: {trigger.trigger_id}")
-                
-                successful_executions += 1
-                
-                # Small delay between executions to avoid overwhelming the system
-                await asyncio.sleep(0.1)
-                
-            except Exception as e:
-                logger.error(f"❌ Failed to execute missed trigger {trigger.trigger_type.value} for {trigger.event_id}: {e}")
-                failed_executions += 1
-        
-        logger.info(f"✅ Missed trigger execution complete: {successful_executions} successful, {failed_executions} failed")
+            await event_action_logger.log_status_changes(log_entries)
+            
+            logger.info(f"✅ Missed trigger execution complete: {len(log_entries)} successful, {len(missed_triggers) - len(log_entries)} failed")
+            
+        except Exception as e:
+            logger.error(f"❌ Failed to execute missed triggers: {e}")
         
     async def add_new_event(self, event: Dict[str, Any]):
         """Add triggers for a newly created event"""
-        current_time = datetime.now()
-        triggers_added = await self._add_event_triggers(event, current_time)
+        triggers_added = await self._replace_event_triggers(event.get('event_id'), event)
+        await self._publish_update("upsert", event.get('event_id'), event)
         
         if triggers_added > 0:
             logger.info(f"Added {triggers_added} triggers for new event: {event.get('event_id')}")
@@ -372,16 +431,17 @@ class DynamicEventScheduler:
             
     async def update_event_triggers(self, event_id: str, updated_event: Dict[str, Any]):
         """Update triggers for an event when its dates change"""
-        # Remove existing triggers for this event
-        await self._remove_event_triggers(event_id)
-        
-        # Add new triggers
-        current_time = datetime.now()
-        triggers_added = await self._add_event_triggers(updated_event, current_time)
+        triggers_added = await self._replace_event_triggers(event_id, updated_event)
+        await self._publish_update("upsert", event_id, updated_event)
         
         if triggers_added > 0:
             logger.info(f"Updated {triggers_added} triggers for event: {event_id}")
             logger.info(f"Next trigger: {self._get_next_trigger_info()}")
+    
+    async def _replace_event_triggers(self, event_id: str, event: Dict[str, Any]) -> int:
+        """Swap an event's queued triggers for the ones its current dates produce (idempotent)"""
+        await self._remove_event_triggers(event_id)
+        return await self._add_event_triggers({**event, "event_id": event_id}, datetime.now())
             
     async def _remove_event_triggers(self, event_id: str):
         """Remove all triggers for a specific event"""
@@ -396,7 +456,108 @@ class DynamicEventScheduler:
     async def remove_event(self, event_id: str):
         """Remove all triggers for a deleted event"""
         await self._remove_event_triggers(event_id)
+        await self._publish_update("remove", event_id)
         logger.info(f"Removed all triggers for deleted event: {event_id}")
+    
+    # ----- queue updates shared between workers -----
+    
+    async def _publish_update(self, action: str, event_id: Optional[str], event: Optional[Dict[str, Any]] = None):
+        """Tell the other workers about a queue change already applied here"""
+        if not event_id or not RedisPool.is_available():
+            return
+        message = {
+            "origin": self.lease.worker_id,
+            "action": action,
+            "event_id": event_id,
+            "schedule": {
+                field: value.isoformat() if isinstance(value, datetime) else value
+                for field, value in (event or {}).items() if field in SCHEDULE_FIELDS
+            }
+        }
+        try:
+            await RedisPool.get_client().publish(SCHEDULER_UPDATES_CHANNEL, json.dumps(message, default=str))
+        except Exception as e:
+            logger.warning(f"Failed to publish scheduler update for {event_id}: {e}")
+    
+    async def _apply_update(self, raw: Any):
+        try:
+            message = json.loads(raw)
+            if message.get("origin") == self.lease.worker_id:
+                return
+            if message.get("action") == "remove":
+                await self._remove_event_triggers(message["event_id"])
+            elif message.get("action") == "upsert":
+                await self._replace_event_triggers(message["event_id"], message.get("schedule") or {})
+        except Exception as e:
+            logger.warning(f"Ignoring malformed scheduler update: {e}")
+    
+    async def _listen_for_updates(self):
+        while self.running:
+            pubsub = None
+            try:
+                pubsub = RedisPool.get_client().pubsub()
+                await pubsub.subscribe(SCHEDULER_UPDATES_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        await self._apply_update(message.get("data"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Updates published while disconnected are lost: rebuild the queue from the database
+                logger.warning(f"Scheduler update listener disconnected, retrying: {e}")
+                await asyncio.sleep(5)
+                if not self.is_leader:
+                    await self._load_trigger_queue()
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.aclose()
+                    except Exception:
+                        pass
+    
+    async def _load_trigger_queue(self):
+        """Build the trigger queue from event dates only (followers neither execute nor recover triggers)"""
+        try:
+            current_time = datetime.now()
+            events = await self._load_schedulable_events(current_time)
+            self.trigger_queue.clear()
+            for event in events:
+                await self._add_event_triggers(event, current_time)
+            logger.info(f"Loaded {len(self.trigger_queue)} future triggers as follower")
+        except Exception as e:
+            logger.error(f"Error loading trigger queue: {str(e)}")
+    
+    # ----- leader election -----
+    
+    async def _become_leader(self):
+        self.is_leader = True
+        EVENT_SCHEDULER_LEADER.set(1)
+        logger.info(f"👑 Worker {self.lease.worker_id} is now the event scheduler leader")
+        # Recovers triggers that fell due while no worker was leading
+        await self.initialize()
+        self._last_reconcile = 0.0
+    
+    def _step_down(self):
+        self.is_leader = False
+        EVENT_SCHEDULER_LEADER.set(0)
+        logger.warning(f"Worker {self.lease.worker_id} is no longer the event scheduler leader")
+    
+    async def _leadership_loop(self):
+        """Heartbeat the lease; take over initialisation on election, stop executing on loss"""
+        while self.running:
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=SCHEDULER_HEARTBEAT_SECONDS)
+                break
+            except asyncio.TimeoutError:
+                pass
+            try:
+                held = await self.lease.heartbeat()
+                if held and not self.is_leader:
+                    await self._become_leader()
+                elif not held and self.is_leader:
+                    self._step_down()
+            except Exception as e:
+                logger.error(f"Error in scheduler leadership loop: {str(e)}")
         
     def _get_next_trigger_info(self) -> str:
         """Get information about the next trigger"""
@@ -416,12 +577,19 @@ class DynamicEventScheduler:
             
         self.running = True
         self._stop_event.clear()
-          # Initialize with current events
-        await self.initialize()
+        
+        # The leader initializes fully (including missed trigger recovery); followers only load the queue
+        if await self.lease.heartbeat():
+            await self._become_leader()
+        else:
+            await self._load_trigger_queue()
         
         # Start the scheduler task
         self._scheduler_task = asyncio.create_task(self._scheduler_loop())
-        logger.info("Dynamic Event Scheduler started")
+        self._leadership_task = asyncio.create_task(self._leadership_loop())
+        if RedisPool.is_available():
+            self._updates_task = asyncio.create_task(self._listen_for_updates())
+        logger.info(f"Dynamic Event Scheduler started ({'leader' if self.is_leader else 'follower'})")
         
     async def stop(self):
         """Stop the scheduler"""
@@ -441,6 +609,20 @@ class DynamicEventScheduler:
                 except asyncio.CancelledError:
                     pass
         
+        for task in (self._leadership_task, self._updates_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        self._leadership_task = self._updates_task = None
+        
+        # Hand leadership over without waiting for the lease to expire
+        if self.is_leader:
+            self._step_down()
+        await self.lease.release()
+        
         logger.info("Dynamic Event Scheduler stopped")
         
     async def _scheduler_loop(self):
@@ -456,6 +638,15 @@ class DynamicEventScheduler:
         
         while self.running:
             try:
+                if self.is_leader and not self.lease.held:
+                    # Heartbeats stopped succeeding: stop acting now; regaining the lease
+                    # re-runs initialization, which recovers any trigger that fell due meanwhile
+                    self._step_down()
+                
+                if self.is_leader and time.monotonic() - self._last_reconcile >= STATUS_RECONCILE_INTERVAL_SECONDS:
+                    self._last_reconcile = time.monotonic()
+                    await self.reconcile_statuses()
+                
                 current_time = datetime.now()
                 
                 # Check for triggers that are ready to execute
@@ -473,8 +664,10 @@ class DynamicEventScheduler:
                         # No more ready triggers
                         break
                 
-                # Execute all ready triggers
+                # Execute all ready triggers (followers just drop them: the leader runs them)
                 for trigger in ready_triggers:
+                    if not self.is_leader:
+                        continue
                     await self._execute_trigger(trigger)
                     # **CRITICAL FIX**: Mark regular triggers as executed too
                     self.executed_triggers.add(trigger.trigger_id)
@@ -558,6 +751,8 @@ class DynamicEventScheduler:
                     }}                )
                 
                 if success:
+                    await invalidate_admin_event_listings(event, {**event, "status": new_status, "sub_status": new_sub_status})
+                    await event_cache.refresh_event(event_id)
                     execution_type = "missed" if is_missed else "scheduled"
                     logger.info(f"Updated event {event_id} status: {current_status}/{current_sub_status} -> {new_status}/{new_sub_status} ({execution_type} trigger)")
                     
@@ -576,6 +771,58 @@ class DynamicEventScheduler:
         except Exception as e:
             logger.error(f"Error updating status for event {event_id}: {str(e)}")
             
+    async def reconcile_statuses(self) -> int:
+        """
+        Bounded sweep over events that have not completed yet: recompute their
+        status and bulk-fix any that drifted from the persisted value.
+        
+        Updates are conditional on the status read, so a concurrent trigger wins.
+        Returns the number of events corrected.
+        """
+        try:
+            current_time = datetime.now()
+            # Soonest-ending first: those are the events due to change next
+            events = await DatabaseOperations.find_many(
+                "events", {"status": {"$ne": "completed"}}, STATUS_PROJECTION,
+                limit=STATUS_RECONCILE_BATCH_SIZE, sort_by=[("end_datetime", 1)]
+            )
+            
+            operations = []
+            changed = []
+            for event in events:
+                try:
+                    new_status, new_sub_status = await self._calculate_event_status(event, current_time)
+                except Exception as e:
+                    logger.warning(f"Reconcile: cannot derive status for {event.get('event_id')}: {e}")
+                    continue
+                
+                if (event.get('status'), event.get('sub_status')) != (new_status, new_sub_status):
+                    changed.extend([event, {**event, "status": new_status, "sub_status": new_sub_status}])
+                    operations.append(UpdateOne(
+                        {"event_id": event["event_id"], "status": event.get('status'), "sub_status": event.get('sub_status')},
+                        {"$set": {
+                            "status": new_status,
+                            "sub_status": new_sub_status,
+                            "last_status_update": current_time,
+                            "updated_by_scheduler": True
+                        }}
+                    ))
+            
+            corrected = 0
+            if operations:
+                result = await DatabaseOperations.bulk_write("events", operations)
+                corrected = result.modified_count if result else 0
+                EVENT_STATUS_RECONCILED.inc(corrected)
+                self.statuses_reconciled += corrected
+                await invalidate_admin_event_listings(*changed)
+                await event_cache.refresh_events(event["event_id"] for event in changed)
+                logger.warning(f"Reconcile: corrected status of {corrected} of {len(events)} active events")
+            return corrected
+            
+        except Exception as e:
+            logger.error(f"Error reconciling event statuses: {str(e)}")
+            return 0
+            
     async def _calculate_event_status(self, event: Dict[str, Any], current_time: datetime) -> tuple[str, str]:
         """Calculate the appropriate status and sub_status for an event based on current time"""
         # Convert string dates to datetime objects
@@ -583,7 +830,7 @@ class DynamicEventScheduler:
         for field in date_fields:
             if isinstance(event.get(field), str):
                 try:
-                    event[field] = datetime.fromisoformat(event[field].replace('Z', '+00:00'))
+                    event[field] = datetime.fromisoformat(event[field].replace('Z', '+00:00').replace('+00:00', ''))
                 except (ValueError, AttributeError):
                     logger.warning(f"Invalid date format for {field}: {event.get(field)}")
                     
@@ -601,10 +848,10 @@ class DynamicEventScheduler:
         if registration_start and current_time < registration_start:
             # Before registration starts
             return "upcoming", "registration_not_started"
-        elif registration_end and current_time >= registration_start and current_time < registration_end:
+        elif registration_end and registration_start and current_time >= registration_start and current_time < registration_end:
             # During registration window
             return "upcoming", "registration_open"
-        elif current_time >= registration_end and current_time < event_start:
+        elif registration_end and current_time >= registration_end and current_time < event_start:
             # Between registration end and event start
             return "upcoming", "registration_closed"
         elif current_time >= event_start and current_time < event_end:
@@ -632,8 +879,6 @@ class DynamicEventScheduler:
             event = await DatabaseOperations.find_one("events", {"event_id": event_id})
             event_name = event.get("event_name", "Unknown Event") if event else "Unknown Event"
             
-            # Enhanced metadata for missed triggers
-            execution_type = "missed_trigger_recovery" if is_missed else "scheduled_trigger"
             trigger_source = "scheduler_missed_recovery" if is_missed else "scheduler"
             
             # Use the unified logging system
@@ -644,14 +889,7 @@ class DynamicEventScheduler:
                 new_status=new_status,
                 trigger_source=trigger_source,
                 trigger_type=trigger_type.value,
-                metadata={
-                    "scheduler_version": "dynamic_v1_enhanced",
-                    "trigger_timestamp": datetime.now().isoformat(),
-                    "automated": True,
-                    "execution_type": execution_type,
-                    "is_missed_trigger": is_missed,
-                    "recovered_from_downtime": is_missed
-                }
+                metadata=self._status_log_metadata(is_missed)
             )
             
             # Additional logging for missed triggers
@@ -683,10 +921,23 @@ class DynamicEventScheduler:
             except Exception as fallback_error:
                 logger.error(f"Fallback logging also failed for event {event_id}: {str(fallback_error)}")
             
+    def _status_log_metadata(self, is_missed: bool) -> Dict[str, Any]:
+        """Enhanced metadata for scheduler status logs (marks missed trigger recovery)"""
+        return {
+            "scheduler_version": "dynamic_v1_enhanced",
+            "trigger_timestamp": datetime.now().isoformat(),
+            "automated": True,
+            "execution_type": "missed_trigger_recovery" if is_missed else "scheduled_trigger",
+            "is_missed_trigger": is_missed,
+            "recovered_from_downtime": is_missed
+        }
+            
     async def get_status(self) -> Dict[str, Any]:
         """Get current scheduler status"""
         return {
             "running": self.running,
+            "role": "leader" if self.is_leader else "follower",
+            "worker_id": self.lease.worker_id,
             "triggers_queued": len(self.trigger_queue),
             "next_trigger": self._get_next_trigger_info(),
             "queue_preview": [
@@ -697,7 +948,9 @@ class DynamicEventScheduler:
                     "time_until": str(trigger.trigger_time - datetime.now())
                 }
                 for trigger in sorted(self.trigger_queue)[:5]  # Show next 5 triggers
-            ]
+            ],
+            "reconcile_interval_seconds": STATUS_RECONCILE_INTERVAL_SECONDS,
+            "statuses_reconciled": self.statuses_reconciled
         }
 
     def get_scheduled_triggers(self) -> List[Dict[str, Any]]:
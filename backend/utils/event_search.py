@@ -0,0 +1,231 @@
+"""
+In-process inverted index for client event search.
+
+Events are tokenized once (name, category, descriptions) into postings
+token -> {event_id: weight}. Queries are tokenized the same way; every query
+token is matched as a prefix of indexed tokens (so "hack" finds "hackathon"
+while the user is still typing), all tokens must match, and hits are ranked
+by field weight x IDF with exact token matches scoring above prefix matches.
+
+Admin create/update/delete call upsert_event()/remove_event() so the local
+index changes incrementally. Each change also bumps a generation counter in
+Redis; other workers notice the new generation on their next search and
+rebuild from MongoDB, so every worker converges without a pub/sub channel.
+"""
+
+import asyncio
+import logging
+import math
+import re
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from database.operations import DatabaseOperations
+from utils.redis_cache import event_cache
+
+logger = logging.getLogger(__name__)
+
+# Shared counter bumped on every event change; a mismatch means this worker's index is stale
+SEARCH_GENERATION_KEY = "campus_connect:event_search:generation"
+
+# Full rebuild at least this often, as a safety net for writes that bypass the admin API
+SEARCH_REBUILD_SECONDS = 900
+
+# Relevance weight of a token per field it appears in
+FIELD_WEIGHTS = {
+    "event_name": 3.0,
+    "category": 2.0,
+    "event_type": 1.5,
+    "organizing_department": 1.0,
+    "short_description": 1.0,
+    "description": 0.5,
+    "detailed_description": 0.5,
+}
+
+# A prefix hit is worth this fraction of an exact token hit
+PREFIX_MATCH_FACTOR = 0.6
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOP_WORDS = frozenset({"a", "an", "and", "at", "by", "for", "in", "of", "on", "or", "the", "to", "with"})
+
+
+def tokenize(text: Any) -> List[str]:
+    """Lowercase alphanumeric tokens without stop words"""
+    if not isinstance(text, str):
+        return []
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in _STOP_WORDS]
+
+
+class EventSearchIndex:
+    """Inverted index over event text fields with prefix matching and relevance ranking"""
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._doc_tokens: Dict[str, Set[str]] = {}
+        # Sorted vocabulary for prefix range lookups, rebuilt lazily after changes
+        self._vocabulary: List[str] = []
+        self._vocabulary_dirty = False
+        self._generation: Optional[int] = None
+        self._built_at = 0.0
+        self._loaded = False
+        self._rebuild_lock = asyncio.Lock()
+
+    @property
+    def size(self) -> int:
+        return len(self._doc_tokens)
+
+    # ----- indexing -----
+
+    def add(self, event: Dict[str, Any]):
+        """Index (or re-index) one event document"""
+        event_id = event.get("event_id")
+        if not event_id:
+            return
+        self.discard(event_id)
+
+        weights: Dict[str, float] = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(event.get(field)):
+                weights[token] = max(weights.get(token, 0.0), weight)
+
+        for token, weight in weights.items():
+            if token not in self._postings:
+                self._vocabulary_dirty = True
+            self._postings[token][event_id] = weight
+        self._doc_tokens[event_id] = set(weights)
+
+    def discard(self, event_id: str):
+        """Drop an event from the index (no-op when it is not indexed)"""
+        for token in self._doc_tokens.pop(event_id, ()):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(event_id, None)
+            if not postings:
+                del self._postings[token]
+                self._vocabulary_dirty = True
+
+    def load(self, events: Iterable[Dict[str, Any]]):
+        """Replace the whole index"""
+        self._postings = defaultdict(dict)
+        self._doc_tokens = {}
+        for event in events:
+            self.add(event)
+        self._vocabulary = sorted(self._postings)
+        self._vocabulary_dirty = False
+
+    # ----- querying -----
+
+    def _expand(self, token: str) -> List[str]:
+        """Indexed tokens starting with `token`"""
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+        start = bisect_left(self._vocabulary, token)
+        matches = []
+        for candidate in self._vocabulary[start:]:
+            if not candidate.startswith(token):
+                break
+            matches.append(candidate)
+        return matches
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Events matching every query token, best first.
+
+        Returns:
+            [(event_id, score), ...] ordered by descending score, then event_id
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or not self._doc_tokens:
+            return []
+
+        total = len(self._doc_tokens)
+        scores: Optional[Dict[str, float]] = None
+        for token in tokens:
+            token_scores: Dict[str, float] = {}
+            for candidate in self._expand(token):
+                postings = self._postings[candidate]
+                idf = math.log(1 + total / len(postings))
+                factor = 1.0 if candidate == token else PREFIX_MATCH_FACTOR
+                for event_id, weight in postings.items():
+                    score = weight * idf * factor
+                    if score > token_scores.get(event_id, 0.0):
+                        token_scores[event_id] = score
+
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {event_id: score + token_scores[event_id] for event_id, score in scores.items() if event_id in token_scores}
+            if not scores:
+                return []
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit] if limit else ranked
+
+    # ----- MongoDB / cross-worker sync -----
+
+    async def _shared_generation(self) -> Optional[int]:
+        try:
+            value = await event_cache.redis_client.get(SEARCH_GENERATION_KEY)
+            return int(value) if value is not None else 0
+        except Exception as e:
+            logger.warning(f"Event search generation unavailable: {e}")
+            return None
+
+    async def rebuild(self):
+        """Reload every event from MongoDB"""
+        async with self._rebuild_lock:
+            generation = await self._shared_generation()
+            started = time.perf_counter()
+            projection = {"_id": 0, "event_id": 1, **{field: 1 for field in FIELD_WEIGHTS}}
+            events = await DatabaseOperations.find_many("events", {}, projection)
+            self.load(events)
+            self._generation = generation
+            self._built_at = time.monotonic()
+            self._loaded = True
+            logger.info(f"Event search index built: {self.size} events, {len(self._postings)} tokens in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    async def ensure_current(self):
+        """Build on first use; rebuild when another worker changed events or the index is old"""
+        if not self._loaded or time.monotonic() - self._built_at > SEARCH_REBUILD_SECONDS:
+            await self.rebuild()
+            return
+        generation = await self._shared_generation()
+        if generation is not None and generation != self._generation:
+            await self.rebuild()
+
+    async def _publish_change(self):
+        """Bump the shared generation; rebuild later if someone else changed events meanwhile"""
+        try:
+            generation = await event_cache.redis_client.incr(SEARCH_GENERATION_KEY)
+        except Exception as e:
+            logger.warning(f"Failed to publish event search change: {e}")
+            return
+        if self._generation is not None and generation == self._generation + 1:
+            self._generation = generation
+        else:
+            self._generation = None
+
+    async def upsert_event(self, event: Dict[str, Any]):
+        """Re-index an event after it was created or updated"""
+        if self._loaded:
+            self.add(event)
+        await self._publish_change()
+
+    async def remove_event(self, event_id: str):
+        """Drop a deleted event"""
+        if self._loaded:
+            self.discard(event_id)
+        await self._publish_change()
+
+    async def search_event_ids(self, query: str, limit: Optional[int] = None) -> List[str]:
+        """Ranked event IDs for a query, bringing the index up to date first"""
+        await self.ensure_current()
+        return [event_id for event_id, _ in self.search(query, limit)]
+
+
+# Singleton instance
+event_search_index = EventSearchIndex()
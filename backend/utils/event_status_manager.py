@@ -1,5 +1,6 @@
 # Enhanced Event Status Manager with intelligent status calculation
-# Comprehensive event status management with real-time status updates
+# Reads persisted status/sub_status; DynamicEventScheduler (triggers plus a
+# periodic reconciliation sweep) is the only writer of those fields.
 
 from database.operations import DatabaseOperations
 from core.logger import get_logger
@@ -8,6 +9,10 @@ from typing import List, Dict, Optional
 
 logger = get_logger(__name__)
 
+# The "active"/"ongoing" listing: events still open for registration or already running
+ACTIVE_LISTING_STATUSES = ("upcoming", "ongoing")
+ACTIVE_LISTING_SUB_STATUSES = ("registration_open", "event_started")
+
 class EventStatusManager:
     """Enhanced event status management with intelligent status calculation"""
     
@@ -65,110 +70,54 @@ class EventStatusManager:
             return "draft", "draft"
     
     @staticmethod
-    async def update_event_status_if_needed(event: Dict) -> Dict:
-        """Update event status if it's outdated based on current time"""
-        try:
-            # Use local time (IST) for consistency with event dates
-            from datetime import timezone, timedelta
-            ist_timezone = timezone(timedelta(hours=5, minutes=30))
-            current_time = datetime.now(ist_timezone).replace(tzinfo=None)  # Remove timezone for comparison
-            current_status = event.get('status', 'draft')
-            current_sub_status = event.get('sub_status', 'draft')
-            
-            # Calculate what the status should be
-            calculated_status, calculated_sub_status = await EventStatusManager.calculate_event_status(event, current_time)
-            
-            # If status needs updating, update in database and return updated event
-            if current_status != calculated_status or current_sub_status != calculated_sub_status:
-                logger.info(f"🔄 Updating event {event.get('event_id')} status: {current_status}/{current_sub_status} -> {calculated_status}/{calculated_sub_status}")
-                
-                # Update in database
-                await DatabaseOperations.update_one(
-                    "events",
-                    {"event_id": event.get('event_id')},
-                    {"$set": {
-                        "status": calculated_status,
-                        "sub_status": calculated_sub_status,
-                        "status_updated_at": current_time
-                    }}
-                )
-                
-                # Update the event object
-                event['status'] = calculated_status
-                event['sub_status'] = calculated_sub_status
-                event['status_updated_at'] = current_time
-                
-            return event
-            
-        except Exception as e:
-            logger.error(f"Error updating event status: {str(e)}")
-            return event
-    
+    def status_query(status: str = "all", include_pending_approval: bool = False) -> Dict:
+        """MongoDB filter selecting events by their persisted status
+        
+        Args:
+            status: Event status filter ("all", "upcoming", "active"/"ongoing", "live", "completed", "pending_approval", ...)
+            include_pending_approval: Whether to include events pending approval (for admin use)
+        """
+        if status == "pending_approval":
+            return {"event_approval_status": "pending_approval"}
+        
+        query = {}
+        if not include_pending_approval:
+            # For regular views, exclude pending approval events
+            query["event_approval_status"] = {"$ne": "pending_approval"}
+        
+        if status in ("active", "ongoing"):
+            query["status"] = {"$in": list(ACTIVE_LISTING_STATUSES)}
+            query["sub_status"] = {"$in": list(ACTIVE_LISTING_SUB_STATUSES)}
+        elif status == "live":
+            # Events whose persisted status is "ongoing", whatever their sub_status
+            query["status"] = "ongoing"
+        elif status != "all":
+            query["status"] = status
+        return query
+
+    @staticmethod
+    def matches_status(event: Dict, status: str) -> bool:
+        """Whether `event` is selected by status_query(status) (pending approval excluded)"""
+        if event.get("event_approval_status") == "pending_approval":
+            return False
+        if status in ("active", "ongoing"):
+            return (event.get("status") in ACTIVE_LISTING_STATUSES
+                    and event.get("sub_status") in ACTIVE_LISTING_SUB_STATUSES)
+        if status == "live":
+            return event.get("status") == "ongoing"
+        return status == "all" or event.get("status") == status
 
     @staticmethod
     async def get_available_events(status: str = "all", include_pending_approval: bool = False) -> List[Dict]:
-        """Get available events based on status with real-time status updates
+        """Get available events based on their persisted status
         
         Args:
             status: Event status filter ("all", "upcoming", "active", "pending_approval", etc.)
             include_pending_approval: Whether to include events pending approval (for admin use)
         """
         try:
-            query = {}
-            
-            if status == "pending_approval":
-                # Specifically query for events pending approval
-                query["event_approval_status"] = "pending_approval"
-            elif status == "upcoming":
-                # For upcoming events, we'll filter after status calculation
-                if not include_pending_approval:
-                    query["event_approval_status"] = {"$ne": "pending_approval"}
-            elif status == "active":
-                # For active events, we'll filter after status calculation
-                if not include_pending_approval:
-                    query["event_approval_status"] = {"$ne": "pending_approval"}
-            elif status != "all":
-                # For other specific statuses, use the regular status field but also check calculated status
-                query["status"] = status
-                if not include_pending_approval:
-                    query["event_approval_status"] = {"$ne": "pending_approval"}
-            
-            # If include_pending_approval is True and status is "all", include all events
-            if status == "all" and not include_pending_approval:
-                # For regular views, exclude pending approval events
-                query["event_approval_status"] = {"$ne": "pending_approval"}
-            
-            events = await DatabaseOperations.find_many("events", query)
-            
-            # Update status for all events and filter based on calculated status
-            updated_events = []
-            for event in events or []:
-                # Update event status based on current time
-                updated_event = await EventStatusManager.update_event_status_if_needed(event)
-                
-                # Apply filtering based on calculated status
-                calculated_status = updated_event.get('status', 'draft')
-                calculated_sub_status = updated_event.get('sub_status', 'draft')
-                
-                # Filter based on requested status after calculation
-                should_include = False
-                
-                if status == "all" or status == "pending_approval":
-                    should_include = True
-                elif status == "upcoming":
-                    should_include = calculated_status == "upcoming"
-                elif status == "active" or status == "ongoing":
-                    should_include = calculated_status in ["upcoming", "ongoing"] and calculated_sub_status in ["registration_open", "event_started"]
-                elif status == "completed":
-                    should_include = calculated_status == "completed"
-                else:
-                    # Exact status match
-                    should_include = calculated_status == status
-                
-                if should_include:
-                    updated_events.append(updated_event)
-            
-            return updated_events
+            query = EventStatusManager.status_query(status, include_pending_approval)
+            return await DatabaseOperations.find_many("events", query)
             
         except Exception as e:
             logger.error(f"Failed to get events: {str(e)}")
@@ -176,13 +125,9 @@ class EventStatusManager:
     
     @staticmethod
     async def get_event_by_id(event_id: str) -> Optional[Dict]:
-        """Get event by ID with real-time status update"""
+        """Get event by ID with its persisted status"""
         try:
-            event = await DatabaseOperations.find_one("events", {"event_id": event_id})
-            if event:
-                # Update event status based on current time
-                event = await EventStatusManager.update_event_status_if_needed(event)
-            return event
+            return await DatabaseOperations.find_one("events", {"event_id": event_id})
             
         except Exception as e:
             logger.error(f"Failed to get event {event_id}: {str(e)}")
@@ -197,8 +142,6 @@ class EventStatusManager:
             ist_timezone = timezone(timedelta(hours=5, minutes=30))
             current_time = datetime.now(ist_timezone).replace(tzinfo=None)  # Remove timezone for comparison
             
-            # Ensure event has updated status
-            event = await EventStatusManager.update_event_status_if_needed(event)
             
             # Extract dates
             registration_start = event.get('registration_start_date')
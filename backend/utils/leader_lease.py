@@ -0,0 +1,103 @@
+"""
+MongoDB lease for electing one leader among worker processes.
+
+Every worker calls `heartbeat()` periodically. The lease holder extends its
+lease; any other worker takes the lease over once it has expired, so a crashed
+or hung leader is replaced after at most `lease_seconds`. Leases live in the
+`leader_leases` collection, one document per name.
+
+MongoDB is used rather than Redis because it is always shared between
+workers, while Redis may fall back to a per-process store.
+
+Usage:
+    lease = LeaderLease("event_scheduler")
+    if await lease.heartbeat():
+        ...  # this worker leads until lease.held turns False
+    await lease.release()
+"""
+
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+from database.operations import DatabaseOperations
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+LEADER_LEASES_COLLECTION = "leader_leases"
+
+
+class LeaderLease:
+    """A named, expiring leadership lease shared through MongoDB"""
+
+    def __init__(self, name: str, lease_seconds: int = 30):
+        self.name = name
+        self.lease_seconds = lease_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        # time.monotonic() until which this worker may act as leader
+        self._held_until = 0.0
+
+    @property
+    def held(self) -> bool:
+        """Whether this worker holds the lease (judged by its own clock, so it stops before the lease expires)"""
+        return time.monotonic() < self._held_until
+
+    async def heartbeat(self) -> bool:
+        """Extend the lease if held, otherwise try to take it over. Returns whether it is held now."""
+        started = time.monotonic()
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.lease_seconds)
+        try:
+            if self.held:
+                lease = await DatabaseOperations.find_one_and_update(
+                    LEADER_LEASES_COLLECTION,
+                    {"_id": self.name, "holder": self.worker_id},
+                    {"$set": {"expires_at": expires_at, "heartbeat_at": now}}
+                )
+            else:
+                lease = await DatabaseOperations.find_one_and_update(
+                    LEADER_LEASES_COLLECTION,
+                    {"_id": self.name, "$or": [{"holder": self.worker_id}, {"expires_at": {"$lt": now}}]},
+                    {"$set": {"holder": self.worker_id, "acquired_at": now, "expires_at": expires_at, "heartbeat_at": now}},
+                    upsert=True
+                )
+        except DuplicateKeyError:
+            # Another worker holds an unexpired lease (the upsert collided with its document)
+            lease = None
+        except Exception as e:
+            logger.warning(f"Lease heartbeat for {self.name} failed: {e}")
+            return self.held
+
+        if lease is None:
+            if self.held:
+                logger.warning(f"Lost the {self.name} lease to another worker")
+            self._held_until = 0.0
+            return False
+        # Measured from before the round trip, so this worker never outlives the stored lease
+        self._held_until = started + self.lease_seconds
+        return True
+
+    async def release(self):
+        """Give the lease up so another worker can take over without waiting for it to expire"""
+        was_held = self.held
+        self._held_until = 0.0
+        if not was_held:
+            return
+        try:
+            await DatabaseOperations.update_one(
+                LEADER_LEASES_COLLECTION,
+                {"_id": self.name, "holder": self.worker_id},
+                {"$set": {"expires_at": datetime.utcnow()}}
+            )
+        except Exception as e:
+            logger.warning(f"Could not release the {self.name} lease: {e}")
+
+    async def current(self) -> Optional[Dict[str, Any]]:
+        """The stored lease document (holder, expires_at, ...), or None"""
+        return await DatabaseOperations.find_one(LEADER_LEASES_COLLECTION, {"_id": self.name})
@@ -0,0 +1,102 @@
+"""
+Compiled keyword-pattern tables for the event and venue classifiers.
+
+The classifiers score text against tables of regexes such as
+"hackathon|coding.*marathon", counting `re.findall` matches per pattern. A
+PatternTable compiles every pattern once and extracts the literal substrings
+each alternative needs ("coding" and "marathon" above). Scoring first checks
+which literals occur in the text and only runs the regexes whose alternatives
+all have their literals present; on typical event text that skips nearly every
+pattern, including the `.*` ones that backtrack over long descriptions.
+Counts are identical to running `re.findall` over the whole table.
+
+Usage:
+    table = PatternTable({"single_mark": [r"seminar|webinar"], ...})
+    table.counts("tech seminar")      # {"single_mark": 1, ...}
+"""
+
+import re
+from typing import Any, Dict, FrozenSet, Hashable, List, Mapping, Optional, Sequence, Tuple
+
+# One syntax element of a pattern, in the order they are tried
+_TOKEN = re.compile(r"\\d[*+?]?|\.[*+?]?|\\.|[^\\]\?|.", re.DOTALL)
+_SPECIAL = set("()[]{}^$*+?")
+
+
+def required_literals(pattern: str) -> Optional[Tuple[FrozenSet[str], ...]]:
+    """
+    Literals every match of each top-level alternative of `pattern` contains.
+
+    Understands literal text, `.`, `.*`, `.+`, `\\d`, `\\d+`, an optional `x?`
+    and `|`. Returns None for anything else (groups, classes, anchors, ...);
+    such patterns are always run.
+    """
+    branches: List[FrozenSet[str]] = []
+    literals: List[str] = []
+    current = ""
+    for token in _TOKEN.findall(pattern):
+        if token == "|":
+            literals.append(current)
+            branches.append(frozenset(literal for literal in literals if literal))
+            literals, current = [], ""
+        elif token.startswith(("\\d", ".")) or (len(token) == 2 and token[1] == "?" and token[0] not in _SPECIAL):
+            literals.append(current)
+            current = ""
+        elif len(token) == 2 and token[0] == "\\" and not token[1].isalnum():
+            current += token[1]
+        elif len(token) == 1 and token not in _SPECIAL and token != "\\":
+            current += token
+        else:
+            return None
+    literals.append(current)
+    branches.append(frozenset(literal for literal in literals if literal))
+    return tuple(branches)
+
+
+class PatternTable:
+    """Regex patterns grouped by key, compiled once and prefiltered by their literals"""
+
+    def __init__(self, patterns: Mapping[Hashable, Sequence[str]]):
+        self.keys = list(patterns)
+        # (key, pattern, compiled, literals per alternative or None)
+        self._entries: List[Tuple[Hashable, str, "re.Pattern", Optional[Tuple[FrozenSet[str], ...]]]] = [
+            (key, pattern, re.compile(pattern), required_literals(pattern))
+            for key, key_patterns in patterns.items()
+            for pattern in key_patterns
+        ]
+        self._literals = tuple(sorted({
+            literal
+            for *_, branches in self._entries if branches
+            for branch in branches
+            for literal in branch
+        }))
+
+    def _candidates(self, text: str):
+        present = {literal for literal in self._literals if literal in text}
+        for entry in self._entries:
+            branches = entry[3]
+            if branches is None or any(branch <= present for branch in branches):
+                yield entry
+
+    def pattern_counts(self, text: str) -> List[Tuple[Hashable, str, int]]:
+        """(key, pattern, len(re.findall(pattern, text))) for every pattern that matches, in table order"""
+        results = []
+        for key, pattern, compiled, _ in self._candidates(text):
+            count = len(compiled.findall(text))
+            if count:
+                results.append((key, pattern, count))
+        return results
+
+    def counts(self, text: str) -> Dict[Any, int]:
+        """Total match count per key (0 for keys with no match)"""
+        totals = dict.fromkeys(self.keys, 0)
+        for key, _, count in self.pattern_counts(text):
+            totals[key] += count
+        return totals
+
+    def first_match(self, text: str) -> Optional[Hashable]:
+        """Key of the first pattern, in table order, that `re.search` finds in `text`"""
+        for key, _, compiled, _ in self._candidates(text):
+            if compiled.search(text):
+                return key
+        return None
@@ -4,187 +4,452 @@ Redis caching utility for high-performance event data caching.
 This module provides Redis-based caching for event data to complement 
 the frontend localStorage caching system.
 
+Events are cached one key per event (campus_connect:event:<event_id>), and
+listings are served from one sorted set per (status, audience view) holding
+event IDs scored by start time. A page of events therefore costs one range read
+plus one MGET, independent of catalog size.
+
 Installation requirements:
-pip install redis
+pip install redis orjson
 
 Usage:
-    from utils.redis_cache import EventCache
-    
-    cache = EventCache()
-    
-    # Cache events
-    cache.set_events(events_data)
-    
-    # Get cached events
-    cached_events = cache.get_events()
-    
-    # Clear cache
-    cache.clear_events()
+    from utils.redis_cache import event_cache
+
+    # One event (loaded from MongoDB and cached on a miss)
+    event = await event_cache.get_event(event_id)
+
+    # A page of a listing (None while the index is being built)
+    page = await event_cache.get_listing_page("upcoming", "student", limit=10)
+    events = await event_cache.get_events(page["event_ids"])
+
+    # After an event changed
+    await event_cache.refresh_event(event_id)
 """
 
+import asyncio
 import json
 import logging
-from typing import Optional, List, Dict, Any
-from datetime import datetime, timedelta
-import pytz
-import os
+import time
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+from datetime import datetime
 
-# Load environment variables
-from dotenv import load_dotenv
-load_dotenv()
+from bson import ObjectId
 
-from utils.logging_utils import mask_redis_url
+from database.operations import DatabaseOperations
+from utils.event_status_manager import EventStatusManager
+from utils.redis_pool import RedisPool
+from utils.two_tier_cache import invalidate_cache
+from utils.tagged_cache import invalidate_student_dashboards_for_events
 
 try:
-    import redis
-    REDIS_AVAILABLE = True
+    import orjson
+    ORJSON_AVAILABLE = True
 except ImportError:
-    REDIS_AVAILABLE = False
-    logging.warning("Redis not installed. Run 'pip install redis' to enable Redis caching.")
+    ORJSON_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Listing statuses kept as sorted indexes, with the same membership as
+# EventStatusManager.status_query; other filters (category, search) query MongoDB
+INDEXED_STATUSES = ("all", "upcoming", "ongoing", "completed")
+
+# Audience views: who is browsing -> which target_audience values they see
+AUDIENCE_VIEWS = {
+    "public": ("student",),
+    "student": ("student", "both"),
+    "faculty": ("faculty", "both"),
+}
+
+# Two-tier caches keyed by event_id that must be dropped whenever an event changes
+EVENT_SCOPED_CACHES = ("event_details", "feedback_forms")
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    return str(value)
+
+
+def _dumps(value: Any) -> str:
+    """Compact JSON; orjson when installed (Redis clients decode responses as str)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value, default=_json_default).decode()
+    return json.dumps(value, default=_json_default, separators=(",", ":"))
+
+
+def _loads(raw: Any) -> Any:
+    return orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+
+
+def start_score(value: Any) -> float:
+    """Sorted-index score for an event start (seconds since epoch, naive datetimes as stored)"""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00').replace('+00:00', ''))
+        except ValueError:
+            return 0.0
+    if not isinstance(value, datetime):
+        return 0.0
+    return (value.replace(tzinfo=None) - _EPOCH).total_seconds()
+
+
 class EventCache:
     """Redis-based cache for event data with automatic expiration."""
-    
-    def __init__(self, redis_host=None, redis_port=None, redis_db=0, expire_minutes=5):
+
+    def __init__(self, expire_minutes=5, index_refresh_minutes=10):
         """
-        Initialize Redis cache connection.
+        Initialize the cache on top of the shared async Redis pool.
         
         Args:
-            redis_host: Redis server host (overridden by env if set)
-            redis_port: Redis server port  (overridden by env if set)
-            redis_db: Redis database number
-            expire_minutes: Cache expiration time in minutes
+            expire_minutes: How long a cached event is served as fresh
+            index_refresh_minutes: How often the listing indexes are rebuilt from MongoDB
         """
         self.expire_seconds = expire_minutes * 60
-        self.events_key = 'campus_connect:events'
-        self.redis_client = None
-        
-        redis_url = os.getenv("UPSTASH_REDIS_URL") or os.getenv("REDIS_URL")
-        if REDIS_AVAILABLE and redis_url:
-            try:
-                # Redis-py 5.x automatically handles SSL from rediss:// URL
-                self.redis_client = redis.from_url(
-                    redis_url, 
-                    decode_responses=True,
-                    socket_connect_timeout=10,
-                    socket_timeout=10,
-                    retry_on_timeout=True
-                )
-                self.redis_client.ping()
-                logger.info(f"Redis cache initialized successfully on {mask_redis_url(redis_url)}")
-            except Exception as e:
-                logger.warning(f"Failed to connect to Redis: {e}")
-                self.redis_client = None
-        elif REDIS_AVAILABLE:
-            try:
-                self.redis_client = redis.Redis(
-                    host=redis_host or 'localhost',
-                    port=redis_port or 6379,
-                    db=redis_db,
-                    decode_responses=True,
-                    socket_connect_timeout=2,
-                    socket_timeout=2
-                )
-                self.redis_client.ping()
-                logger.info(f"Redis cache initialized successfully on {redis_host or 'localhost'}:{redis_port or 6379}")
-            except Exception as e:
-                logger.warning(f"Failed to connect to Redis: {e}")
-                self.redis_client = None
-        else:
-            logger.warning("Redis not available, caching disabled")
+        # Entries outlive their freshness so a stale copy can be served while refreshing
+        self.stale_seconds = self.expire_seconds
+        self.index_refresh_seconds = index_refresh_minutes * 60
+        self.event_prefix = 'campus_connect:event:'
+        self.index_prefix = 'campus_connect:events:index:'
+        self.index_meta_key = 'campus_connect:events:index:meta'
+        self.index_lock_key = 'campus_connect:events:index:lock'
+        self._rebuild_task: Optional[asyncio.Task] = None
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._loading: Dict[str, asyncio.Future] = {}
+
+    @property
+    def redis_client(self):
+        """Shared async Redis client, or the in-process fallback store when Redis is down"""
+        return RedisPool.get_client()
     
     def is_available(self) -> bool:
-        """Check if Redis caching is available."""
+        """Check if caching is available (always true - falls back to an in-process store)."""
         return self.redis_client is not None
     
-    def set_events(self, events: List[Dict[str, Any]]) -> bool:
+    def is_shared(self) -> bool:
+        """Check if the cache is shared between workers (real Redis in use)."""
+        return RedisPool.is_available()
+
+    # ----- per-event entries -----
+
+    def _event_key(self, event_id: str) -> str:
+        return f"{self.event_prefix}{event_id}"
+
+    def _index_key(self, status: str, view: str) -> str:
+        return f"{self.index_prefix}{status}:{view}"
+
+    def _all_index_keys(self) -> List[str]:
+        return [self._index_key(status, view) for status in INDEXED_STATUSES for view in AUDIENCE_VIEWS]
+
+    def _index_keys_for(self, event: Dict[str, Any]) -> List[str]:
+        """Indexes an event belongs in; events pending approval are never listed"""
+        audience = event.get('target_audience')
+        views = [view for view, audiences in AUDIENCE_VIEWS.items() if audience in audiences]
+        statuses = [status for status in INDEXED_STATUSES if EventStatusManager.matches_status(event, status)]
+        return [self._index_key(status, view) for status in statuses for view in views]
+
+    def _entry(self, event: Dict[str, Any]) -> str:
+        event = {key: value for key, value in event.items() if key != '_id'}
+        return _dumps({"event": event, "fresh_until": time.time() + self.expire_seconds})
+
+    async def _load_events(self, event_ids: List[str]) -> List[Dict[str, Any]]:
+        if not event_ids:
+            return []
+        return await DatabaseOperations.find_many("events", {"event_id": {"$in": event_ids}}, {"_id": 0})
+
+    async def _store_events(self, events: List[Dict[str, Any]]):
+        if not events:
+            return
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            for event in events:
+                pipe.set(self._event_key(event['event_id']), self._entry(event), ex=self.expire_seconds + self.stale_seconds)
+            await pipe.execute()
+
+    def _refresh_in_background(self, event_ids: List[str]):
+        """Reload stale entries once per worker while the stale copies are being served"""
+        pending = [event_id for event_id in event_ids if event_id not in self._refreshing]
+        if not pending:
+            return
+
+        async def refresh():
+            try:
+                await self._store_events(await self._load_events(pending))
+            except Exception as e:
+                logger.warning(f"Background refresh of {len(pending)} cached events failed: {e}")
+            finally:
+                for event_id in pending:
+                    self._refreshing.pop(event_id, None)
+
+        task = asyncio.create_task(refresh())
+        for event_id in pending:
+            self._refreshing[event_id] = task
+
+    async def _load_missing(self, event_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Load cache misses from MongoDB; concurrent misses for the same event share one query"""
+        waiting = {event_id: self._loading[event_id] for event_id in event_ids if event_id in self._loading}
+        to_load = [event_id for event_id in event_ids if event_id not in waiting]
+        loaded: Dict[str, Dict[str, Any]] = {}
+
+        if to_load:
+            future = asyncio.get_running_loop().create_future()
+            # Mark the exception retrieved even when no other request was waiting
+            future.add_done_callback(lambda done: done.exception())
+            for event_id in to_load:
+                self._loading[event_id] = future
+            try:
+                events = await self._load_events(to_load)
+                try:
+                    await self._store_events(events)
+                except Exception as e:
+                    logger.warning(f"Event cache write failed: {e}")
+                # Round-trip through JSON so hits and misses look the same to callers
+                loaded = {event['event_id']: _loads(_dumps(event)) for event in events}
+                future.set_result(loaded)
+            except Exception as e:
+                future.set_exception(e)
+                raise
+            finally:
+                for event_id in to_load:
+                    self._loading.pop(event_id, None)
+
+        for event_id, pending in waiting.items():
+            result = await asyncio.shield(pending)
+            if event_id in result:
+                loaded[event_id] = result[event_id]
+        return loaded
+
+    async def get_events(self, event_ids: List[str]) -> List[Dict[str, Any]]:
         """
-        Cache events data in Redis.
-        
-        Args:
-            events: List of event dictionaries
-            
+        Events by ID in the given order, from cache with MongoDB backfill for misses.
+
         Returns:
-            True if cached successfully, False otherwise
+            Event documents (JSON types - datetimes as ISO strings); unknown IDs are skipped
         """
-        if not self.is_available():
+        if not event_ids:
+            return []
+
+        found: Dict[str, Dict[str, Any]] = {}
+        stale: List[str] = []
+        try:
+            raw_entries = await self.redis_client.mget([self._event_key(event_id) for event_id in event_ids])
+            now = time.time()
+            for event_id, raw in zip(event_ids, raw_entries):
+                if raw:
+                    entry = _loads(raw)
+                    found[event_id] = entry["event"]
+                    if now >= entry.get("fresh_until", 0):
+                        stale.append(event_id)
+        except Exception as e:
+            logger.warning(f"Event cache read failed: {e}")
+
+        missing = [event_id for event_id in event_ids if event_id not in found]
+        if missing:
+            found.update(await self._load_missing(missing))
+        if stale:
+            self._refresh_in_background(stale)
+
+        return [found[event_id] for event_id in event_ids if event_id in found]
+
+    async def get_event(self, event_id: str) -> Optional[Dict[str, Any]]:
+        """One event from cache (loaded from MongoDB on a miss), or None when it does not exist"""
+        events = await self.get_events([event_id])
+        return events[0] if events else None
+
+    async def refresh_events(self, event_ids: Iterable[str]):
+        """Re-read changed events from MongoDB and move them to the right listing indexes"""
+        event_ids = list(dict.fromkeys(event_ids))
+        if not event_ids:
+            return
+        try:
+            events = {event['event_id']: event for event in await self._load_events(event_ids)}
+            index_keys = self._all_index_keys()
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                for event_id in event_ids:
+                    for key in index_keys:
+                        pipe.zrem(key, event_id)
+                    event = events.get(event_id)
+                    if event is None:
+                        pipe.delete(self._event_key(event_id))
+                        continue
+                    pipe.set(self._event_key(event_id), self._entry(event), ex=self.expire_seconds + self.stale_seconds)
+                    for key in self._index_keys_for(event):
+                        pipe.zadd(key, {event_id: start_score(event.get('start_datetime'))})
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to refresh cached events {event_ids}: {e}")
+        for name in EVENT_SCOPED_CACHES:
+            await invalidate_cache(name, *event_ids)
+        await invalidate_student_dashboards_for_events(*event_ids)
+
+    async def refresh_event(self, event_id: str):
+        """Re-read one changed (or deleted) event"""
+        await self.refresh_events([event_id])
+
+    # ----- listing indexes -----
+
+    async def rebuild_index(self) -> bool:
+        """
+        Rebuild every listing index from MongoDB. Single-flight across workers: only
+        the holder of the rebuild lock does the work.
+
+        Returns:
+            True if this call rebuilt the indexes
+        """
+        if not await self.redis_client.set(self.index_lock_key, "1", ex=60, nx=True):
             return False
-            
         try:
-            # Store events with metadata
-            cache_data = {
-                'events': events,
-                'cached_at': datetime.now(pytz.timezone('Asia/Kolkata')).replace(tzinfo=None).isoformat(),
-                'count': len(events)
-            }
-            
-            # Set with expiration
-            result = self.redis_client.setex(
-                self.events_key,
-                self.expire_seconds,
-                json.dumps(cache_data, default=str)
+            started = time.perf_counter()
+            events = await DatabaseOperations.find_many(
+                "events", {"event_approval_status": {"$ne": "pending_approval"}},
+                {"_id": 0, "event_id": 1, "status": 1, "sub_status": 1, "target_audience": 1, "start_datetime": 1,
+                 "event_approval_status": 1}
             )
-            
-            if result:
-                logger.info(f"Cached {len(events)} events in Redis, expires in {self.expire_seconds}s")
-                return True
-            return False
-            
+            indexes: Dict[str, Dict[str, float]] = {key: {} for key in self._all_index_keys()}
+            for event in events:
+                for key in self._index_keys_for(event):
+                    indexes[key][event['event_id']] = start_score(event.get('start_datetime'))
+
+            # Swap in atomically so readers never see a half-built index
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                for key, members in indexes.items():
+                    pipe.delete(key)
+                    if members:
+                        pipe.zadd(key, members)
+                pipe.set(self.index_meta_key, _dumps({"built_at": time.time(), "count": len(events)}))
+                await pipe.execute()
+            logger.info(f"Rebuilt event listing indexes: {len(events)} events in {(time.perf_counter() - started) * 1000:.0f} ms")
+            return True
         except Exception as e:
-            logger.error(f"Failed to cache events in Redis: {e}")
+            logger.error(f"Failed to rebuild event listing indexes: {e}")
             return False
-    
-    def get_events(self) -> Optional[List[Dict[str, Any]]]:
+        finally:
+            await self.redis_client.delete(self.index_lock_key)
+
+    def _rebuild_in_background(self):
+        if self._rebuild_task and not self._rebuild_task.done():
+            return
+        self._rebuild_task = asyncio.create_task(self.rebuild_index())
+
+    async def get_listing_page(self, status: str, view: str, limit: int, offset: int = 0,
+                               after: Optional[Tuple[Any, str]] = None,
+                               descending: bool = False) -> Optional[Dict[str, Any]]:
         """
-        Retrieve cached events from Redis.
-        
+        One page of a listing, ordered by (start_datetime, event_id).
+
+        Args:
+            status: One of INDEXED_STATUSES
+            view: Audience view, one of AUDIENCE_VIEWS
+            limit: Page size
+            offset: Rank to start from (page-numbered requests)
+            after: (start_datetime, event_id) keyset position to continue after
+            descending: Latest start first instead
+
         Returns:
-            List of events if cache hit, None if cache miss or error
+            {"event_ids": [...], "has_next": bool, "total": int}, or None when the
+            index is not available yet and the caller should query MongoDB
         """
-        if not self.is_available():
+        if status not in INDEXED_STATUSES or view not in AUDIENCE_VIEWS:
             return None
-            
+        key = self._index_key(status, view)
         try:
-            cached_data = self.redis_client.get(self.events_key)
-            if not cached_data:
-                logger.debug("No events found in Redis cache")
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.get(self.index_meta_key)
+                pipe.zcard(key)
+                if after is None:
+                    (pipe.zrevrange if descending else pipe.zrange)(key, offset, offset + limit)
+                meta_raw, total, *ranged = await pipe.execute()
+
+            if not meta_raw:
+                # Cold index: build it once in the background, serve this request from MongoDB
+                self._rebuild_in_background()
                 return None
-                
-            cache_data = json.loads(cached_data)
-            events = cache_data.get('events', [])
-            cached_at = cache_data.get('cached_at')
-            
-            logger.info(f"Retrieved {len(events)} events from Redis cache (cached at {cached_at})")
-            return events
-            
+            if time.time() - _loads(meta_raw).get("built_at", 0) > self.index_refresh_seconds:
+                self._rebuild_in_background()
+
+            if after is None:
+                event_ids = ranged[0]
+            else:
+                event_ids = await self._range_after(key, after, limit + 1, descending)
+            return {"event_ids": event_ids[:limit], "has_next": len(event_ids) > limit, "total": total}
         except Exception as e:
-            logger.error(f"Failed to retrieve events from Redis: {e}")
+            logger.warning(f"Event listing index read failed: {e}")
+            return None
+
+    async def _range_after(self, key: str, after: Tuple[Any, str], count: int, descending: bool = False) -> List[str]:
+        """Up to `count` members ordered after (score, event_id) - equal scores sort by member"""
+        after_score, after_event_id = start_score(after[0]), after[1]
+        event_ids: List[str] = []
+        offset = 0
+        while len(event_ids) < count:
+            if descending:
+                batch = await self.redis_client.zrevrangebyscore(key, after_score, "-inf", start=offset, num=count, withscores=True)
+            else:
+                batch = await self.redis_client.zrangebyscore(key, after_score, "+inf", start=offset, num=count, withscores=True)
+            if not batch:
+                break
+            offset += len(batch)
+            event_ids.extend(
+                member for member, score in batch
+                if (score < after_score or member < after_event_id if descending
+                    else score > after_score or member > after_event_id)
+            )
+        return event_ids[:count]
+
+    # ----- generic JSON entries -----
+
+    async def get_json(self, key: str) -> Optional[Any]:
+        """
+        Get a JSON value stored under an arbitrary cache key.
+        
+        Returns:
+            Decoded value, or None on cache miss or error
+        """
+        try:
+            cached_data = await self.redis_client.get(key)
+            return json.loads(cached_data) if cached_data else None
+        except Exception as e:
+            logger.error(f"Failed to read cache key {key}: {e}")
             return None
     
-    def clear_events(self) -> bool:
+    async def set_json(self, key: str, value: Any, expire_seconds: int) -> bool:
         """
-        Clear cached events from Redis.
+        Store a JSON-serializable value under an arbitrary cache key.
         
         Returns:
-            True if cleared successfully, False otherwise
+            True if cached successfully, False otherwise
         """
-        if not self.is_available():
-            return False
-            
         try:
-            result = self.redis_client.delete(self.events_key)
-            if result:
-                logger.info("Cleared events cache from Redis")
-                return True
-            return False
-            
+            return bool(await self.redis_client.setex(key, expire_seconds, json.dumps(value, default=str)))
         except Exception as e:
-            logger.error(f"Failed to clear events cache from Redis: {e}")
+            logger.error(f"Failed to write cache key {key}: {e}")
             return False
     
-    def get_cache_info(self) -> Dict[str, Any]:
+    async def delete_pattern(self, pattern: str) -> int:
+        """
+        Delete all keys matching a pattern using incremental SCAN and pipelined deletes.
+        
+        Returns:
+            Number of keys deleted
+        """
+        try:
+            deleted = 0
+            batch = []
+            async for key in self.redis_client.scan_iter(match=pattern, count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    deleted += await self.redis_client.delete(*batch)
+                    batch = []
+            if batch:
+                deleted += await self.redis_client.delete(*batch)
+            return deleted
+        except Exception as e:
+            logger.error(f"Failed to delete cache keys matching {pattern}: {e}")
+            return 0
+    
+    async def get_cache_info(self) -> Dict[str, Any]:
         """
         Get information about the current cache state.
         
@@ -195,24 +460,18 @@ class EventCache:
             return {'available': False, 'reason': 'Redis not available'}
             
         try:
-            cached_data = self.redis_client.get(self.events_key)
-            if not cached_data:
-                return {
-                    'available': True,
-                    'cached': False,
-                    'events_count': 0,
-                    'ttl': 0
-                }
-                
-            cache_data = json.loads(cached_data)
-            ttl = self.redis_client.ttl(self.events_key)
-            
+            meta_raw = await self.redis_client.get(self.index_meta_key)
+            if not meta_raw:
+                return {'available': True, 'shared': self.is_shared(), 'cached': False, 'events_count': 0}
+
+            meta = _loads(meta_raw)
             return {
                 'available': True,
+                'shared': self.is_shared(),
                 'cached': True,
-                'events_count': len(cache_data.get('events', [])),
-                'cached_at': cache_data.get('cached_at'),
-                'ttl': ttl
+                'events_count': meta.get('count', 0),
+                'index_built_at': datetime.utcfromtimestamp(meta.get('built_at', 0)).isoformat(),
+                'serializer': 'orjson' if ORJSON_AVAILABLE else 'json'
             }
             
         except Exception as e:
@@ -0,0 +1,266 @@
+"""
+Shared async Redis connection pool.
+
+One redis.asyncio connection pool per process, used by EventCache,
+TokenManager and AdvancedRateLimiter so no Redis call blocks the event loop.
+When Redis is not configured or unreachable an in-process store exposing the
+same subset of commands is returned instead, so callers degrade gracefully.
+
+Usage:
+    from utils.redis_pool import RedisPool
+
+    await RedisPool.connect()          # once, at application startup
+    client = RedisPool.get_client()    # redis.asyncio.Redis or InMemoryRedis
+    await client.setex("key", 60, "value")
+"""
+
+import asyncio
+import fnmatch
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Load environment variables
+from dotenv import load_dotenv
+load_dotenv()
+
+from utils.logging_utils import mask_redis_url
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    logging.warning("Redis not installed. Run 'pip install redis' to enable Redis support.")
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("UPSTASH_REDIS_URL") or os.getenv("REDIS_URL")
+
+# Pool settings - short socket timeouts so a slow Redis hop cannot stall requests
+REDIS_POOL_OPTIONS = {
+    "max_connections": int(os.getenv("REDIS_MAX_CONNECTIONS", "50")),
+    "socket_connect_timeout": float(os.getenv("REDIS_CONNECT_TIMEOUT", "3")),
+    "socket_timeout": float(os.getenv("REDIS_SOCKET_TIMEOUT", "2")),
+    "health_check_interval": 30,
+    "retry_on_timeout": True,
+    "decode_responses": True,
+}
+
+
+class InMemoryPipeline:
+    """Pipeline stand-in for InMemoryRedis: queues commands and runs them in order."""
+
+    def __init__(self, store: "InMemoryRedis"):
+        self._store = store
+        self._commands: List[Tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name: str):
+        def queue(*args, **kwargs):
+            self._commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self) -> List[Any]:
+        commands, self._commands = self._commands, []
+        return [await getattr(self._store, name)(*args, **kwargs) for name, args, kwargs in commands]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._commands = []
+
+
+class InMemoryRedis:
+    """
+    Minimal in-process fallback implementing the async Redis commands used in this codebase.
+
+    Data lives only in the current worker process, so it is a degraded mode
+    for single-worker/local development rather than a shared store.
+    """
+
+    def __init__(self):
+        self._data: Dict[str, Any] = {}
+        self._expires: Dict[str, float] = {}
+
+    def _expired(self, key: str) -> bool:
+        expires_at = self._expires.get(key)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+            return True
+        return False
+
+    def _live_keys(self) -> List[str]:
+        return [key for key in list(self._data) if not self._expired(key)]
+
+    async def ping(self) -> bool:
+        return True
+
+    async def get(self, key: str) -> Optional[str]:
+        if self._expired(key):
+            return None
+        return self._data.get(key)
+
+    async def mget(self, *keys) -> List[Optional[str]]:
+        if len(keys) == 1 and isinstance(keys[0], (list, tuple)):
+            keys = tuple(keys[0])
+        return [await self.get(key) for key in keys]
+
+    async def set(self, key: str, value: Any, ex: Optional[int] = None, nx: bool = False) -> Optional[bool]:
+        if nx and await self.exists(key):
+            return None
+        self._data[key] = value
+        if ex:
+            self._expires[key] = time.monotonic() + ex
+        else:
+            self._expires.pop(key, None)
+        return True
+
+    async def setex(self, key: str, seconds: int, value: Any) -> bool:
+        return await self.set(key, value, ex=seconds)
+
+    async def delete(self, *keys) -> int:
+        deleted = 0
+        for key in keys:
+            if not self._expired(key) and key in self._data:
+                deleted += 1
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return deleted
+
+    async def exists(self, *keys) -> int:
+        return sum(1 for key in keys if not self._expired(key) and key in self._data)
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        value = int(await self.get(key) or 0) + amount
+        self._data[key] = str(value)
+        return value
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        if self._expired(key) or key not in self._data:
+            return False
+        self._expires[key] = time.monotonic() + seconds
+        return True
+
+    async def ttl(self, key: str) -> int:
+        if self._expired(key) or key not in self._data:
+            return -2
+        expires_at = self._expires.get(key)
+        if expires_at is None:
+            return -1
+        return max(int(expires_at - time.monotonic()), 0)
+
+    # Sorted sets are kept as {member: score}; ordering happens on read
+    def _sorted_members(self, key: str) -> List[Tuple[str, float]]:
+        members = (None if self._expired(key) else self._data.get(key)) or {}
+        return sorted(members.items(), key=lambda item: (item[1], item[0]))
+
+    async def zadd(self, key: str, mapping: Dict[str, float]) -> int:
+        members = self._data.setdefault(key, {})
+        added = sum(1 for member in mapping if member not in members)
+        members.update({member: float(score) for member, score in mapping.items()})
+        return added
+
+    async def zrem(self, key: str, *members) -> int:
+        stored = self._data.get(key) or {}
+        removed = sum(1 for member in members if stored.pop(member, None) is not None)
+        if key in self._data and not stored:
+            await self.delete(key)
+        return removed
+
+    async def zcard(self, key: str) -> int:
+        return len(self._sorted_members(key))
+
+    async def zrange(self, key: str, start: int, end: int, withscores: bool = False):
+        items = self._sorted_members(key)
+        items = items[start:] if end == -1 else items[start:end + 1]
+        return items if withscores else [member for member, _ in items]
+
+    async def zrangebyscore(self, key: str, min: Any, max: Any, start: Optional[int] = None,
+                            num: Optional[int] = None, withscores: bool = False):
+        low, high = float(min), float(max)
+        items = [item for item in self._sorted_members(key) if low <= item[1] <= high]
+        if start is not None:
+            items = items[start:start + num] if num is not None and num >= 0 else items[start:]
+        return items if withscores else [member for member, _ in items]
+
+    async def keys(self, pattern: str = "*") -> List[str]:
+        return [key for key in self._live_keys() if fnmatch.fnmatchcase(key, pattern)]
+
+    async def scan_iter(self, match: str = "*", count: Optional[int] = None):
+        for key in await self.keys(match):
+            yield key
+
+    def pipeline(self, transaction: bool = True) -> InMemoryPipeline:
+        return InMemoryPipeline(self)
+
+    async def close(self):
+        pass
+
+    async def aclose(self):
+        pass
+
+
+class RedisPool:
+    """Process-wide async Redis client built on a single connection pool."""
+
+    client: Optional["aioredis.Redis"] = None
+    fallback = InMemoryRedis()
+    _connect_lock: Optional[asyncio.Lock] = None
+
+    @classmethod
+    async def connect(cls) -> bool:
+        """Create the shared pool and verify it once. Returns True if real Redis is in use."""
+        if cls.client is not None:
+            return True
+        if not REDIS_AVAILABLE:
+            logger.warning("Redis not available, using in-process fallback store")
+            return False
+
+        if cls._connect_lock is None:
+            cls._connect_lock = asyncio.Lock()
+
+        async with cls._connect_lock:
+            if cls.client is not None:
+                return True
+
+            url = REDIS_URL or "redis://localhost:6379/0"
+            client = None
+            try:
+                # redis-py handles SSL automatically for rediss:// URLs
+                pool = aioredis.ConnectionPool.from_url(url, **REDIS_POOL_OPTIONS)
+                client = aioredis.Redis(connection_pool=pool)
+                await client.ping()
+                cls.client = client
+                logger.info(f"Async Redis pool initialized on {mask_redis_url(url)}")
+                return True
+            except Exception as e:
+                logger.warning(f"Failed to connect to Redis ({mask_redis_url(url)}), using in-process fallback: {e}")
+                if client is not None:
+                    await client.aclose()
+                return False
+
+    @classmethod
+    async def close(cls):
+        """Close the shared pool"""
+        if cls.client is not None:
+            try:
+                await cls.client.aclose()
+                logger.info("Closed Redis connection pool")
+            except Exception as e:
+                logger.error(f"Error closing Redis connection pool: {e}")
+            finally:
+                cls.client = None
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """Whether a real (shared) Redis server is in use"""
+        return cls.client is not None
+
+    @classmethod
+    def get_client(cls):
+        """Return the shared Redis client, or the in-process fallback store"""
+        return cls.client if cls.client is not None else cls.fallback
@@ -4,67 +4,79 @@ Fetches real data from the database for dashboard statistics
 """
 from database.operations import DatabaseOperations
 from config.database import Database
+from pymongo.errors import DuplicateKeyError
+from datetime import datetime
 from typing import Dict, Any, Optional
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
+PLATFORM_STATS_COLLECTION = "platform_stats"
+PLATFORM_STATS_ID = "platform"
+PLATFORM_STATS_CACHE_KEY = "campus_connect:platform_stats"
+PLATFORM_STATS_CACHE_SECONDS = 30
+# Full recount interval - corrects drift from writes that bypass the counters
+PLATFORM_STATS_REBUILD_SECONDS = 3600
+DEFAULT_PLATFORM_RATING = 4.5
+
+# Participants per registration document (student team documents hold one entry per member)
+_PARTICIPANTS_EXPRESSION = {"$cond": [
+    {"$isArray": "$team_members"},
+    {"$size": "$team_members"},
+    1
+]}
+
+# Participants whose attendance reached "present" (the prerequisite for a certificate)
+_PRESENT_PARTICIPANTS_EXPRESSION = {"$cond": [
+    {"$isArray": "$team_members"},
+    {"$size": {"$filter": {
+        "input": "$team_members",
+        "as": "member",
+        "cond": {"$eq": ["$$member.attendance.status", "present"]}
+    }}},
+    {"$cond": [{"$eq": ["$attendance.status", "present"]}, 1, 0]}
+]}
+
+_REAL_FEEDBACK = {"$match": {"is_test_submission": {"$ne": True}}}
+
+
 class StatisticsManager:
     """Manager class for fetching platform statistics"""
     
     @staticmethod
     async def get_platform_statistics() -> Dict[str, Any]:
         """
-        Fetch real platform statistics from the database
+        Fetch platform statistics from the maintained platform_stats summary
+        
+        The summary document is updated incrementally on registration, attendance
+        and feedback writes and recounted in the background every hour, so this
+        costs one cache hit or one indexed read regardless of platform size.
         
         Returns:
             Dict containing:
             - total_events: Total number of events hosted
             - active_students: Total number of registered students  
-            - certificates_issued: Total certificates earned by students
+            - certificates_issued: Participants whose attendance qualifies for a certificate
             - platform_rating: Average rating from event feedback
+            - total_registrations: Total event participants
         """
         try:
-            stats = {
-                "total_events": 0,
-                "active_students": 0,
-                "certificates_issued": 0,
-                "platform_rating": 4.5
-            }
-
-            # Get total events count
-            try:
-                events_count = await DatabaseOperations.count_documents("events", {})
-                stats["total_events"] = events_count
-            except Exception as e:
-                logger.warning(f"Failed to fetch events count: {e}")
-                stats["total_events"] = 0
-
-            # Get active students count
-            try:
-                students_count = await DatabaseOperations.count_documents("students", {"is_active": True})
-                stats["active_students"] = students_count
-            except Exception as e:
-                logger.warning(f"Failed to fetch students count: {e}")
-                stats["active_students"] = 0
-
-            # Get certificates issued count by counting attendance records
-            # (attendance is prerequisite for certificate)
-            try:
-                certificates_count = await StatisticsManager.get_certificates_count()
-                stats["certificates_issued"] = certificates_count
-            except Exception as e:
-                logger.warning(f"Failed to fetch certificates count: {e}")
-                stats["certificates_issued"] = 0
+            from utils.redis_cache import event_cache
+            
+            cached = await event_cache.get_json(PLATFORM_STATS_CACHE_KEY)
+            if cached:
+                return cached
             
-            # Calculate platform rating from feedback
-            try:
-                avg_rating = await StatisticsManager.get_average_rating()
-                stats["platform_rating"] = avg_rating
-            except Exception as e:
-                logger.warning(f"Failed to fetch platform rating: {e}")
-                stats["platform_rating"] = 4.5
+            summary = await DatabaseOperations.find_one(PLATFORM_STATS_COLLECTION, {"_id": PLATFORM_STATS_ID})
+            if not summary:
+                summary = await StatisticsManager.rebuild_platform_stats()
+            elif StatisticsManager._needs_rebuild(summary):
+                # Serve the current numbers and recount in the background
+                asyncio.create_task(StatisticsManager.rebuild_platform_stats())
             
+            stats = StatisticsManager._format_summary(summary)
+            await event_cache.set_json(PLATFORM_STATS_CACHE_KEY, stats, PLATFORM_STATS_CACHE_SECONDS)
             return stats
             
         except Exception as e:
@@ -74,38 +86,109 @@ class StatisticsManager:
                 "total_events": 0,
                 "active_students": 0,
                 "certificates_issued": 0,
-                "platform_rating": 4.5
+                "platform_rating": DEFAULT_PLATFORM_RATING,
+                "total_registrations": 0
             }
     
+    @staticmethod
+    def _needs_rebuild(summary: Dict[str, Any]) -> bool:
+        rebuilt_at = summary.get("rebuilt_at")
+        return not rebuilt_at or (datetime.utcnow() - rebuilt_at).total_seconds() > PLATFORM_STATS_REBUILD_SECONDS
+    
+    @staticmethod
+    def _format_summary(summary: Dict[str, Any]) -> Dict[str, Any]:
+        rating_count = summary.get("rating_count", 0)
+        if rating_count > 0:
+            platform_rating = min(max(round(summary.get("rating_sum", 0) / rating_count, 1), 1.0), 5.0)
+        else:
+            platform_rating = DEFAULT_PLATFORM_RATING
+        return {
+            "total_events": summary.get("total_events", 0),
+            "active_students": summary.get("active_students", 0),
+            "certificates_issued": summary.get("certificates_issued", 0),
+            "platform_rating": platform_rating,
+            "total_registrations": summary.get("total_registrations", 0)
+        }
+    
+    @staticmethod
+    async def rebuild_platform_stats() -> Dict[str, Any]:
+        """
+        Recount every statistic with aggregations and store the summary document
+        
+        The recount replaces the counters, and only if no other worker rebuilt the
+        summary in the meantime. Increments from writes that race the aggregations
+        may be dropped or counted twice; that drift is corrected by the next rebuild.
+        """
+        before = await DatabaseOperations.find_one(PLATFORM_STATS_COLLECTION, {"_id": PLATFORM_STATS_ID}) or {}
+        events_count, students_count, registration_totals, rating_totals = await asyncio.gather(
+            DatabaseOperations.count_documents("events", {}),
+            DatabaseOperations.count_documents("students", {"is_active": True}),
+            StatisticsManager._aggregate_registration_totals(),
+            StatisticsManager._aggregate_rating_totals()
+        )
+        
+        counts = {
+            "total_events": events_count,
+            "active_students": students_count,
+            "total_registrations": registration_totals["registrations"],
+            "certificates_issued": registration_totals["certificates"],
+            "rating_sum": rating_totals["sum"],
+            "rating_count": rating_totals["count"]
+        }
+        now = datetime.utcnow()
+        try:
+            summary = await DatabaseOperations.find_one_and_update(
+                PLATFORM_STATS_COLLECTION,
+                {"_id": PLATFORM_STATS_ID, "rebuilt_at": before.get("rebuilt_at")},
+                {"$set": {**counts, "rebuilt_at": now, "updated_at": now}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # Another worker's rebuild landed first; its summary is at least as recent
+            summary = await DatabaseOperations.find_one(PLATFORM_STATS_COLLECTION, {"_id": PLATFORM_STATS_ID})
+        
+        summary = summary or {"_id": PLATFORM_STATS_ID, **counts, "rebuilt_at": now, "updated_at": now}
+        logger.info(f"Platform statistics rebuilt: {StatisticsManager._format_summary(summary)}")
+        return summary
+    
+    @staticmethod
+    async def _aggregate_registration_totals() -> Dict[str, int]:
+        """Participants and present participants across student and faculty registrations (one round trip)"""
+        rows = await DatabaseOperations.aggregate("student_registrations", [
+            {"$unionWith": {"coll": "faculty_registrations"}},
+            {"$group": {
+                "_id": None,
+                "registrations": {"$sum": _PARTICIPANTS_EXPRESSION},
+                "certificates": {"$sum": _PRESENT_PARTICIPANTS_EXPRESSION}
+            }}
+        ])
+        if not rows:
+            return {"registrations": 0, "certificates": 0}
+        return {"registrations": rows[0]["registrations"], "certificates": rows[0]["certificates"]}
+    
+    @staticmethod
+    async def _aggregate_rating_totals() -> Dict[str, float]:
+        """Sum and count of 1-5 overall ratings across student and faculty feedback (one round trip)"""
+        rows = await DatabaseOperations.aggregate("student_feedbacks", [
+            _REAL_FEEDBACK,
+            {"$unionWith": {"coll": "faculty_feedbacks", "pipeline": [_REAL_FEEDBACK]}},
+            # overall_satisfaction is the rating field of older feedback documents
+            {"$project": {"rating": {"$ifNull": ["$overall_rating", "$overall_satisfaction"]}}},
+            {"$match": {"rating": {"$gte": 1, "$lte": 5}}},
+            {"$group": {"_id": None, "sum": {"$sum": "$rating"}, "count": {"$sum": 1}}}
+        ])
+        if not rows:
+            return {"sum": 0.0, "count": 0}
+        return {"sum": rows[0]["sum"], "count": rows[0]["count"]}
+    
     @staticmethod
     async def get_certificates_count() -> int:
         """
-        Count total certificates that can be issued based on attendance records
+        Count participants whose attendance qualifies them for a certificate
         Since certificates are issued to students who attended events
         """
         try:
-            # Get all events to check their individual attendance collections
-            events = await DatabaseOperations.find_many("events", {})
-            total_certificates = 0
-            
-            for event in events:
-                event_id = event.get("event_id")
-                if not event_id:
-                    continue
-                    
-                try:
-                    # Count attendance records for this event (students who attended)
-                    attendance_count = await DatabaseOperations.count_documents("attendance", {
-                        "event_id": event_id,
-                        "attendance_status": "present"
-                    })
-                    total_certificates += attendance_count
-                except Exception as e:
-                    logger.debug(f"Could not count attendance for event {event_id}: {e}")
-                    continue
-            
-            return total_certificates
-            
+            return (await StatisticsManager._aggregate_registration_totals())["certificates"]
         except Exception as e:
             logger.error(f"Error counting certificates: {e}")
             return 0
@@ -116,38 +199,57 @@ class StatisticsManager:
         Calculate average platform rating from event feedback
         """
         try:
-            # Get all events to check their individual feedback collections
-            events = await DatabaseOperations.find_many("events", {})
-            total_rating = 0.0
-            total_feedback = 0
-            
-            for event in events:
-                event_id = event.get("event_id")
-                if not event_id:
-                    continue
-                    
-                try:
-                    # Get all feedback for this event
-                    feedbacks = await DatabaseOperations.find_many("feedback", {"event_id": event_id})
-                    for feedback in feedbacks:
-                        # Use overall_satisfaction rating (1-5 scale)
-                        rating = feedback.get("overall_satisfaction")
-                        if rating and isinstance(rating, (int, float)) and 1 <= rating <= 5:
-                            total_rating += rating
-                            total_feedback += 1
-                except Exception as e:
-                    logger.debug(f"Could not access feedback for event {event_id}: {e}")
-                    continue
-            
-            if total_feedback > 0:
-                avg_rating = round(total_rating / total_feedback, 1)
+            totals = await StatisticsManager._aggregate_rating_totals()
+            if totals["count"] > 0:
+                avg_rating = round(totals["sum"] / totals["count"], 1)
                 return min(max(avg_rating, 1.0), 5.0)  # Ensure rating is between 1-5
             else:
-                return 4.5  # Default rating when no feedback exists
+                return DEFAULT_PLATFORM_RATING  # Default rating when no feedback exists
                 
         except Exception as e:
             logger.error(f"Error calculating average rating: {e}")
-            return 4.5
+            return DEFAULT_PLATFORM_RATING
+    
+    @staticmethod
+    async def _increment_platform_stats(increments: Dict[str, Any]):
+        """Apply counter increments to the summary; never fails the write that triggered it"""
+        try:
+            await DatabaseOperations.update_one(
+                PLATFORM_STATS_COLLECTION,
+                {"_id": PLATFORM_STATS_ID},
+                {"$inc": increments, "$set": {"updated_at": datetime.utcnow()}}
+            )
+        except Exception as e:
+            logger.warning(f"Failed to update platform statistics: {e}")
+    
+    @staticmethod
+    async def record_registrations(count: int = 1):
+        """Call after new event participants are registered"""
+        await StatisticsManager._increment_platform_stats({"total_registrations": count})
+    
+    @staticmethod
+    def present_participants(registration: Dict[str, Any]) -> int:
+        """Participants of one registration document counted as "present" (as the recount counts them)"""
+        team_members = registration.get("team_members")
+        if isinstance(team_members, list):
+            return sum(1 for member in team_members if (member.get("attendance") or {}).get("status") == "present")
+        return 1 if (registration.get("attendance") or {}).get("status") == "present" else 0
+    
+    @staticmethod
+    async def record_attendance_present(count: int = 1):
+        """
+        Call when participants' attendance first reaches "present"
+        
+        Writers that can also take a mark back pass the net change, which may be negative.
+        """
+        if count:
+            await StatisticsManager._increment_platform_stats({"certificates_issued": count})
+    
+    @staticmethod
+    async def record_feedback_rating(rating: Optional[float]):
+        """Call after a feedback submission; rating is its 1-5 overall rating, if it has one"""
+        if rating is not None and 1 <= rating <= 5:
+            await StatisticsManager._increment_platform_stats({"rating_sum": rating, "rating_count": 1})
     
     @staticmethod
     def format_stat_number(number: int) -> str:
@@ -0,0 +1,212 @@
+"""
+Tag-versioned cache with stale-while-revalidate.
+
+Every cache entry records the version of each tag it depends on. Invalidating
+a tag is a single INCR of its version counter, so a mutation drops exactly the
+entries that carry that tag in O(1), without KEYS/SCAN over the keyspace.
+Entries whose tag versions no longer match are treated as misses and simply
+age out through their Redis TTL.
+
+Freshness is two-staged: within `fresh_seconds` an entry is served as-is;
+after that (up to `stale_seconds` more) it is still served, while one request
+refreshes it in the background. Tag invalidation always wins over staleness -
+an invalidated entry is never served.
+
+Usage:
+    cache = TaggedCache("admin_events")
+    data = await cache.get_or_load(key, loader, tags=["upcoming|student"])
+    await cache.invalidate_tags(["upcoming|student", "all|all"])
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from utils.redis_pool import RedisPool
+
+logger = logging.getLogger(__name__)
+
+
+class TaggedCache:
+    """Redis cache whose entries are invalidated through versioned tags"""
+
+    def __init__(self, namespace: str, fresh_seconds: int = 30, stale_seconds: int = 300):
+        self.namespace = namespace
+        self.fresh_seconds = fresh_seconds
+        self.stale_seconds = stale_seconds
+        self._refreshing: Dict[str, asyncio.Task] = {}
+
+    @property
+    def redis_client(self):
+        return RedisPool.get_client()
+
+    def _entry_key(self, key: str) -> str:
+        return f"{self.namespace}:entry:{key}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.namespace}:tag:{tag}"
+
+    async def _read(self, key: str, tags: List[str]):
+        """Entry and current tag versions in one round trip"""
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.get(self._entry_key(key))
+            if tags:
+                pipe.mget([self._tag_key(tag) for tag in tags])
+            results = await pipe.execute()
+        raw_entry = results[0]
+        versions = [int(version or 0) for version in results[1]] if tags else []
+        return (json.loads(raw_entry) if raw_entry else None), dict(zip(tags, versions))
+
+    async def _tag_versions(self, tags: List[str]) -> Dict[str, int]:
+        if not tags:
+            return {}
+        versions = await self.redis_client.mget([self._tag_key(tag) for tag in tags])
+        return {tag: int(version or 0) for tag, version in zip(tags, versions)}
+
+    async def _store(self, key: str, value: Any, versions: Dict[str, int]):
+        entry = {"value": value, "tags": versions, "fresh_until": time.time() + self.fresh_seconds}
+        await self.redis_client.set(
+            self._entry_key(key),
+            json.dumps(entry, default=str),
+            ex=self.fresh_seconds + self.stale_seconds
+        )
+
+    async def _load_and_store(self, key: str, loader: Callable[[], Awaitable[Any]], tags: List[str]) -> Any:
+        # Versions are read before loading: if a tag is bumped while the loader
+        # runs, the stored entry is already outdated and will not be served
+        versions = await self._tag_versions(tags)
+        value = await loader()
+        try:
+            await self._store(key, value, versions)
+        except Exception as e:
+            logger.warning(f"Cache write failed for {self.namespace}:{key}: {e}")
+        return value
+
+    def _refresh_in_background(self, key: str, loader: Callable[[], Awaitable[Any]], tags: List[str]):
+        """At most one refresh per key per worker; another worker may refresh too, which is harmless"""
+        task = self._refreshing.get(key)
+        if task and not task.done():
+            return
+
+        async def refresh():
+            try:
+                await self._load_and_store(key, loader, tags)
+            except Exception as e:
+                logger.warning(f"Background refresh failed for {self.namespace}:{key}: {e}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.create_task(refresh())
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]], tags: Iterable[str] = ()) -> Any:
+        """
+        Cached value for `key`, loading it with `loader()` on a miss.
+
+        Args:
+            key: Entry key within the namespace
+            loader: Coroutine function producing a JSON-serializable value
+            tags: Tags the value depends on; invalidating any of them drops the entry
+        """
+        tags = list(tags)
+        try:
+            entry, versions = await self._read(key, tags)
+        except Exception as e:
+            logger.warning(f"Cache read failed for {self.namespace}:{key}: {e}")
+            return await loader()
+
+        if entry is not None and entry.get("tags") == versions:
+            if time.time() >= entry.get("fresh_until", 0):
+                self._refresh_in_background(key, loader, tags)
+            return entry["value"]
+
+        return await self._load_and_store(key, loader, tags)
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """Bump the version of each tag; entries depending on any of them become misses"""
+        tags = sorted(set(tags))
+        if not tags:
+            return 0
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for tag in tags:
+                    pipe.incr(self._tag_key(tag))
+                await pipe.execute()
+            return len(tags)
+        except Exception as e:
+            logger.warning(f"Failed to invalidate {self.namespace} tags {tags}: {e}")
+            return 0
+
+
+# ----- Admin event listings -----
+
+# Every `status` value the admin event list accepts, and which events each one shows
+_ADMIN_LISTING_STATUSES = {
+    "all": lambda event: True,
+    "upcoming": lambda event: event.get("status") == "upcoming",
+    "ongoing": lambda event: event.get("status") in ("upcoming", "ongoing") and event.get("sub_status") in ("registration_open", "event_started"),
+    "active": lambda event: event.get("status") in ("upcoming", "ongoing") and event.get("sub_status") in ("registration_open", "event_started"),
+    "completed": lambda event: event.get("status") == "completed",
+    "pending_approval": lambda event: event.get("event_approval_status") == "pending_approval",
+}
+
+admin_events_cache = TaggedCache("admin_events", fresh_seconds=30, stale_seconds=300)
+
+
+def admin_listing_tag(status: str, target_audience: str) -> str:
+    """Tag shared by every role/user/page entry of one (status, audience) listing"""
+    return f"{status}|{target_audience}"
+
+
+def admin_listing_tags_for(*events: Optional[Dict[str, Any]]) -> List[str]:
+    """Listing tags whose results may contain any of `events` (pass before and after states)"""
+    tags = set()
+    for event in events:
+        if not event:
+            continue
+        statuses = [status for status, matches in _ADMIN_LISTING_STATUSES.items() if matches(event)]
+        if event.get("status") and event.get("status") not in _ADMIN_LISTING_STATUSES:
+            statuses.append(event["status"])
+        for status in statuses:
+            for audience in ("all", event.get("target_audience") or "all"):
+                tags.add(admin_listing_tag(status, audience))
+    return sorted(tags)
+
+
+async def invalidate_admin_event_listings(*events: Optional[Dict[str, Any]]) -> int:
+    """Drop cached admin listings that showed, or should now show, the given events"""
+    tags = admin_listing_tags_for(*events)
+    invalidated = await admin_events_cache.invalidate_tags(tags)
+    if invalidated:
+        logger.info(f"🗑️ Invalidated admin event listings: {', '.join(tags)}")
+    return invalidated
+
+
+# ----- Student dashboards -----
+
+student_dashboard_cache = TaggedCache("student_dashboard", fresh_seconds=300, stale_seconds=600)
+
+
+def student_dashboard_tag(enrollment_no: str) -> str:
+    """Tag bumped when a student's attendance, feedback or certificate changes"""
+    return f"student:{enrollment_no}"
+
+
+def student_dashboard_event_tag(event_id: str) -> str:
+    """Tag bumped when an event shown on student dashboards changes"""
+    return f"event:{event_id}"
+
+
+async def invalidate_student_dashboards(*enrollment_nos: Optional[str]) -> int:
+    """Drop the cached dashboards of the given students"""
+    return await student_dashboard_cache.invalidate_tags(
+        student_dashboard_tag(enrollment_no) for enrollment_no in enrollment_nos if enrollment_no
+    )
+
+
+async def invalidate_student_dashboards_for_events(*event_ids: Optional[str]) -> int:
+    """Drop every cached dashboard that shows one of the given events"""
+    return await student_dashboard_cache.invalidate_tags(
+        student_dashboard_event_tag(event_id) for event_id in event_ids if event_id
+    )
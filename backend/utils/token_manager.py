@@ -11,79 +11,32 @@ import pytz
 from utils.datetime_helper import safe_datetime_compare, get_current_ist
 import secrets
 import hashlib
-import os
 
-# Load environment variables
-from dotenv import load_dotenv
-load_dotenv()
-
-try:
-    import redis
-    REDIS_AVAILABLE = True
-except ImportError:
-    REDIS_AVAILABLE = False
-    logging.warning("Redis not installed. Run 'pip install redis' to enable token management.")
+from utils.redis_pool import RedisPool
 
 logger = logging.getLogger(__name__)
 
 class TokenManager:
     """Redis-based token manager for authentication with remember me functionality"""
     
-    def __init__(self, redis_host='localhost', redis_port=6379, redis_db=1):
+    def __init__(self):
         """
-        Initialize Redis token manager
+        Initialize token manager on top of the shared async Redis pool (utils.redis_pool).
         
-        Args:
-            redis_host: Redis server host
-            redis_port: Redis server port  
-            redis_db: Redis database number (using db=1 for tokens, separate from cache)
+        Tokens must be visible to every worker, so the in-process fallback store is
+        never used here; when Redis is down callers fall back to stateless JWTs.
         """
-        self.redis_client = None
         self.access_token_expiry = 3600  # 1 hour in seconds
         self.refresh_token_expiry = 30 * 24 * 3600  # 30 days in seconds
-        
-        if REDIS_AVAILABLE:
-            # First try to use Upstash Redis URL from environment
-            redis_url = os.getenv("UPSTASH_REDIS_URL") or os.getenv("REDIS_URL")
-            
-            if redis_url:
-                try:
-                    # Redis-py 5.x automatically handles SSL from rediss:// URL
-                    self.redis_client = redis.from_url(
-                        redis_url, 
-                        decode_responses=True,
-                        socket_connect_timeout=10,
-                        socket_timeout=10,
-                        retry_on_timeout=True
-                    )
-                    self.redis_client.ping()
-                    logger.info(f"Token manager initialized successfully with cloud Redis")
-                except Exception as e:
-                    logger.warning(f"Failed to connect to Redis for token management: {e}")
-                    self.redis_client = None
-            else:
-                # Fallback to local Redis only if no cloud URL is provided
-                try:
-                    self.redis_client = redis.Redis(
-                        host=redis_host,
-                        port=redis_port,
-                        db=redis_db,
-                        decode_responses=True,
-                        socket_connect_timeout=2,
-                        socket_timeout=2
-                    )
-                    # Test connection
-                    self.redis_client.ping()
-                    logger.info(f"Token manager initialized successfully on {redis_host}:{redis_port}/db{redis_db}")
-                except Exception as e:
-                    logger.warning(f"Failed to connect to Redis for token management: {e}")
-                    self.redis_client = None
-        else:
-            logger.warning("Redis not available, token management disabled")
+    
+    @property
+    def redis_client(self):
+        """Shared async Redis client"""
+        return RedisPool.client
     
     def is_available(self) -> bool:
         """Check if Redis token management is available."""
-        return self.redis_client is not None
+        return RedisPool.is_available()
     
     def _generate_token(self) -> str:
         """Generate a secure random token"""
@@ -101,7 +54,39 @@ class TokenManager:
         """Generate Redis key for refresh token lookup"""
         return f"refresh_token:{token_hash}"
     
-    def generate_tokens(self, user_id: str, user_type: str, user_data: Dict[str, Any], remember_me: bool = False) -> Dict[str, str]:
+    def _get_access_token_key(self, token_hash: str) -> str:
+        """Generate Redis key for the access token reverse index"""
+        return f"access_token:{token_hash}"
+    
+    def _build_access_index_data(self, token_data: Dict[str, Any]) -> str:
+        """
+        Build the reverse index entry for an access token.
+        
+        The entry carries everything validation needs so a lookup is a single GET;
+        refresh token secrets stay only in the per-user blob.
+        """
+        index_data = {
+            'user_id': token_data['user_id'],
+            'user_type': token_data['user_type'],
+            'user_data': token_data.get('user_data', {}),
+            'created_at': token_data['created_at'],
+            'expires_at': token_data['expires_at'],
+            'remember_me': token_data.get('remember_me', False)
+        }
+        return json.dumps(index_data, default=str)
+    
+    async def _get_previous_access_key(self, user_key: str) -> Optional[str]:
+        """Return the index key of the access token currently stored for a user, if any"""
+        token_data_str = await self.redis_client.get(user_key)
+        if not token_data_str:
+            return None
+        try:
+            previous_token = json.loads(token_data_str).get('access_token')
+        except (ValueError, TypeError):
+            return None
+        return self._get_access_token_key(self._hash_token(previous_token)) if previous_token else None
+    
+    async def generate_tokens(self, user_id: str, user_type: str, user_data: Dict[str, Any], remember_me: bool = False) -> Dict[str, str]:
         """
         Generate access and refresh tokens for a user
         
@@ -134,6 +119,14 @@ class TokenManager:
             }
             
             user_key = self._get_user_key(user_id, user_type)
+            access_key = self._get_access_token_key(self._hash_token(access_token))
+            previous_access_key = await self._get_previous_access_key(user_key)
+            
+            pipe = self.redis_client.pipeline()
+            if previous_access_key:
+                # A new login replaces the user's previous access token
+                pipe.delete(previous_access_key)
+            pipe.setex(access_key, self.access_token_expiry, self._build_access_index_data(token_data))
             
             if remember_me:
                 # Generate refresh token
@@ -154,18 +147,19 @@ class TokenManager:
                 }
                 
                 # Set refresh token with 30-day expiration
-                self.redis_client.setex(
+                pipe.setex(
                     refresh_key,
                     self.refresh_token_expiry,
                     json.dumps(refresh_lookup_data)
                 )
                 
                 # Store user tokens with 30-day expiration
-                self.redis_client.setex(
+                pipe.setex(
                     user_key,
                     self.refresh_token_expiry,
                     json.dumps(token_data, default=str)
                 )
+                await pipe.execute()
                 
                 logger.info(f"Generated tokens with remember_me for {user_type} {user_id}")
                 return {
@@ -175,11 +169,12 @@ class TokenManager:
                 }
             else:
                 # Store user tokens with 1-hour expiration (access token only)
-                self.redis_client.setex(
+                pipe.setex(
                     user_key,
                     self.access_token_expiry,
                     json.dumps(token_data, default=str)
                 )
+                await pipe.execute()
                 
                 logger.info(f"Generated access token only for {user_type} {user_id}")
                 return {
@@ -191,7 +186,7 @@ class TokenManager:
             logger.error(f"Failed to generate tokens for {user_type} {user_id}: {e}")
             return {}
     
-    def validate_access_token(self, access_token: str) -> Optional[Dict[str, Any]]:
+    async def validate_access_token(self, access_token: str) -> Optional[Dict[str, Any]]:
         """
         Validate an access token and return user data
         
@@ -205,29 +200,27 @@ class TokenManager:
             return None
         
         try:
-            # We need to scan for the token since we don't know the user_id
-            pattern = "tokens:*"
-            for key in self.redis_client.scan_iter(match=pattern):
-                token_data_str = self.redis_client.get(key)
-                if token_data_str:
-                    token_data = json.loads(token_data_str)
-                    if token_data.get('access_token') == access_token:
-                        # Check if token is expired
-                        expires_at = datetime.fromisoformat(token_data['expires_at'])
-                        if safe_datetime_compare(get_current_ist(), expires_at, 'gt'):
-                            # Token expired, clean up
-                            self.redis_client.delete(key)
-                            return None
-                        
-                        return token_data
+            # Single GET against the reverse index keyed by the token hash
+            access_key = self._get_access_token_key(self._hash_token(access_token))
+            token_data_str = await self.redis_client.get(access_key)
+            if not token_data_str:
+                return None
             
-            return None
+            token_data = json.loads(token_data_str)
+            
+            # Check if token is expired (the index TTL normally handles this)
+            expires_at = datetime.fromisoformat(token_data['expires_at'])
+            if safe_datetime_compare(get_current_ist(), expires_at, 'gt'):
+                await self.redis_client.delete(access_key)
+                return None
+            
+            return token_data
             
         except Exception as e:
             logger.error(f"Failed to validate access token: {e}")
             return None
     
-    def refresh_access_token(self, refresh_token: str) -> Optional[Dict[str, str]]:
+    async def refresh_access_token(self, refresh_token: str) -> Optional[Dict[str, str]]:
         """
         Generate a new access token using a refresh token
         
@@ -245,7 +238,7 @@ class TokenManager:
             refresh_key = self._get_refresh_token_key(refresh_token_hash)
             
             # Get refresh token data
-            refresh_data_str = self.redis_client.get(refresh_key)
+            refresh_data_str = await self.redis_client.get(refresh_key)
             if not refresh_data_str:
                 logger.warning("Refresh token not found or expired")
                 return None
@@ -256,7 +249,7 @@ class TokenManager:
             
             # Get current user token data
             user_key = self._get_user_key(user_id, user_type)
-            token_data_str = self.redis_client.get(user_key)
+            token_data_str = await self.redis_client.get(user_key)
             if not token_data_str:
                 logger.warning(f"User token data not found for {user_type} {user_id}")
                 return None
@@ -272,35 +265,40 @@ class TokenManager:
             refresh_expires_at = datetime.fromisoformat(refresh_data['expires_at'])
             if safe_datetime_compare(get_current_ist(), refresh_expires_at, 'gt'):
                 # Clean up expired tokens
-                self.redis_client.delete(refresh_key)
-                self.redis_client.delete(user_key)
+                keys_to_delete = [refresh_key, user_key]
+                if token_data.get('access_token'):
+                    keys_to_delete.append(self._get_access_token_key(self._hash_token(token_data['access_token'])))
+                await self.redis_client.delete(*keys_to_delete)
                 logger.warning("Refresh token expired")
                 return None
             
             # Generate new access token
             new_access_token = self._generate_token()
             current_time = datetime.now(pytz.timezone('Asia/Kolkata')).replace(tzinfo=None)
+            old_access_token = token_data.get('access_token')
             
             # Update token data
             token_data['access_token'] = new_access_token
             token_data['created_at'] = current_time.isoformat()
             token_data['expires_at'] = (current_time + timedelta(seconds=self.access_token_expiry)).isoformat()
             
-            # Update user token data in Redis
-            remaining_ttl = self.redis_client.ttl(user_key)
-            if remaining_ttl > 0:
-                self.redis_client.setex(
-                    user_key,
-                    remaining_ttl,
-                    json.dumps(token_data, default=str)
-                )
-            else:
+            # Update user token data in Redis, swapping the access token index entry
+            remaining_ttl = await self.redis_client.ttl(user_key)
+            pipe = self.redis_client.pipeline()
+            if old_access_token:
+                pipe.delete(self._get_access_token_key(self._hash_token(old_access_token)))
+            pipe.setex(
+                self._get_access_token_key(self._hash_token(new_access_token)),
+                self.access_token_expiry,
+                self._build_access_index_data(token_data)
+            )
+            pipe.setex(
+                user_key,
                 # Fallback to refresh token expiry
-                self.redis_client.setex(
-                    user_key,
-                    self.refresh_token_expiry,
-                    json.dumps(token_data, default=str)
-                )
+                remaining_ttl if remaining_ttl > 0 else self.refresh_token_expiry,
+                json.dumps(token_data, default=str)
+            )
+            await pipe.execute()
             
             logger.info(f"Refreshed access token for {user_type} {user_id}")
             return {
@@ -312,7 +310,7 @@ class TokenManager:
             logger.error(f"Failed to refresh access token: {e}")
             return None
     
-    def revoke_user_tokens(self, user_id: str, user_type: str) -> bool:
+    async def revoke_user_tokens(self, user_id: str, user_type: str) -> bool:
         """
         Revoke all tokens for a user (logout)
         
@@ -329,19 +327,23 @@ class TokenManager:
         try:
             user_key = self._get_user_key(user_id, user_type)
             
-            # Get current token data to find refresh token
-            token_data_str = self.redis_client.get(user_key)
+            keys_to_delete = [user_key]
+            
+            # Get current token data to find refresh and access tokens
+            token_data_str = await self.redis_client.get(user_key)
             if token_data_str:
                 token_data = json.loads(token_data_str)
                 refresh_token = token_data.get('refresh_token')
+                access_token = token_data.get('access_token')
                 
                 if refresh_token:
                     refresh_token_hash = self._hash_token(refresh_token)
-                    refresh_key = self._get_refresh_token_key(refresh_token_hash)
-                    self.redis_client.delete(refresh_key)
+                    keys_to_delete.append(self._get_refresh_token_key(refresh_token_hash))
+                if access_token:
+                    keys_to_delete.append(self._get_access_token_key(self._hash_token(access_token)))
             
-            # Delete user token data
-            self.redis_client.delete(user_key)
+            # Delete user token data and its lookups
+            await self.redis_client.delete(*keys_to_delete)
             
             logger.info(f"Revoked tokens for {user_type} {user_id}")
             return True
@@ -350,7 +352,26 @@ class TokenManager:
             logger.error(f"Failed to revoke tokens for {user_type} {user_id}: {e}")
             return False
     
-    def cleanup_expired_tokens(self) -> int:
+    async def _scan_values(self, pattern: str, batch_size: int = 200):
+        """
+        Iterate (key, value) pairs for a key pattern, fetching values with one MGET per batch
+        
+        Args:
+            pattern: Redis key pattern
+            batch_size: Number of keys fetched per MGET
+        """
+        batch = []
+        async for key in self.redis_client.scan_iter(match=pattern, count=batch_size):
+            batch.append(key)
+            if len(batch) >= batch_size:
+                for pair in zip(batch, await self.redis_client.mget(batch)):
+                    yield pair
+                batch = []
+        if batch:
+            for pair in zip(batch, await self.redis_client.mget(batch)):
+                yield pair
+    
+    async def cleanup_expired_tokens(self) -> int:
         """
         Clean up expired tokens (maintenance task)
         
@@ -362,46 +383,69 @@ class TokenManager:
         
         try:
             cleaned_count = 0
+            keys_to_delete = set()
             current_time = datetime.now(pytz.timezone('Asia/Kolkata')).replace(tzinfo=None)
+            current_access_keys = {}
             
             # Clean up user tokens
-            pattern = "tokens:*"
-            for key in self.redis_client.scan_iter(match=pattern):
-                token_data_str = self.redis_client.get(key)
-                if token_data_str:
-                    try:
-                        token_data = json.loads(token_data_str)
-                        expires_at = datetime.fromisoformat(token_data.get('expires_at', ''))
-                        if current_time > expires_at:
-                            # Clean up associated refresh token if exists
-                            refresh_token = token_data.get('refresh_token')
-                            if refresh_token:
-                                refresh_token_hash = self._hash_token(refresh_token)
-                                refresh_key = self._get_refresh_token_key(refresh_token_hash)
-                                self.redis_client.delete(refresh_key)
-                            
-                            self.redis_client.delete(key)
-                            cleaned_count += 1
-                    except (ValueError, KeyError, TypeError):
-                        # Invalid data, delete the key
-                        self.redis_client.delete(key)
+            async for key, token_data_str in self._scan_values("tokens:*"):
+                if not token_data_str:
+                    continue
+                try:
+                    token_data = json.loads(token_data_str)
+                    access_token = token_data.get('access_token')
+                    access_key = self._get_access_token_key(self._hash_token(access_token)) if access_token else None
+                    expires_at = datetime.fromisoformat(token_data.get('expires_at', ''))
+                    if current_time > expires_at:
+                        # Clean up associated refresh token and access index if they exist
+                        refresh_token = token_data.get('refresh_token')
+                        if refresh_token:
+                            keys_to_delete.add(self._get_refresh_token_key(self._hash_token(refresh_token)))
+                        if access_key:
+                            keys_to_delete.add(access_key)
+                        keys_to_delete.add(key)
                         cleaned_count += 1
+                    else:
+                        current_access_keys[key] = access_key
+                except (ValueError, KeyError, TypeError):
+                    # Invalid data, delete the key
+                    keys_to_delete.add(key)
+                    cleaned_count += 1
             
             # Clean up orphaned refresh tokens
-            pattern = "refresh_token:*"
-            for key in self.redis_client.scan_iter(match=pattern):
-                refresh_data_str = self.redis_client.get(key)
-                if refresh_data_str:
-                    try:
-                        refresh_data = json.loads(refresh_data_str)
-                        expires_at = datetime.fromisoformat(refresh_data.get('expires_at', ''))
-                        if current_time > expires_at:
-                            self.redis_client.delete(key)
-                            cleaned_count += 1
-                    except (ValueError, KeyError, TypeError):
-                        # Invalid data, delete the key
-                        self.redis_client.delete(key)
+            async for key, refresh_data_str in self._scan_values("refresh_token:*"):
+                if not refresh_data_str or key in keys_to_delete:
+                    continue
+                try:
+                    refresh_data = json.loads(refresh_data_str)
+                    expires_at = datetime.fromisoformat(refresh_data.get('expires_at', ''))
+                    if current_time > expires_at:
+                        keys_to_delete.add(key)
+                        cleaned_count += 1
+                except (ValueError, KeyError, TypeError):
+                    # Invalid data, delete the key
+                    keys_to_delete.add(key)
+                    cleaned_count += 1
+            
+            # Clean up access token index entries that no longer match their user's tokens
+            async for key, index_data_str in self._scan_values("access_token:*"):
+                if not index_data_str or key in keys_to_delete:
+                    continue
+                try:
+                    index_data = json.loads(index_data_str)
+                    user_key = self._get_user_key(index_data['user_id'], index_data['user_type'])
+                    if current_access_keys.get(user_key) != key:
+                        keys_to_delete.add(key)
                         cleaned_count += 1
+                except (ValueError, KeyError, TypeError):
+                    # Invalid data, delete the key
+                    keys_to_delete.add(key)
+                    cleaned_count += 1
+            
+            # Delete everything in pipelined batches
+            keys_to_delete = list(keys_to_delete)
+            for i in range(0, len(keys_to_delete), 500):
+                await self.redis_client.delete(*keys_to_delete[i:i + 500])
             
             if cleaned_count > 0:
                 logger.info(f"Cleaned up {cleaned_count} expired tokens")
@@ -412,7 +456,7 @@ class TokenManager:
             logger.error(f"Failed to cleanup expired tokens: {e}")
             return 0
     
-    def get_token_stats(self) -> Dict[str, Any]:
+    async def get_token_stats(self) -> Dict[str, Any]:
         """
         Get statistics about stored tokens
         
@@ -427,13 +471,13 @@ class TokenManager:
                 'available': True,
                 'total_user_tokens': 0,
                 'total_refresh_tokens': 0,
+                'total_access_token_index': 0,
                 'tokens_by_type': {},
                 'tokens_with_remember_me': 0
             }
             
             # Count user tokens
-            pattern = "tokens:*"
-            for key in self.redis_client.scan_iter(match=pattern):
+            async for key, token_data_str in self._scan_values("tokens:*"):
                 stats['total_user_tokens'] += 1
                 
                 # Extract user type from key
@@ -443,7 +487,6 @@ class TokenManager:
                     stats['tokens_by_type'][user_type] = stats['tokens_by_type'].get(user_type, 0) + 1
                 
                 # Check if token has remember_me
-                token_data_str = self.redis_client.get(key)
                 if token_data_str:
                     try:
                         token_data = json.loads(token_data_str)
@@ -453,10 +496,13 @@ class TokenManager:
                         pass
             
             # Count refresh tokens
-            pattern = "refresh_token:*"
-            for key in self.redis_client.scan_iter(match=pattern):
+            async for key in self.redis_client.scan_iter(match="refresh_token:*", count=200):
                 stats['total_refresh_tokens'] += 1
             
+            # Count access token index entries
+            async for key in self.redis_client.scan_iter(match="access_token:*", count=200):
+                stats['total_access_token_index'] += 1
+            
             return stats
             
         except Exception as e:
@@ -0,0 +1,291 @@
+"""
+Two-tier cache for hot, rarely-changing reads.
+
+Tier 1 is a bounded in-process LRU with a short TTL, so repeated reads inside
+one worker never leave the process. Tier 2 is a TaggedCache in Redis shared by
+all workers. Invalidations delete the Redis tier through tag versions and are
+published on a Redis pub/sub channel so every worker drops its local copy too.
+
+Usage:
+    @two_tier_cached("venues", key=lambda include_inactive=False: str(include_inactive),
+                     encode=lambda response: response.model_dump(mode="json"),
+                     decode=VenueResponse.model_validate)
+    async def get_all_venues(include_inactive: bool = False) -> VenueResponse: ...
+
+    await get_all_venues.invalidate()             # every key of the cache
+    await invalidate_cache("feedback_forms", event_id)
+
+Call `start_invalidation_listener()` once per process at startup.
+Hit/miss/eviction counters are exported on /metrics.
+"""
+
+import asyncio
+import copy
+import functools
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from prometheus_client import Counter
+
+from utils.redis_pool import RedisPool
+from utils.tagged_cache import TaggedCache
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "campus_connect:cache:invalidate"
+
+# Defaults for the in-process tier
+LOCAL_CACHE_MAX_ENTRIES = int(os.getenv("LOCAL_CACHE_MAX_ENTRIES", "512"))
+LOCAL_CACHE_TTL_SECONDS = float(os.getenv("LOCAL_CACHE_TTL_SECONDS", "30"))
+
+CACHE_LOOKUPS = Counter(
+    "two_tier_cache_lookups_total",
+    "Two-tier cache lookups by the tier that answered (local, redis or miss)",
+    ["cache", "result"],
+)
+CACHE_EVICTIONS = Counter(
+    "two_tier_cache_evictions_total",
+    "Entries dropped from the in-process cache tier",
+    ["cache", "reason"],
+)
+
+
+class LocalLRUCache:
+    """Bounded in-process LRU whose entries also expire after `ttl_seconds`"""
+
+    def __init__(self, name: str, max_entries: int = LOCAL_CACHE_MAX_ENTRIES, ttl_seconds: float = LOCAL_CACHE_TTL_SECONDS):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        # Bumped on every invalidation; loads that started earlier must not store their result
+        self.generation = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """(found, value); expired entries count as not found"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            CACHE_EVICTIONS.labels(self.name, "expired").inc()
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def set(self, key: Hashable, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            CACHE_EVICTIONS.labels(self.name, "size").inc()
+
+    def discard(self, *keys: Hashable) -> int:
+        """Drop the given keys, or everything when no key is given"""
+        self.generation += 1
+        if not keys:
+            dropped = len(self._entries)
+            self._entries.clear()
+        else:
+            dropped = sum(1 for key in keys if self._entries.pop(key, None) is not None)
+        if dropped:
+            CACHE_EVICTIONS.labels(self.name, "invalidated").inc(dropped)
+        return dropped
+
+
+class TwoTierCache:
+    """In-process LRU in front of a shared TaggedCache, invalidated across workers"""
+
+    def __init__(self, name: str, local_ttl_seconds: float = LOCAL_CACHE_TTL_SECONDS,
+                 max_entries: int = LOCAL_CACHE_MAX_ENTRIES, fresh_seconds: int = 60,
+                 stale_seconds: int = 300, shared: bool = True):
+        """
+        Args:
+            name: Cache name; also the Redis namespace and the metrics label
+            local_ttl_seconds: Lifetime of in-process entries
+            max_entries: Size bound of the in-process tier
+            fresh_seconds / stale_seconds: Redis tier freshness (see TaggedCache)
+            shared: False keeps only the in-process tier, for loaders that already
+                read from a shared cache
+        """
+        self.name = name
+        self.local = LocalLRUCache(name, max_entries, local_ttl_seconds)
+        self.shared = TaggedCache(f"cache:{name}", fresh_seconds, stale_seconds) if shared else None
+
+    def _all_tag(self) -> str:
+        return "*"
+
+    def _key_tag(self, key: str) -> str:
+        return f"key:{key}"
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]],
+                          cache_if: Callable[[Any], bool] = lambda value: value is not None) -> Any:
+        """
+        JSON-compatible value for `key`, loading it with `loader()` on a miss.
+
+        Values rejected by `cache_if` (e.g. error results) are returned but not cached.
+        """
+        found, value = self.local.get(key)
+        if found:
+            CACHE_LOOKUPS.labels(self.name, "local").inc()
+            return value
+
+        generation = self.local.generation
+        loaded = False
+
+        async def load():
+            nonlocal loaded
+            loaded = True
+            return await loader()
+
+        if self.shared is not None:
+            value = await self.shared.get_or_load(key, load, tags=[self._all_tag(), self._key_tag(key)])
+            if not cache_if(value):
+                # Do not keep a rejected value in Redis either
+                await self.shared.invalidate_tags([self._key_tag(key)])
+        else:
+            value = await load()
+
+        CACHE_LOOKUPS.labels(self.name, "miss" if loaded else "redis").inc()
+        if cache_if(value) and generation == self.local.generation:
+            self.local.set(key, value)
+        return value
+
+    async def invalidate(self, *keys: str):
+        """Drop `keys` (or every key when none are given) in Redis and in every worker"""
+        self.local.discard(*keys)
+        if self.shared is not None:
+            await self.shared.invalidate_tags([self._key_tag(key) for key in keys] if keys else [self._all_tag()])
+        await _publish_invalidation(self.name, list(keys))
+
+
+_NOT_LOADED = object()
+
+# name -> cache, so pub/sub messages can be routed to the local tier
+_registry: Dict[str, TwoTierCache] = {}
+
+
+def two_tier_cached(name: str, key: Callable[..., Any], encode: Callable[[Any], Any] = copy.deepcopy,
+                    decode: Callable[[Any], Any] = copy.deepcopy,
+                    cache_if: Callable[[Any], bool] = lambda value: value is not None, **cache_options):
+    """
+    Cache an async function's results in a TwoTierCache.
+
+    Args:
+        name: Cache name (unique per decorated function)
+        key: Builds the cache key from the call's arguments
+        encode: Result -> JSON-compatible value that gets cached (must not share
+            mutable state with the result)
+        decode: Cached value -> result; runs on every hit, so callers never share
+            (and cannot mutate) the cached object
+        cache_if: Encoded values for which this returns False are not cached
+        **cache_options: Passed to TwoTierCache
+
+    The wrapper exposes `.invalidate(*keys)` and `.cache`.
+    """
+    def decorator(function):
+        cache = TwoTierCache(name, **cache_options)
+        _registry[name] = cache
+
+        @functools.wraps(function)
+        async def wrapper(*args, **kwargs):
+            result = _NOT_LOADED
+
+            async def loader():
+                nonlocal result
+                result = await function(*args, **kwargs)
+                return encode(result)
+
+            value = await cache.get_or_load(str(key(*args, **kwargs)), loader, cache_if=cache_if)
+            # A load in this call hands back the original result; hits are decoded
+            return result if result is not _NOT_LOADED else decode(value)
+
+        wrapper.cache = cache
+        wrapper.invalidate = cache.invalidate
+        return wrapper
+
+    return decorator
+
+
+async def invalidate_cache(name: str, *keys: str):
+    """Invalidate keys of a registered cache by name (no-op for unknown names)"""
+    cache = _registry.get(name)
+    if cache is not None:
+        await cache.invalidate(*keys)
+
+
+# ----- cross-worker invalidation -----
+
+_listener_task: Optional[asyncio.Task] = None
+
+
+async def _publish_invalidation(name: str, keys: list):
+    if not RedisPool.is_available():
+        return
+    try:
+        await RedisPool.get_client().publish(INVALIDATION_CHANNEL, json.dumps({"cache": name, "keys": keys}))
+    except Exception as e:
+        logger.warning(f"Failed to publish cache invalidation for {name}: {e}")
+
+
+def _apply_invalidation(raw: Any):
+    try:
+        message = json.loads(raw)
+        cache = _registry.get(message.get("cache"))
+        if cache is not None:
+            cache.local.discard(*(message.get("keys") or []))
+    except Exception as e:
+        logger.warning(f"Ignoring malformed cache invalidation message: {e}")
+
+
+async def _listen():
+    while True:
+        pubsub = None
+        try:
+            pubsub = RedisPool.get_client().pubsub()
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            logger.info("Listening for cache invalidations")
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    _apply_invalidation(message.get("data"))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Anything published while disconnected is lost: start from empty local tiers
+            logger.warning(f"Cache invalidation listener disconnected, retrying: {e}")
+            for cache in _registry.values():
+                cache.local.discard()
+            await asyncio.sleep(5)
+        finally:
+            if pubsub is not None:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+
+async def start_invalidation_listener():
+    """Subscribe this worker to cache invalidations (no-op without a shared Redis)"""
+    global _listener_task
+    if not RedisPool.is_available() or (_listener_task and not _listener_task.done()):
+        return
+    _listener_task = asyncio.create_task(_listen())
+
+
+async def stop_invalidation_listener():
+    global _listener_task
+    if _listener_task:
+        _listener_task.cancel()
+        try:
+            await _listener_task
+        except (asyncio.CancelledError, Exception):
+            pass
+        _listener_task = None
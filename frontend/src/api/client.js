@@ -4,6 +4,7 @@ import api from './base';
 export const clientAPI = {
   // Events - Keep existing event endpoints
   getEvents: (filters) => api.get('/api/v1/client/events/list', { params: filters }),
+  getEventsUnified: (params) => api.get('/api/v1/client/events/unified', { params }),
   getEventDetails: (eventId) => api.get(`/api/v1/client/events/details/${eventId}`),
   
   // UPDATED: Registration - Now using unified participation endpoints
@@ -35,7 +35,10 @@ const eventsCache = {
     return false;
   },
 
-  set: function (data) {
+  // data: { events, nextCursor, nextPage, total } - the pages loaded so far for one query
+  // (query: the serialised request params) and where the next page starts
+  set: function (query, data) {
+    data = { ...data, query };
     this.data = data;
     this.timestamp = Date.now();
 
@@ -48,10 +51,10 @@ const eventsCache = {
     }
   },
 
-  get: function () {
+  get: function (query) {
     // Return memory cache if valid
     if (this.data && this.timestamp && (Date.now() - this.timestamp) < this.duration) {
-      return this.data;
+      return this.data.query === query ? this.data : null;
     }
 
     // Try localStorage cache
@@ -64,7 +67,7 @@ const eventsCache = {
           // Update memory cache
           this.data = data;
           this.timestamp = parseInt(storedTimestamp);
-          return data;
+          return data.query === query ? data : null;
         }
       } catch (error) {
         
@@ -99,11 +102,15 @@ function EventList() {
   const location = useLocation();
   const { user, userType, isAuthenticated } = useAuth(); // Get authentication state
 
-  const [allEvents, setAllEvents] = useState([]); // Store all events
+  const [allEvents, setAllEvents] = useState([]); // Events loaded so far for the current filters
   const [filteredEvents, setFilteredEvents] = useState([]);
   const [paginatedEvents, setPaginatedEvents] = useState([]); // Events for current page
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState('');
+  const [nextCursor, setNextCursor] = useState(null); // Keyset cursor of the next server page
+  const [nextPage, setNextPage] = useState(null); // Next page number of search results
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
+  const [isFetching, setIsFetching] = useState(false); // Refetching after a filter change
 
   // Filter states
   const [searchTerm, setSearchTerm] = useState('');
@@ -120,6 +127,7 @@ function EventList() {
   // Event type counts for filter buttons
   const [eventTypeCounts, setEventTypeCounts] = useState({});
   const [categoryOptions, setCategoryOptions] = useState([]);
+  const [statusCounts, setStatusCounts] = useState({ ongoing: 0, upcoming: 0 });
 
   // Calculate if we should show loading state - include user data loading for students
   const shouldShowLoading = isLoading || (isAuthenticated && userType === 'student' && (!user?.department || !user?.semester));
@@ -127,9 +135,12 @@ function EventList() {
   // Calculate if we're waiting for user data (computed value, not state) 
   const isWaitingForUserData = isAuthenticated && userType === 'student' && (!user?.department || !user?.semester);
 
-  // Ref to prevent multiple simultaneous API calls
-  const fetchingRef = useRef(false);
+  // Id of the latest events request; responses for earlier filters are dropped
+  const requestIdRef = useRef(0);
+  const loadedOnceRef = useRef(false);
   const mountedRef = useRef(true);
+  // Set while appending a loaded page so the filter effect keeps the current page
+  const keepPageRef = useRef(false);
 
   // Update statusFilter when URL parameters change (debounced)
   useEffect(() => {
@@ -152,45 +163,64 @@ function EventList() {
     return () => clearTimeout(timer);
   }, [searchTerm]);
 
-  // Fetch events only once and cache them
   useEffect(() => {
-    
     mountedRef.current = true;
 
-    // Always fetch events on mount (cache will handle duplicates)
-    fetchEventsOnce();
-
     // Cleanup function
     return () => {
-      
       mountedRef.current = false;
     };
-  }, []); // Only run once on mount
-  // Filter events when filter criteria change OR user authentication changes
+  }, []);
+
+  // Request params for the current filters. The "ongoing" tab lists events whose status is ongoing
+  // (server status "live"); the other tabs show the latest events first
+  const buildEventQuery = () => {
+    const params = {
+      status: statusFilter === 'ongoing' ? 'live' : statusFilter,
+      order: statusFilter === 'upcoming' || statusFilter === 'ongoing' ? 'asc' : 'desc',
+      limit: 100 // Server page size cap
+    };
+    if (selectedCategory !== 'all') {
+      params.category = selectedCategory;
+    }
+    const search = debouncedSearchTerm.trim();
+    if (search.length >= 2) {
+      params.mode = 'search';
+      params.q = search;
+    }
+    if (userType === 'student') {
+      params.match_profile = true;
+    }
+    return params;
+  };
+
+  // Status, category and search are applied by the server: any change starts again from its first page
+  const eventQueryKey = JSON.stringify(buildEventQuery());
   useEffect(() => {
-    console.log('🔄 Filter effect triggered:', {
-      allEventsCount: allEvents.length,
-      debouncedSearchTerm,
-      selectedCategory,
-      statusFilter,
-      isAuthenticated,
-      userType,
-      userDepartment: user?.department,
-      userSemester: user?.semester,
-      userObject: user
-    });
-
-    if (allEvents.length > 0) {
-      applyFilters();
-      calculateEventTypeCounts();
+    if (isWaitingForUserData) {
+      return;
+    }
+    fetchEvents();
+  }, [eventQueryKey, isWaitingForUserData]);
+
+  // Live/upcoming totals and category counts for the current status tab
+  useEffect(() => {
+    if (isWaitingForUserData) {
+      return;
+    }
+    fetchListingSummary();
+  }, [statusFilter, isAuthenticated, userType, user?.department, user?.semester, isWaitingForUserData]);
+
+  // Re-apply visibility rules when the loaded events or the user change
+  useEffect(() => {
+    applyFilters();
+    // Reset to first page when filters change (not when more events were appended)
+    if (keepPageRef.current) {
+      keepPageRef.current = false;
     } else {
-      // Even with no events, we should apply filters to clear the display
-      applyFilters();
-      calculateEventTypeCounts();
+      setCurrentPage(1);
     }
-    // Reset to first page when filters change
-    setCurrentPage(1);
-  }, [allEvents, debouncedSearchTerm, selectedCategory, statusFilter, isAuthenticated, userType, user?.department, user?.semester, user]);
+  }, [allEvents, isAuthenticated, userType, user?.department, user?.semester, user]);
 
   // Enhanced pagination effect with loading state
   useEffect(() => {
@@ -328,200 +358,160 @@ function EventList() {
     }
   };
 
-  const fetchEventsOnce = async () => {
-    // Prevent multiple simultaneous calls
-    if (fetchingRef.current) {
-      
-      return;
-    }
+  // Pagination of one server response: listings continue from a cursor, search results by page number
+  const readEventPage = (data, page = 1) => {
+    const pagination = data.pagination || {};
+    return {
+      events: data.events || [],
+      nextCursor: pagination.next_cursor || null,
+      nextPage: data.mode === 'search' && pagination.has_next ? page + 1 : null
+    };
+  };
 
-    // Check if component is still mounted
-    if (!mountedRef.current) {
-      
-      return;
-    }
+  const showEventPage = (loaded) => {
+    setAllEvents(loaded.events);
+    setNextCursor(loaded.nextCursor);
+    setNextPage(loaded.nextPage);
+    setError('');
+  };
+
+  // First page of events for the current filters
+  const fetchEvents = async () => {
+    const params = buildEventQuery();
+    const query = JSON.stringify(params);
+    const requestId = ++requestIdRef.current;
 
     // Check cache first
-    const cachedEvents = eventsCache.get();
-    if (cachedEvents) {
-      
-      if (mountedRef.current) {
-        setAllEvents(cachedEvents);
-        setIsLoading(false);
-        setError('');
-      }
+    const cached = eventsCache.get(query);
+    if (cached) {
+      showEventPage(cached);
+      setIsLoading(false);
+      setIsFetching(false);
       return;
     }
 
     try {
-      fetchingRef.current = true;
-      
-      // Set loading state when fetching
-      if (mountedRef.current) {
+      // Full-page spinner only for the first load, later filter changes keep the controls on screen
+      if (loadedOnceRef.current) {
+        setIsFetching(true);
+      } else {
         setIsLoading(true);
-        setError('');
       }
+      setError('');
 
-      // First, try to get all events with a high limit
-      let response = await clientAPI.getEvents({
-        status: 'all',
-        limit: 1000 // Set high limit to get all events
-      });
+      const response = await clientAPI.getEventsUnified(params);
 
-      // Check if component is still mounted before processing response
-      if (!mountedRef.current) {
-        
+      // Drop responses for filters that have since changed
+      if (!mountedRef.current || requestId !== requestIdRef.current) {
         return;
       }
 
       if (response.data && response.data.success) {
-        let allFetchedEvents = response.data.events || [];
-        
-        
+        const loaded = readEventPage(response.data);
+        eventsCache.set(query, loaded);
+        showEventPage(loaded);
+      } else {
+        setAllEvents([]);
+        setNextCursor(null);
+        setNextPage(null);
+        setError(response.data?.message || 'Failed to load events - API returned unsuccessful response');
+      }
+    } catch (error) {
+      if (mountedRef.current && requestId === requestIdRef.current) {
+        setError(`Failed to load events: ${error.message}`);
+      }
+    } finally {
+      if (mountedRef.current && requestId === requestIdRef.current) {
+        loadedOnceRef.current = true;
+        setIsLoading(false);
+        setIsFetching(false);
+      }
+    }
+  };
 
-        // If there are more pages, fetch them all
-        if (response.data.pagination && response.data.pagination.total_pages > 1) {
-          
+  // Append the next server page of events (from the "Load more events" button)
+  const loadMoreEvents = async () => {
+    if ((!nextCursor && !nextPage) || isLoadingMore || !mountedRef.current) {
+      return;
+    }
 
-          for (let page = 2; page <= response.data.pagination.total_pages; page++) {
-            if (!mountedRef.current) break; // Stop if component unmounted
-
-            try {
-              const pageResponse = await clientAPI.getEvents({
-                status: 'all',
-                page: page,
-                limit: 1000
-              });
-
-              if (pageResponse.data && pageResponse.data.success) {
-                const pageEvents = pageResponse.data.events || [];
-                allFetchedEvents = [...allFetchedEvents, ...pageEvents];
-                
-              }
-            } catch (pageError) {
-              
-            }
-          }
-        }
+    const params = buildEventQuery();
+    const query = JSON.stringify(params);
+    const requestId = requestIdRef.current;
 
-        
+    try {
+      setIsLoadingMore(true);
 
-        // Cache the complete events list
-        eventsCache.set(allFetchedEvents);
+      const response = await clientAPI.getEventsUnified(
+        nextCursor ? { ...params, cursor: nextCursor } : { ...params, page: nextPage }
+      );
 
-        // Update state only if component is still mounted
-        if (mountedRef.current) {
-          setAllEvents(allFetchedEvents);
-          setError('');
-        }
+      if (!mountedRef.current || requestId !== requestIdRef.current) {
+        return;
+      }
+
+      if (response.data && response.data.success) {
+        const page = readEventPage(response.data, nextPage || 1);
+        const loaded = { ...page, events: [...allEvents, ...page.events] };
 
+        eventsCache.set(query, loaded);
+        keepPageRef.current = true;
+        showEventPage(loaded);
       } else {
-        
-        if (mountedRef.current) {
-          setError('Failed to load events - API returned unsuccessful response');
-        }
+        setError('Failed to load more events - API returned unsuccessful response');
       }
     } catch (error) {
-      
       if (mountedRef.current) {
-        setError(`Failed to load events: ${error.message}`);
+        setError(`Failed to load more events: ${error.message}`);
       }
     } finally {
       if (mountedRef.current) {
-        setIsLoading(false);
+        setIsLoadingMore(false);
       }
-      fetchingRef.current = false;
     }
-  };  // Regular filtering function (not wrapped in useMemo)
-  const applyFilters = () => {
-    let filtered = [...allEvents];
-
-    // Sort events by date (most recent first)
-    filtered.sort((a, b) => {
-      const dateA = new Date(a.event_date || a.created_at || 0);
-      const dateB = new Date(b.event_date || b.created_at || 0);
-      return dateB - dateA; // Descending order (newest first)
-    });
-
-    // ===== INTELLIGENT USER-BASED FILTERING =====
-    console.log('🔍 Applying intelligent user-based filtering...', {
-      isAuthenticated,
-      userType,
-      userDepartment: user?.department,
-      userSemester: user?.semester,
-      userObject: user,
-      totalEvents: filtered.length,
-      filteringMode: !isAuthenticated ? 'public' :
-        userType === 'faculty' ? 'faculty' :
-          userType === 'student' && !user?.department ? 'student-no-dept' :
-            userType === 'student' && !user?.semester ? 'student-dept-only' :
-              userType === 'student' ? 'student-full' : 'other'
-    });
-
-    // Apply user-based filtering using helper function
-    filtered = getUserFilteredEvents(filtered);
+  };
 
-    
-    // ===== END INTELLIGENT USER-BASED FILTERING =====
+  // Live/upcoming totals and per-category counts, counted by the server over all matching events
+  const fetchListingSummary = async () => {
+    const profile = userType === 'student' ? { match_profile: true } : {};
 
-    // Apply status filter
-    if (statusFilter !== 'all') {
-      filtered = filtered.filter(event => event.status === statusFilter);
-    }
+    try {
+      const [live, upcoming, categories] = await Promise.all([
+        clientAPI.getEventsUnified({ status: 'live', limit: 1, ...profile }),
+        clientAPI.getEventsUnified({ status: 'upcoming', limit: 1, ...profile }),
+        clientAPI.getEventsUnified({
+          mode: 'categories',
+          status: statusFilter === 'ongoing' ? 'live' : statusFilter,
+          ...profile
+        })
+      ]);
 
-    // Apply search filter
-    if (debouncedSearchTerm.trim()) {
-      const search = debouncedSearchTerm.toLowerCase();
-      filtered = filtered.filter(event =>
-        event.event_name?.toLowerCase().includes(search) ||
-        event.description?.toLowerCase().includes(search) ||
-        event.organizing_department?.toLowerCase().includes(search) ||
-        event.event_type?.toLowerCase().includes(search)
-      );
-    }
+      if (!mountedRef.current) {
+        return;
+      }
 
-    // Apply category filter
-    if (selectedCategory !== 'all') {
-      filtered = filtered.filter(event =>
-        event.event_type?.toLowerCase() === selectedCategory.toLowerCase()
-      );
-    }
+      setStatusCounts({
+        ongoing: live.data?.pagination?.total_events || 0,
+        upcoming: upcoming.data?.pagination?.total_events || 0
+      });
 
-    
-    setFilteredEvents(filtered);
+      const counts = categories.data?.counts || {};
+      setEventTypeCounts(counts);
+      setCategoryOptions([
+        { value: 'all', label: `All Categories (${categories.data?.total_events || 0})` },
+        ...Object.entries(counts).map(([category, count]) => ({
+          value: category,
+          label: `${category} (${count})`
+        }))
+      ]);
+    } catch (error) {
+      // The counts are informational, the list itself still works without them
+    }
   };
 
-  // Regular event type counts calculation (not wrapped in useMemo)
-  const calculateEventTypeCounts = () => {
-    const counts = {};
-
-    // Step 1: Apply user-based filtering using helper function
-    const userFilteredEvents = getUserFilteredEvents(allEvents);
-
-    // Step 2: Apply status filter on user-filtered events
-    const eventsToCount = statusFilter === 'all'
-      ? userFilteredEvents
-      : userFilteredEvents.filter(event => event.status === statusFilter);
-
-    eventsToCount.forEach(event => {
-      const type = event.event_type || 'Other';
-      counts[type] = (counts[type] || 0) + 1;
-    });
-    setEventTypeCounts(counts);
-
-    // Create category options for dropdown based on user-filtered events
-    const options = [
-      { value: 'all', label: `All Categories (${eventsToCount.length})` }
-    ];
-
-    Object.entries(counts).forEach(([type, count]) => {
-      options.push({
-        value: type.toLowerCase(),
-        label: `${type} (${count})`
-      });
-    });
-
-    setCategoryOptions(options);
+  // Completed-event visibility and audience rules stay client-side
+  const applyFilters = () => {
+    setFilteredEvents(getUserFilteredEvents(allEvents));
   };
 
   const handleCategoryChange = (category) => {
@@ -621,14 +611,6 @@ function EventList() {
     if (statusFilter === 'upcoming') return 'Events you can register for';
     if (statusFilter === 'ongoing') return 'Events happening right now';
     return 'Find events that interest you';
-  }; const getEventStatusCounts = () => {
-    // Step 1: Apply user-based filtering using helper function
-    const userFilteredEvents = getUserFilteredEvents(allEvents);
-
-    // Step 2: Count statuses from user-filtered events
-    const ongoing = userFilteredEvents.filter(e => e.status === 'ongoing').length;
-    const upcoming = userFilteredEvents.filter(e => e.status === 'upcoming').length;
-    return { ongoing, upcoming };
   };  // Refresh function for manual refresh
   const handleRefresh = () => {
     console.log('🔄 Manual refresh triggered - clearing cache and fetching fresh data');
@@ -638,18 +620,18 @@ function EventList() {
     
     // Reset all states to force fresh fetch
     setAllEvents([]);
+    setNextCursor(null);
+    setNextPage(null);
     setFilteredEvents([]);
     setPaginatedEvents([]);
-    setIsLoading(true);
     setError('');
     setCurrentPage(1);
     
-    // Reset fetch flag
-    fetchingRef.current = false;
-    
     // Fetch fresh data
     if (mountedRef.current) {
-      fetchEventsOnce();
+      loadedOnceRef.current = false;
+      fetchEvents();
+      fetchListingSummary();
     }
   };
 
@@ -682,8 +664,9 @@ function EventList() {
     );
   }
 
-  const statusCounts = getEventStatusCounts(); 
-  
+  // Search or category narrowing (an empty result then means "no match" rather than "no events")
+  const hasSearchFilters = debouncedSearchTerm.trim().length >= 2 || selectedCategory !== 'all';
+
   return (
     <div className="min-h-screen bg-gradient-to-br from-teal-50 to-sky-100 pt-26">
       {/* Content Layer */}
@@ -734,7 +717,7 @@ function EventList() {
                 />
               </div>
             </div>            {/* Quick Stats */}
-            {allEvents.length > 0 && (
+            {(allEvents.length > 0 || hasSearchFilters) && (
               <div className="mt-6 pt-6 border-t border-teal-200">
                 <div className="flex items-center justify-between text-sm">
                   <span className="text-gray-600">
@@ -791,7 +774,7 @@ function EventList() {
 
           {/* Events Grid */}
           <div className="max-w-6xl mx-auto px-4">
-            <div className={`grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6 transition-opacity duration-200 ${isChangingPage ? 'opacity-50' : 'opacity-100'}`} id="eventsGrid">
+            <div className={`grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6 transition-opacity duration-200 ${isChangingPage || isFetching ? 'opacity-50' : 'opacity-100'}`} id="eventsGrid">
               {isChangingPage && (
                 <div className="col-span-full flex justify-center py-8">
                   <div className="flex items-center space-x-2 text-teal-600">
@@ -885,7 +868,23 @@ function EventList() {
                 </div>
               </div>
             )}
-          </div>          {/* No Events State */}
+          </div>
+
+          {/* Load More - later server pages are fetched on request */}
+          {!isLoading && (nextCursor || nextPage) && (
+            <div className="max-w-6xl mx-auto px-4 mt-6 text-center">
+              <button
+                onClick={loadMoreEvents}
+                disabled={isLoadingMore}
+                className="inline-block px-6 py-3 border-2 border-teal-600 text-teal-600 rounded-lg hover:bg-teal-50 transition-colors font-semibold disabled:opacity-50"
+              >
+                <i className={`fas ${isLoadingMore ? 'fa-spinner fa-spin' : 'fa-chevron-down'} mr-2`}></i>
+                {isLoadingMore ? 'Loading more events...' : 'Load more events'}
+              </button>
+            </div>
+          )}
+
+          {/* No Events State */}
           {!isLoading && paginatedEvents.length === 0 && (
             <div className="max-w-6xl mx-auto px-4">
               <div className="text-center py-16 bg-gradient-to-br from-gray-50 to-gray-100 rounded-xl">
@@ -898,13 +897,13 @@ function EventList() {
                 <h3 className="text-xl font-bold text-gray-700 mb-3">
                   {isWaitingForUserData
                     ? 'Loading Your Events...'
-                    : (allEvents.length === 0 ? 'No Events Found' : 'No Events Match Your Criteria')
+                    : (!hasSearchFilters ? 'No Events Found' : 'No Events Match Your Criteria')
                   }
                 </h3>
                 <p className="text-gray-500 mb-6 max-w-md mx-auto">
                   {isWaitingForUserData
                     ? 'Please wait while we load events tailored for your profile...'
-                    : (allEvents.length === 0
+                    : (!hasSearchFilters
                       ? (() => {
                         if (!isAuthenticated) {
                           return statusFilter === 'upcoming'
@@ -947,7 +946,7 @@ function EventList() {
                   }
                 </p>
                 <div className="space-x-3">
-                  {allEvents.length === 0 ? (
+                  {!hasSearchFilters ? (
                     <>
                       <Link
                         to="/client/events?filter=all"